@@ -1,61 +1,36 @@
 #!/usr/bin/env python3
 """
 Carefully add exchange rounds implementation to node.js
+
+Adds the ExchangeCoordinator ABI and contract, exchangeMultisigKeys(), the
+coordinator/participant exchange round methods, and the participant call in
+monitorNetwork(). Safe to re-run: steps that are already applied are skipped,
+and methods that already exist are kept as they are (newer trees have
+reworked them), never replaced.
+
+Usage: python3 add_exchange_rounds.py [--dry-run] [file]
 """
-from pathlib import Path
-import re
+import sys
 
-def main():
-    p = Path('node.js')
-    content = p.read_text()
-    
-    # Step 1: Add exchangeCoordinatorABI after zfiABI
-    print("Step 1: Adding exchangeCoordinatorABI...")
-    zfi_abi_pattern = r"(    const zfiABI = \[[\s\S]*?\];)\n"
-    match = re.search(zfi_abi_pattern, content)
-    if not match:
-        print("ERROR: Could not find zfiABI")
-        return False
-    
-    exchange_abi = """
+from patch_node import Insert, InsertAfterLine, InsertAfterStatement, run
+
+EXCHANGE_ABI = """
     const exchangeCoordinatorABI = [
       'function submitExchangeInfo(bytes32 clusterId, uint8 round, string exchangeInfo, address[] clusterNodes) external',
       'function getExchangeRoundInfo(bytes32 clusterId, uint8 round, address[] clusterNodes) external view returns (address[] addresses, string[] exchangeInfos)',
       'function getExchangeRoundStatus(bytes32 clusterId, uint8 round) external view returns (bool complete, uint8 submitted)'
     ];
 """
-    
-    content = content.replace(match.group(0), match.group(0) + exchange_abi)
-    print("  ✓ Added exchangeCoordinatorABI")
-    
-    # Step 2: Add exchangeCoordinator contract initialization after this.zfi
-    print("Step 2: Adding exchangeCoordinator contract...")
-    zfi_contract_pattern = r"(    this\.zfi = new ethers\.Contract\([\s\S]*?\);)\n"
-    match = re.search(zfi_contract_pattern, content)
-    if not match:
-        print("ERROR: Could not find this.zfi initialization")
-        return False
-    
-    exchange_contract = """
+
+EXCHANGE_CONTRACT = """
     this.exchangeCoordinator = new ethers.Contract(
       '0x9D6DDb5A20F1Abd6CAb63c7545BE69Ac2615E5C4',
       exchangeCoordinatorABI,
       this.wallet
     );
 """
-    
-    content = content.replace(match.group(0), match.group(0) + exchange_contract)
-    print("  ✓ Added exchangeCoordinator contract")
-    
-    # Step 3: Add exchangeMultisigKeys method after makeMultisig
-    print("Step 3: Adding exchangeMultisigKeys method...")
-    make_multisig_pattern = r"(  async makeMultisig\([\s\S]*?\n  \})\n"
-    match = re.search(make_multisig_pattern, content)
-    if not match:
-        print("ERROR: Could not find makeMultisig method")
-        return False
-    
-    exchange_method = """
+
+EXCHANGE_METHOD = """
 
   async exchangeMultisigKeys(multisigInfos, password) {
     console.log(`\\n→ Exchanging multisig keys (${multisigInfos.length} peers)...`);
@@ -78,21 +53,10 @@ def main():
     }
   }
 """
-    
-    content = content.replace(match.group(0), match.group(0) + exchange_method)
-    print("  ✓ Added exchangeMultisigKeys method")
-    
-    # Step 4: Replace finalizeClusterWithMultisigCoordination with new version
-    print("Step 4: Replacing finalizeClusterWithMultisigCoordination...")
-    
-    # Find the entire function
-    finalize_pattern = r"  async finalizeClusterWithMultisigCoordination\(clusterId\) \{[\s\S]*?\n  \}\n(?=\n  async registerToQueue)"
-    match = re.search(finalize_pattern, content)
-    if not match:
-        print("ERROR: Could not find finalizeClusterWithMultisigCoordination")
-        return False
-    
-    new_finalize = '''  async finalizeClusterWithMultisigCoordination(clusterId) {
+
+# finalizeClusterWithMultisigCoordination, confirmClusterOnChain and the
+# coordinator/participant round methods
+EXCHANGE_ROUNDS = '''  async finalizeClusterWithMultisigCoordination(clusterId) {
     try {
       // Fetch forming cluster multisig info list (addresses aligned to selectedAddrs)
       const [addrList, infoList] = await this.registry.getFormingClusterMultisigInfo();
@@ -362,27 +326,24 @@ def main():
     }
   }
 '''
-    
-    content = content.replace(match.group(0), new_finalize)
-    print("  ✓ Replaced finalizeClusterWithMultisigCoordination with full exchange implementation")
-    
-    # Step 5: Add participateInExchangeRounds call for non-coordinators
-    print("Step 5: Adding non-coordinator participation...")
-    waiting_pattern = r"(                } else \{\n                  console\.log\('⏳ Waiting for coordinator to finalize cluster\.\.\.'\);)\n"
-    match = re.search(waiting_pattern, content)
-    if not match:
-        print("ERROR: Could not find waiting for coordinator message")
-        return False
-    
-    participate_call = "                  await this.participateInExchangeRounds(clusterId);\n"
-    content = content.replace(match.group(0), match.group(0) + participate_call)
-    print("  ✓ Added non-coordinator participation")
-    
-    # Write the updated content
-    p.write_text(content)
-    print("\n✅ Successfully added complete exchange rounds implementation")
-    return True
+
+OPS = [
+    # Step 1: exchangeCoordinatorABI after zfiABI
+    InsertAfterStatement('constructor', 'const zfiABI', EXCHANGE_ABI,
+                         unless='const exchangeCoordinatorABI', blank_line=True),
+    # Step 2: exchangeCoordinator contract after this.zfi
+    InsertAfterStatement('constructor', 'this.zfi =', EXCHANGE_CONTRACT,
+                         unless='this.exchangeCoordinator =', blank_line=True),
+    # Step 3: exchangeMultisigKeys after makeMultisig (trees that already
+    # exchange through the coordinator rounds do without it)
+    Insert(EXCHANGE_METHOD, after='makeMultisig', keep_existing=True, unless='coordinateExchangeRound'),
+    # Step 4: full exchange implementation (only the methods still missing)
+    Insert(EXCHANGE_ROUNDS, after='makeMultisig', keep_existing=True),
+    # Step 5: non-coordinators participate in the exchange rounds
+    InsertAfterLine('monitorNetwork', "console.log('⏳ Waiting for coordinator to finalize cluster...');",
+                    'await this.participateInExchangeRounds(clusterId);',
+                    unless='this.participateInExchangeRounds(clusterId)'),
+]
 
 if __name__ == '__main__':
-    success = main()
-    exit(0 if success else 1)
+    sys.exit(0 if run(OPS, 'Add exchange rounds implementation to node.js') else 1)
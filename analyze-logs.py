@@ -0,0 +1,608 @@
+#!/usr/bin/env python3
+"""
+Rebuild multisig ceremony timelines from ZNode logs and report latency.
+
+Reads the stdout ZNode writes (znode.service -> node.log / the journal) for
+any number of nodes in one pass and reports, per exchange round, latency
+percentiles and how long each node waited on the slowest peer (own
+submission -> round complete), time from selection to a ready multisig
+wallet per node and per cluster, and requeue / ghost rates.
+
+Inputs are plain or gzipped files (detected by magic bytes), directories
+(walked recursively) or '-' for stdin. Latency needs timestamps, so export
+the journal with one of
+  journalctl -u znode -o short-iso      2026-10-16T12:00:01+0000 host node[7]: ...
+  journalctl -u znode -o short-precise  Oct 16 12:00:01.123456 host node[7]: ...
+  journalctl -u znode -o short-unix     1792152001.123456 host node[7]: ...
+or prefix node.log lines with an ISO timestamp (e.g. `| ts '%Y-%m-%dT%H:%M:%.S'`).
+Lines without a timestamp inherit the previous one from the same file; a
+file without any is still counted (requeues, ghosts) but yields no latency.
+The node is the journal host name, else the file name.
+
+Memory stays flat however large the archive: files are merged by timestamp
+as streams, every line is matched against one precompiled alternation of
+all event patterns (bytes, no decoding unless it hits), round rows are
+written as they complete, clusters are flushed once idle, and percentiles
+come from fixed log-scale histograms.
+
+Usage:
+  analyze-logs.py [options] <file | dir | ->...
+Options:
+  --csv DIR          write rounds.csv, clusters.csv and nodes.csv to DIR
+  --json FILE        write the summary (percentiles, per-node stats) as JSON
+  --year YYYY        year for `short` timestamps (default: current year)
+  --cluster-idle S   flush a cluster after S seconds without events (default 3600)
+"""
+import argparse
+import calendar
+import csv
+import gzip
+import heapq
+import json
+import math
+import os
+import re
+import sys
+import time
+
+# --- event patterns: one alternation, dispatched on the matched group name ---
+
+PATTERNS = [
+    ('queue', r'Queue: (\d+) \| Selected: (\d+)/11'),
+    ('registered', r'✓ Registered to queue'),
+    ('requeue', r'Re-queuing: reason staleRound=(\w+) degenerate=(\w+) needsQueue=(\w+)'),
+    ('ghost', r'Ghost (?:state )?detected'),
+    ('stale_cleared', r'Stale forming cluster cleared on-chain'),
+    ('selected', r'✅ Selected for cluster!'),
+    ('cluster_id', r'Computed clusterId: (0x[0-9a-fA-F]{64})'),
+    ('coordinator', r'🎯 I am the coordinator'),
+    ('participant', r'⏳ Waiting for coordinator to finalize'),
+    ('round_start', r'(?:Coordinator: Starting|Participating in) Round (\d+)'),
+    ('round_submitted', r'✓ Submitted (?:my )?exchange info for round (\d+)'),
+    ('round_progress', r'(?:Progress|Waiting): (\d+)/11 nodes submitted'),
+    ('round_all_in', r'✓ (?:All nodes submitted|Round complete) \((\d+)/11\)'),
+    ('round_done', r'✓ Round (\d+) (?:exchange )?complete'),
+    ('round_failed', r'❌ Round (\d+) (?:error|failed|participation failed)'),
+    ('ready', r'✅ (?:Final multisig address: (\w+)|Multisig exchange complete and ready)'),
+    ('finalized', r'✓ Cluster finalized on-chain|Cluster already finalized'),
+]
+
+EVENTS = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in PATTERNS).encode())
+# Every pattern starts with one of these literals. A search for plain
+# literals gets the regex engine's first-byte skip, so noise lines are
+# rejected quickly and EVENTS only runs anchored at a candidate position.
+ANCHORS = re.compile('|'.join(re.escape(a) for a in (
+    'Queue: ', 'Re-queuing', 'Ghost ', 'Stale forming', 'Computed clusterId', 'Coordinator: Starting',
+    'Participating in', 'Progress: ', 'Waiting: ', 'Cluster already', '✓ ', '✅ ', '❌ ', '🎯 ', '⏳ ',
+)).encode())
+# Positional capture groups of each alternative, resolved once
+GROUPS = {}
+for _name, _pattern in PATTERNS:
+    _first = EVENTS.groupindex[_name] + 1
+    GROUPS[_name] = range(_first, _first + re.compile(_pattern).groups)
+
+# --- timestamp prefixes (journalctl short-iso / short / short-unix, plain ISO) ---
+
+_HOST = rb'(?:(\S+) [^\s:\[]+\[\d+\]: )?'
+TS_ISO = re.compile(rb'^(\d{4}-\d\d-\d\d)[T ](\d\d:\d\d:\d\d)(\.\d+)?(Z|[+-]\d\d:?\d\d)?\s+' + _HOST)
+TS_SHORT = re.compile(rb'^([A-Z][a-z]{2}) +(\d{1,2}) (\d\d:\d\d:\d\d)(\.\d+)? ' + _HOST)
+TS_UNIX = re.compile(rb'^(\d{9,11}(?:\.\d+)?) ' + _HOST)
+MONTHS = {m.encode(): i for i, m in enumerate(calendar.month_abbr) if m}
+
+_epoch_cache = {}
+
+
+def _epoch(key, fmt):
+    """Whole-second epoch for a timestamp prefix, cached (lines share seconds)"""
+    value = _epoch_cache.get(key)
+    if value is None:
+        if len(_epoch_cache) > 4096:
+            _epoch_cache.clear()
+        value = calendar.timegm(time.strptime(key, fmt))
+        _epoch_cache[key] = value
+    return value
+
+
+def parse_prefix(line, year):
+    """(epoch seconds or None, host or None)"""
+    m = TS_ISO.match(line)
+    if m:
+        date, clock, frac, tz, host = m.groups()
+        ts = _epoch(f'{date.decode()} {clock.decode()}', '%Y-%m-%d %H:%M:%S')
+        if frac:
+            ts += float(frac)
+        if tz and tz != b'Z':
+            sign = -1 if tz[:1] == b'+' else 1
+            tz = tz.replace(b':', b'')
+            ts += sign * (int(tz[1:3]) * 3600 + int(tz[3:5]) * 60)
+        return ts, host
+    m = TS_SHORT.match(line)
+    if m:
+        month, day, clock, frac, host = m.groups()
+        ts = _epoch(f'{year}-{MONTHS.get(month, 1)}-{int(day)} {clock.decode()}', '%Y-%m-%d %H:%M:%S')
+        return ts + (float(frac) if frac else 0.0), host
+    m = TS_UNIX.match(line)
+    if m:
+        return float(m.group(1)), m.group(2)
+    return None, None
+
+
+# --- inputs ---
+
+def expand_inputs(targets):
+    for target in targets:
+        if target != '-' and os.path.isdir(target):
+            for root, _, files in os.walk(target):
+                for name in sorted(files):
+                    yield os.path.join(root, name)
+        else:
+            yield target
+
+
+def open_log(path):
+    if path == '-':
+        return sys.stdin.buffer
+    f = open(path, 'rb', buffering=1 << 20)
+    if f.peek(2)[:2] == b'\x1f\x8b':
+        return gzip.open(f, 'rb')
+    return f
+
+
+def node_name(path):
+    name = os.path.basename(path)
+    for suffix in ('.gz', '.log', '.txt', '.journal'):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name or 'stdin'
+
+
+def read_events(path, index, year, stats):
+    """Matched events of one file in log order: (ts, index, seq, node, kind, args)"""
+    default_node = node_name(path)
+    ts = None
+    seq = 0
+    search = ANCHORS.search
+    match = EVENTS.match
+    f = open_log(path)
+    try:
+        for line in f:
+            stats['lines'] += 1
+            m = None
+            anchor = search(line)
+            while anchor is not None:
+                m = match(line, anchor.start())
+                if m is not None:
+                    break
+                anchor = search(line, anchor.start() + 1)
+            if m is None:
+                continue
+            line_ts, host = parse_prefix(line, year)
+            if line_ts is not None:
+                ts = line_ts
+            kind = m.lastgroup
+            args = tuple(m.group(i).decode() if m.group(i) else None for i in GROUPS[kind])
+            seq += 1
+            yield (ts if ts is not None else 0.0, index, seq,
+                   host.decode() if host else default_node, kind, args, ts is not None)
+    finally:
+        if f is not sys.stdin.buffer:
+            f.close()
+
+
+# --- fixed-size log histogram (~1% relative error) ---
+
+class Histogram:
+    BASE = math.log(1.02)
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        value = max(value, 0.0)
+        bucket = int(math.log(value + 1e-3) / self.BASE)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, p):
+        if not self.count:
+            return None
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(math.exp((bucket + 0.5) * self.BASE) - 1e-3, self.max)
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 3),
+            'p50': round(self.percentile(50), 3),
+            'p90': round(self.percentile(90), 3),
+            'p99': round(self.percentile(99), 3),
+            'max': round(self.max, 3),
+        }
+
+
+# --- timeline reconstruction ---
+
+ROUND_FIELDS = ['node', 'cluster', 'round', 'role', 'start', 'submitted', 'complete',
+                'duration_s', 'peer_wait_s', 'submitted_peers', 'status']
+CLUSTER_FIELDS = ['cluster', 'nodes', 'first_selected', 'first_round_start', 'last_round_complete',
+                  'confirmed', 'time_to_confirm_s', 'rounds_failed', 'status']
+NODE_FIELDS = ['node', 'events', 'span_h', 'clusters', 'rounds', 'rounds_failed', 'requeues',
+               'requeues_per_h', 'ghosts', 'ghosts_per_h', 'peer_wait_p50_s', 'peer_wait_max_s']
+
+
+def _iso(ts):
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(ts)) if ts else ''
+
+
+def _delta(a, b):
+    return round(b - a, 3) if a is not None and b is not None else None
+
+
+class Analyzer:
+    def __init__(self, round_sink, cluster_sink, cluster_idle):
+        self.round_sink = round_sink
+        self.cluster_sink = cluster_sink
+        self.cluster_idle = cluster_idle
+        self.nodes = {}
+        self.clusters = {}
+        self.now = 0.0
+        self.round_latency = {}  # round -> Histogram
+        self.peer_wait = {}      # round -> Histogram
+        self.node_ttc = Histogram()
+        self.cluster_ttc = Histogram()
+        self.queue_len = Histogram()
+        self.requeue_reasons = {}
+        self.totals = {'rounds': 0, 'rounds_failed': 0, 'clusters': 0, 'clusters_confirmed': 0,
+                       'requeues': 0, 'ghosts': 0, 'stale_cleared': 0}
+
+    def node(self, name, ts):
+        state = self.nodes.get(name)
+        if state is None:
+            state = self.nodes[name] = {
+                'first': ts, 'last': ts, 'events': 0, 'cluster': None, 'seen_cluster': None,
+                'role': None, 'selected_at': None, 'ready': False, 'rounds': {}, 'current_round': None,
+                'clusters': 0, 'rounds_done': 0, 'rounds_failed': 0, 'requeues': 0, 'ghosts': 0,
+                'peer_wait': Histogram(),
+            }
+        if ts is not None:
+            if state['first'] is None:
+                state['first'] = ts
+            state['last'] = ts
+        state['events'] += 1
+        return state
+
+    def cluster(self, key, ts):
+        c = self.clusters.get(key)
+        if c is None:
+            c = self.clusters[key] = {
+                'nodes': set(), 'first_selected': None, 'first_round_start': None,
+                'last_round_complete': None, 'confirmed': None, 'last_ready': None,
+                'rounds_failed': 0, 'last_event': ts,
+            }
+            self.totals['clusters'] += 1
+        if ts is not None:
+            c['last_event'] = ts
+        return c
+
+    def feed(self, ts, name, kind, args, timed):
+        ts = ts if timed else None
+        if ts is not None:
+            self.now = max(self.now, ts)
+        n = self.node(name, ts)
+        handler = getattr(self, f'on_{kind}')
+        handler(n, name, ts, *args)
+
+    # Queue / registration
+
+    def on_queue(self, n, name, ts, queue_len, selected):
+        self.queue_len.add(float(queue_len))
+
+    def on_registered(self, n, name, ts):
+        self._leave(n, name, 'requeued')
+
+    def on_requeue(self, n, name, ts, stale_round, degenerate, needs_queue):
+        n['requeues'] += 1
+        self.totals['requeues'] += 1
+        for reason, flag in (('staleRound', stale_round), ('degenerate', degenerate), ('needsQueue', needs_queue)):
+            if flag == 'true':
+                self.requeue_reasons[reason] = self.requeue_reasons.get(reason, 0) + 1
+        self._leave(n, name, 'requeued')
+
+    def on_ghost(self, n, name, ts):
+        n['ghosts'] += 1
+        self.totals['ghosts'] += 1
+
+    def on_stale_cleared(self, n, name, ts):
+        self.totals['stale_cleared'] += 1
+
+    # Cluster membership
+
+    def on_selected(self, n, name, ts):
+        if n['selected_at'] is None and (n['cluster'] is None or n['ready']):
+            n['selected_at'] = ts
+
+    def on_cluster_id(self, n, name, ts, cluster_id):
+        n['seen_cluster'] = cluster_id[:10].lower()
+
+    def _join(self, n, name, ts, role):
+        key = n['seen_cluster']
+        if key is None or n['cluster'] == key:
+            return
+        selected = n['selected_at']
+        self._leave(n, name, 'incomplete')
+        n['selected_at'] = selected
+        n['cluster'] = key
+        n['role'] = role
+        n['ready'] = False
+        n['clusters'] += 1
+        c = self.cluster(key, ts)
+        c['nodes'].add(name)
+        selected = n['selected_at'] if n['selected_at'] is not None else ts
+        if selected is not None and (c['first_selected'] is None or selected < c['first_selected']):
+            c['first_selected'] = selected
+
+    def on_coordinator(self, n, name, ts):
+        self._join(n, name, ts, 'coordinator')
+
+    def on_participant(self, n, name, ts):
+        self._join(n, name, ts, 'participant')
+
+    def _leave(self, n, name, status):
+        for number in list(n['rounds']):
+            self._end_round(n, name, number, status)
+        n['cluster'] = None
+        n['selected_at'] = None
+        n['current_round'] = None
+
+    # Rounds
+
+    def on_round_start(self, n, name, ts, number):
+        number = int(number)
+        if number in n['rounds']:
+            return
+        n['rounds'][number] = {'start': ts, 'submitted': None, 'complete': None, 'peers': None}
+        n['current_round'] = number
+        if n['cluster']:
+            c = self.cluster(n['cluster'], ts)
+            if ts is not None and (c['first_round_start'] is None or ts < c['first_round_start']):
+                c['first_round_start'] = ts
+
+    def on_round_submitted(self, n, name, ts, number):
+        number = int(number)
+        if number not in n['rounds']:
+            self.on_round_start(n, name, None, str(number))
+        r = n['rounds'][number]
+        if r['submitted'] is None:
+            r['submitted'] = ts
+
+    def on_round_progress(self, n, name, ts, submitted):
+        r = n['rounds'].get(n['current_round'])
+        if r is not None:
+            r['peers'] = int(submitted)
+
+    def on_round_all_in(self, n, name, ts, submitted):
+        number = n['current_round']
+        if number in n['rounds']:
+            n['rounds'][number]['peers'] = int(submitted)
+            self._end_round(n, name, number, 'complete', ts)
+
+    def on_round_done(self, n, name, ts, number):
+        number = int(number)
+        if number in n['rounds']:
+            self._end_round(n, name, number, 'complete', ts)
+
+    def on_round_failed(self, n, name, ts, number):
+        number = int(number)
+        if number in n['rounds']:
+            self._end_round(n, name, number, 'failed', ts)
+
+    def _end_round(self, n, name, number, status, ts=None):
+        r = n['rounds'].pop(number)
+        duration = _delta(r['start'], ts) if status == 'complete' else None
+        wait = _delta(r['submitted'], ts) if status == 'complete' else None
+        if status == 'complete':
+            self.totals['rounds'] += 1
+            n['rounds_done'] += 1
+            if duration is not None:
+                self.round_latency.setdefault(number, Histogram()).add(duration)
+            if wait is not None:
+                self.peer_wait.setdefault(number, Histogram()).add(wait)
+                n['peer_wait'].add(wait)
+        elif status == 'failed':
+            self.totals['rounds_failed'] += 1
+            n['rounds_failed'] += 1
+        if n['cluster']:
+            c = self.cluster(n['cluster'], ts)
+            if status == 'failed':
+                c['rounds_failed'] += 1
+            if status == 'complete' and ts is not None and (c['last_round_complete'] is None or ts > c['last_round_complete']):
+                c['last_round_complete'] = ts
+        if self.round_sink:
+            self.round_sink({
+                'node': name, 'cluster': n['cluster'] or '', 'round': number, 'role': n['role'] or '',
+                'start': _iso(r['start']), 'submitted': _iso(r['submitted']),
+                'complete': _iso(ts) if status == 'complete' else '',
+                'duration_s': duration, 'peer_wait_s': wait,
+                'submitted_peers': r['peers'], 'status': status,
+            })
+
+    # Confirmation
+
+    def on_ready(self, n, name, ts, address=None):
+        if n['ready'] or not n['cluster']:
+            return
+        n['ready'] = True
+        if n['selected_at'] is not None and ts is not None:
+            self.node_ttc.add(ts - n['selected_at'])
+        n['selected_at'] = None
+        c = self.cluster(n['cluster'], ts)
+        if ts is not None:
+            c['last_ready'] = max(c['last_ready'] or ts, ts)
+
+    def on_finalized(self, n, name, ts):
+        if n['cluster']:
+            c = self.cluster(n['cluster'], ts)
+            if c['confirmed'] is None:
+                c['confirmed'] = ts if ts is not None else 0.0
+
+    # Cluster flushing
+
+    def flush_idle(self, force=False):
+        for key in list(self.clusters):
+            c = self.clusters[key]
+            if force or (c['last_event'] is not None and self.now - c['last_event'] > self.cluster_idle):
+                self._emit_cluster(key, self.clusters.pop(key))
+
+    def _emit_cluster(self, key, c):
+        confirmed = c['confirmed'] or c['last_ready']
+        ttc = _delta(c['first_selected'], confirmed) if confirmed else None
+        if c['confirmed'] is not None or c['last_ready'] is not None:
+            self.totals['clusters_confirmed'] += 1
+        if ttc is not None:
+            self.cluster_ttc.add(ttc)
+        if self.cluster_sink:
+            self.cluster_sink({
+                'cluster': key, 'nodes': len(c['nodes']), 'first_selected': _iso(c['first_selected']),
+                'first_round_start': _iso(c['first_round_start']),
+                'last_round_complete': _iso(c['last_round_complete']),
+                'confirmed': _iso(confirmed), 'time_to_confirm_s': ttc,
+                'rounds_failed': c['rounds_failed'],
+                'status': 'confirmed' if confirmed else 'abandoned',
+            })
+
+    def finish(self):
+        for name, n in self.nodes.items():
+            self._leave(n, name, 'incomplete')
+        self.flush_idle(force=True)
+
+    def node_rows(self):
+        for name in sorted(self.nodes):
+            n = self.nodes[name]
+            span_h = (n['last'] - n['first']) / 3600 if n['first'] is not None else 0.0
+            yield {
+                'node': name, 'events': n['events'], 'span_h': round(span_h, 2), 'clusters': n['clusters'],
+                'rounds': n['rounds_done'], 'rounds_failed': n['rounds_failed'],
+                'requeues': n['requeues'], 'requeues_per_h': round(n['requeues'] / span_h, 3) if span_h else None,
+                'ghosts': n['ghosts'], 'ghosts_per_h': round(n['ghosts'] / span_h, 3) if span_h else None,
+                'peer_wait_p50_s': n['peer_wait'].summary().get('p50'),
+                'peer_wait_max_s': n['peer_wait'].summary().get('max'),
+            }
+
+    def summary(self, stats):
+        return {
+            'lines': stats['lines'],
+            'events': stats['events'],
+            'nodes': len(self.nodes),
+            'totals': self.totals,
+            'requeue_reasons': self.requeue_reasons,
+            'round_latency_s': {str(k): h.summary() for k, h in sorted(self.round_latency.items())},
+            'peer_wait_s': {str(k): h.summary() for k, h in sorted(self.peer_wait.items())},
+            'node_time_to_ready_s': self.node_ttc.summary(),
+            'cluster_time_to_confirm_s': self.cluster_ttc.summary(),
+            'queue_length': self.queue_len.summary(),
+            'per_node': list(self.node_rows()),
+        }
+
+
+def _fmt(h):
+    if not h.get('count'):
+        return 'n/a'
+    return f"n={h['count']:<6} p50={h['p50']:>8.1f}s p90={h['p90']:>8.1f}s p99={h['p99']:>8.1f}s max={h['max']:>8.1f}s"
+
+
+def print_report(summary, elapsed):
+    t = summary['totals']
+    print(f"{summary['lines']} lines, {summary['events']} events, {summary['nodes']} node(s) "
+          f"in {elapsed:.1f}s ({summary['lines'] / max(elapsed, 1e-9) / 1e6:.2f}M lines/s)")
+    print(f"Clusters: {t['clusters']} ({t['clusters_confirmed']} confirmed) | rounds: {t['rounds']} "
+          f"({t['rounds_failed']} failed) | requeues: {t['requeues']} | ghosts: {t['ghosts']} | "
+          f"stale cleared: {t['stale_cleared']}")
+    if summary['requeue_reasons']:
+        print('Requeue reasons: ' + ', '.join(f'{k}={v}' for k, v in sorted(summary['requeue_reasons'].items())))
+    print('\nRound latency (start -> complete)')
+    for number, h in summary['round_latency_s'].items():
+        print(f'  round {number:<3} {_fmt(h)}')
+    print('Peer wait (own submission -> round complete)')
+    for number, h in summary['peer_wait_s'].items():
+        print(f'  round {number:<3} {_fmt(h)}')
+    print(f"Selection -> wallet ready (node)   {_fmt(summary['node_time_to_ready_s'])}")
+    print(f"Selection -> confirmed (cluster)   {_fmt(summary['cluster_time_to_confirm_s'])}")
+    print('\nPer node')
+    for row in summary['per_node']:
+        rate = f"{row['requeues_per_h']}/h" if row['requeues_per_h'] is not None else '-'
+        ghosts = f"{row['ghosts_per_h']}/h" if row['ghosts_per_h'] is not None else '-'
+        wait = f"{row['peer_wait_p50_s']}s" if row['peer_wait_p50_s'] is not None else '-'
+        print(f"  {row['node'][:28]:<28} clusters={row['clusters']:<4} rounds={row['rounds']:<5} "
+              f"failed={row['rounds_failed']:<4} requeues={row['requeues']} ({rate}) "
+              f"ghosts={row['ghosts']} ({ghosts}) peer-wait p50={wait}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ceremony latency report from ZNode logs')
+    parser.add_argument('inputs', nargs='+', help='log files (plain or .gz), directories or - for stdin')
+    parser.add_argument('--csv', default=None, metavar='DIR', help='write rounds/clusters/nodes CSV files here')
+    parser.add_argument('--json', default=None, metavar='FILE', help='write the summary as JSON')
+    parser.add_argument('--year', type=int, default=time.gmtime().tm_year, help='year for `short` timestamps')
+    parser.add_argument('--cluster-idle', type=float, default=3600, help='seconds before an idle cluster is flushed')
+    args = parser.parse_args()
+
+    outputs = []
+    round_sink = cluster_sink = None
+    if args.csv:
+        os.makedirs(args.csv, exist_ok=True)
+
+        def writer(name, fields):
+            f = open(os.path.join(args.csv, name), 'w', newline='')
+            outputs.append(f)
+            w = csv.DictWriter(f, fieldnames=fields)
+            w.writeheader()
+            return w.writerow
+
+        round_sink = writer('rounds.csv', ROUND_FIELDS)
+        cluster_sink = writer('clusters.csv', CLUSTER_FIELDS)
+
+    analyzer = Analyzer(round_sink, cluster_sink, args.cluster_idle)
+    stats = {'lines': 0, 'events': 0}
+    started = time.monotonic()
+    try:
+        streams = [read_events(path, i, args.year, stats) for i, path in enumerate(expand_inputs(args.inputs))]
+        for ts, _, _, node, kind, event_args, timed in heapq.merge(*streams):
+            stats['events'] += 1
+            analyzer.feed(ts, node, kind, event_args, timed)
+            if stats['events'] % 10000 == 0:
+                analyzer.flush_idle()
+    except OSError as e:
+        print(f"Error: {e}")
+        return 1
+    analyzer.finish()
+    summary = analyzer.summary(stats)
+
+    if args.csv:
+        with open(os.path.join(args.csv, 'nodes.csv'), 'w', newline='') as f:
+            w = csv.DictWriter(f, fieldnames=NODE_FIELDS)
+            w.writeheader()
+            w.writerows(summary['per_node'])
+        for f in outputs:
+            f.close()
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+    print_report(summary, time.monotonic() - started)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
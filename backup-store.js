@@ -0,0 +1,337 @@
+const fs = require('fs').promises;
+const path = require('path');
+
+const MANIFEST = 'manifest.json';
+const RECORD_HEADER_BYTES = 4;
+const LEGACY_FILE = /^(.+)_backup(\d+)\.json$/;
+
+/**
+ * Backup Share Store
+ * Indexed on-disk storage for backup shares held on behalf of other clusters.
+ *
+ * Records are appended to a single data file (4-byte length + JSON) and
+ * fsynced before a write returns; deletes append a tombstone. manifest.json
+ * maps cluster -> backup index -> [offset, length, timestamp] and is
+ * replaced atomically (tmp + fsync + rename). It may lag the data file: on
+ * open, records past manifest.dataSize are replayed and a torn trailing
+ * record is cut off. Listing and deletes work from the in-memory index, so
+ * nothing rescans the directory. Once dead records outweigh live ones the
+ * data file is compacted into a new generation.
+ *
+ * Legacy <cluster>_backup<index>.json files found on open are imported and
+ * removed.
+ */
+class BackupStore {
+  constructor(dir, options = {}) {
+    this.dir = dir;
+    this.manifestDelayMs = options.manifestDelayMs !== undefined ? options.manifestDelayMs : 1000;
+    this.compactMinBytes = options.compactMinBytes || 1024 * 1024;
+
+    this.backups = new Map();    // sourceCluster -> Map(backupIndex -> { offset, length, timestamp })
+    this.generation = 0;
+    this.dataSize = 0;
+    this.garbage = 0;            // bytes held by overwritten / deleted records
+    this.fh = null;
+    this._lock = Promise.resolve();
+    this._saveTimer = null;
+  }
+
+  static async open(dir, options = {}) {
+    const store = new BackupStore(dir, options);
+    await store.open();
+    return store;
+  }
+
+  _withLock(fn) {
+    const run = this._lock.then(fn, fn);
+    this._lock = run.catch(() => {});
+    return run;
+  }
+
+  _dataPath(generation = this.generation) {
+    return path.join(this.dir, `shares.${generation}.dat`);
+  }
+
+  async open() {
+    await fs.mkdir(this.dir, { recursive: true });
+
+    let manifest = null;
+    try {
+      manifest = JSON.parse(await fs.readFile(path.join(this.dir, MANIFEST), 'utf8'));
+    } catch (error) {
+      if (error.code !== 'ENOENT') {
+        console.log(`[BackupStore] Manifest unreadable, rebuilding from data file: ${error.message}`);
+      }
+    }
+
+    if (manifest && manifest.version === 1) {
+      this.generation = manifest.generation;
+      this.garbage = manifest.garbage;
+      for (const [sourceCluster, indexes] of Object.entries(manifest.backups)) {
+        const entries = new Map();
+        for (const [backupIndex, [offset, length, timestamp]] of Object.entries(indexes)) {
+          entries.set(Number(backupIndex), { offset, length, timestamp });
+        }
+        this.backups.set(sourceCluster, entries);
+      }
+    } else {
+      this.generation = await this._latestGeneration();
+    }
+
+    // r+ rather than a: positional writes are ignored in append mode
+    this.fh = await fs.open(this._dataPath(), 'r+').catch(error => {
+      if (error.code !== 'ENOENT') throw error;
+      return fs.open(this._dataPath(), 'w+');
+    });
+    const committed = manifest && manifest.version === 1 ? manifest.dataSize : 0;
+    const replayed = await this._replay(committed);
+
+    await this._migrateLegacy();
+    if (replayed > 0) await this.save();
+  }
+
+  async _latestGeneration() {
+    const files = await fs.readdir(this.dir);
+    const generations = files
+      .map(f => /^shares\.(\d+)\.dat$/.exec(f))
+      .filter(Boolean)
+      .map(m => Number(m[1]));
+    return generations.length ? Math.max(...generations) : 0;
+  }
+
+  /**
+   * Apply records written after the manifest checkpoint
+   */
+  async _replay(from) {
+    const { size } = await this.fh.stat();
+    let offset = from;
+    let count = 0;
+    while (offset + RECORD_HEADER_BYTES <= size) {
+      const header = Buffer.alloc(RECORD_HEADER_BYTES);
+      await this.fh.read(header, 0, RECORD_HEADER_BYTES, offset);
+      const length = header.readUInt32BE(0);
+      if (offset + RECORD_HEADER_BYTES + length > size) break;
+
+      const body = Buffer.alloc(length);
+      await this.fh.read(body, 0, length, offset + RECORD_HEADER_BYTES);
+      let record;
+      try {
+        record = JSON.parse(body.toString());
+      } catch {
+        break;
+      }
+      this._index(record, offset, RECORD_HEADER_BYTES + length);
+      offset += RECORD_HEADER_BYTES + length;
+      count++;
+    }
+    if (offset < size) {
+      console.log(`[BackupStore] Dropping ${size - offset} bytes of torn record at end of data file`);
+      await this.fh.truncate(offset);
+    }
+    this.dataSize = offset;
+    return count;
+  }
+
+  _index(record, offset, length) {
+    if (record.op === 'del') {
+      const entries = this.backups.get(record.sourceCluster);
+      if (entries) {
+        for (const entry of entries.values()) this.garbage += entry.length;
+        this.backups.delete(record.sourceCluster);
+      }
+      this.garbage += length;
+      return;
+    }
+    let entries = this.backups.get(record.sourceCluster);
+    if (!entries) {
+      entries = new Map();
+      this.backups.set(record.sourceCluster, entries);
+    }
+    const previous = entries.get(record.backupIndex);
+    if (previous) this.garbage += previous.length;
+    entries.set(record.backupIndex, { offset, length, timestamp: record.timestamp });
+  }
+
+  async _append(record, sync = true) {
+    const body = Buffer.from(JSON.stringify(record));
+    const header = Buffer.alloc(RECORD_HEADER_BYTES);
+    header.writeUInt32BE(body.length, 0);
+    const offset = this.dataSize;
+    await this.fh.write(Buffer.concat([header, body]), 0, RECORD_HEADER_BYTES + body.length, offset);
+    if (sync) await this.fh.datasync();
+    this.dataSize += RECORD_HEADER_BYTES + body.length;
+    this._index(record, offset, RECORD_HEADER_BYTES + body.length);
+  }
+
+  async put(sourceCluster, backupIndex, shares, timestamp = Date.now()) {
+    return this._withLock(async () => {
+      await this._append({ op: 'put', sourceCluster, backupIndex, timestamp, shares });
+      await this._maybeCompact();
+      this._scheduleSave();
+    });
+  }
+
+  async get(sourceCluster, backupIndex) {
+    const entries = this.backups.get(sourceCluster);
+    const entry = entries && entries.get(backupIndex);
+    if (!entry) return null;
+    return this._withLock(async () => {
+      // Re-read under the lock: compaction may have moved the record
+      const current = this.backups.get(sourceCluster)?.get(backupIndex);
+      if (!current) return null;
+      const buffer = Buffer.alloc(current.length - RECORD_HEADER_BYTES);
+      await this.fh.read(buffer, 0, buffer.length, current.offset + RECORD_HEADER_BYTES);
+      return JSON.parse(buffer.toString()).shares;
+    });
+  }
+
+  list() {
+    const backups = [];
+    for (const [sourceCluster, entries] of this.backups.entries()) {
+      for (const [backupIndex, entry] of entries.entries()) {
+        backups.push({ sourceCluster, backupIndex, timestamp: entry.timestamp });
+      }
+    }
+    return backups;
+  }
+
+  /**
+   * Drop every backup held for a cluster, returns how many there were
+   */
+  async deleteCluster(sourceCluster) {
+    return this._withLock(async () => {
+      const entries = this.backups.get(sourceCluster);
+      if (!entries) return 0;
+      const deleted = entries.size;
+      await this._append({ op: 'del', sourceCluster, timestamp: Date.now() });
+      await this._maybeCompact();
+      this._scheduleSave();
+      return deleted;
+    });
+  }
+
+  async _maybeCompact() {
+    if (this.garbage < this.compactMinBytes || this.garbage < this.dataSize - this.garbage) return;
+
+    const generation = this.generation + 1;
+    const target = await fs.open(this._dataPath(generation), 'w+');
+    const moved = new Map();
+    let offset = 0;
+    try {
+      for (const [sourceCluster, entries] of this.backups.entries()) {
+        const movedEntries = new Map();
+        for (const [backupIndex, entry] of entries.entries()) {
+          const record = Buffer.alloc(entry.length);
+          await this.fh.read(record, 0, entry.length, entry.offset);
+          await target.write(record, 0, entry.length, offset);
+          movedEntries.set(backupIndex, { ...entry, offset });
+          offset += entry.length;
+        }
+        moved.set(sourceCluster, movedEntries);
+      }
+      await target.sync();
+    } catch (error) {
+      await target.close();
+      await fs.unlink(this._dataPath(generation)).catch(() => {});
+      throw error;
+    }
+
+    const previous = this.generation;
+    await this.fh.close();
+    this.fh = target;
+    this.generation = generation;
+    this.backups = moved;
+    this.dataSize = offset;
+    this.garbage = 0;
+    // The manifest switch is the commit point; the old file goes after it
+    await this._writeManifest();
+    await fs.unlink(this._dataPath(previous)).catch(() => {});
+    console.log(`[BackupStore] Compacted data file to ${offset} bytes (generation ${generation})`);
+  }
+
+  _scheduleSave() {
+    if (this._saveTimer) return;
+    this._saveTimer = setTimeout(() => {
+      this._saveTimer = null;
+      this.save().catch(error => console.log(`[BackupStore] Manifest save failed: ${error.message}`));
+    }, this.manifestDelayMs);
+    if (this._saveTimer.unref) this._saveTimer.unref();
+  }
+
+  /**
+   * Checkpoint the index to manifest.json
+   */
+  async save() {
+    return this._withLock(() => this._writeManifest());
+  }
+
+  async _writeManifest() {
+    const backups = {};
+    for (const [sourceCluster, entries] of this.backups.entries()) {
+      backups[sourceCluster] = {};
+      for (const [backupIndex, entry] of entries.entries()) {
+        backups[sourceCluster][backupIndex] = [entry.offset, entry.length, entry.timestamp];
+      }
+    }
+    const manifestPath = path.join(this.dir, MANIFEST);
+    const tmp = `${manifestPath}.tmp`;
+    const fh = await fs.open(tmp, 'w');
+    try {
+      await fh.writeFile(JSON.stringify({
+        version: 1,
+        generation: this.generation,
+        dataSize: this.dataSize,
+        garbage: this.garbage,
+        backups
+      }));
+      await fh.sync();
+    } finally {
+      await fh.close();
+    }
+    await fs.rename(tmp, manifestPath);
+  }
+
+  /**
+   * Import <cluster>_backup<index>.json files written by older versions
+   */
+  async _migrateLegacy() {
+    const files = (await fs.readdir(this.dir)).filter(f => LEGACY_FILE.test(f));
+    if (files.length === 0) return;
+
+    const migrated = [];
+    for (const file of files) {
+      const filepath = path.join(this.dir, file);
+      try {
+        const backup = JSON.parse(await fs.readFile(filepath, 'utf8'));
+        await this._append({
+          op: 'put',
+          sourceCluster: backup.sourceCluster,
+          backupIndex: backup.backupIndex,
+          timestamp: backup.timestamp,
+          shares: backup.shares
+        }, false);
+        migrated.push(filepath);
+      } catch (error) {
+        console.log(`[BackupStore] Could not migrate ${file}: ${error.message}`);
+      }
+    }
+    await this.fh.datasync();
+    await this._writeManifest();
+    await Promise.all(migrated.map(filepath => fs.unlink(filepath)));
+    console.log(`[BackupStore] Migrated ${migrated.length} legacy backup files`);
+  }
+
+  async close() {
+    if (this._saveTimer) {
+      clearTimeout(this._saveTimer);
+      this._saveTimer = null;
+    }
+    if (this.fh) {
+      await this.save();
+      await this.fh.close();
+      this.fh = null;
+    }
+  }
+}
+
+module.exports = BackupStore;
@@ -0,0 +1,175 @@
+#!/usr/bin/env node
+// Backup share fan-out benchmark
+// Starts in-process libp2p backup peers (P2PBackupNetwork) with injected
+// response latency, some of them dead or black-holed, and compares the old
+// one-peer-at-a-time recovery / distribution with the concurrent fan-out in
+// CrossClusterBackupManager.
+//
+// Usage: node bench-backup-fanout.js [--latency 2000,hang,dead,40,80]
+//          [--deadline-ms 1500] [--concurrency 5] [--block-ms 400] [--runs 3] [--verbose]
+//
+// --latency lists one entry per backup peer: milliseconds before the peer
+// answers, 'hang' (accepts the stream, never answers) or 'dead' (stopped).
+
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { ethers } = require('ethers');
+const P2PBackupNetwork = require('./p2p-backup-network');
+const CrossClusterBackupManager = require('./cross-cluster-backup');
+
+function parseArgs(argv) {
+  const opts = {
+    latency: ['2000', 'hang', 'dead', '40', '80'],
+    deadlineMs: 1500,
+    concurrency: 5,
+    blockMs: 400,
+    runs: 3,
+    verbose: false
+  };
+  for (let i = 2; i < argv.length; i++) {
+    const arg = argv[i];
+    const next = () => Number(argv[++i]);
+    if (arg === '--latency') opts.latency = argv[++i].split(',');
+    else if (arg === '--deadline-ms') opts.deadlineMs = next();
+    else if (arg === '--concurrency') opts.concurrency = next();
+    else if (arg === '--block-ms') opts.blockMs = next();
+    else if (arg === '--runs') opts.runs = next();
+    else if (arg === '--verbose') opts.verbose = true;
+  }
+  return opts;
+}
+
+const sleep = (ms) => new Promise(r => setTimeout(r, ms));
+const out = console.log.bind(console);
+const CLUSTER_ID = '0x' + 'ab'.repeat(32);
+const KEYS_PER_SET = 11;
+
+/**
+ * Backup peer whose protocol handler is delayed (or never answers)
+ */
+async function startPeer(spec, storageRoot) {
+  const wallet = ethers.Wallet.createRandom();
+  const peer = new P2PBackupNetwork(wallet, 0);
+  peer.backupStoragePath = path.join(storageRoot, wallet.address);
+
+  const handle = peer.processMessage.bind(peer);
+  peer.processMessage = async (message) => {
+    if (spec === 'hang') return new Promise(() => {});
+    await sleep(Number(spec) || 0);
+    return handle(message);
+  };
+
+  await peer.start();
+  const multiaddr = peer.getMultiaddrs().find(a => a.includes('127.0.0.1')) || peer.getMultiaddrs()[0];
+  if (spec === 'dead') await peer.stop();
+  return { spec, wallet, peer, multiaddr };
+}
+
+/**
+ * Registry stand-in: assignBackupNode resolves after one block
+ */
+function fakeRegistry(blockMs) {
+  return {
+    target: '0x' + '00'.repeat(20),
+    assignBackupNode: async () => ({ wait: () => sleep(blockMs) })
+  };
+}
+
+async function sequentialRecovery(manager, backupNodes, deadlineMs) {
+  const collected = [];
+  for (let i = 0; i < backupNodes.length; i++) {
+    const peerMultiaddr = manager.peerAddrs.get(backupNodes[i].nodeAddress);
+    const shares = await manager.p2pNetwork.requestBackupFromPeer(
+      peerMultiaddr, manager.myClusterId, i, { signal: AbortSignal.timeout(deadlineMs) }
+    );
+    if (shares) collected.push(shares);
+    if (collected.length >= manager.BACKUP_THRESHOLD) break;
+  }
+  return collected;
+}
+
+async function sequentialDistribution(manager, distribution, deadlineMs) {
+  for (const dist of distribution) {
+    const delivered = await manager.p2pNetwork.sendBackupToPeer(
+      manager.peerAddrs.get(dist.targetNode), manager.myClusterId, dist.backupIndex, dist.shares,
+      { signal: AbortSignal.timeout(deadlineMs) }
+    );
+    if (!delivered) {
+      await manager.p2pNetwork.storeBackupShares(manager.myClusterId, dist.backupIndex, dist.shares);
+    }
+    const tx = await manager.registry.assignBackupNode(manager.myClusterId, dist.targetNode);
+    await tx.wait();
+  }
+}
+
+async function timed(fn) {
+  const start = process.hrtime.bigint();
+  const result = await fn();
+  return { ms: Number(process.hrtime.bigint() - start) / 1e6, result };
+}
+
+async function main() {
+  const opts = parseArgs(process.argv);
+  const storageRoot = fs.mkdtempSync(path.join(os.tmpdir(), 'bench-backup-'));
+  if (!opts.verbose) console.log = console.error = () => {};
+
+  const peers = [];
+  for (const spec of opts.latency) peers.push(await startPeer(spec, storageRoot));
+
+  const owner = ethers.Wallet.createRandom();
+  const manager = new CrossClusterBackupManager(fakeRegistry(opts.blockMs), CLUSTER_ID, owner, 0, {
+    fanOutConcurrency: opts.concurrency,
+    peerDeadlineMs: opts.deadlineMs,
+    clusterIndex: { dir: path.join(storageRoot, 'cluster_index') }
+  });
+  manager.p2pNetwork.backupStoragePath = path.join(storageRoot, owner.address);
+  // Shares travel in the clear here: this measures transport, not ECIES
+  manager.ecies = {
+    encryptShareSet: async shares => JSON.stringify(shares),
+    decryptShares: async shares => (shares.length === 1 ? JSON.parse(shares[0]) : shares)
+  };
+  await manager.p2pNetwork.start();
+
+  const backupNodes = peers.map(p => ({ nodeAddress: p.wallet.address }));
+  const backupSet = (i) => Array.from({ length: KEYS_PER_SET }, (_, k) => `8${(i + 1).toString(16).padStart(2, '0')}${k}`.padEnd(130, 'f'));
+  for (let i = 0; i < peers.length; i++) {
+    manager.registerPeer(peers[i].wallet.address, peers[i].multiaddr, peers[i].wallet.publicKey);
+    if (peers[i].spec !== 'dead') await peers[i].peer.storeBackupShares(CLUSTER_ID, i, backupSet(i));
+  }
+  const distribution = peers.map((p, i) => ({ backupIndex: i, targetNode: p.wallet.address, shares: backupSet(i) }));
+  const clusters = peers.map((p, i) => ({ clusterId: `0x${String(i).padStart(64, '0')}`, members: [p.wallet.address] }));
+
+  out(`${peers.length} backup peers [${opts.latency.join(', ')}], deadline=${opts.deadlineMs}ms ` +
+      `concurrency=${opts.concurrency} block=${opts.blockMs}ms, ${opts.runs} run(s)`);
+
+  const rows = [
+    ['recovery sequential', () => sequentialRecovery(manager, backupNodes, opts.deadlineMs), r => `${r.length} sets`],
+    ['recovery fan-out', () => manager.requestBackupSharesP2P(backupNodes), r => `${r.length} sets`],
+    ['distribute sequential', () => sequentialDistribution(manager, distribution, opts.deadlineMs), () => ''],
+    ['distribute fan-out', () => manager.distributeToOtherClusters(distribution.map(d => d.shares), clusters), () => '']
+  ];
+  for (const [label, fn, describe] of rows) {
+    const times = [];
+    let last;
+    for (let run = 0; run < opts.runs; run++) {
+      const { ms, result } = await timed(fn);
+      times.push(ms);
+      last = result;
+    }
+    times.sort((a, b) => a - b);
+    out(`${label.padEnd(24)} median ${times[Math.floor(times.length / 2)].toFixed(0).padStart(6)}ms  ` +
+        `min ${times[0].toFixed(0).padStart(6)}ms  ${describe(last)}`);
+  }
+
+  await manager.p2pNetwork.stop();
+  for (const p of peers) if (p.spec !== 'dead') await p.peer.stop();
+  fs.rmSync(storageRoot, { recursive: true, force: true });
+  process.exit(0);
+}
+
+main().catch(error => {
+  console.error = console.log = out;
+  out('Benchmark failed:', error);
+  process.exit(1);
+});
@@ -0,0 +1,114 @@
+#!/usr/bin/env node
+// Backup share storage benchmark
+// Compares the old one-JSON-file-per-backup layout with BackupStore for
+// N stored backups: write, list, read, delete one cluster, reopen, and the
+// one-off migration of the old files into the store.
+//
+// Usage: node bench-backup-store.js [backups=10000] [shareBytes=300]
+
+const fs = require('fs');
+const fsp = fs.promises;
+const os = require('os');
+const path = require('path');
+const BackupStore = require('./backup-store');
+
+const BACKUPS = Number(process.argv[2] || 10000);
+const SHARE_BYTES = Number(process.argv[3] || 300);
+const PER_CLUSTER = 5;
+const KEYS_PER_SET = 11;
+
+const clusterId = (i) => '0x' + Math.floor(i / PER_CLUSTER).toString(16).padStart(64, '0');
+const shares = Array.from({ length: KEYS_PER_SET }, (_, k) => '0x' + k.toString(16).padStart(2, '0').repeat(SHARE_BYTES / 2));
+
+// Old P2PBackupNetwork storage, verbatim apart from logging
+const legacy = {
+  async store(dir, sourceCluster, backupIndex, encryptedShares) {
+    const filepath = path.join(dir, `${sourceCluster}_backup${backupIndex}.json`);
+    await fsp.writeFile(filepath, JSON.stringify({
+      sourceCluster, backupIndex, shares: encryptedShares, timestamp: Date.now(), nodeAddress: '0x0'
+    }, null, 2));
+  },
+  async retrieve(dir, sourceCluster, backupIndex) {
+    const data = await fsp.readFile(path.join(dir, `${sourceCluster}_backup${backupIndex}.json`), 'utf8');
+    return JSON.parse(data).shares;
+  },
+  async list(dir) {
+    const backups = [];
+    for (const file of await fsp.readdir(dir)) {
+      if (file.endsWith('.json')) {
+        const backup = JSON.parse(await fsp.readFile(path.join(dir, file), 'utf8'));
+        backups.push({ sourceCluster: backup.sourceCluster, backupIndex: backup.backupIndex, timestamp: backup.timestamp });
+      }
+    }
+    return backups;
+  },
+  async delete(dir, sourceCluster) {
+    let deleted = 0;
+    for (const file of await fsp.readdir(dir)) {
+      if (file.startsWith(sourceCluster)) {
+        await fsp.unlink(path.join(dir, file));
+        deleted++;
+      }
+    }
+    return deleted;
+  }
+};
+
+async function timed(label, fn) {
+  const start = process.hrtime.bigint();
+  const result = await fn();
+  const ms = Number(process.hrtime.bigint() - start) / 1e6;
+  console.log(`  ${label.padEnd(26)} ${ms.toFixed(1).padStart(10)}ms`);
+  return result;
+}
+
+function duSync(dir) {
+  return fs.readdirSync(dir).reduce((n, f) => n + fs.statSync(path.join(dir, f)).size, 0);
+}
+
+async function main() {
+  const root = fs.mkdtempSync(path.join(os.tmpdir(), 'bench-store-'));
+  const legacyDir = path.join(root, 'legacy');
+  const storeDir = path.join(root, 'store');
+  fs.mkdirSync(legacyDir);
+  const sample = clusterId(Math.floor(BACKUPS / 2));
+  console.log(`${BACKUPS} backups (${PER_CLUSTER} per cluster, ${KEYS_PER_SET} x ${SHARE_BYTES}B shares)`);
+
+  console.log('legacy JSON files');
+  await timed(`write ${BACKUPS}`, async () => {
+    for (let i = 0; i < BACKUPS; i++) await legacy.store(legacyDir, clusterId(i), i % PER_CLUSTER, shares);
+  });
+  await timed('list', () => legacy.list(legacyDir));
+  await timed('read 1000', async () => {
+    for (let i = 0; i < 1000; i++) await legacy.retrieve(legacyDir, clusterId(i * 7 % BACKUPS), (i * 7) % PER_CLUSTER);
+  });
+  await timed('delete 1 cluster', () => legacy.delete(legacyDir, sample));
+  console.log(`  ${'disk'.padEnd(26)} ${(duSync(legacyDir) / 1048576).toFixed(1).padStart(8)}MiB`);
+
+  console.log('BackupStore');
+  let store = await BackupStore.open(storeDir, { manifestDelayMs: 50 });
+  await timed(`write ${BACKUPS}`, async () => {
+    for (let i = 0; i < BACKUPS; i++) await store.put(clusterId(i), i % PER_CLUSTER, shares);
+  });
+  await timed('list', () => store.list());
+  await timed('read 1000', async () => {
+    for (let i = 0; i < 1000; i++) await store.get(clusterId(i * 7 % BACKUPS), (i * 7) % PER_CLUSTER);
+  });
+  await timed('delete 1 cluster', () => store.deleteCluster(sample));
+  await store.close();
+  store = await timed('reopen (manifest)', () => BackupStore.open(storeDir));
+  const listed = store.list().length;
+  await store.close();
+  console.log(`  ${'disk'.padEnd(26)} ${(duSync(storeDir) / 1048576).toFixed(1).padStart(8)}MiB  (${listed} backups after reopen)`);
+
+  const migrated = await timed(`migrate ${BACKUPS - PER_CLUSTER} legacy files`, () => BackupStore.open(legacyDir));
+  console.log(`  ${'migrated'.padEnd(26)} ${String(migrated.list().length).padStart(10)}`);
+  await migrated.close();
+
+  fs.rmSync(root, { recursive: true, force: true });
+}
+
+main().catch(error => {
+  console.error('Benchmark failed:', error);
+  process.exit(1);
+});
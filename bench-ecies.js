@@ -0,0 +1,93 @@
+#!/usr/bin/env node
+// ECIES benchmark for a full backup distribution
+// One sender encrypts 5 backup sets of 11 shares for 5 recipients, and each
+// recipient decrypts its set. Compared:
+//   per-share (old)   - ECDH derivation for every share on both sides
+//   per-share cached  - encryptWithECDH/decryptWithECDH with the peer cache
+//   share-set         - encryptShareSet/decryptShareSet, one envelope per set
+//
+// Usage: node bench-ecies.js [distributions=50] [shareHexChars=130]
+
+const crypto = require('crypto');
+const ECIESEncryption = require('./ecies-encryption');
+
+const DISTRIBUTIONS = Number(process.argv[2] || 50);
+const SHARE_CHARS = Number(process.argv[3] || 130);
+const BACKUPS = 5;
+const KEYS = 11;
+
+const newWallet = () => ({ privateKey: '0x' + crypto.randomBytes(32).toString('hex'), address: '0x' });
+const shareSet = () => Array.from({ length: KEYS }, () => '8' + crypto.randomBytes(SHARE_CHARS).toString('hex').slice(0, SHARE_CHARS - 1));
+
+// Previous encryptWithECDH / decryptWithECDH: fresh ECDH each call, no KDF
+function legacyEncrypt(ecies, data, recipientPublicKey) {
+  const sharedSecret = ecies.deriveSharedSecretECDH(recipientPublicKey);
+  const iv = crypto.randomBytes(16);
+  const cipher = crypto.createCipheriv('aes-256-gcm', sharedSecret, iv);
+  const encrypted = Buffer.concat([cipher.update(Buffer.from(data, 'utf8')), cipher.final()]);
+  const ourPublicKey = Buffer.from(ecies.getPublicKey(), 'hex');
+  return '0x' + Buffer.concat([Buffer.from([ourPublicKey.length]), ourPublicKey, iv, cipher.getAuthTag(), encrypted]).toString('hex');
+}
+
+function legacyDecrypt(ecies, encryptedHex) {
+  const buf = Buffer.from(encryptedHex.slice(2), 'hex');
+  const pubKeyLength = buf[0];
+  const sharedSecret = ecies.deriveSharedSecretECDH(buf.slice(1, 1 + pubKeyLength).toString('hex'));
+  const decipher = crypto.createDecipheriv('aes-256-gcm', sharedSecret, buf.slice(1 + pubKeyLength, 17 + pubKeyLength));
+  decipher.setAuthTag(buf.slice(17 + pubKeyLength, 33 + pubKeyLength));
+  return Buffer.concat([decipher.update(buf.slice(33 + pubKeyLength)), decipher.final()]).toString('utf8');
+}
+
+async function run(label, modes) {
+  const sender = new ECIESEncryption(newWallet());
+  const recipients = Array.from({ length: BACKUPS }, () => new ECIESEncryption(newWallet()));
+  const sets = recipients.map(() => shareSet());
+  let bytes = 0;
+  let encryptMs = 0;
+  let decryptMs = 0;
+
+  for (let d = 0; d < DISTRIBUTIONS; d++) {
+    let start = process.hrtime.bigint();
+    const sealed = [];
+    for (let r = 0; r < BACKUPS; r++) {
+      sealed.push(await modes.encrypt(sender, sets[r], recipients[r].getPublicKey()));
+    }
+    encryptMs += Number(process.hrtime.bigint() - start) / 1e6;
+
+    start = process.hrtime.bigint();
+    for (let r = 0; r < BACKUPS; r++) {
+      const opened = await modes.decrypt(recipients[r], sealed[r]);
+      if (opened[KEYS - 1] !== sets[r][KEYS - 1]) throw new Error(`${label}: round trip failed`);
+    }
+    decryptMs += Number(process.hrtime.bigint() - start) / 1e6;
+    bytes = sealed.reduce((n, s) => n + s.reduce((m, c) => m + (c.length - 2) / 2, 0), 0);
+  }
+
+  console.log(
+    `${label.padEnd(18)} encrypt ${(encryptMs / DISTRIBUTIONS).toFixed(2).padStart(7)}ms  ` +
+    `decrypt ${(decryptMs / DISTRIBUTIONS).toFixed(2).padStart(7)}ms  ` +
+    `${((BACKUPS * KEYS * DISTRIBUTIONS) / ((encryptMs + decryptMs) / 1000)).toFixed(0).padStart(7)} shares/s  ` +
+    `${(bytes / 1024).toFixed(1).padStart(6)} KiB/distribution`
+  );
+}
+
+async function main() {
+  console.log(`${DISTRIBUTIONS} distributions of ${BACKUPS} sets x ${KEYS} shares (${SHARE_CHARS} hex chars each)`);
+  await run('per-share (old)', {
+    encrypt: async (sender, set, pub) => set.map(share => legacyEncrypt(sender, share, pub)),
+    decrypt: async (recipient, sealed) => sealed.map(c => legacyDecrypt(recipient, c))
+  });
+  await run('per-share cached', {
+    encrypt: (sender, set, pub) => Promise.all(set.map(share => sender.encryptWithECDH(share, pub))),
+    decrypt: (recipient, sealed) => recipient.decryptShares(sealed)
+  });
+  await run('share-set', {
+    encrypt: async (sender, set, pub) => [await sender.encryptShareSet(set, pub)],
+    decrypt: (recipient, sealed) => recipient.decryptShares(sealed)
+  });
+}
+
+main().catch(error => {
+  console.error('Benchmark failed:', error);
+  process.exit(1);
+});
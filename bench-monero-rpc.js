@@ -0,0 +1,99 @@
+// Benchmark MoneroRPC against a local fake wallet-rpc server
+// Compares one-connection-per-call (old behaviour) with the pooled
+// keep-alive client, sequentially and pipelined through batch().
+//
+// Usage: node bench-monero-rpc.js [calls] [serverLatencyMs]
+
+const http = require('http');
+const MoneroRPC = require('./monero-rpc');
+
+const CALLS = Number(process.argv[2] || 500);
+const LATENCY_MS = Number(process.argv[3] || 1);
+
+const RESULTS = {
+  open_wallet: {},
+  is_multisig: { multisig: false, ready: false, threshold: 0, total: 0 },
+  get_address: { address: '4' + 'A'.repeat(94) },
+  export_multisig_info: { info: 'ab'.repeat(512) }
+};
+
+function startFakeWalletRpc() {
+  const counters = { connections: 0, requests: 0 };
+  const server = http.createServer((req, res) => {
+    let body = '';
+    req.on('data', chunk => { body += chunk; });
+    req.on('end', () => {
+      counters.requests++;
+      const msg = JSON.parse(body);
+      const reply = (m) => ({ jsonrpc: '2.0', id: m.id, result: RESULTS[m.method] || {} });
+      const out = Array.isArray(msg) ? msg.map(reply) : reply(msg);
+      setTimeout(() => {
+        res.setHeader('Content-Type', 'application/json');
+        res.end(JSON.stringify(out));
+      }, LATENCY_MS);
+    });
+  });
+  server.on('connection', () => { counters.connections++; });
+  return new Promise(resolve => {
+    server.listen(0, '127.0.0.1', () => resolve({ server, counters }));
+  });
+}
+
+async function run(label, rpc, counters, fn) {
+  counters.connections = 0;
+  counters.requests = 0;
+  rpc.resetStats();
+  const start = process.hrtime.bigint();
+  await fn(rpc);
+  const ms = Number(process.hrtime.bigint() - start) / 1e6;
+  console.log(
+    `${label.padEnd(28)} ${ms.toFixed(1).padStart(9)}ms  ` +
+    `${(CALLS / (ms / 1000)).toFixed(0).padStart(7)} calls/s  ` +
+    `conns=${counters.connections} reqs=${counters.requests}`
+  );
+  return rpc.getStats();
+}
+
+const methods = ['open_wallet', 'is_multisig', 'get_address', 'export_multisig_info'];
+
+async function sequential(rpc) {
+  for (let i = 0; i < CALLS; i++) {
+    await rpc.call(methods[i % methods.length]);
+  }
+}
+
+async function batched(rpc) {
+  for (let i = 0; i < CALLS; i += methods.length) {
+    await rpc.batch(methods.map(m => [m]));
+  }
+}
+
+async function main() {
+  const { server, counters } = await startFakeWalletRpc();
+  const url = `http://127.0.0.1:${server.address().port}`;
+  console.log(`Fake wallet-rpc at ${url} (latency ${LATENCY_MS}ms), ${CALLS} calls per run\n`);
+
+  const legacy = new MoneroRPC({ url, keepAlive: false });
+  const pooled = new MoneroRPC({ url });
+  const jsonBatch = new MoneroRPC({ url, jsonBatch: true });
+
+  await run('no keep-alive, sequential', legacy, counters, sequential);
+  await run('keep-alive, sequential', pooled, counters, sequential);
+  await run('keep-alive, pipelined batch', pooled, counters, batched);
+  const stats = await run('keep-alive, JSON-RPC batch', jsonBatch, counters, batched);
+
+  console.log('\nPer-method counters (last run):');
+  for (const [method, s] of Object.entries(stats)) {
+    console.log(`  ${method.padEnd(22)} calls=${s.calls} errors=${s.errors} avg=${s.avgMs}ms max=${s.maxMs}ms`);
+  }
+
+  legacy.destroy();
+  pooled.destroy();
+  jsonBatch.destroy();
+  server.close();
+}
+
+main().catch(e => {
+  console.error(e);
+  process.exit(1);
+});
@@ -0,0 +1,103 @@
+#!/usr/bin/env node
+// Size and gas of on-chain multisig strings, wallet-rpc form vs multisig-codec
+// Payloads come from a capture file (one string per line, or a JSON array;
+// e.g. registered infos from getFormingClusterMultisigInfo and
+// getExchangeRoundInfo exchange infos), otherwise synthetic ones with the
+// wallet-rpc layout for an 11-member cluster:
+//   prepare   MultisigxV2R1 + base58(secret key | signer pubkey | signature)
+//   kex       MultisigxV2Rn + base58(round | count | keys | signer pubkey | signature)
+//   export    hex export_multisig_info
+//
+// Gas: calldata at 16/4 per non-zero/zero byte of the ABI-encoded string
+// argument, storage at 20000 per new 32-byte slot (solidity string layout).
+//
+// Usage: node bench-multisig-codec.js [captureFile] [iterations=200]
+
+const fs = require('fs');
+const crypto = require('crypto');
+const MultisigCodec = require('./multisig-codec');
+
+const CAPTURE = process.argv[2] && process.argv[2] !== '-' ? process.argv[2] : null;
+const ITERATIONS = Number(process.argv[3] || 200);
+const MEMBERS = 11;
+
+function synthetic() {
+  const signers = Array.from({ length: MEMBERS }, () => crypto.randomBytes(32));
+  const prepare = signers.map(pub =>
+    'MultisigxV2R1' + MultisigCodec.base58Encode(Buffer.concat([crypto.randomBytes(32), pub, crypto.randomBytes(64)])));
+  const kex = signers.map(pub =>
+    'MultisigxV2Rn' + MultisigCodec.base58Encode(Buffer.concat([
+      Buffer.from([2, MEMBERS - 1]),
+      ...Array.from({ length: MEMBERS - 1 }, () => crypto.randomBytes(32)),
+      pub,
+      crypto.randomBytes(64)
+    ])));
+  const exported = signers.map(() => crypto.randomBytes(96 + 64 * 12).toString('hex'));
+  return { prepare, groups: { prepare, kex, export: exported } };
+}
+
+function captured(file) {
+  const text = fs.readFileSync(file, 'utf8').trim();
+  const infos = text.startsWith('[') ? JSON.parse(text) : text.split('\n').map(l => l.trim()).filter(Boolean);
+  const decoded = infos.map(info => MultisigCodec.decode(info));
+  const prepare = decoded.filter(i => i.startsWith('MultisigxV2R1') || i.startsWith('MultisigV1') || i.startsWith('MultisigxV1'));
+  const groups = { prepare, kex: decoded.filter(i => i.startsWith('MultisigxV2Rn')), export: decoded.filter(i => /^[0-9a-f]+$/.test(i)) };
+  const other = decoded.filter(i => !groups.prepare.includes(i) && !groups.kex.includes(i) && !groups.export.includes(i));
+  if (other.length > 0) groups.other = other;
+  return { prepare, groups };
+}
+
+// ABI encoding of one dynamic string argument: offset, length, padded data
+function calldataGas(str) {
+  const data = Buffer.from(str, 'utf8');
+  const encoded = Buffer.alloc(64 + Math.ceil(data.length / 32) * 32);
+  encoded.writeUInt32BE(32, 28);
+  encoded.writeUInt32BE(data.length, 60);
+  data.copy(encoded, 64);
+  let gas = 0;
+  for (const b of encoded) gas += b === 0 ? 4 : 16;
+  return gas;
+}
+
+function storageGas(str) {
+  const length = Buffer.byteLength(str, 'utf8');
+  return (length < 32 ? 1 : 1 + Math.ceil(length / 32)) * 20000;
+}
+
+function time(fn) {
+  const start = process.hrtime.bigint();
+  for (let i = 0; i < ITERATIONS; i++) fn();
+  return Number(process.hrtime.bigint() - start) / 1e6 / ITERATIONS;
+}
+
+const { prepare, groups } = CAPTURE ? captured(CAPTURE) : synthetic();
+const dictionary = MultisigCodec.buildDictionary(prepare);
+console.log(`Payloads: ${CAPTURE || 'synthetic'} (${Object.entries(groups).map(([k, v]) => `${v.length} ${k}`).join(', ')})\n`);
+
+for (const [label, infos] of Object.entries(groups)) {
+  if (infos.length === 0) continue;
+  // Registration strings cannot use the dictionary (it is built from them)
+  const dict = label === 'prepare' ? null : dictionary;
+  const rows = infos.map(info => {
+    const packed = MultisigCodec.encode(info, dict);
+    if (MultisigCodec.decode(packed, dict) !== info) throw new Error(`${label}: round trip failed`);
+    return { info, packed };
+  });
+  const sum = f => rows.reduce((n, r) => n + f(r), 0) / rows.length;
+  const before = sum(r => Buffer.byteLength(r.info));
+  const after = sum(r => Buffer.byteLength(r.packed));
+  const gasBefore = sum(r => calldataGas(r.info));
+  const gasAfter = sum(r => calldataGas(r.packed));
+  const storeBefore = sum(r => storageGas(r.info));
+  const storeAfter = sum(r => storageGas(r.packed));
+  const encodeMs = time(() => rows.forEach(r => MultisigCodec.encode(r.info, dict)));
+  const decodeMs = time(() => rows.forEach(r => MultisigCodec.decode(r.packed, dict)));
+
+  console.log(
+    `${label.padEnd(8)} ${before.toFixed(0).padStart(6)} -> ${after.toFixed(0).padStart(6)} bytes ` +
+    `(${(100 * (1 - after / before)).toFixed(1).padStart(5)}%)  ` +
+    `calldata ${gasBefore.toFixed(0).padStart(6)} -> ${gasAfter.toFixed(0).padStart(6)} gas  ` +
+    `storage ${storeBefore.toFixed(0).padStart(7)} -> ${storeAfter.toFixed(0).padStart(7)} gas  ` +
+    `encode ${(encodeMs / rows.length * 1000).toFixed(0)}us decode ${(decodeMs / rows.length * 1000).toFixed(0)}us`
+  );
+}
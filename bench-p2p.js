@@ -0,0 +1,119 @@
+#!/usr/bin/env node
+// Backup protocol benchmark: v1 (JSON per dial) vs v2 (framed, reused connection)
+// Starts a backup server and one client per protocol version as local
+// libp2p nodes, then measures per-message latency (sequential) and
+// throughput (concurrent) for STORE_BACKUP and REQUEST_BACKUP.
+//
+// Usage: node bench-p2p.js [--messages 200] [--concurrency 16] [--shares 11]
+//          [--share-bytes 512] [--verbose]
+
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { ethers } = require('ethers');
+const P2PBackupNetwork = require('./p2p-backup-network');
+
+function parseArgs(argv) {
+  const opts = { messages: 200, concurrency: 16, shares: 11, shareBytes: 512, verbose: false };
+  for (let i = 2; i < argv.length; i++) {
+    const arg = argv[i];
+    const next = () => Number(argv[++i]);
+    if (arg === '--messages') opts.messages = next();
+    else if (arg === '--concurrency') opts.concurrency = next();
+    else if (arg === '--shares') opts.shares = next();
+    else if (arg === '--share-bytes') opts.shareBytes = next();
+    else if (arg === '--verbose') opts.verbose = true;
+  }
+  return opts;
+}
+
+const out = console.log.bind(console);
+const CLUSTER_ID = '0x' + 'cd'.repeat(32);
+
+function percentile(sorted, p) {
+  return sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p / 100))];
+}
+
+async function startNode(storageRoot, protocolVersion) {
+  const wallet = ethers.Wallet.createRandom();
+  const node = new P2PBackupNetwork(wallet, 0, { protocolVersion });
+  node.backupStoragePath = path.join(storageRoot, wallet.address);
+  await node.start();
+  return node;
+}
+
+async function sequential(count, fn) {
+  const latencies = [];
+  for (let i = 0; i < count; i++) {
+    const start = process.hrtime.bigint();
+    await fn(i);
+    latencies.push(Number(process.hrtime.bigint() - start) / 1e6);
+  }
+  return latencies.sort((a, b) => a - b);
+}
+
+async function concurrent(count, concurrency, fn) {
+  let next = 0;
+  const start = process.hrtime.bigint();
+  await Promise.all(Array.from({ length: concurrency }, async () => {
+    while (next < count) await fn(next++);
+  }));
+  return Number(process.hrtime.bigint() - start) / 1e6;
+}
+
+async function main() {
+  const opts = parseArgs(process.argv);
+  const storageRoot = fs.mkdtempSync(path.join(os.tmpdir(), 'bench-p2p-'));
+  if (!opts.verbose) console.log = console.error = () => {};
+
+  const server = await startNode(storageRoot, 2);
+  const serverAddr = server.node.getMultiaddrs().find(a => a.toString().includes('127.0.0.1')) || server.node.getMultiaddrs()[0];
+  let connections = 0;
+  server.node.addEventListener('connection:open', () => { connections++; });
+
+  const shares = Array.from({ length: opts.shares }, (_, i) => i.toString(16).padStart(2, '0').repeat(opts.shareBytes / 2));
+  const messageBytes = shares.reduce((n, s) => n + s.length, 0);
+
+  out(`${opts.messages} messages x ${opts.shares} shares x ${opts.shareBytes}B ` +
+      `(${(messageBytes / 1024).toFixed(1)} KiB), concurrency ${opts.concurrency}`);
+
+  for (const version of [1, 2]) {
+    const client = await startNode(storageRoot, version);
+    const label = `v${version}`;
+    const store = async (i) => {
+      const ok = await client.sendBackupToPeer(serverAddr, CLUSTER_ID, i % 50, shares);
+      if (!ok) throw new Error('store failed');
+    };
+    const fetch = async (i) => {
+      const got = await client.requestBackupFromPeer(serverAddr, CLUSTER_ID, i % 50);
+      if (!got || got.length !== shares.length) throw new Error('request failed');
+    };
+
+    // v1 STORE is fire-and-forget; let the server finish writing first
+    await store(0);
+    await new Promise(r => setTimeout(r, 200));
+
+    for (const [op, fn] of [['store', store], ['request', fetch]]) {
+      connections = 0;
+      const latencies = await sequential(opts.messages, fn);
+      const ms = await concurrent(opts.messages, opts.concurrency, fn);
+      const mbps = (opts.messages * messageBytes / 1024 / 1024) / (ms / 1000);
+      out(`${label} ${op.padEnd(8)} p50 ${percentile(latencies, 50).toFixed(2).padStart(7)}ms  ` +
+          `p99 ${percentile(latencies, 99).toFixed(2).padStart(7)}ms  ` +
+          `${(opts.messages / (ms / 1000)).toFixed(0).padStart(6)} msg/s  ${mbps.toFixed(1).padStart(6)} MiB/s  ` +
+          `server conns=${connections}`);
+      if (version === 1 && op === 'store') await new Promise(r => setTimeout(r, 200));
+    }
+    await client.stop();
+  }
+
+  await server.stop();
+  fs.rmSync(storageRoot, { recursive: true, force: true });
+  process.exit(0);
+}
+
+main().catch(error => {
+  console.error = console.log = out;
+  out('Benchmark failed:', error);
+  process.exit(1);
+});
@@ -0,0 +1,114 @@
+#!/usr/bin/env node
+// Upstream read volume for a host of znodes, direct vs through rpc-proxy
+// A stub upstream (fixed latency, new block every blockMs) counts the
+// calls it receives. Each simulated node polls every tickMs with the
+// monitor's reads: eth_blockNumber, eth_chainId and the four registry /
+// coordinator eth_calls (getQueueStatus, getFormingCluster,
+// getFormingClusterMultisigInfo, getExchangeRoundStatus) at 'latest',
+// one JSON-RPC batch per tick as ethers sends them. A tx is sent now and
+// then to exercise the write path.
+//
+// Usage: node bench-rpc-proxy.js [nodes=8] [ticks=20] [tickMs=250] [blockMs=1000] [latencyMs=40]
+
+const http = require('http');
+const axios = require('axios');
+const RpcProxy = require('./rpc-proxy');
+
+const NODES = Number(process.argv[2] || 8);
+const TICKS = Number(process.argv[3] || 20);
+const TICK_MS = Number(process.argv[4] || 250);
+const BLOCK_MS = Number(process.argv[5] || 1000);
+const LATENCY_MS = Number(process.argv[6] || 40);
+
+const SELECTORS = ['0x8b0e9f3f', '0x5e6c3a1b', '0x1f2d4c7e', '0x9a4b6d02']; // the four polled views
+const REGISTRY = '0x' + '11'.repeat(20);
+
+function startUpstream() {
+  const started = Date.now();
+  const counts = { calls: 0, requests: 0, byMethod: {} };
+  const server = http.createServer((req, res) => {
+    const chunks = [];
+    req.on('data', c => chunks.push(c));
+    req.on('end', () => {
+      const payload = JSON.parse(Buffer.concat(chunks).toString('utf8'));
+      const calls = Array.isArray(payload) ? payload : [payload];
+      counts.requests++;
+      const block = 1000 + Math.floor((Date.now() - started) / BLOCK_MS);
+      const answers = calls.map(({ id, method, params }) => {
+        counts.calls++;
+        counts.byMethod[method] = (counts.byMethod[method] || 0) + 1;
+        let result;
+        if (method === 'eth_blockNumber') result = '0x' + block.toString(16);
+        else if (method === 'eth_chainId') result = '0xaa36a7';
+        else if (method === 'eth_sendRawTransaction') result = '0x' + 'ab'.repeat(32);
+        else result = '0x' + Buffer.from(`${params[0].data}@${block}`).toString('hex');
+        return { jsonrpc: '2.0', id, result };
+      });
+      setTimeout(() => {
+        res.setHeader('Content-Type', 'application/json');
+        res.end(JSON.stringify(Array.isArray(payload) ? answers : answers[0]));
+      }, LATENCY_MS);
+    });
+  });
+  return new Promise(resolve => server.listen(0, '127.0.0.1', () => {
+    resolve({ server, counts, url: `http://127.0.0.1:${server.address().port}` });
+  }));
+}
+
+function tickBatch(node, tick) {
+  let id = 1;
+  const batch = [
+    { jsonrpc: '2.0', id: id++, method: 'eth_chainId', params: [] },
+    { jsonrpc: '2.0', id: id++, method: 'eth_blockNumber', params: [] },
+    ...SELECTORS.map(data => ({ jsonrpc: '2.0', id: id++, method: 'eth_call', params: [{ to: REGISTRY, data }, 'latest'] }))
+  ];
+  if (tick % 10 === node % 10) {
+    batch.push({ jsonrpc: '2.0', id: id++, method: 'eth_sendRawTransaction', params: ['0x02' + node.toString(16).padStart(4, '0')] });
+  }
+  return batch;
+}
+
+async function run(label, url, counts) {
+  counts.calls = 0;
+  counts.requests = 0;
+  counts.byMethod = {};
+  let clientCalls = 0;
+  let wrong = 0;
+  const start = Date.now();
+  for (let tick = 0; tick < TICKS; tick++) {
+    const tickStart = Date.now();
+    await Promise.all(Array.from({ length: NODES }, async (_, node) => {
+      // Nodes on one host tick at nearly the same moment
+      await new Promise(r => setTimeout(r, Math.random() * 20));
+      const batch = tickBatch(node, tick);
+      clientCalls += batch.length;
+      const { data } = await axios.post(url, batch, { httpAgent: new http.Agent({ keepAlive: false }) });
+      for (const r of data) if (r.error || r.result === undefined) wrong++;
+    }));
+    await new Promise(r => setTimeout(r, Math.max(0, TICK_MS - (Date.now() - tickStart))));
+  }
+  const seconds = (Date.now() - start) / 1000;
+  console.log(
+    `${label.padEnd(7)} client ${String(clientCalls).padStart(5)} calls  ` +
+    `upstream ${String(counts.calls).padStart(5)} calls / ${String(counts.requests).padStart(4)} requests  ` +
+    `(${(counts.calls / clientCalls * 100).toFixed(1).padStart(5)}%)  ${seconds.toFixed(1)}s  errors ${wrong}`
+  );
+  return counts.byMethod;
+}
+
+(async () => {
+  const upstream = await startUpstream();
+  console.log(`${NODES} nodes, ${TICKS} ticks every ${TICK_MS}ms, block every ${BLOCK_MS}ms, upstream latency ${LATENCY_MS}ms\n`);
+
+  await run('direct', upstream.url, upstream.counts);
+
+  const proxy = await new RpcProxy({ upstream: upstream.url, port: 0 }).start();
+  const byMethod = await run('proxy', `http://127.0.0.1:${proxy.port}`, upstream.counts);
+  const stats = proxy.getStats();
+  console.log(`\nproxy hit rate ${(stats.hitRate * 100).toFixed(1)}% ` +
+    `(${stats.cacheHits} cached, ${stats.shared} shared in flight, ${stats.passthrough + stats.writes} passed through)`);
+  console.log('upstream by method:', JSON.stringify(byMethod));
+
+  await proxy.stop();
+  upstream.server.close();
+})();
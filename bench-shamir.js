@@ -0,0 +1,52 @@
+#!/usr/bin/env node
+// Shamir microbenchmark: per-key secrets.js-grempe vs ShamirBatch
+// Measures the cluster-wide operations (11 keys): combine 6-of-11 shares
+// per key, split 6-of-11 (refresh) and 3-of-5 (backup), and checks that
+// each implementation combines the other's shares.
+//
+// Usage: node bench-shamir.js [iterations=200] [keys=11]
+
+const crypto = require('crypto');
+const secrets = require('secrets.js-grempe');
+const ShamirBatch = require('./shamir-batch');
+
+const ITERATIONS = Number(process.argv[2] || 200);
+const KEYS = Number(process.argv[3] || 11);
+
+function bench(label, fn) {
+  fn(); // warm up
+  const start = process.hrtime.bigint();
+  for (let i = 0; i < ITERATIONS; i++) fn();
+  const ms = Number(process.hrtime.bigint() - start) / 1e6;
+  console.log(`  ${label.padEnd(34)} ${(ms / ITERATIONS).toFixed(3).padStart(9)}ms/op`);
+  return ms / ITERATIONS;
+}
+
+const keys = Array.from({ length: KEYS }, () => crypto.randomBytes(32).toString('hex'));
+const shareSets = keys.map(key => secrets.share(key, 11, 6));
+const sixOfEleven = shareSets.map(shares => shares.slice(0, 6));
+
+// Compatibility, both directions
+for (let i = 0; i < KEYS; i++) {
+  const batchShares = ShamirBatch.split(keys[i], 11, 6);
+  if (secrets.combine(batchShares.slice(3, 9)) !== keys[i]) throw new Error('secrets.js cannot combine ShamirBatch shares');
+}
+if (ShamirBatch.combineMany(sixOfEleven).some((key, i) => key !== keys[i])) {
+  throw new Error('ShamirBatch cannot combine secrets.js shares');
+}
+console.log(`${KEYS} keys x 32 bytes, ${ITERATIONS} iterations (shares are interchangeable)`);
+
+const rows = [
+  ['combine 6-of-11', () => sixOfEleven.map(s => secrets.combine(s)), () => ShamirBatch.combineMany(sixOfEleven)],
+  ['split 6-of-11 (refresh)', () => keys.map(k => secrets.share(k, 11, 6)), () => ShamirBatch.splitMany(keys, 11, 6)],
+  ['split 3-of-5 (backup)', () => keys.map(k => secrets.share(k, 5, 3)), () => ShamirBatch.splitMany(keys, 5, 3)],
+  ['createBackupShares (combine+split)',
+    () => sixOfEleven.map(s => secrets.share(secrets.combine(s), 5, 3)),
+    () => ShamirBatch.splitMany(ShamirBatch.combineMany(sixOfEleven), 5, 3)]
+];
+for (const [label, perKey, batch] of rows) {
+  console.log(label);
+  const a = bench('secrets.js per key', perKey);
+  const b = bench('ShamirBatch', batch);
+  console.log(`  ${'speedup'.padEnd(34)} ${(a / b).toFixed(1).padStart(9)}x`);
+}
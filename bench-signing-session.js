@@ -0,0 +1,98 @@
+#!/usr/bin/env node
+// Signing throughput: one reconstruction per request vs SigningSession batches
+// Requests arrive open-loop at a fixed rate. Every reconstruction costs one
+// share collection round (collectMs, simulated network) plus secrets.combine
+// of 6-of-11 shares; each signature costs signMs of CPU. Window 0 with
+// maxBatch 1 is the old reconstructSignClear path. Requests refused by
+// back-pressure (maxPending) are counted, not retried.
+//
+// Usage: node bench-signing-session.js [requests=2000] [ratePerSec=400] [collectMs=20] [signMs=0.5] [maxPending=256]
+
+const crypto = require('crypto');
+const secrets = require('secrets.js-grempe');
+const { SecureSigningSystem, SigningSession } = require('./secure-signing-system');
+
+const REQUESTS = Number(process.argv[2] || 2000);
+const RATE = Number(process.argv[3] || 400);
+const COLLECT_MS = Number(process.argv[4] || 20);
+const SIGN_MS = Number(process.argv[5] || 0.5);
+const MAX_PENDING = Number(process.argv[6] || 256);
+const WINDOWS = [0, 2, 5, 10, 25, 50];
+
+const key = crypto.randomBytes(32).toString('hex');
+const shares = secrets.share(key, 11, 6).slice(0, 6);
+const sleep = ms => new Promise(r => setTimeout(r, ms));
+
+function signFunction(myKey, payload) {
+  const until = process.hrtime.bigint() + BigInt(Math.round(SIGN_MS * 1e6));
+  let mac;
+  do {
+    mac = crypto.createHmac('sha256', myKey).update(payload).digest('hex');
+  } while (process.hrtime.bigint() < until);
+  return mac;
+}
+
+async function run(windowMs) {
+  const session = new SigningSession({
+    signer: new SecureSigningSystem('0xbench'),
+    collectShares: async () => {
+      await sleep(COLLECT_MS);
+      return shares;
+    },
+    signFunction,
+    windowMs,
+    maxBatch: windowMs === 0 ? 1 : 64,
+    maxPending: MAX_PENDING
+  });
+
+  let signed = 0;
+  let rejected = 0;
+  let lastDone = 0;
+  const start = Date.now();
+  const pending = [];
+  for (let i = 0; i < REQUESTS; i++) {
+    const due = start + (i * 1000) / RATE;
+    if (due > Date.now()) await sleep(due - Date.now());
+    pending.push(session.sign(`withdrawal-${i}`).then(() => {
+      signed++;
+      lastDone = Date.now();
+    }, error => {
+      if (error.code !== 'SIGNING_BACKPRESSURE') throw error;
+      rejected++;
+    }));
+  }
+  await Promise.all(pending);
+
+  const stats = session.getStats();
+  const seconds = ((lastDone || Date.now()) - start) / 1000;
+  return {
+    label: windowMs === 0 ? 'per-request' : `window ${windowMs}ms`,
+    throughput: signed / seconds,
+    signed,
+    rejected,
+    batches: stats.batches,
+    avgBatch: stats.avgBatch,
+    p50: stats.latencyMs.p50,
+    p99: stats.latencyMs.p99
+  };
+}
+
+(async () => {
+  console.log(`${REQUESTS} requests at ${RATE}/s, share collection ${COLLECT_MS}ms, sign ${SIGN_MS}ms, maxPending ${MAX_PENDING}\n`);
+  const log = console.log;
+  for (const windowMs of WINDOWS) {
+    console.log = () => {}; // reconstruct / clear messages
+    let r;
+    try {
+      r = await run(windowMs);
+    } finally {
+      console.log = log;
+    }
+    console.log(
+      `${r.label.padEnd(12)} ${r.throughput.toFixed(0).padStart(6)} signed/s  ` +
+      `${String(r.signed).padStart(5)} signed ${String(r.rejected).padStart(5)} rejected  ` +
+      `${String(r.batches).padStart(5)} reconstructions (avg ${r.avgBatch.toFixed(1).padStart(5)}/batch)  ` +
+      `latency p50 ${String(r.p50).padStart(5)}ms p99 ${String(r.p99).padStart(5)}ms`
+    );
+  }
+})();
@@ -0,0 +1,144 @@
+const fs = require('fs').promises;
+const path = require('path');
+
+/**
+ * Ceremony Journal
+ * Local, per-cluster record of multisig ceremony progress so that a failed
+ * tick resumes from the last completed step instead of starting over.
+ *
+ * Steps used by ZNode:
+ *   multisig_made        { address }
+ *   round<N>_submitted   { info, txHash }
+ *   round<N>_done        { peers }
+ *   address_submitted    { address, txHash }
+ *
+ * The journal is removed once the cluster is confirmed or the node
+ * requeues, and ignored if the cluster wallet it describes is gone.
+ *
+ * Every record() is written to a temp file and renamed over the journal, so
+ * a crash never leaves a torn file behind.
+ */
+class CeremonyJournal {
+  constructor(clusterId, options = {}) {
+    this.clusterId = clusterId;
+    this.dir = options.dir || process.env.CEREMONY_STATE_DIR || path.join(__dirname, 'ceremony_state');
+    this.filepath = path.join(this.dir, `${clusterId}.json`);
+    this.walletFile = options.walletFile || null;
+    this.state = { clusterId, steps: {}, createdAt: Date.now(), updatedAt: Date.now() };
+  }
+
+  /**
+   * Load (or create) the journal for a cluster
+   */
+  static async open(clusterId, options = {}) {
+    const journal = new CeremonyJournal(clusterId, options);
+    await journal.load();
+    return journal;
+  }
+
+  async load() {
+    try {
+      const data = await fs.readFile(this.filepath, 'utf8');
+      const parsed = JSON.parse(data);
+      if (parsed && parsed.clusterId === this.clusterId && parsed.steps) {
+        if (this.walletFile && !(await CeremonyJournal._exists(this.walletFile))) {
+          // Progress refers to a wallet that no longer exists (e.g. wiped
+          // by clean-restart.sh): resuming would open a missing wallet
+          console.log(`  Ceremony journal ignored: wallet ${path.basename(this.walletFile)} is missing`);
+          await this.clear();
+        } else {
+          this.state = parsed;
+        }
+      }
+    } catch (error) {
+      if (error.code !== 'ENOENT') {
+        console.log(`  Ceremony journal unreadable, starting fresh: ${error.message}`);
+      }
+    }
+    return this.state;
+  }
+
+  has(step) {
+    return Object.prototype.hasOwnProperty.call(this.state.steps, step);
+  }
+
+  get(step) {
+    return this.has(step) ? this.state.steps[step] : null;
+  }
+
+  /**
+   * Last recorded step name (for resume logging)
+   */
+  lastStep() {
+    let last = null;
+    let lastAt = -1;
+    for (const [step, data] of Object.entries(this.state.steps)) {
+      if (data.at > lastAt) {
+        last = step;
+        lastAt = data.at;
+      }
+    }
+    return last;
+  }
+
+  async record(step, data = {}) {
+    this.state.steps[step] = { ...data, at: Date.now() };
+    this.state.updatedAt = Date.now();
+    await this.save();
+  }
+
+  async forget(step) {
+    if (!this.has(step)) return;
+    delete this.state.steps[step];
+    this.state.updatedAt = Date.now();
+    await this.save();
+  }
+
+  async save() {
+    await fs.mkdir(this.dir, { recursive: true });
+    const tmp = `${this.filepath}.tmp`;
+    await fs.writeFile(tmp, JSON.stringify(this.state, null, 2));
+    await fs.rename(tmp, this.filepath);
+  }
+
+  async clear() {
+    this.state.steps = {};
+    try {
+      await fs.unlink(this.filepath);
+    } catch {}
+  }
+
+  /**
+   * Delete the journal of one cluster
+   */
+  static async remove(clusterId, options = {}) {
+    await new CeremonyJournal(clusterId, options).clear();
+  }
+
+  /**
+   * Delete every journal (the node left whatever ceremony it was in)
+   */
+  static async removeAll(options = {}) {
+    const dir = new CeremonyJournal('', options).dir;
+    let files = [];
+    try {
+      files = await fs.readdir(dir);
+    } catch {
+      return 0;
+    }
+    const journals = files.filter(f => f.endsWith('.json') || f.endsWith('.json.tmp'));
+    await Promise.all(journals.map(f => fs.unlink(path.join(dir, f)).catch(() => {})));
+    return journals.length;
+  }
+
+  static async _exists(file) {
+    try {
+      await fs.access(file);
+      return true;
+    } catch {
+      return false;
+    }
+  }
+}
+
+module.exports = CeremonyJournal;
@@ -28,6 +28,12 @@ echo "→ Removing all wallet files..."
 rm -rf ~/.monero-wallets/* ~/.bitmonero/znode* ~/.monero-wallets/znode* 2>/dev/null || true
 mkdir -p ~/.monero-wallets
 
+echo "→ Clearing warm-start cache..."
+rm -rf warm_start
+
+echo "→ Clearing ceremony journals..."
+rm -rf "${CEREMONY_STATE_DIR:-ceremony_state}"
+
 echo "→ Waiting for cleanup to complete..."
 sleep 2
 
@@ -0,0 +1,235 @@
+const fs = require('fs').promises;
+const path = require('path');
+
+const ZERO_ADDRESS = '0x0000000000000000000000000000000000000000';
+const DEAD_STATES = new Set(['DEAD', 'INACTIVE']);
+
+/**
+ * Cluster Index
+ * Local view of every confirmed cluster, kept up to date incrementally.
+ *
+ * sync() only asks for ClusterConfirmed / ClusterStateChanged logs newer
+ * than the saved block checkpoint, applies them in chain order and re-reads
+ * getClusterInfo() just for the clusters those logs touched (plus a small,
+ * fixed number of the least recently refreshed ones, so member liveness
+ * converges without a full pass). Member and active-node counts live in
+ * memory and are snapshotted to disk so a restart resumes from the
+ * checkpoint instead of replaying the whole history.
+ */
+class ClusterIndex {
+  constructor(registry, options = {}) {
+    this.registry = registry;
+    this.reader = options.reader || null;
+    this.fromBlock = options.fromBlock !== undefined
+      ? options.fromBlock
+      : Number(process.env.CLUSTER_INDEX_FROM_BLOCK || 0);
+    // Logs this close to the head are re-read on the next sync (reorgs)
+    this.reorgDepth = options.reorgDepth !== undefined ? options.reorgDepth : 12;
+    this.refreshBudget = options.refreshBudget !== undefined ? options.refreshBudget : 8;
+    this.dir = options.dir || process.env.CLUSTER_INDEX_DIR || path.join(__dirname, 'cluster_index');
+    this.filepath = null;
+
+    this.clusters = new Map();   // clusterId -> { state, members, activeNodes, allNodes, confirmedBlock, refreshedAt }
+    this.checkpoint = null;      // last block whose logs are fully applied
+    this._syncing = null;
+    this._syncAgain = false;
+    this.stats = { syncs: 0, logs: 0, refreshes: 0, lastSyncMs: 0 };
+  }
+
+  async _snapshotPath() {
+    if (!this.filepath) {
+      const address = String(this.registry.target || (await this.registry.getAddress())).toLowerCase();
+      this.filepath = path.join(this.dir, `${address}.json`);
+    }
+    return this.filepath;
+  }
+
+  /**
+   * Load the on-disk snapshot, if any
+   */
+  async load() {
+    const filepath = await this._snapshotPath();
+    try {
+      const snapshot = JSON.parse(await fs.readFile(filepath, 'utf8'));
+      if (snapshot.version !== 1) return false;
+      this.checkpoint = snapshot.checkpoint;
+      this.clusters = new Map(Object.entries(snapshot.clusters));
+      console.log(`[ClusterIndex] Loaded ${this.clusters.size} clusters (checkpoint block ${this.checkpoint})`);
+      return true;
+    } catch (error) {
+      if (error.code !== 'ENOENT') {
+        console.log(`[ClusterIndex] Snapshot unreadable, rebuilding: ${error.message}`);
+      }
+      return false;
+    }
+  }
+
+  async save() {
+    const filepath = await this._snapshotPath();
+    await fs.mkdir(this.dir, { recursive: true });
+    const tmp = `${filepath}.tmp`;
+    await fs.writeFile(tmp, JSON.stringify({
+      version: 1,
+      checkpoint: this.checkpoint,
+      savedAt: Date.now(),
+      clusters: Object.fromEntries(this.clusters)
+    }));
+    await fs.rename(tmp, filepath);
+  }
+
+  /**
+   * Bring the index up to the current head. Concurrent callers share the
+   * running sync; a call that arrives mid-sync queues one more pass.
+   */
+  sync() {
+    if (this._syncing) {
+      this._syncAgain = true;
+      return this._syncing;
+    }
+    this._syncing = (async () => {
+      try {
+        do {
+          this._syncAgain = false;
+          await this._syncOnce();
+        } while (this._syncAgain);
+      } finally {
+        this._syncing = null;
+      }
+    })();
+    return this._syncing;
+  }
+
+  async _syncOnce() {
+    const started = Date.now();
+    const provider = this.registry.runner && this.registry.runner.provider
+      ? this.registry.runner.provider
+      : this.registry.runner;
+    const head = await provider.getBlockNumber();
+    const from = this.checkpoint === null ? this.fromBlock : Math.max(this.fromBlock, this.checkpoint - this.reorgDepth + 1);
+    const touched = new Set();
+
+    if (from <= head) {
+      const [confirmed, changed] = await Promise.all([
+        this._queryLogs(this.registry.filters.ClusterConfirmed(), from, head),
+        this._queryLogs(this.registry.filters.ClusterStateChanged(), from, head)
+      ]);
+      const logs = [...confirmed, ...changed].sort((a, b) =>
+        (a.blockNumber - b.blockNumber) || ((a.index ?? a.logIndex ?? 0) - (b.index ?? b.logIndex ?? 0))
+      );
+      for (const log of logs) {
+        this._apply(log);
+        touched.add(log.args.clusterId);
+      }
+      this.stats.logs += logs.length;
+    }
+
+    // Refresh touched clusters plus the stalest few live ones
+    const refresh = new Set([...touched].filter(id => !this._isDead(this.clusters.get(id))));
+    const stalest = [...this.clusters.entries()]
+      .filter(([id, c]) => !refresh.has(id) && !this._isDead(c))
+      .sort((a, b) => a[1].refreshedAt - b[1].refreshedAt)
+      .slice(0, this.refreshBudget);
+    stalest.forEach(([id]) => refresh.add(id));
+    await this._refresh([...refresh]);
+
+    this.checkpoint = head;
+    this.stats.syncs++;
+    this.stats.lastSyncMs = Date.now() - started;
+    await this.save().catch(error => console.log(`[ClusterIndex] Snapshot save failed: ${error.message}`));
+  }
+
+  /**
+   * queryFilter over [from, to]; ranges the provider rejects are split in half
+   */
+  async _queryLogs(filter, from, to) {
+    try {
+      return await this.registry.queryFilter(filter, from, to);
+    } catch (error) {
+      if (to <= from) throw error;
+      const mid = Math.floor((from + to) / 2);
+      const left = await this._queryLogs(filter, from, mid);
+      const right = await this._queryLogs(filter, mid + 1, to);
+      return left.concat(right);
+    }
+  }
+
+  _apply(log) {
+    const clusterId = log.args.clusterId;
+    let entry = this.clusters.get(clusterId);
+    if (!entry) {
+      entry = { state: 'ACTIVE', members: [], activeNodes: 0, allNodes: [], confirmedBlock: log.blockNumber, refreshedAt: 0 };
+      this.clusters.set(clusterId, entry);
+    }
+    const eventName = log.eventName || (log.fragment && log.fragment.name);
+    if (eventName === 'ClusterStateChanged') {
+      entry.state = String(log.args.newState);
+    }
+  }
+
+  _isDead(entry) {
+    return !entry || DEAD_STATES.has(entry.state);
+  }
+
+  async _refresh(clusterIds) {
+    if (clusterIds.length === 0) return;
+    const infos = this.reader
+      ? await this.reader.readMany(clusterIds.map(id => [this.registry, 'getClusterInfo', [id]]))
+      : await Promise.all(clusterIds.map(id => this.registry.getClusterInfo(id)));
+    const now = Date.now();
+    clusterIds.forEach((id, i) => this.update(id, ClusterIndex.stateFromInfo(infos[i]), now));
+    this.stats.refreshes += clusterIds.length;
+  }
+
+  static stateFromInfo(info) {
+    const activeMembers = info.currentMembers.filter(addr => addr !== ZERO_ADDRESS);
+    return {
+      activeNodes: activeMembers.length,
+      members: [...activeMembers],
+      allNodes: [...info.nodes]
+    };
+  }
+
+  /**
+   * Record a freshly read cluster state (also used by direct reads)
+   */
+  update(clusterId, state, refreshedAt = Date.now()) {
+    const entry = this.clusters.get(clusterId) || { state: 'ACTIVE', confirmedBlock: null };
+    Object.assign(entry, state, { refreshedAt });
+    this.clusters.set(clusterId, entry);
+  }
+
+  get(clusterId) {
+    return this.clusters.get(clusterId) || null;
+  }
+
+  /**
+   * Re-read the given clusters whose liveness is older than maxAgeMs;
+   * returns how many were refreshed
+   */
+  async refreshOlderThan(clusterIds, maxAgeMs) {
+    const cutoff = Date.now() - maxAgeMs;
+    const stale = clusterIds.filter(id => {
+      const entry = this.clusters.get(id);
+      return entry && !(entry.refreshedAt >= cutoff);
+    });
+    await this._refresh(stale);
+    return stale.length;
+  }
+
+  /**
+   * Clusters with at least minActive live members, from memory; with
+   * maxAgeMs, only those whose liveness was read within that window
+   */
+  clustersWithActive(minActive, maxAgeMs = Infinity) {
+    const cutoff = Date.now() - maxAgeMs;
+    const out = [];
+    for (const [clusterId, entry] of this.clusters.entries()) {
+      if (!this._isDead(entry) && entry.activeNodes >= minActive && entry.refreshedAt >= cutoff) {
+        out.push({ clusterId, activeNodes: entry.activeNodes, members: entry.members });
+      }
+    }
+    return out;
+  }
+}
+
+module.exports = ClusterIndex;
@@ -0,0 +1,273 @@
+/**
+ * Cluster Monitor
+ * Keeps one cached view of ClusterRegistry state and refreshes it from a
+ * single block poll instead of re-reading everything on a fixed loop.
+ *
+ * Every blockPollMs the monitor learns the chain head and, if blocks were
+ * mined since the last poll, fetches NodeRegistered and ClusterFormed for
+ * the whole new range with one eth_getLogs:
+ *
+ * - NodeRegistered  → queue status (+ our registration if it is us)
+ * - ClusterFormed   → forming cluster + queue status
+ * - new blocks      → queue status; forming cluster only if the counts moved
+ *
+ * Requests per poll: with Multicall3 the queue status read also returns
+ * the head, so a poll costs 1 eth_call plus 1 eth_getLogs when a block was
+ * mined; without it, 1 eth_blockNumber and, only when the head moved,
+ * 1 eth_getLogs + 1 eth_call. The forming cluster (1 more eth_call) is read
+ * only when the queue counts moved or a cluster formed. The legacy 'poll'
+ * mode does 3 eth_calls per interval regardless.
+ *
+ * Ticks (the node's status/action callback) are serialized: a tick never
+ * starts while the previous one is still running, extra triggers coalesce.
+ */
+class ClusterMonitor {
+  constructor(registry, provider, nodeAddress, options = {}) {
+    this.registry = registry;
+    this.provider = provider;
+    this.nodeAddress = nodeAddress;
+    this.mode = options.mode || 'events';
+    this.pollIntervalMs = options.pollIntervalMs || 15000;
+    this.blockPollMs = options.blockPollMs || 15000;
+    this.maxLogRange = options.maxLogRange || 2000;
+    this.reader = options.reader || null;
+
+    this.state = {
+      blockNumber: 0,
+      queueLen: 0n,
+      selectedCount: 0n,
+      canRegister: false,
+      selectedNodes: [],
+      lastSelection: 0n,
+      registration: null,
+      updatedAt: 0
+    };
+
+    this.dirty = new Set(['queue', 'forming', 'registration']);
+    this.onTick = null;
+    this._tickRunning = false;
+    this._tickPending = false;
+    this._pollDue = false;
+    this._logBlock = null;
+    this._timers = [];
+    this._started = false;
+  }
+
+  /**
+   * Start monitoring. `onTick(state)` runs once immediately and then after
+   * every poll, never concurrently with itself.
+   */
+  async start(onTick) {
+    this.onTick = onTick;
+    this._started = true;
+
+    if (this.mode === 'poll') {
+      this._timers.push(setInterval(() => {
+        this.invalidate();
+        this.trigger();
+      }, this.pollIntervalMs));
+    } else {
+      // Every tick also keeps time-based logic (stale cluster age, retries
+      // of a pending finalization) moving
+      this._timers.push(setInterval(() => this.poll(), this.blockPollMs));
+      this._pollDue = true;
+    }
+
+    await this.trigger();
+  }
+
+  stop() {
+    this._started = false;
+    for (const timer of this._timers) clearInterval(timer);
+    this._timers = [];
+  }
+
+  /**
+   * Check the chain for new blocks on the next tick.
+   */
+  poll() {
+    this._pollDue = true;
+    return this.trigger();
+  }
+
+  /**
+   * Mark cached parts as stale (all parts if none given). Call after our
+   * own writes so the next tick sees fresh registry state.
+   */
+  invalidate(...parts) {
+    const keys = parts.length > 0 ? parts : ['queue', 'forming', 'registration'];
+    for (const key of keys) this.dirty.add(key);
+  }
+
+  getState() {
+    return this.state;
+  }
+
+  /**
+   * Request a tick. If one is running, a single follow-up tick is queued.
+   */
+  async trigger() {
+    if (!this._started) return;
+    if (this._tickRunning) {
+      this._tickPending = true;
+      return;
+    }
+
+    this._tickRunning = true;
+    try {
+      do {
+        this._tickPending = false;
+        await this.refresh();
+        if (this.onTick) {
+          await this.onTick(this.state);
+        }
+      } while (this._tickPending && this._started);
+    } catch (e) {
+      console.log('Monitor error:', e.message);
+    } finally {
+      this._tickRunning = false;
+    }
+  }
+
+  /**
+   * Catch up with the chain if a poll is due, then re-read only the dirty
+   * parts of the registry state.
+   */
+  async refresh() {
+    if (this._pollDue) {
+      this._pollDue = false;
+      await this._pollChain();
+    }
+    return this._readDirty();
+  }
+
+  /**
+   * Learn the head and turn the logs of every block mined since the last
+   * poll into dirty parts.
+   */
+  async _pollChain() {
+    let head = null;
+    if (this.reader && this.reader.enabled) {
+      // Multicall3 returns the block it read at: the queue status doubles
+      // as the head lookup
+      this.dirty.add('queue');
+      await this._readDirty();
+      head = this.reader.latestBlock;
+    }
+    if (head === null) head = Number(await this.provider.getBlockNumber());
+
+    if (this._logBlock === null || head <= this._logBlock) {
+      if (this._logBlock === null) this._logBlock = head;
+      this.state.blockNumber = Math.max(this.state.blockNumber, head);
+      return;
+    }
+
+    // Selection changes the queue without an event of its own
+    this.dirty.add('queue');
+    if (head - this._logBlock > this.maxLogRange) {
+      // Too far behind for one log query: a full re-read is cheaper
+      this.invalidate();
+    } else {
+      try {
+        await this._scanLogs(this._logBlock + 1, head);
+      } catch (e) {
+        console.log('Monitor log query failed:', e.message);
+        this.invalidate();
+      }
+    }
+    this._logBlock = head;
+    this.state.blockNumber = head;
+  }
+
+  async _scanLogs(fromBlock, toBlock) {
+    const iface = this.registry.interface;
+    const logs = await this.provider.getLogs({
+      address: this.registry.target,
+      fromBlock,
+      toBlock,
+      topics: [[
+        iface.getEvent('NodeRegistered').topicHash,
+        iface.getEvent('ClusterFormed').topicHash
+      ]]
+    });
+
+    for (const log of logs) {
+      const parsed = iface.parseLog(log);
+      if (!parsed) continue;
+      if (parsed.name === 'NodeRegistered') {
+        const node = parsed.args[0];
+        if (node && node.toLowerCase() === this.nodeAddress.toLowerCase()) {
+          this.dirty.add('registration');
+        }
+      } else if (parsed.name === 'ClusterFormed') {
+        this.dirty.add('forming');
+      }
+    }
+  }
+
+  /**
+   * Read the dirty parts: queue status (and registration) first, the
+   * forming cluster only if it is dirty itself or the queue counts moved.
+   */
+  async _readDirty() {
+    if (this.dirty.size === 0) return this.state;
+    const dirty = this.dirty;
+    this.dirty = new Set();
+
+    try {
+      const calls = [];
+      const parts = [];
+      for (const [part, method, args] of [
+        ['queue', 'getQueueStatus', []],
+        ['forming', 'getFormingCluster', []],
+        ['registration', 'registeredNodes', [this.nodeAddress]]
+      ]) {
+        if (dirty.has(part)) {
+          calls.push([this.registry, method, args]);
+          parts.push(part);
+        }
+      }
+
+      let results = await this._read(calls);
+      for (let i = 0; i < parts.length; i++) {
+        if (parts[i] === 'queue') {
+          const [queueLen, selectedCount, canRegister] = results[i];
+          const moved = queueLen !== this.state.queueLen || selectedCount !== this.state.selectedCount;
+          this.state.queueLen = queueLen;
+          this.state.selectedCount = selectedCount;
+          this.state.canRegister = canRegister;
+          // Selection changes the forming cluster without an event of its own
+          if (moved && !dirty.has('forming')) {
+            dirty.add('forming');
+            parts.push('forming');
+            results = [...results, ...await this._read([[this.registry, 'getFormingCluster', []]])];
+          }
+        } else if (parts[i] === 'forming') {
+          const [selectedNodes, lastSelection] = results[i];
+          this.state.selectedNodes = [...selectedNodes];
+          this.state.lastSelection = lastSelection;
+        } else if (parts[i] === 'registration') {
+          this.state.registration = results[i];
+        }
+      }
+
+      this.state.updatedAt = Date.now();
+    } catch (e) {
+      // Keep the parts we failed to read marked for the next tick
+      for (const key of dirty) this.dirty.add(key);
+      throw e;
+    }
+
+    return this.state;
+  }
+
+  /**
+   * One Multicall3 round trip through the reader, else direct view calls
+   */
+  _read(calls) {
+    if (this.reader) return this.reader.readMany(calls);
+    return Promise.all(calls.map(([contract, method, args]) => contract[method](...args)));
+  }
+}
+
+module.exports = ClusterMonitor;
@@ -0,0 +1,568 @@
+#!/usr/bin/env node
+// Local cluster formation simulator
+// Runs N ZNode instances in one process against an in-memory
+// ClusterRegistry / ExchangeCoordinator and a fake monero-wallet-rpc per node,
+// then reports time-to-confirmed-cluster, RPC counts and failure recovery.
+//
+// Usage: node cluster-simulator.js [--nodes 11] [--runs 1] [--block-ms 250]
+//          [--latency-ms 10] [--jitter-ms 10] [--drop-rate 0] [--timeout-s 300] [--verbose]
+
+const EventEmitter = require('events');
+const crypto = require('crypto');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { ethers } = require('ethers');
+const ZNode = require('./node');
+const MulticallReader = require('./multicall-reader');
+
+function parseArgs(argv) {
+  const opts = {
+    nodes: 11,
+    runs: 1,
+    blockMs: 250,
+    latencyMs: 10,
+    jitterMs: 10,
+    dropRate: 0,
+    timeoutS: 300,
+    verbose: false
+  };
+  for (let i = 2; i < argv.length; i++) {
+    const arg = argv[i];
+    const next = () => Number(argv[++i]);
+    if (arg === '--nodes') opts.nodes = next();
+    else if (arg === '--runs') opts.runs = next();
+    else if (arg === '--block-ms') opts.blockMs = next();
+    else if (arg === '--latency-ms') opts.latencyMs = next();
+    else if (arg === '--jitter-ms') opts.jitterMs = next();
+    else if (arg === '--drop-rate') opts.dropRate = next();
+    else if (arg === '--timeout-s') opts.timeoutS = next();
+    else if (arg === '--verbose') opts.verbose = true;
+  }
+  return opts;
+}
+
+const sleep = (ms) => new Promise(r => setTimeout(r, ms));
+// Node output is muted (or passed through with --verbose); reports use this
+const out = console.log.bind(console);
+
+/**
+ * Injected latency and drops, shared by chain and wallet stand-ins
+ */
+class Faults {
+  constructor(opts) {
+    this.latencyMs = opts.latencyMs;
+    this.jitterMs = opts.jitterMs;
+    this.dropRate = opts.dropRate;
+    this.dropped = new Map();
+  }
+
+  async apply(kind) {
+    const delay = this.latencyMs + Math.random() * this.jitterMs;
+    if (delay > 0) await sleep(delay);
+    if (this.dropRate > 0 && Math.random() < this.dropRate) {
+      this.dropped.set(kind, (this.dropped.get(kind) || 0) + 1);
+      const err = new Error(`simulated ${kind} drop`);
+      err.code = 'ECONNRESET';
+      throw err;
+    }
+  }
+}
+
+/**
+ * In-memory chain: acts as the provider (block events, receipts) and
+ * mines queued writes every blockMs.
+ */
+class SimChain extends EventEmitter {
+  constructor(blockMs, faults) {
+    super();
+    this.setMaxListeners(0);
+    this.blockMs = blockMs;
+    this.faults = faults;
+    this.blockNumber = 0;
+    this.queue = [];
+    this.receipts = new Map();
+    this.logs = [];
+    this.waiters = new Map();
+    this.stats = { reads: new Map(), txs: new Map(), reverts: new Map() };
+    this.timer = null;
+  }
+
+  start() {
+    this.timer = setInterval(() => this.mine(), this.blockMs);
+  }
+
+  stop() {
+    clearInterval(this.timer);
+  }
+
+  count(map, key) {
+    map.set(key, (map.get(key) || 0) + 1);
+  }
+
+  enqueue(hash, method, run) {
+    this.count(this.stats.txs, method);
+    this.queue.push({ hash, method, run });
+  }
+
+  mine() {
+    this.blockNumber++;
+    const txs = this.queue;
+    this.queue = [];
+    const events = [];
+    for (const tx of txs) {
+      let status = 1;
+      let reason = null;
+      try {
+        const emitted = tx.run() || [];
+        events.push(...emitted);
+      } catch (error) {
+        status = 0;
+        reason = error.message;
+        this.count(this.stats.reverts, tx.method);
+      }
+      const receipt = { hash: tx.hash, status, reason, blockNumber: this.blockNumber, gasUsed: 21000n };
+      this.receipts.set(tx.hash, receipt);
+      (this.waiters.get(tx.hash) || []).forEach(resolve => resolve(receipt));
+      this.waiters.delete(tx.hash);
+    }
+    for (const [contract, name, args] of events) {
+      this.logs.push({
+        address: contract.target,
+        topics: [contract.interface.getEvent(name).topicHash],
+        blockNumber: this.blockNumber,
+        name,
+        args
+      });
+    }
+    this.emit('block', this.blockNumber);
+    for (const [contract, name, args] of events) contract.emit(name, ...args);
+  }
+
+  // Provider surface used by ZNode
+  async getBlockNumber() { return this.blockNumber; }
+  async getNetwork() { return { name: 'simnet', chainId: 31337n }; }
+  async getTransactionReceipt(hash) { return this.receipts.get(hash) || null; }
+
+  async getLogs({ address, fromBlock, toBlock, topics = [] }) {
+    this.count(this.stats.reads, 'eth_getLogs');
+    await this.faults.apply('eth_getLogs');
+    const wanted = topics[0] ? [].concat(topics[0]) : null;
+    return this.logs.filter(log =>
+      log.address === address &&
+      log.blockNumber >= fromBlock && log.blockNumber <= toBlock &&
+      (!wanted || wanted.includes(log.topics[0])));
+  }
+
+  async waitForTransaction(hash, confirms = 1, timeout = 0) {
+    if (this.receipts.has(hash)) return this.receipts.get(hash);
+    return new Promise(resolve => {
+      const list = this.waiters.get(hash) || [];
+      list.push(resolve);
+      this.waiters.set(hash, list);
+      if (timeout) setTimeout(() => resolve(null), timeout);
+    });
+  }
+}
+
+/**
+ * Base for in-memory contracts: views are async methods that count reads
+ * and pass through the fault injector; writes run when a block is mined.
+ */
+class SimContract extends EventEmitter {
+  constructor(chain, name) {
+    super();
+    this.setMaxListeners(0);
+    this.chain = chain;
+    this.name = name;
+    this.target = `sim:${name}`;
+    // Enough of ethers' Interface for log queries: topic = event name
+    this.interface = {
+      getEvent: (event) => ({ topicHash: `sim:${event}` }),
+      parseLog: (log) => ({ name: log.name, args: log.args })
+    };
+  }
+
+  view(method, fn) {
+    this[method] = async (...args) => {
+      this.chain.count(this.chain.stats.reads, `${this.name}.${method}`);
+      await this.chain.faults.apply('eth_call');
+      return fn(...args);
+    };
+  }
+}
+
+class SimClusterRegistry extends SimContract {
+  constructor(chain) {
+    super(chain, 'ClusterRegistry');
+    this.queue = [];
+    this.selected = [];
+    this.lastSelection = 0n;
+    this.registered = new Map();
+    this.addresses = new Map();
+    this.clusters = new Map();
+
+    this.view('getQueueStatus', () => [BigInt(this.queue.length), BigInt(this.selected.length), true]);
+    this.view('getFormingCluster', () => [this.selected.slice(), this.lastSelection]);
+    this.view('getFormingClusterMultisigInfo', () => [
+      this.selected.slice(),
+      this.selected.map(a => (this.registered.get(a) || {}).multisigInfo || '')
+    ]);
+    this.view('registeredNodes', (addr) => {
+      const r = this.registered.get(addr.toLowerCase());
+      return r
+        ? { codeHash: r.codeHash, registrationTime: r.registrationTime }
+        : { codeHash: ethers.ZeroHash, registrationTime: 0n };
+    });
+  }
+
+  _exec(from, method, args) {
+    const me = from.toLowerCase();
+    switch (method) {
+      case 'registerNode': {
+        if (this.registered.has(me)) throw new Error('already registered');
+        const [codeHash, multisigInfo] = args;
+        this.registered.set(me, {
+          codeHash,
+          multisigInfo,
+          registrationTime: BigInt(Math.floor(Date.now() / 1000))
+        });
+        this.queue.push(me);
+        return [[this, 'NodeRegistered', [me]]];
+      }
+      case 'deregisterNode': {
+        if (!this.registered.has(me)) throw new Error('not registered');
+        this.registered.delete(me);
+        this.queue = this.queue.filter(a => a !== me);
+        return [];
+      }
+      case 'selectNextNode': {
+        if (this.selected.length >= 11) throw new Error('cluster full');
+        if (this.queue.length === 0) throw new Error('queue empty');
+        const idx = crypto.randomInt(this.queue.length);
+        this.selected.push(this.queue.splice(idx, 1)[0]);
+        this.lastSelection = BigInt(Math.floor(Date.now() / 1000));
+        return [];
+      }
+      case 'submitMultisigAddress': {
+        if (!this.selected.includes(me)) throw new Error('not in forming cluster');
+        this.addresses.set(args[0], args[1]);
+        return [];
+      }
+      case 'confirmCluster': {
+        if (this.selected.length !== 11 || !this.selected.includes(me)) throw new Error('no forming cluster');
+        const clusterId = ethers.keccak256(ethers.solidityPacked(['address[11]'], [this.selected]));
+        if (this.clusters.has(clusterId)) throw new Error('cluster already exists');
+        const members = this.selected;
+        this.clusters.set(clusterId, { members, moneroAddress: args[0] });
+        this.selected = [];
+        this.lastSelection = 0n;
+        return [[this, 'ClusterFormed', [clusterId, members]]];
+      }
+      case 'clearStaleCluster': {
+        if (this.selected.length === 0) throw new Error('no forming cluster');
+        this.selected = [];
+        this.lastSelection = 0n;
+        return [];
+      }
+      default:
+        throw new Error(`unknown method ${method}`);
+    }
+  }
+}
+
+class SimExchangeCoordinator extends SimContract {
+  constructor(chain) {
+    super(chain, 'ExchangeCoordinator');
+    this.rounds = new Map();
+
+    this.view('getExchangeRoundStatus', (clusterId, round) => {
+      const subs = this.rounds.get(`${clusterId}:${Number(round)}`) || new Map();
+      return [subs.size >= 11, subs.size];
+    });
+    this.view('getExchangeRoundInfo', (clusterId, round, nodes) => {
+      const subs = this.rounds.get(`${clusterId}:${Number(round)}`) || new Map();
+      return [nodes.slice(), nodes.map(n => subs.get(n.toLowerCase()) || '')];
+    });
+  }
+
+  _exec(from, method, args) {
+    if (method !== 'submitExchangeInfo') throw new Error(`unknown method ${method}`);
+    const [clusterId, round, info, nodes] = args;
+    const me = from.toLowerCase();
+    if (!nodes.map(n => n.toLowerCase()).includes(me)) throw new Error('not a cluster member');
+    const key = `${clusterId}:${Number(round)}`;
+    const subs = this.rounds.get(key) || new Map();
+    if (subs.has(me)) throw new Error('already submitted');
+    subs.set(me, info);
+    this.rounds.set(key, subs);
+    return [[this, 'ExchangeInfoSubmitted', [clusterId, Number(round), me]]];
+  }
+}
+
+/**
+ * Per-node write path: same surface as TxManager.send()
+ */
+class SimTxManager {
+  constructor(chain, address) {
+    this.chain = chain;
+    this.address = address;
+    this.nonce = 0;
+  }
+
+  async send(contract, method, args = []) {
+    await this.chain.faults.apply('eth_send');
+    const hash = '0x' + crypto.randomBytes(32).toString('hex');
+    const nonce = this.nonce++;
+    this.chain.enqueue(hash, method, () => contract._exec(this.address, method, args));
+    const mined = this.chain.waitForTransaction(hash).then(receipt => {
+      if (receipt.status !== 1) throw new Error(`${method} reverted: ${receipt.reason}`);
+      return receipt;
+    });
+    mined.catch(() => {});
+    return { hash, nonce, method, wait: () => mined };
+  }
+}
+
+/**
+ * Fake monero-wallet-rpc: enough of the multisig flow for ZNode
+ */
+class FakeWalletRpc {
+  constructor(faults) {
+    this.faults = faults;
+    this.wallets = new Map();
+    this.current = null;
+    this.preparedInfo = null;
+    this.stats = new Map();
+    this.onCall = null;
+  }
+
+  async call(method, params = {}) {
+    const s = this.stats.get(method) || { calls: 0, errors: 0 };
+    this.stats.set(method, s);
+    s.calls++;
+    try {
+      await this.faults.apply('wallet_rpc');
+      return this._handle(method, params);
+    } catch (error) {
+      s.errors++;
+      throw error;
+    }
+  }
+
+  async batch(calls) {
+    return Promise.all(calls.map(c => Array.isArray(c) ? this.call(c[0], c[1]) : this.call(c.method, c.params)));
+  }
+
+  createWallet(filename, password = '') { return this.call('create_wallet', { filename, password }); }
+  openWallet(filename, password = '') { return this.call('open_wallet', { filename, password }); }
+  closeWallet() { return this.call('close_wallet'); }
+
+  _wallet() {
+    const w = this.wallets.get(this.current);
+    if (!w) throw new Error('RPC Error: No wallet file');
+    return w;
+  }
+
+  _handle(method, params) {
+    switch (method) {
+      case 'create_wallet':
+        if (this.wallets.has(params.filename)) throw new Error('RPC Error: Cannot create wallet. Already exists.');
+        this.wallets.set(params.filename, { multisig: false, ready: false, rounds: 0, address: null });
+        this.current = params.filename;
+        return {};
+      case 'open_wallet':
+        if (!this.wallets.has(params.filename)) throw new Error('RPC Error: Failed to open wallet');
+        this.current = params.filename;
+        return {};
+      case 'close_wallet':
+        this.current = null;
+        return {};
+      case 'set':
+      case 'refresh':
+        return {};
+      case 'prepare_multisig': {
+        if (this._wallet().multisig) throw new Error('RPC Error: This wallet is already multisig');
+        this.preparedInfo = 'MultisigV1' + crypto.randomBytes(96).toString('hex');
+        return { multisig_info: this.preparedInfo };
+      }
+      case 'make_multisig': {
+        const w = this._wallet();
+        if (w.multisig) throw new Error('RPC Error: This wallet is already multisig');
+        const infos = [...params.multisig_info, this.preparedInfo].sort();
+        w.multisig = true;
+        w.threshold = params.threshold;
+        w.total = infos.length;
+        w.address = '5' + crypto.createHash('sha256').update(infos.join('')).digest('hex');
+        return { address: w.address, multisig_info: 'MultisigxV2R1' + crypto.randomBytes(96).toString('hex') };
+      }
+      case 'is_multisig': {
+        const w = this._wallet();
+        return { multisig: w.multisig, ready: w.ready, threshold: w.threshold || 0, total: w.total || 0 };
+      }
+      case 'export_multisig_info':
+        if (!this._wallet().multisig) throw new Error('RPC Error: This wallet is not multisig');
+        return { info: crypto.randomBytes(128).toString('hex') };
+      case 'import_multisig_info':
+      case 'exchange_multisig_keys': {
+        const w = this._wallet();
+        if (!w.multisig) throw new Error('RPC Error: This wallet is not multisig');
+        w.rounds++;
+        // 8-of-11 here needs the two exchange rounds ZNode runs (3 and 4)
+        if (w.rounds >= 2) w.ready = true;
+        return { n_outputs: 0 };
+      }
+      case 'get_address':
+        return { address: this._wallet().address || '4' + crypto.randomBytes(47).toString('hex') };
+      case 'get_version':
+        return { version: 65562 };
+      default:
+        throw new Error(`RPC Error: Method not found: ${method}`);
+    }
+  }
+
+  getStats() {
+    return Object.fromEntries(this.stats);
+  }
+}
+
+function percentile(values, p) {
+  if (values.length === 0) return 0;
+  const sorted = [...values].sort((a, b) => a - b);
+  return sorted[Math.min(sorted.length - 1, Math.floor((p / 100) * sorted.length))];
+}
+
+async function runOnce(opts, runIndex) {
+  const faults = new Faults(opts);
+  const chain = new SimChain(opts.blockMs, faults);
+  const registry = new SimClusterRegistry(chain);
+  const exchangeCoordinator = new SimExchangeCoordinator(chain);
+  // One ceremony journal dir per node, as if each ran on its own host
+  const stateDir = fs.mkdtempSync(path.join(os.tmpdir(), 'znode-sim-'));
+
+  // Count journal resumes and error lines; stragglers from a finished run
+  // log into the next run's counters, which only ever overcounts by a few
+  const logs = { resumes: 0, errors: 0 };
+  console.log = console.error = (...args) => {
+    const line = args.map(String).join(' ');
+    if (line.includes('↻')) logs.resumes++;
+    if (line.includes('❌') || line.includes('error')) logs.errors++;
+    if (opts.verbose) out(...args);
+  };
+
+  const wallets = [];
+  const nodes = [];
+  for (let i = 0; i < opts.nodes; i++) {
+    const wallet = {
+      address: '0x' + crypto.randomBytes(20).toString('hex'),
+      privateKey: '0x' + crypto.randomBytes(32).toString('hex')
+    };
+    const monero = new FakeWalletRpc(faults);
+    wallets.push(monero);
+    nodes.push(new ZNode({
+      provider: chain,
+      wallet,
+      registry,
+      exchangeCoordinator,
+      monero,
+      txm: new SimTxManager(chain, wallet.address),
+      reader: new MulticallReader(chain, { enabled: false }),
+      monitor: { mode: 'events', blockPollMs: Math.max(500, opts.blockMs * 4) },
+      ceremonyStateDir: path.join(stateDir, `node${i}`)
+    }));
+  }
+
+  const startTime = Date.now();
+  const formed = new Promise(resolve => {
+    registry.once('ClusterFormed', (clusterId) => resolve({ clusterId, ms: Date.now() - startTime }));
+  });
+  const timeout = sleep(opts.timeoutS * 1000).then(() => null);
+
+  chain.start();
+  // Bring nodes up concurrently, retrying the startup steps on injected drops
+  await Promise.all(nodes.map(async (node) => {
+    for (let attempt = 1; ; attempt++) {
+      try {
+        await node.setupMonero();
+        await node.registerToQueue();
+        break;
+      } catch (error) {
+        if (attempt >= 20) throw error;
+        await sleep(opts.blockMs);
+      }
+    }
+    node.monitorNetwork().catch(() => {});
+  }));
+
+  const result = await Promise.race([formed, timeout]);
+  nodes.forEach(node => node.clusterMonitor && node.clusterMonitor.stop());
+  chain.stop();
+  fs.rmSync(stateDir, { recursive: true, force: true });
+
+  const walletCalls = new Map();
+  for (const w of wallets) {
+    for (const [method, s] of Object.entries(w.getStats())) {
+      const agg = walletCalls.get(method) || { calls: 0, errors: 0 };
+      agg.calls += s.calls;
+      agg.errors += s.errors;
+      walletCalls.set(method, agg);
+    }
+  }
+
+  return {
+    run: runIndex,
+    confirmed: !!result,
+    timeToConfirmMs: result ? result.ms : null,
+    blocks: chain.blockNumber,
+    reads: Object.fromEntries(chain.stats.reads),
+    txs: Object.fromEntries(chain.stats.txs),
+    reverts: Object.fromEntries(chain.stats.reverts),
+    walletCalls: Object.fromEntries(walletCalls),
+    dropsInjected: Object.fromEntries(faults.dropped),
+    resumes: logs.resumes,
+    errorLines: logs.errors
+  };
+}
+
+function sum(obj) {
+  return Object.values(obj).reduce((a, v) => a + (typeof v === 'number' ? v : v.calls), 0);
+}
+
+async function main() {
+  const opts = parseArgs(process.argv);
+  out(`Simulating ${opts.nodes} nodes, ${opts.runs} run(s): block=${opts.blockMs}ms ` +
+    `latency=${opts.latencyMs}±${opts.jitterMs}ms drop=${opts.dropRate}`);
+
+  const results = [];
+  for (let i = 1; i <= opts.runs; i++) {
+    const r = await runOnce(opts, i);
+    results.push(r);
+    out(
+      `run ${i}: ${r.confirmed ? `confirmed in ${(r.timeToConfirmMs / 1000).toFixed(2)}s` : 'NOT confirmed'} ` +
+      `blocks=${r.blocks} reads=${sum(r.reads)} txs=${sum(r.txs)} reverts=${sum(r.reverts)} ` +
+      `walletRpc=${sum(r.walletCalls)} drops=${sum(r.dropsInjected)} resumes=${r.resumes}`
+    );
+  }
+
+  const times = results.filter(r => r.confirmed).map(r => r.timeToConfirmMs);
+  out('\nSummary');
+  out(`  confirmed: ${times.length}/${results.length}`);
+  if (times.length > 0) {
+    out(`  time-to-confirmed p50=${(percentile(times, 50) / 1000).toFixed(2)}s ` +
+      `p90=${(percentile(times, 90) / 1000).toFixed(2)}s max=${(Math.max(...times) / 1000).toFixed(2)}s`);
+  }
+  const last = results[results.length - 1];
+  out('  last run detail:');
+  out(JSON.stringify(last, null, 2).split('\n').map(l => '    ' + l).join('\n'));
+
+  process.exit(times.length === results.length ? 0 : 1);
+}
+
+if (require.main === module) {
+  main().catch(error => {
+    out(error);
+    process.exit(1);
+  });
+}
+
+module.exports = { SimChain, SimClusterRegistry, SimExchangeCoordinator, SimTxManager, FakeWalletRpc, Faults };
@@ -1,7 +1,60 @@
 const crypto = require('crypto');
-const secrets = require('secrets.js-grempe');
+const ShamirBatch = require('./shamir-batch');
 const ECIESEncryption = require('./ecies-encryption');
 const P2PBackupNetwork = require('./p2p-backup-network');
+const ClusterIndex = require('./cluster-index');
+
+/**
+ * Run worker(item, signal) over items with at most `concurrency` in flight,
+ * each bounded by deadlineMs (the signal aborts when it passes). Resolves
+ * with [{ index, item, result }] for every non-null result, as soon as
+ * `quorum` of them are in (outstanding work is aborted) or all items are done.
+ */
+function fanOut(items, worker, { concurrency, deadlineMs, quorum = items.length }) {
+  return new Promise(resolve => {
+    const results = [];
+    const controllers = new Set();
+    let next = 0;
+    let running = 0;
+    let done = false;
+
+    const finish = () => {
+      if (done) return;
+      done = true;
+      controllers.forEach(controller => controller.abort());
+      resolve(results);
+    };
+
+    const launch = () => {
+      while (!done && running < concurrency && next < items.length) {
+        const index = next++;
+        const controller = new AbortController();
+        const timer = setTimeout(() => controller.abort(), deadlineMs);
+        const aborted = new Promise(r => controller.signal.addEventListener('abort', () => r(null)));
+        controllers.add(controller);
+        running++;
+
+        Promise.race([Promise.resolve().then(() => worker(items[index], controller.signal)), aborted])
+          .catch(() => null)
+          .then(result => {
+            clearTimeout(timer);
+            controllers.delete(controller);
+            running--;
+            if (done) return;
+            if (result !== null && result !== undefined) {
+              results.push({ index, item: items[index], result });
+              if (results.length >= quorum) return finish();
+            }
+            if (next >= items.length && running === 0) return finish();
+            launch();
+          });
+      }
+      if (items.length === 0) finish();
+    };
+
+    launch();
+  });
+}
 
 /**
  * Cross-Cluster Backup System V2 with P2P Integration
@@ -13,7 +66,7 @@ const P2PBackupNetwork = require('./p2p-backup-network');
  * - 3-of-5 backup threshold
  */
 class CrossClusterBackupManager {
-  constructor(clusterRegistryContract, myClusterId, wallet, p2pPort = 0) {
+  constructor(clusterRegistryContract, myClusterId, wallet, p2pPort = 0, options = {}) {
     this.registry = clusterRegistryContract;
     this.myClusterId = myClusterId;
     this.wallet = wallet;
@@ -24,12 +77,25 @@ class CrossClusterBackupManager {
     this.BACKUP_THRESHOLD = 3;
     this.BACKUP_TOTAL = 5;
     
+    // Peer fan-out: requests in flight at once and per-peer deadline
+    this.fanOutConcurrency = options.fanOutConcurrency || Number(process.env.BACKUP_FANOUT_CONCURRENCY || 5);
+    this.peerDeadlineMs = options.peerDeadlineMs || Number(process.env.BACKUP_PEER_DEADLINE_MS || 15000);
+    this.txm = options.txm || null;
+    
+    // Incremental view of confirmed clusters (checkpointed on disk)
+    this.clusterIndex = new ClusterIndex(clusterRegistryContract, options.clusterIndex || {});
+    // Candidates' member liveness must be at most this old when they are picked
+    this.livenessMaxAgeMs = options.livenessMaxAgeMs || Number(process.env.BACKUP_LIVENESS_MAX_AGE_MS || 300000);
+    
     // Peer multiaddr cache (eth address => libp2p multiaddr)
     this.peerAddrs = new Map();
+    // Peer public keys for ECIES (eth address => uncompressed hex public key)
+    this.peerKeys = new Map();
   }
 
   async initialize() {
     this.ecies = new ECIESEncryption(this.wallet);
+    await this.clusterIndex.load();
     await this.p2pNetwork.start();
   }
 
@@ -38,10 +104,13 @@ class CrossClusterBackupManager {
   }
 
   /**
-   * Register peer's P2P multiaddr
+   * Register peer's P2P multiaddr (and ECIES public key, needed to send it backups)
    */
-  registerPeer(ethAddress, multiaddr) {
+  registerPeer(ethAddress, multiaddr, publicKey = null) {
     this.peerAddrs.set(ethAddress, multiaddr);
+    if (publicKey) {
+      this.peerKeys.set(ethAddress, publicKey);
+    }
     console.log(`[CrossClusterBackup] Registered peer ${ethAddress.slice(0, 10)}: ${multiaddr}`);
   }
 
@@ -66,64 +135,47 @@ class CrossClusterBackupManager {
   }
 
   async getHealthyClusters() {
-    const allClusters = await this.getAllActiveClusters();
-    const healthy = [];
-
-    for (const clusterId of allClusters) {
-      const state = await this.getClusterState(clusterId);
-      if (state.activeNodes >= 9) {
-        healthy.push({
-          clusterId,
-          activeNodes: state.activeNodes,
-          members: state.members
-        });
-      }
-    }
-
-    return healthy;
+    return this._clustersWithFreshLiveness(9);
   }
 
   async getAllActiveClusters() {
-    const filter = this.registry.filters.ClusterConfirmed();
-    const events = await this.registry.queryFilter(filter);
-    const clusterIds = events.map(e => e.args.clusterId);
-    const active = [];
-    
-    for (const clusterId of clusterIds) {
-      const state = await this.getClusterState(clusterId);
-      if (state.activeNodes >= 6) {
-        active.push(clusterId);
-      }
+    return (await this._clustersWithFreshLiveness(6)).map(c => c.clusterId);
+  }
+
+  /**
+   * A sync only re-reads the clusters it touched plus a few of the stalest,
+   * so every candidate whose liveness is older than livenessMaxAgeMs is
+   * re-read before it is used. If that read fails, such candidates are
+   * left out rather than trusted.
+   */
+  async _clustersWithFreshLiveness(minActive) {
+    await this.clusterIndex.sync();
+    const candidates = this.clusterIndex.clustersWithActive(minActive).map(c => c.clusterId);
+    try {
+      await this.clusterIndex.refreshOlderThan(candidates, this.livenessMaxAgeMs);
+    } catch (error) {
+      console.log(`[CrossClusterBackup] Liveness refresh failed, skipping stale clusters: ${error.message}`);
     }
-    
-    return active;
+    return this.clusterIndex.clustersWithActive(minActive, this.livenessMaxAgeMs);
   }
 
   async getClusterState(clusterId) {
     const info = await this.registry.getClusterInfo(clusterId);
-    const activeMembers = info.currentMembers.filter(addr => addr !== '0x0000000000000000000000000000000000000000');
-    
-    return {
-      activeNodes: activeMembers.length,
-      members: activeMembers,
-      allNodes: info.nodes
-    };
+    const state = ClusterIndex.stateFromInfo(info);
+    this.clusterIndex.update(clusterId, state);
+    return state;
   }
 
   createBackupShares(primaryShares) {
     console.log('[CrossClusterBackup] Creating backup shares from primary shares');
-    const backupShareSets = [];
-
+    // All 11 keys in one pass: combine the primary shares, re-split 3-of-5
+    const primarySharesByKey = [];
     for (let keyIndex = 0; keyIndex < 11; keyIndex++) {
-      const primarySharesForKey = primaryShares.map(nodeShares => nodeShares[keyIndex]);
-      const reconstructedKey = secrets.combine(primarySharesForKey);
-      const backupShares = secrets.share(reconstructedKey, this.BACKUP_TOTAL, this.BACKUP_THRESHOLD);
-      backupShareSets.push(backupShares);
-      
-      if (Buffer.isBuffer(reconstructedKey)) {
-        reconstructedKey.fill(0);
-      }
+      primarySharesByKey.push(primaryShares.map(nodeShares => nodeShares[keyIndex]));
     }
+    const reconstructedKeys = ShamirBatch.combineMany(primarySharesByKey);
+    const backupShareSets = ShamirBatch.splitMany(reconstructedKeys, this.BACKUP_TOTAL, this.BACKUP_THRESHOLD);
+    reconstructedKeys.fill(null);
 
     const backupNodes = [];
     for (let backupIndex = 0; backupIndex < this.BACKUP_TOTAL; backupIndex++) {
@@ -156,37 +208,83 @@ class CrossClusterBackupManager {
       });
     }
 
-    // Send via P2P
+    // Send via P2P, several peers at a time; whatever is not delivered
+    // before its deadline is kept locally (peer will request later)
     for (const dist of distribution) {
-      await this.sendBackupToNode(dist.targetNode, dist.shares, dist.backupIndex);
-      
-      // Register on-chain (gas cost minimal - just address assignment)
+      dist.encryptedShares = await this.encryptShares(dist.shares, dist.targetNode);
+    }
+    const delivered = await fanOut(
+      distribution,
+      async (dist, signal) => (await this.deliverBackup(dist.targetNode, dist.encryptedShares, dist.backupIndex, signal)) || null,
+      { concurrency: this.fanOutConcurrency, deadlineMs: this.peerDeadlineMs }
+    );
+    const deliveredIndexes = new Set(delivered.map(d => d.index));
+    await Promise.all(distribution
+      .filter((dist, i) => !deliveredIndexes.has(i))
+      .map(dist => this.p2pNetwork.storeBackupShares(this.myClusterId, dist.backupIndex, dist.encryptedShares)));
+
+    // Register on-chain (gas cost minimal - just address assignment)
+    await this.assignBackupNodes(distribution.map(dist => dist.targetNode));
+
+    this.backupShares.set(this.myClusterId, distribution);
+    console.log(`[CrossClusterBackup] Backup shares distributed successfully (${delivered.length}/${distribution.length} delivered directly)`);
+  }
+
+  /**
+   * Register backup nodes on-chain as one batch: every tx is broadcast
+   * before any receipt is awaited. Submission order is kept, so position i
+   * in getBackupNodes() still holds backupIndex i.
+   */
+  async assignBackupNodes(targetNodes) {
+    const sent = [];
+    let previous = null;
+    for (const targetNode of targetNodes) {
       try {
-        const tx = await this.registry.assignBackupNode(this.myClusterId, dist.targetNode);
-        await tx.wait();
-        console.log(`[CrossClusterBackup] Registered backup node ${dist.targetNode.slice(0, 10)} on-chain`);
+        const tx = this.txm
+          ? await this.txm.send(this.registry, 'assignBackupNode', [this.myClusterId, targetNode], { after: previous })
+          : await this.registry.assignBackupNode(this.myClusterId, targetNode);
+        previous = tx;
+        sent.push({ targetNode, tx });
       } catch (error) {
         console.error(`[CrossClusterBackup] Failed to register backup on-chain:`, error.message);
       }
     }
 
-    this.backupShares.set(this.myClusterId, distribution);
-    console.log('[CrossClusterBackup] Backup shares distributed successfully');
+    const receipts = await Promise.allSettled(sent.map(({ tx }) => tx.wait()));
+    receipts.forEach((receipt, i) => {
+      if (receipt.status === 'fulfilled') {
+        console.log(`[CrossClusterBackup] Registered backup node ${sent[i].targetNode.slice(0, 10)} on-chain`);
+      } else {
+        console.error(`[CrossClusterBackup] Failed to register backup on-chain:`, receipt.reason.message);
+      }
+    });
+  }
+
+  async encryptShares(shares, targetNodeAddress) {
+    // Encrypt the whole set with target node's public key (one envelope)
+    const publicKey = this.peerKeys.get(targetNodeAddress);
+    if (!publicKey) {
+      throw new Error(`No public key registered for ${targetNodeAddress}`);
+    }
+    return [await this.ecies.encryptShareSet(shares, publicKey)];
   }
 
   async sendBackupToNode(targetNodeAddress, shares, backupIndex) {
-    // Encrypt shares with target node's public key
-    const encryptedShares = shares.map(share => {
-      return this.ecies.encryptForRecipient(share, targetNodeAddress);
-    });
+    const encryptedShares = await this.encryptShares(shares, targetNodeAddress);
+    const success = await this.deliverBackup(targetNodeAddress, encryptedShares, backupIndex);
 
+    if (!success) {
+      // Fallback: store locally for now (peer will request later)
+      await this.p2pNetwork.storeBackupShares(this.myClusterId, backupIndex, encryptedShares);
+    }
+  }
+
+  async deliverBackup(targetNodeAddress, encryptedShares, backupIndex, signal) {
     // Get peer multiaddr
     const peerMultiaddr = this.peerAddrs.get(targetNodeAddress);
     if (!peerMultiaddr) {
       console.error(`[CrossClusterBackup] No P2P address for ${targetNodeAddress}`);
-      // Fallback: store locally for now (peer will request later)
-      await this.p2pNetwork.storeBackupShares(this.myClusterId, backupIndex, encryptedShares);
-      return;
+      return false;
     }
 
     // Send via P2P
@@ -194,13 +292,14 @@ class CrossClusterBackupManager {
       peerMultiaddr,
       this.myClusterId,
       backupIndex,
-      encryptedShares
+      encryptedShares,
+      { signal }
     );
 
     if (!success) {
       console.error(`[CrossClusterBackup] Failed to send to peer, storing locally`);
-      await this.p2pNetwork.storeBackupShares(this.myClusterId, backupIndex, encryptedShares);
     }
+    return success;
   }
 
   async rebalanceBackupShares() {
@@ -267,9 +366,13 @@ class CrossClusterBackupManager {
     return combinedShares;
   }
 
+  /**
+   * Ask every registered backup node at once (up to fanOutConcurrency in
+   * flight, peerDeadlineMs each) and stop at BACKUP_THRESHOLD valid sets,
+   * so dead or slow peers cost at most one deadline instead of one each.
+   */
   async requestBackupSharesP2P(backupNodes) {
-    const collected = [];
-
+    const targets = [];
     for (let i = 0; i < backupNodes.length; i++) {
       const backupNode = backupNodes[i];
       const peerMultiaddr = this.peerAddrs.get(backupNode.nodeAddress);
@@ -278,32 +381,41 @@ class CrossClusterBackupManager {
         console.log(`[CrossClusterBackup] No P2P address for backup node ${backupNode.nodeAddress.slice(0, 10)}`);
         continue;
       }
+      targets.push({ peerMultiaddr, backupIndex: i });
+    }
 
+    const responses = await fanOut(targets, async ({ peerMultiaddr, backupIndex }, signal) => {
       const shares = await this.p2pNetwork.requestBackupFromPeer(
         peerMultiaddr,
         this.myClusterId,
-        i // backupIndex
+        backupIndex,
+        { signal }
       );
+      if (!Array.isArray(shares) || shares.length === 0) return null;
+
+      // Decrypt shares (a set that does not decrypt does not count)
+      return this.ecies.decryptShares(shares);
+    }, {
+      concurrency: this.fanOutConcurrency,
+      deadlineMs: this.peerDeadlineMs,
+      quorum: this.BACKUP_THRESHOLD
+    });
 
-      if (shares) {
-        // Decrypt shares
-        const decryptedShares = shares.map(encShare => {
-          return this.ecies.decrypt(encShare);
-        });
-        collected.push(decryptedShares);
-      }
-
-      if (collected.length >= this.BACKUP_THRESHOLD) {
-        break;
-      }
-    }
-
-    return collected;
+    return responses.map(response => response.result);
   }
 
+  /**
+   * Shares to reconstruct each of the 11 keys from. Primary shares are used
+   * as they are when there are enough of them; otherwise the key is
+   * recovered from the backup set and handed back as exactly the 6 shares
+   * of a fresh 6-of-6 split.
+   * Primary and re-split shares come from different polynomials, so they
+   * are never mixed.
+   */
   combinePrimaryAndBackup(primaryShares, backupShares) {
     console.log(`[CrossClusterBackup] Combining ${primaryShares.length} primary shares + ${backupShares.length} backup shares`);
     const combinedForReconstruction = [];
+    const fromBackup = [];
     
     for (let keyIndex = 0; keyIndex < 11; keyIndex++) {
       const sharesForThisKey = [];
@@ -315,7 +427,7 @@ class CrossClusterBackupManager {
         }
       }
       
-      // Add backup shares
+      // Backup shares for keys the primaries cannot cover
       const backupSharesForKey = [];
       for (const backup of backupShares) {
         if (backup && backup[keyIndex]) {
@@ -323,22 +435,21 @@ class CrossClusterBackupManager {
         }
       }
       
-      if (backupSharesForKey.length >= this.BACKUP_THRESHOLD) {
-        const reconstructedFromBackup = secrets.combine(backupSharesForKey.slice(0, this.BACKUP_THRESHOLD));
-        const additionalShares = secrets.share(reconstructedFromBackup, 11, 6);
-        const needed = Math.max(0, 6 - sharesForThisKey.length);
-        
-        for (let i = 0; i < needed && i < additionalShares.length; i++) {
-          sharesForThisKey.push(additionalShares[i]);
-        }
-        
-        if (Buffer.isBuffer(reconstructedFromBackup)) {
-          reconstructedFromBackup.fill(0);
-        }
+      if (sharesForThisKey.length < 6 && backupSharesForKey.length >= this.BACKUP_THRESHOLD) {
+        fromBackup.push({ keyIndex, shares: backupSharesForKey.slice(0, this.BACKUP_THRESHOLD) });
       }
       
       combinedForReconstruction.push(sharesForThisKey);
     }
+
+    if (fromBackup.length > 0) {
+      const recoveredKeys = ShamirBatch.combineMany(fromBackup.map(entry => entry.shares));
+      const resplit = ShamirBatch.splitMany(recoveredKeys, 6, 6);
+      recoveredKeys.fill(null);
+      fromBackup.forEach((entry, i) => {
+        combinedForReconstruction[entry.keyIndex] = resplit[i];
+      });
+    }
     
     return combinedForReconstruction;
   }
@@ -354,3 +465,4 @@ class CrossClusterBackupManager {
 }
 
 module.exports = CrossClusterBackupManager;
+module.exports.fanOut = fanOut;
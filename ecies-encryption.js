@@ -2,15 +2,112 @@ const crypto = require('crypto');
 const { ec: EC } = require('elliptic');
 const ec = new EC('secp256k1');
 
+// Ciphertext versions (first byte). Legacy messages start with the public
+// key length (65) and use the hashed ECDH secret directly as the AES key.
+const VERSION_MESSAGE = 0x02;
+const VERSION_SHARE_SET = 0x03;
+const LEGACY_PUBKEY_LENGTH = 65;
+const HKDF_INFO = {
+  [VERSION_MESSAGE]: 'xmrbridge/ecies/v2/message',
+  [VERSION_SHARE_SET]: 'xmrbridge/ecies/v2/share-set'
+};
+
 /**
  * ECIES Encryption using ECDH + AES-256-GCM
  * Properly implements Elliptic Curve Integrated Encryption Scheme
  */
 class ECIESEncryption {
-  constructor(wallet) {
+  constructor(wallet, options = {}) {
     this.wallet = wallet;
     // Get EC keypair from wallet private key
     this.keyPair = ec.keyFromPrivate(wallet.privateKey.slice(2), 'hex');
+    this.publicKeyBytes = Buffer.from(this.keyPair.getPublic().encode('hex', false), 'hex');
+
+    // Derived ECDH secrets per peer public key (LRU, oldest evicted first)
+    this.maxCachedPeers = options.maxCachedPeers || Number(process.env.ECIES_CACHE_PEERS || 256);
+    this.secretCache = new Map();
+    this.cacheStats = { hits: 0, misses: 0, evictions: 0 };
+  }
+
+  /**
+   * deriveSharedSecretECDH with a bounded per-peer cache
+   */
+  getSharedSecret(otherPublicKey) {
+    const key = otherPublicKey.toLowerCase();
+    const cached = this.secretCache.get(key);
+    if (cached) {
+      this.cacheStats.hits++;
+      this.secretCache.delete(key);
+      this.secretCache.set(key, cached);
+      return cached;
+    }
+
+    this.cacheStats.misses++;
+    const secret = this.deriveSharedSecretECDH(otherPublicKey);
+    this.secretCache.set(key, secret);
+    if (this.secretCache.size > this.maxCachedPeers) {
+      const [oldestKey, oldest] = this.secretCache.entries().next().value;
+      oldest.fill(0);
+      this.secretCache.delete(oldestKey);
+      this.cacheStats.evictions++;
+    }
+    return secret;
+  }
+
+  clearSecretCache() {
+    for (const secret of this.secretCache.values()) {
+      secret.fill(0);
+    }
+    this.secretCache.clear();
+  }
+
+  /**
+   * Per-message AES key + GCM IV: HKDF(shared secret, random salt, version info)
+   */
+  deriveMessageKey(sharedSecret, salt, version) {
+    const okm = Buffer.from(crypto.hkdfSync('sha256', sharedSecret, salt, HKDF_INFO[version], 44));
+    return { key: okm.subarray(0, 32), iv: okm.subarray(32, 44), okm };
+  }
+
+  /**
+   * Format: [1 byte: version][65 bytes: sender public key][16 bytes: salt][16 bytes: authTag][encrypted data]
+   * The header is authenticated as associated data.
+   */
+  seal(version, plaintext, recipientPublicKey) {
+    const sharedSecret = this.getSharedSecret(recipientPublicKey);
+    const salt = crypto.randomBytes(16);
+    const header = Buffer.concat([Buffer.from([version]), this.publicKeyBytes, salt]);
+    const { key, iv, okm } = this.deriveMessageKey(sharedSecret, salt, version);
+
+    const cipher = crypto.createCipheriv('aes-256-gcm', key, iv);
+    cipher.setAAD(header);
+    const encrypted = Buffer.concat([cipher.update(plaintext), cipher.final()]);
+    okm.fill(0);
+
+    return '0x' + Buffer.concat([header, cipher.getAuthTag(), encrypted]).toString('hex');
+  }
+
+  open(version, encryptedBuffer) {
+    const headerLength = 1 + LEGACY_PUBKEY_LENGTH + 16;
+    if (encryptedBuffer.length < headerLength + 16 || encryptedBuffer[0] !== version) {
+      throw new Error('Malformed ciphertext');
+    }
+    const header = encryptedBuffer.subarray(0, headerLength);
+    const senderPublicKey = header.subarray(1, 1 + LEGACY_PUBKEY_LENGTH).toString('hex');
+    const salt = header.subarray(1 + LEGACY_PUBKEY_LENGTH);
+    const authTag = encryptedBuffer.subarray(headerLength, headerLength + 16);
+    const encrypted = encryptedBuffer.subarray(headerLength + 16);
+
+    const sharedSecret = this.getSharedSecret(senderPublicKey);
+    const { key, iv, okm } = this.deriveMessageKey(sharedSecret, salt, version);
+    try {
+      const decipher = crypto.createDecipheriv('aes-256-gcm', key, iv);
+      decipher.setAAD(header);
+      decipher.setAuthTag(authTag);
+      return Buffer.concat([decipher.update(encrypted), decipher.final()]);
+    } finally {
+      okm.fill(0);
+    }
   }
 
   /**
@@ -51,33 +148,7 @@ class ECIESEncryption {
    */
   async encryptWithECDH(data, recipientPublicKey) {
     try {
-      const dataBuffer = Buffer.from(data, 'utf8');
-      
-      // Derive shared secret using ECDH
-      const sharedSecret = this.deriveSharedSecretECDH(recipientPublicKey);
-      
-      // Use AES-256-GCM for symmetric encryption
-      const iv = crypto.randomBytes(16);
-      const cipher = crypto.createCipheriv('aes-256-gcm', sharedSecret, iv);
-      
-      let encrypted = cipher.update(dataBuffer);
-      encrypted = Buffer.concat([encrypted, cipher.final()]);
-      
-      const authTag = cipher.getAuthTag();
-      
-      // Include our public key in the message so recipient can derive shared secret
-      const ourPublicKey = Buffer.from(this.keyPair.getPublic().encode('hex', false), 'hex');
-      
-      // Format: [1 byte: pubkey length][public key][16 bytes: IV][16 bytes: authTag][encrypted data]
-      const result = Buffer.concat([
-        Buffer.from([ourPublicKey.length]),
-        ourPublicKey,
-        iv,
-        authTag,
-        encrypted
-      ]);
-      
-      return '0x' + result.toString('hex');
+      return this.seal(VERSION_MESSAGE, Buffer.from(data, 'utf8'), recipientPublicKey);
     } catch (error) {
       throw new Error(`Encryption failed: ${error.message}`);
     }
@@ -90,8 +161,12 @@ class ECIESEncryption {
   async decryptWithECDH(encryptedHex) {
     try {
       const encryptedBuffer = Buffer.from(encryptedHex.slice(2), 'hex');
+
+      if (encryptedBuffer[0] === VERSION_MESSAGE) {
+        return this.open(VERSION_MESSAGE, encryptedBuffer).toString('utf8');
+      }
       
-      // Parse: [1 byte: pubkey length][public key][16 bytes: IV][16 bytes: authTag][encrypted data]
+      // Legacy: [1 byte: pubkey length][public key][16 bytes: IV][16 bytes: authTag][encrypted data]
       const pubKeyLength = encryptedBuffer[0];
       const senderPublicKey = encryptedBuffer.slice(1, 1 + pubKeyLength).toString('hex');
       const iv = encryptedBuffer.slice(1 + pubKeyLength, 1 + pubKeyLength + 16);
@@ -99,7 +174,7 @@ class ECIESEncryption {
       const encrypted = encryptedBuffer.slice(1 + pubKeyLength + 32);
       
       // Derive shared secret using sender's public key
-      const sharedSecret = this.deriveSharedSecretECDH(senderPublicKey);
+      const sharedSecret = this.getSharedSecret(senderPublicKey);
       
       // Decrypt
       const decipher = crypto.createDecipheriv('aes-256-gcm', sharedSecret, iv);
@@ -114,6 +189,66 @@ class ECIESEncryption {
     }
   }
 
+  /**
+   * Encrypt a whole share set for one recipient: one key agreement, one
+   * public key and one auth tag for all shares.
+   * Plaintext: [2 bytes: count] then per share [4 bytes: length][utf8 bytes]
+   * @param {string[]} shares - Shares to encrypt
+   * @param {string} recipientPublicKey - Recipient's public key (hex, uncompressed)
+   */
+  async encryptShareSet(shares, recipientPublicKey) {
+    const parts = [Buffer.alloc(2)];
+    parts[0].writeUInt16BE(shares.length, 0);
+    for (const share of shares) {
+      const bytes = Buffer.from(share, 'utf8');
+      const length = Buffer.alloc(4);
+      length.writeUInt32BE(bytes.length, 0);
+      parts.push(length, bytes);
+    }
+    const plaintext = Buffer.concat(parts);
+    try {
+      return this.seal(VERSION_SHARE_SET, plaintext, recipientPublicKey);
+    } catch (error) {
+      throw new Error(`Encryption failed: ${error.message}`);
+    } finally {
+      plaintext.fill(0);
+    }
+  }
+
+  async decryptShareSet(envelopeHex) {
+    let plaintext;
+    try {
+      plaintext = this.open(VERSION_SHARE_SET, Buffer.from(envelopeHex.slice(2), 'hex'));
+    } catch (error) {
+      throw new Error(`Decryption failed: ${error.message}`);
+    }
+
+    const shares = [];
+    const count = plaintext.readUInt16BE(0);
+    let offset = 2;
+    for (let i = 0; i < count; i++) {
+      const length = plaintext.readUInt32BE(offset);
+      shares.push(plaintext.toString('utf8', offset + 4, offset + 4 + length));
+      offset += 4 + length;
+    }
+    plaintext.fill(0);
+    return shares;
+  }
+
+  static isShareSet(encryptedHex) {
+    return typeof encryptedHex === 'string' && encryptedHex.startsWith('0x03');
+  }
+
+  /**
+   * Decrypt stored backup shares: a share-set envelope or per-share ciphertexts
+   */
+  async decryptShares(encryptedShares) {
+    if (encryptedShares.length === 1 && ECIESEncryption.isShareSet(encryptedShares[0])) {
+      return this.decryptShareSet(encryptedShares[0]);
+    }
+    return Promise.all(encryptedShares.map(encShare => this.decryptWithECDH(encShare)));
+  }
+
   /**
    * Create authenticated package (encrypted + signed)
    */
@@ -1,51 +1,307 @@
 #!/usr/bin/env python3
-import sys
+"""
+Enable experimental multisig in Monero wallet .keys files.
+
+A .keys file is wallet2's keys_file_data in binary_archive form:
+
+  iv            8 bytes (chacha IV)
+  account_data  varint length + chacha20(key, iv, json)
+
+where key = cn_slow_hash(password) (repeated kdf_rounds times) and the JSON
+document holds the wallet settings, including "enable_multisig" (the value
+monero-wallet-cli's `set enable-multisig-experimental 1` writes).
+
+Every file is decrypted, the JSON is parsed and re-serialized with the flag
+set, re-encrypted under a fresh IV, written atomically and then read back
+and verified. The password KDF runs once per password, so all of a node's
+wallets (base + every _cluster_* wallet) are handled in one process.
+
+Key derivation needs the optional `pycryptonight` package (cn_slow_hash);
+without it pass the derived 32-byte chacha key with --key. ChaCha20 uses
+pycryptodome when installed and a built-in implementation otherwise.
+
+Usage:
+  enable-multisig-exp.py [options] <wallet.keys | wallet | dir>...
+  enable-multisig-exp.py --private-key-env PRIVATE_KEY ~/.monero-wallets
+Options:
+  --password PW | --password-env VAR | --private-key-env VAR (ZNode password)
+  --key HEX          derived chacha key (skips cn_slow_hash)
+  --kdf-rounds N     wallet KDF rounds (default 1)
+  --pattern GLOB     filter wallets found in directories (default *)
+  --check            report the current setting only, write nothing
+  --backup           keep <file>.bak before rewriting
+"""
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import re
 import struct
+import sys
 
-def enable_multisig_experimental(keys_file):
-    """
-    Monero wallet .keys files store attributes after the main data.
-    We need to add the enable-multisig-experimental attribute.
-    Format: string_length (varint) + string_data + value
-    """
-    try:
-        with open(keys_file, 'rb') as f:
-            data = bytearray(f.read())
-        
-        # Attribute key and value
-        attr_key = b'enable-multisig-experimental'
-        attr_value = b'1'
-        
-        # Check if attribute already exists
-        if attr_key in data:
-            print(f"Attribute already exists in {keys_file}")
-            return
-        
-        # Append the attribute at the end
-        # Monero uses length-prefixed strings
-        key_len = len(attr_key)
-        val_len = len(attr_value)
-        
-        # Simple append (this is a simplified version)
-        data.extend(struct.pack('<B', key_len))
-        data.extend(attr_key)
-        data.extend(struct.pack('<B', val_len))
-        data.extend(attr_value)
-        
-        # Write back
+try:
+    from Crypto.Cipher import ChaCha20 as _ChaCha20
+except ImportError:
+    _ChaCha20 = None
+
+try:
+    import pycryptonight
+except ImportError:
+    pycryptonight = None
+
+IV_SIZE = 8
+KEY_SIZE = 32
+ATTR = 'enable_multisig'
+
+
+class KeysFileError(Exception):
+    pass
+
+
+# --- binary_archive varint (7 bits per byte, little endian) ---
+
+def read_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise KeysFileError('truncated varint')
+        b = data[pos]
+        pos += 1
+        value |= (b & 0x7f) << shift
+        if not b & 0x80:
+            return value, pos
+        shift += 7
+        if shift > 63:
+            raise KeysFileError('varint too long')
+
+
+def write_varint(value):
+    out = bytearray()
+    while True:
+        b = value & 0x7f
+        value >>= 7
+        if value:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+# --- chacha20, original variant (64-bit nonce, 64-bit counter) ---
+
+def _chacha20_block(key_words, counter, nonce_words):
+    def rotl(v, c):
+        return ((v << c) & 0xffffffff) | (v >> (32 - c))
+
+    state = [0x61707865, 0x3320646e, 0x79622d32, 0x6b206574, *key_words,
+             counter & 0xffffffff, counter >> 32, *nonce_words]
+    x = list(state)
+    for _ in range(10):
+        for a, b, c, d in ((0, 4, 8, 12), (1, 5, 9, 13), (2, 6, 10, 14), (3, 7, 11, 15),
+                           (0, 5, 10, 15), (1, 6, 11, 12), (2, 7, 8, 13), (3, 4, 9, 14)):
+            x[a] = (x[a] + x[b]) & 0xffffffff; x[d] = rotl(x[d] ^ x[a], 16)
+            x[c] = (x[c] + x[d]) & 0xffffffff; x[b] = rotl(x[b] ^ x[c], 12)
+            x[a] = (x[a] + x[b]) & 0xffffffff; x[d] = rotl(x[d] ^ x[a], 8)
+            x[c] = (x[c] + x[d]) & 0xffffffff; x[b] = rotl(x[b] ^ x[c], 7)
+    return struct.pack('<16I', *((x[i] + state[i]) & 0xffffffff for i in range(16)))
+
+
+def chacha20(key, iv, data):
+    """crypto::chacha20 from Monero (encrypt == decrypt)"""
+    if len(key) != KEY_SIZE or len(iv) != IV_SIZE:
+        raise KeysFileError('bad chacha key/iv size')
+    if _ChaCha20 is not None:
+        return _ChaCha20.new(key=key, nonce=iv).encrypt(data)
+    key_words = struct.unpack('<8I', key)
+    nonce_words = struct.unpack('<2I', iv)
+    out = bytearray(len(data))
+    for block, offset in enumerate(range(0, len(data), 64)):
+        stream = _chacha20_block(key_words, block, nonce_words)
+        chunk = data[offset:offset + 64]
+        out[offset:offset + len(chunk)] = bytes(a ^ b for a, b in zip(chunk, stream))
+    return bytes(out)
+
+
+_key_cache = {}
+
+
+def derive_key(password, kdf_rounds=1):
+    """crypto::generate_chacha_key: cn_slow_hash(password), kdf_rounds times"""
+    cache_key = (password, kdf_rounds)
+    if cache_key not in _key_cache:
+        if pycryptonight is None:
+            raise KeysFileError('pycryptonight is not installed; pass the chacha key with --key')
+        h = pycryptonight.cn_slow_hash(password.encode(), 0, 0, 0)
+        for _ in range(1, kdf_rounds):
+            h = pycryptonight.cn_slow_hash(h, 0, 0, 0)
+        _key_cache[cache_key] = h[:KEY_SIZE]
+    return _key_cache[cache_key]
+
+
+def znode_password(private_key):
+    """ZNode's wallet password: sha256 of ethers' normalized wallet.privateKey
+    (lowercase hex with 0x), first 32 hex chars"""
+    key = private_key.strip().lower()
+    if not key.startswith('0x'):
+        key = '0x' + key
+    if not re.fullmatch(r'0x[0-9a-f]{64}', key):
+        raise KeysFileError('private key must be 32 bytes of hex')
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def env_value(name):
+    value = os.environ.get(name)
+    if value is None:
+        raise KeysFileError(f'environment variable {name} is not set')
+    return value
+
+
+# --- keys file container ---
+
+class KeysFile:
+    """Decrypted wallet .keys file: iv + settings JSON"""
+
+    def __init__(self, iv, settings):
+        self.iv = iv
+        self.settings = settings
+
+    @staticmethod
+    def decode(raw, key):
+        if len(raw) < IV_SIZE + 1:
+            raise KeysFileError('file too short for a keys file')
+        iv = raw[:IV_SIZE]
+        length, pos = read_varint(raw, IV_SIZE)
+        if pos + length != len(raw):
+            raise KeysFileError(f'account_data length {length} does not match file size')
+        plain = chacha20(key, iv, raw[pos:])
+        if not plain.startswith(b'{'):
+            raise KeysFileError('decryption did not yield JSON (wrong password/key, or a pre-JSON wallet)')
+        # key_data holds raw binary inside a JSON string: latin-1 keeps bytes 1:1
+        try:
+            settings = json.loads(plain.decode('latin-1'))
+        except ValueError as e:
+            raise KeysFileError(f'settings JSON does not parse: {e}') from None
+        return KeysFile(iv, settings)
+
+    def encode(self, key, iv=None):
+        iv = iv or os.urandom(IV_SIZE)
+        plain = json.dumps(self.settings, separators=(',', ':'), ensure_ascii=False).encode('latin-1')
+        cipher = chacha20(key, iv, plain)
+        return iv + write_varint(len(cipher)) + cipher
+
+
+def keys_path(path):
+    return path if path.endswith('.keys') else path + '.keys'
+
+
+def find_wallets(targets, pattern):
+    seen = set()
+    for target in targets:
+        if os.path.isdir(target):
+            for name in sorted(os.listdir(target)):
+                if name.endswith('.keys') and fnmatch.fnmatch(name[:-5], pattern):
+                    path = os.path.join(target, name)
+                    if path not in seen:
+                        seen.add(path)
+                        yield path
+        else:
+            path = keys_path(target)
+            if path not in seen:
+                seen.add(path)
+                yield path
+
+
+def enable_multisig_experimental(keys_file, key, check=False, backup=False):
+    """Returns 'enabled', 'already', 'disabled' (check mode) or raises."""
+    with open(keys_file, 'rb') as f:
+        raw = f.read()
+    wallet = KeysFile.decode(raw, key)
+
+    if wallet.settings.get(ATTR) == 1:
+        return 'already'
+    if check:
+        return 'disabled'
+
+    before = dict(wallet.settings)
+    wallet.settings[ATTR] = 1
+    data = wallet.encode(key)
+
+    if backup:
+        with open(keys_file + '.bak', 'wb') as f:
+            f.write(raw)
+    tmp = keys_file + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.chmod(tmp, os.stat(keys_file).st_mode & 0o777)
+    os.replace(tmp, keys_file)
+
+    # Read back: flag set, everything else untouched
+    with open(keys_file, 'rb') as f:
+        check_wallet = KeysFile.decode(f.read(), key)
+    expected = dict(before, **{ATTR: 1})
+    if check_wallet.settings != expected:
         with open(keys_file, 'wb') as f:
-            f.write(data)
-        
-        print(f"✓ Added experimental multisig attribute to {keys_file}")
-        return True
-        
-    except Exception as e:
+            f.write(raw)
+        raise KeysFileError('verification failed after write; original restored')
+    return 'enabled'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Enable experimental multisig in wallet .keys files')
+    parser.add_argument('targets', nargs='+', help='.keys files, wallet names or wallet directories')
+    parser.add_argument('--password', default=None)
+    parser.add_argument('--password-env', default=None)
+    parser.add_argument('--private-key-env', default=None,
+                        help='derive the ZNode wallet password from this env var')
+    parser.add_argument('--key', default=None, help='hex chacha key (skips cn_slow_hash)')
+    parser.add_argument('--kdf-rounds', type=int, default=1)
+    parser.add_argument('--pattern', default='*')
+    parser.add_argument('--check', action='store_true')
+    parser.add_argument('--backup', action='store_true')
+    args = parser.parse_args()
+
+    try:
+        if args.key:
+            key = bytes.fromhex(args.key)
+            if len(key) != KEY_SIZE:
+                raise KeysFileError('--key must be 32 bytes of hex')
+        else:
+            if args.private_key_env:
+                password = znode_password(env_value(args.private_key_env))
+            elif args.password_env:
+                password = env_value(args.password_env)
+            else:
+                password = args.password or ''
+            key = derive_key(password, args.kdf_rounds)
+    except (KeysFileError, ValueError) as e:
         print(f"Error: {e}")
-        return False
+        return 1
+
+    counts = {'enabled': 0, 'already': 0, 'disabled': 0, 'failed': 0}
+    for path in find_wallets(args.targets, args.pattern):
+        try:
+            status = enable_multisig_experimental(path, key, check=args.check, backup=args.backup)
+        except (KeysFileError, OSError) as e:
+            counts['failed'] += 1
+            print(f"✗ {path}: {e}")
+            continue
+        counts[status] += 1
+        if status == 'enabled':
+            print(f"✓ Enabled experimental multisig in {path}")
+        elif status == 'already':
+            print(f"  Already enabled in {path}")
+        else:
+            print(f"  Not enabled in {path}")
+
+    total = sum(counts.values())
+    print(f"{total} wallet(s): {counts['enabled']} enabled, {counts['already']} already enabled, "
+          f"{counts['disabled']} not enabled, {counts['failed']} failed")
+    return 1 if counts['failed'] or total == 0 else 0
+
 
 if __name__ == '__main__':
-    if len(sys.argv) != 2:
-        print("Usage: enable-multisig-exp.py <wallet.keys>")
-        sys.exit(1)
-    
-    enable_multisig_experimental(sys.argv[1])
+    sys.exit(main())
@@ -0,0 +1,97 @@
+/**
+ * Exchange Round Waiter
+ * Waits for all cluster members to submit an exchange round.
+ *
+ * Instead of a fixed 5s sleep it re-checks as soon as something can have
+ * changed (a new block or an ExchangeInfoSubmitted event) and otherwise
+ * falls back to adaptive backoff polling. Status and round infos are read
+ * in the same batched call, so completion needs no second round trip.
+ */
+class ExchangeRoundWaiter {
+  constructor(exchangeCoordinator, reader, provider, options = {}) {
+    this.exchangeCoordinator = exchangeCoordinator;
+    this.reader = reader;
+    this.provider = provider;
+    this.minDelayMs = options.minDelayMs || 1000;
+    this.maxDelayMs = options.maxDelayMs || 8000;
+    this.backoffFactor = options.backoffFactor || 1.5;
+  }
+
+  /**
+   * Resolve once the round is complete or the timeout passes.
+   * @returns {{ complete, submitted, addresses, exchangeInfos, waitedMs }}
+   */
+  async waitForRound(clusterId, roundNumber, clusterNodes, options = {}) {
+    const timeoutMs = options.timeoutMs || 120000;
+    const onProgress = options.onProgress || null;
+    const onSnapshot = options.onSnapshot || null; // every read, e.g. to prefetch payloads
+    const startTime = Date.now();
+
+    let wake = null;
+    const wakeUp = () => { if (wake) wake(); };
+    const onSubmitted = (eventClusterId, eventRound) => {
+      if (eventClusterId === clusterId && Number(eventRound) === roundNumber) wakeUp();
+    };
+
+    const subscriptions = [];
+    const subscribe = (emitter, event, handler) => {
+      try {
+        emitter.on(event, handler);
+        subscriptions.push(() => emitter.off(event, handler));
+      } catch {
+        // Event not in ABI / provider without subscriptions: polling only
+      }
+    };
+    if (this.provider) subscribe(this.provider, 'block', wakeUp);
+    subscribe(this.exchangeCoordinator, 'ExchangeInfoSubmitted', onSubmitted);
+
+    let delay = this.minDelayMs;
+    let lastSubmitted = -1;
+    let snapshot = null;
+
+    try {
+      while (true) {
+        snapshot = await this.readRound(clusterId, roundNumber, clusterNodes);
+        const submitted = Number(snapshot.submitted);
+        if (onSnapshot) onSnapshot(snapshot);
+
+        if (snapshot.complete) break;
+
+        if (submitted !== lastSubmitted) {
+          // Peers are making progress: check again soon
+          lastSubmitted = submitted;
+          delay = this.minDelayMs;
+          if (onProgress) onProgress(submitted);
+        } else {
+          delay = Math.min(Math.round(delay * this.backoffFactor), this.maxDelayMs);
+        }
+
+        const remaining = timeoutMs - (Date.now() - startTime);
+        if (remaining <= 0) break;
+
+        await new Promise(resolve => {
+          const timer = setTimeout(resolve, Math.min(delay, remaining));
+          wake = () => { clearTimeout(timer); resolve(); };
+        });
+        wake = null;
+      }
+    } finally {
+      subscriptions.forEach(unsubscribe => { try { unsubscribe(); } catch {} });
+    }
+
+    return { ...snapshot, waitedMs: Date.now() - startTime };
+  }
+
+  /**
+   * One batched read of round status + all submitted infos.
+   */
+  async readRound(clusterId, roundNumber, clusterNodes) {
+    const [[complete, submitted], [addresses, exchangeInfos]] = await this.reader.readMany([
+      [this.exchangeCoordinator, 'getExchangeRoundStatus', [clusterId, roundNumber]],
+      [this.exchangeCoordinator, 'getExchangeRoundInfo', [clusterId, roundNumber, clusterNodes]]
+    ]);
+    return { complete, submitted, addresses, exchangeInfos };
+  }
+}
+
+module.exports = ExchangeRoundWaiter;
@@ -0,0 +1,252 @@
+const { ethers } = require('ethers');
+const P2PBackupNetwork = require('./p2p-backup-network');
+
+const { encodeMessage, readMessage, readFrames } = P2PBackupNetwork;
+
+const COMMITMENT_PREFIX = 'zx1';
+// A round whose payloads cannot all be fetched is redone on-chain, with
+// full infos, as round + FALLBACK_ROUND_OFFSET
+const FALLBACK_ROUND_OFFSET = 100;
+
+/**
+ * Exchange Transport
+ * Moves multisig exchange round payloads between cluster members over the
+ * libp2p node of P2PBackupNetwork instead of through contract storage.
+ *
+ * A node posts `zx1:<keccak256(payload)>:<multiaddr>` to the
+ * ExchangeCoordinator in place of the multi-KB exchange info. Peers fetch
+ * the payload from that multiaddr (or from any other member that already
+ * holds it) and accept it only if it hashes to the on-chain commitment, so
+ * the chain still decides what each member submitted.
+ *
+ * Payloads are content addressed by their hash. A node pushes its own
+ * payload to the members it already knows (learned from earlier rounds'
+ * commitments), serves every payload it holds, and fetches missing ones
+ * as soon as their commitments appear on-chain. Plain (non-commitment)
+ * infos pass through unchanged, so members on the chain path interoperate.
+ *
+ * Peers dial the announced address only (EXCHANGE_ANNOUNCE_ADDR, a public
+ * address for the fixed EXCHANGE_P2P_PORT); a node without one cannot
+ * serve payloads, so the transport refuses to start.
+ */
+class ExchangeTransport {
+  constructor(network, options = {}) {
+    this.network = network;
+    this.nodeAddress = (network.nodeAddress || '').toLowerCase();
+    this.PROTOCOL_EXCHANGE = '/xmrbridge/exchange/1.0.0';
+    this.announceAddr = options.announceAddr || process.env.EXCHANGE_ANNOUNCE_ADDR || null;
+    this.fetchDeadlineMs = Number(options.fetchDeadlineMs || process.env.EXCHANGE_FETCH_DEADLINE_MS || 20000);
+    this.maxPayloads = options.maxPayloads || 512;
+
+    this.payloads = new Map(); // commitment hash -> payload (insertion order = age)
+    this.inflight = new Map(); // commitment hash -> Promise<payload | null>
+    this.peers = new Map();    // member address (lowercase) -> multiaddr
+    this.started = false;
+    this.stats = { published: 0, pushed: 0, served: 0, fetched: 0, fromCache: 0, rejected: 0, passthrough: 0 };
+  }
+
+  async start() {
+    if (!this.announceAddr) {
+      throw new Error('EXCHANGE_ANNOUNCE_ADDR is required for the P2P exchange transport');
+    }
+    await this.network.handle(this.PROTOCOL_EXCHANGE, this.handleExchange.bind(this));
+    this.started = true;
+    console.log(`[Exchange] P2P transport on ${this.localMultiaddr()}`);
+  }
+
+  static hash(payload) {
+    return ethers.id(payload);
+  }
+
+  static parseCommitment(info) {
+    if (typeof info !== 'string' || !info.startsWith(`${COMMITMENT_PREFIX}:`)) return null;
+    const second = info.indexOf(':', COMMITMENT_PREFIX.length + 1);
+    if (second < 0) return null;
+    const hash = info.slice(COMMITMENT_PREFIX.length + 1, second);
+    if (!/^0x[0-9a-fA-F]{64}$/.test(hash)) return null;
+    return { hash: hash.toLowerCase(), multiaddr: info.slice(second + 1) };
+  }
+
+  /**
+   * Address peers should dial: EXCHANGE_ANNOUNCE_ADDR, with /p2p/<peerId>
+   * appended if it does not name the peer already
+   */
+  localMultiaddr() {
+    if (this.announceAddr.includes('/p2p/')) return this.announceAddr;
+    const peerId = this.network.getPeerId ? this.network.getPeerId() : null;
+    return peerId ? `${this.announceAddr}/p2p/${peerId}` : this.announceAddr;
+  }
+
+  _remember(hash, payload) {
+    if (this.payloads.has(hash)) return;
+    this.payloads.set(hash, payload);
+    while (this.payloads.size > this.maxPayloads) {
+      this.payloads.delete(this.payloads.keys().next().value);
+    }
+  }
+
+  /**
+   * Keep our round payload available and push it to known members.
+   * Returns the commitment string to submit on-chain.
+   */
+  publish(clusterId, roundNumber, payload, clusterNodes = []) {
+    const hash = ExchangeTransport.hash(payload);
+    this._remember(hash, payload);
+    this.stats.published++;
+
+    const targets = clusterNodes
+      .map(a => a.toLowerCase())
+      .filter(a => a !== this.nodeAddress && this.peers.has(a))
+      .map(a => this.peers.get(a));
+    for (const multiaddr of targets) {
+      this._send(multiaddr, { type: 'PUSH_PAYLOAD', clusterId, round: roundNumber, hash }, [payload], AbortSignal.timeout(this.fetchDeadlineMs))
+        .then(() => { this.stats.pushed++; })
+        .catch(error => console.log(`[Exchange] Push to ${multiaddr} failed: ${error.message}`));
+    }
+    return `${COMMITMENT_PREFIX}:${hash}:${this.localMultiaddr()}`;
+  }
+
+  /**
+   * Start fetching payloads for commitments seen so far (called while the
+   * round is still filling up, so most payloads are local at completion)
+   */
+  prefetch(clusterId, roundNumber, addresses = [], exchangeInfos = []) {
+    const mirrors = this._learn(addresses, exchangeInfos);
+    for (let i = 0; i < exchangeInfos.length; i++) {
+      const commitment = ExchangeTransport.parseCommitment(exchangeInfos[i]);
+      if (commitment) this._fetch(commitment, mirrors).catch(() => {});
+    }
+  }
+
+  /**
+   * Replace every commitment in a round's infos with its verified payload.
+   * Throws if any payload cannot be obtained before the deadline.
+   */
+  async resolve(clusterId, roundNumber, addresses, exchangeInfos) {
+    const mirrors = this._learn(addresses, exchangeInfos);
+    const missing = [];
+    const resolved = await Promise.all(exchangeInfos.map(async (info, i) => {
+      const commitment = ExchangeTransport.parseCommitment(info);
+      if (!commitment) {
+        if (info) this.stats.passthrough++;
+        return info;
+      }
+      const payload = await this._fetch(commitment, mirrors);
+      if (payload === null) missing.push(addresses[i]);
+      return payload;
+    }));
+    if (missing.length > 0) {
+      throw new Error(`Round ${roundNumber} payload unavailable from ${missing.map(a => a.slice(0, 10)).join(', ')}`);
+    }
+    return resolved;
+  }
+
+  /**
+   * Record members' multiaddrs from their commitments; returns them all
+   */
+  _learn(addresses, exchangeInfos) {
+    const mirrors = [];
+    for (let i = 0; i < exchangeInfos.length; i++) {
+      const commitment = ExchangeTransport.parseCommitment(exchangeInfos[i]);
+      if (!commitment || !commitment.multiaddr) continue;
+      const address = String(addresses[i] || '').toLowerCase();
+      if (address === this.nodeAddress) continue;
+      this.peers.set(address, commitment.multiaddr);
+      mirrors.push(commitment.multiaddr);
+    }
+    return mirrors;
+  }
+
+  /**
+   * Payload for a commitment: local copy, else the submitter, else any
+   * other member. Concurrent requests for one hash share a fetch.
+   */
+  _fetch(commitment, mirrors) {
+    const { hash } = commitment;
+    if (this.payloads.has(hash)) {
+      this.stats.fromCache++;
+      return Promise.resolve(this.payloads.get(hash));
+    }
+    let pending = this.inflight.get(hash);
+    if (!pending) {
+      pending = this._fetchFrom(commitment, mirrors).finally(() => this.inflight.delete(hash));
+      this.inflight.set(hash, pending);
+    }
+    return pending;
+  }
+
+  async _fetchFrom({ hash, multiaddr }, mirrors) {
+    const deadline = Date.now() + this.fetchDeadlineMs;
+    const signal = AbortSignal.timeout(this.fetchDeadlineMs);
+    const sources = [multiaddr, ...mirrors.filter(m => m !== multiaddr)].filter(Boolean);
+    // Mirrors may still be fetching it themselves: retry with backoff until the deadline
+    for (let delay = 250; !signal.aborted; delay = Math.min(delay * 2, 2000)) {
+      for (const source of sources) {
+        if (this.payloads.has(hash)) return this.payloads.get(hash); // pushed meanwhile
+        if (signal.aborted) break;
+        try {
+          const response = await this._send(source, { type: 'GET_PAYLOAD', hash }, [], signal);
+          const payload = response.success ? response.shares[0] : undefined;
+          if (payload === undefined) continue;
+          if (ExchangeTransport.hash(payload) !== hash) {
+            this.stats.rejected++;
+            console.log(`[Exchange] Payload from ${source} does not match commitment ${hash.slice(0, 10)}...`);
+            continue;
+          }
+          this._remember(hash, payload);
+          this.stats.fetched++;
+          return payload;
+        } catch (error) {
+          // Unreachable or slow member: try the next one
+        }
+      }
+      await new Promise(r => setTimeout(r, Math.max(0, Math.min(delay, deadline - Date.now()))));
+    }
+    return this.payloads.get(hash) || null;
+  }
+
+  async _send(multiaddr, header, payloads, signal) {
+    const stream = await this.network.openStream(multiaddr, [this.PROTOCOL_EXCHANGE], { signal });
+    await stream.sink(encodeMessage(header, payloads));
+    return readMessage(readFrames(stream.source));
+  }
+
+  async handleExchange({ stream }) {
+    let response;
+    try {
+      const message = await readMessage(readFrames(stream.source));
+      if (message.type === 'GET_PAYLOAD') {
+        const payload = this.payloads.get(String(message.hash).toLowerCase());
+        if (payload !== undefined) this.stats.served++;
+        response = payload !== undefined ? { success: true, shares: [payload] } : { success: false, error: 'Unknown payload' };
+      } else if (message.type === 'PUSH_PAYLOAD') {
+        const payload = message.shares[0];
+        // Only keep what hashes to the advertised commitment
+        if (typeof payload === 'string' && ExchangeTransport.hash(payload) === String(message.hash).toLowerCase()) {
+          this._remember(message.hash.toLowerCase(), payload);
+          response = { success: true };
+        } else {
+          this.stats.rejected++;
+          response = { success: false, error: 'Hash mismatch' };
+        }
+      } else {
+        response = { success: false, error: `Unknown message type: ${message.type}` };
+      }
+    } catch (error) {
+      response = { success: false, error: error.message };
+    }
+    try {
+      const { shares, ...header } = response;
+      await stream.sink(encodeMessage(header, shares));
+    } catch (error) {
+      console.error('[Exchange] Failed to send response:', error.message);
+    }
+  }
+
+  getStats() {
+    return { ...this.stats, payloads: this.payloads.size, peers: this.peers.size };
+  }
+}
+
+module.exports = ExchangeTransport;
+module.exports.FALLBACK_ROUND_OFFSET = FALLBACK_ROUND_OFFSET;
@@ -1,25 +1,19 @@
 #!/usr/bin/env python3
-import re
+"""
+Replace the exchange-round logic in node.js with the make_multisig +
+exchange_multisig_keys implementation (rounds 3-6 through the exchange
+coordinator), and drop the old coordinator/participant round methods.
+Refuses to run on a node.js whose ceremony is journaled (openCeremonyJournal),
+since rewriting that would throw the newer round logic away.
 
-with open('node.js', 'r') as f:
-    content = f.read()
+Usage: python3 fix-multisig.py [--dry-run] [file]
+"""
+import sys
 
-# Find and replace the finalizeClusterWithMultisigCoordination method
-# Remove all the broken exchange coordinator logic and replace with correct implementation
+from patch_node import Refuse, Remove, Upsert, run
 
-# Find the start of the function
-start_marker = "async finalizeClusterWithMultisigCoordination(clusterId) {"
-end_marker = "\n  async confirmClusterOnChain(clusterId, address) {"
-
-start_idx = content.find(start_marker)
-end_idx = content.find(end_marker)
-
-if start_idx == -1 or end_idx == -1:
-    print("Could not find function boundaries")
-    exit(1)
-
-# New implementation
-new_impl = '''async finalizeClusterWithMultisigCoordination(clusterId) {
+# finalizeClusterWithMultisigCoordination plus its two helpers
+NEW_METHODS = '''async finalizeClusterWithMultisigCoordination(clusterId) {
     try {
       // Fetch forming cluster info (addresses and multisig_info from Round 1)
       const [addrList, infoList] = await this.registry.getFormingClusterMultisigInfo();
@@ -194,23 +188,15 @@ new_impl = '''async finalizeClusterWithMultisigCoordination(clusterId) {
 
 '''
 
-# Replace the function
-new_content = content[:start_idx] + new_impl + content[end_idx:]
-
-# Now remove the old coordinateExchangeRound and participateInExchangeRounds methods
-# Find and remove coordinateExchangeRound
-pattern1 = r'\n  async coordinateExchangeRound\(.*?\n  \}\n'
-new_content = re.sub(pattern1, '\n', new_content, flags=re.DOTALL)
-
-# Find and remove participateInExchangeRounds  
-pattern2 = r'\n  async participateInExchangeRounds\(.*?\n  \}\n'
-new_content = re.sub(pattern2, '\n', new_content, flags=re.DOTALL)
-
-# Find and remove participateInRound
-pattern3 = r'\n  async participateInRound\(.*?\n  \}\n'
-new_content = re.sub(pattern3, '\n', new_content, flags=re.DOTALL)
-
-with open('node.js', 'w') as f:
-    f.write(new_content)
+OPS = [
+    Refuse('openCeremonyJournal', 'this node.js already has the journaled exchange rounds'),
+    # Replaced in place; submitExchangeInfo / performExchangeRound follow it
+    Upsert(NEW_METHODS, after='finalizeClusterWithMultisigCoordination'),
+    # Old exchange coordinator logic
+    Remove('coordinateExchangeRound', missing_ok=True),
+    Remove('participateInExchangeRounds', missing_ok=True),
+    Remove('participateInRound', missing_ok=True),
+]
 
-print("✅ Fixed multisig implementation in node.js")
+if __name__ == '__main__':
+    sys.exit(0 if run(OPS, 'Fix multisig implementation in node.js') else 1)
@@ -12,7 +12,17 @@ SERVICE_FILE="/etc/systemd/system/znode.service"
 # Update service file with actual path
 sed "s|WorkingDirectory=.*|WorkingDirectory=$INSTALL_DIR|g" znode.service > $SERVICE_FILE
 
+# Shared RPC proxy for hosts running several nodes (point their RPC_URL at it)
+if [ "$1" == "--with-rpc-proxy" ]; then
+    sed -e "s|WorkingDirectory=.*|WorkingDirectory=$INSTALL_DIR|g" \
+        -e "s|/root/zNode/|$INSTALL_DIR/|g" znode-rpc-proxy.service > /etc/systemd/system/znode-rpc-proxy.service
+fi
+
 systemctl daemon-reload
+if [ "$1" == "--with-rpc-proxy" ]; then
+    systemctl enable znode-rpc-proxy
+    systemctl start znode-rpc-proxy
+fi
 systemctl enable znode
 systemctl start znode
 
@@ -23,3 +33,6 @@ echo "  Start:   sudo systemctl start znode"
 echo "  Stop:    sudo systemctl stop znode"
 echo "  Status:  sudo systemctl status znode"
 echo "  Logs:    sudo journalctl -u znode -f"
+if [ "$1" == "--with-rpc-proxy" ]; then
+    echo "  Proxy:   curl -s http://127.0.0.1:\${RPC_PROXY_PORT:-8546}/stats"
+fi
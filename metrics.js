@@ -0,0 +1,247 @@
+const http = require('http');
+const fs = require('fs').promises;
+const crypto = require('crypto');
+
+const DEFAULT_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300];
+
+/**
+ * Metrics
+ * Counters, histograms and lightweight spans for the znode process.
+ *
+ * - Prometheus text format on /metrics (METRICS_PORT), JSON on /metrics.json
+ * - Optional periodic JSON dump to a file (METRICS_DUMP)
+ * - Spans are kept in a small ring buffer and logged when TRACE=1
+ */
+class Metrics {
+  constructor(options = {}) {
+    this.prefix = options.prefix || 'znode_';
+    this.counters = new Map();     // name -> { help, values: Map(labelKey -> number) }
+    this.histograms = new Map();   // name -> { help, buckets, values: Map(labelKey -> {counts,sum,count}) }
+    this.trace = options.trace !== undefined ? options.trace : process.env.TRACE === '1';
+    this.spans = [];
+    this.maxSpans = options.maxSpans || 500;
+    this.server = null;
+    this.dumpTimer = null;
+  }
+
+  _labelKey(labels) {
+    const keys = Object.keys(labels || {}).sort();
+    return keys.map(k => `${k}="${String(labels[k]).replace(/["\\\n]/g, '_')}"`).join(',');
+  }
+
+  inc(name, labels = {}, value = 1, help = '') {
+    let metric = this.counters.get(name);
+    if (!metric) {
+      metric = { help, values: new Map() };
+      this.counters.set(name, metric);
+    }
+    const key = this._labelKey(labels);
+    metric.values.set(key, (metric.values.get(key) || 0) + value);
+  }
+
+  /**
+   * Record a histogram observation (value in seconds for *_seconds metrics)
+   */
+  observe(name, labels = {}, value, help = '', buckets = DEFAULT_BUCKETS) {
+    let metric = this.histograms.get(name);
+    if (!metric) {
+      metric = { help, buckets, values: new Map() };
+      this.histograms.set(name, metric);
+    }
+    const key = this._labelKey(labels);
+    let h = metric.values.get(key);
+    if (!h) {
+      h = { counts: new Array(metric.buckets.length).fill(0), sum: 0, count: 0 };
+      metric.values.set(key, h);
+    }
+    for (let i = 0; i < metric.buckets.length; i++) {
+      if (value <= metric.buckets[i]) h.counts[i]++;
+    }
+    h.sum += value;
+    h.count++;
+  }
+
+  /**
+   * Time an async function into a histogram
+   */
+  async time(name, labels, fn) {
+    const start = process.hrtime.bigint();
+    let failed = false;
+    try {
+      return await fn();
+    } catch (error) {
+      failed = true;
+      throw error;
+    } finally {
+      const seconds = Number(process.hrtime.bigint() - start) / 1e9;
+      this.observe(name, { ...labels, status: failed ? 'error' : 'ok' }, seconds);
+    }
+  }
+
+  /**
+   * Start a span. Child spans share the parent's traceId.
+   */
+  startSpan(name, attributes = {}, parent = null) {
+    const span = {
+      traceId: parent ? parent.traceId : crypto.randomBytes(8).toString('hex'),
+      spanId: crypto.randomBytes(4).toString('hex'),
+      parentId: parent ? parent.spanId : null,
+      name,
+      attributes,
+      start: Date.now(),
+      end: null,
+      status: null
+    };
+    span.child = (childName, childAttrs = {}) => this.startSpan(childName, childAttrs, span);
+    span.finish = (status = 'ok', extra = {}) => {
+      if (span.end !== null) return span;
+      span.end = Date.now();
+      span.status = status;
+      Object.assign(span.attributes, extra);
+      this.observe(`${this.prefix}span_duration_seconds`, { span: name, status }, (span.end - span.start) / 1000,
+        'Duration of traced operations');
+      this.spans.push(span);
+      if (this.spans.length > this.maxSpans) this.spans.shift();
+      if (this.trace) {
+        console.log(`[trace] ${JSON.stringify(this._spanJSON(span))}`);
+      }
+      return span;
+    };
+    return span;
+  }
+
+  _spanJSON(span) {
+    return {
+      traceId: span.traceId,
+      spanId: span.spanId,
+      parentId: span.parentId,
+      name: span.name,
+      durationMs: span.end - span.start,
+      status: span.status,
+      attributes: span.attributes
+    };
+  }
+
+  /**
+   * Ethereum JSON-RPC latency and errors per method, from ethers' debug
+   * events. receiveRpcResult carries per-request ids; receiveRpcError only
+   * the transport error, which fails the whole payload, so every request of
+   * the oldest payload still outstanding is recorded as failed.
+   */
+  instrumentProvider(provider) {
+    const inflight = new Map(); // id -> { method, start }
+    const payloads = [];        // ids of each sent payload, in send order
+
+    const finish = (id, failed) => {
+      const req = inflight.get(id);
+      if (!req) return;
+      inflight.delete(id);
+      const status = failed ? 'error' : 'ok';
+      this.observe(`${this.prefix}eth_rpc_duration_seconds`, { method: req.method, status },
+        (Date.now() - req.start) / 1000, 'Ethereum JSON-RPC latency');
+      if (failed) this.inc(`${this.prefix}eth_rpc_errors_total`, { method: req.method }, 1, 'Failed Ethereum JSON-RPC requests');
+    };
+
+    provider.on('debug', (info) => {
+      if (info.action === 'sendRpcPayload') {
+        const sent = Array.isArray(info.payload) ? info.payload : [info.payload];
+        const now = Date.now();
+        for (const p of sent) inflight.set(p.id, { method: p.method, start: now });
+        payloads.push(sent.map(p => p.id));
+      } else if (info.action === 'receiveRpcResult') {
+        const results = Array.isArray(info.result) ? info.result : [info.result];
+        for (const r of results) {
+          if (r) finish(r.id, !!r.error);
+        }
+        // Forget payloads that are fully answered
+        for (let i = payloads.length - 1; i >= 0; i--) {
+          if (payloads[i].every(id => !inflight.has(id))) payloads.splice(i, 1);
+        }
+      } else if (info.action === 'receiveRpcError') {
+        const ids = payloads.shift() || [];
+        for (const id of ids) finish(id, true);
+      }
+    });
+  }
+
+  /**
+   * Monero wallet-rpc latency per method (MoneroRPC onCall hook)
+   */
+  instrumentMonero(monero) {
+    monero.onCall = (method, elapsedMs, failed) => {
+      this.observe(`${this.prefix}monero_rpc_duration_seconds`, { method, status: failed ? 'error' : 'ok' },
+        elapsedMs / 1000, 'monero-wallet-rpc latency');
+    };
+  }
+
+  render() {
+    const lines = [];
+    for (const [name, metric] of this.counters.entries()) {
+      if (metric.help) lines.push(`# HELP ${name} ${metric.help}`);
+      lines.push(`# TYPE ${name} counter`);
+      for (const [key, value] of metric.values.entries()) {
+        lines.push(`${name}${key ? `{${key}}` : ''} ${value}`);
+      }
+    }
+    for (const [name, metric] of this.histograms.entries()) {
+      if (metric.help) lines.push(`# HELP ${name} ${metric.help}`);
+      lines.push(`# TYPE ${name} histogram`);
+      for (const [key, h] of metric.values.entries()) {
+        const sep = key ? ',' : '';
+        metric.buckets.forEach((le, i) => {
+          lines.push(`${name}_bucket{${key}${sep}le="${le}"} ${h.counts[i]}`);
+        });
+        lines.push(`${name}_bucket{${key}${sep}le="+Inf"} ${h.count}`);
+        lines.push(`${name}_sum${key ? `{${key}}` : ''} ${h.sum}`);
+        lines.push(`${name}_count${key ? `{${key}}` : ''} ${h.count}`);
+      }
+    }
+    return lines.join('\n') + '\n';
+  }
+
+  toJSON() {
+    const out = { counters: {}, histograms: {}, spans: this.spans.slice(-50).map(s => this._spanJSON(s)) };
+    for (const [name, metric] of this.counters.entries()) {
+      out.counters[name] = Object.fromEntries(metric.values);
+    }
+    for (const [name, metric] of this.histograms.entries()) {
+      out.histograms[name] = {};
+      for (const [key, h] of metric.values.entries()) {
+        out.histograms[name][key] = { count: h.count, sum: h.sum, avg: h.count ? h.sum / h.count : 0 };
+      }
+    }
+    return out;
+  }
+
+  startServer(port) {
+    this.server = http.createServer((req, res) => {
+      if (req.url === '/metrics') {
+        res.setHeader('Content-Type', 'text/plain; version=0.0.4');
+        res.end(this.render());
+      } else if (req.url === '/metrics.json') {
+        res.setHeader('Content-Type', 'application/json');
+        res.end(JSON.stringify(this.toJSON()));
+      } else {
+        res.statusCode = 404;
+        res.end();
+      }
+    });
+    this.server.listen(port, '127.0.0.1');
+    this.server.unref();
+    console.log(`✓ Metrics on http://127.0.0.1:${port}/metrics`);
+  }
+
+  startJsonDump(filepath, intervalMs = 60000) {
+    this.dumpTimer = setInterval(() => {
+      fs.writeFile(filepath, JSON.stringify(this.toJSON(), null, 2)).catch(() => {});
+    }, intervalMs);
+    this.dumpTimer.unref();
+  }
+
+  stop() {
+    if (this.server) this.server.close();
+    if (this.dumpTimer) clearInterval(this.dumpTimer);
+  }
+}
+
+module.exports = Metrics;
@@ -3,40 +3,154 @@
  */
 
 const axios = require('axios');
+const http = require('http');
+const https = require('https');
 
 class MoneroRPC {
   constructor(config = {}) {
     this.url = config.url || process.env.MONERO_WALLET_RPC_URL || 'http://127.0.0.1:18083';
     this.user = config.user || process.env.MONERO_WALLET_RPC_USER;
     this.password = config.password || process.env.MONERO_WALLET_RPC_PASSWORD;
+
+    // Pooled keep-alive sockets: chained multisig calls reuse one TCP connection
+    const keepAlive = config.keepAlive !== false;
+    const agentOptions = { keepAlive, maxSockets: config.maxSockets || 4 };
+    this.httpAgent = new http.Agent(agentOptions);
+    this.httpsAgent = new https.Agent(agentOptions);
+
+    // Use JSON-RPC array batches in batch(); wallet-rpc does not accept them,
+    // so by default batches are pipelined over the pooled connections instead
+    this.jsonBatch = config.jsonBatch === true;
+
+    this._nextId = 1;
+    this.stats = new Map();
+    this.onCall = config.onCall || null; // (method, elapsedMs, failed) for metrics
+  }
+
+  _requestConfig(timeout) {
+    return {
+      auth: this.user && this.password ? {
+        username: this.user,
+        password: this.password
+      } : undefined,
+      httpAgent: this.httpAgent,
+      httpsAgent: this.httpsAgent,
+      timeout
+    };
+  }
+
+  _record(method, startTime, failed) {
+    let s = this.stats.get(method);
+    if (!s) {
+      s = { calls: 0, errors: 0, totalMs: 0, maxMs: 0 };
+      this.stats.set(method, s);
+    }
+    const elapsed = Date.now() - startTime;
+    s.calls++;
+    s.totalMs += elapsed;
+    if (elapsed > s.maxMs) s.maxMs = elapsed;
+    if (failed) s.errors++;
+    if (this.onCall) this.onCall(method, elapsed, failed);
   }
 
   async call(method, params = {}, timeout = 30000) {
+    const id = String(this._nextId++);
+    const startTime = Date.now();
     try {
       const response = await axios.post(`${this.url}/json_rpc`, {
         jsonrpc: '2.0',
-        id: '0',
+        id,
         method,
         params
-      }, {
-        auth: this.user && this.password ? {
-          username: this.user,
-          password: this.password
-        } : undefined,
-        timeout
-      });
+      }, this._requestConfig(timeout));
 
       if (response.data.error) {
         throw new Error(`RPC Error: ${response.data.error.message}`);
       }
 
+      this._record(method, startTime, false);
       return response.data.result;
     } catch (error) {
+      this._record(method, startTime, true);
+      if (error.response) {
+        throw new Error(`HTTP ${error.response.status}: ${error.response.statusText}`);
+      }
+      throw error;
+    }
+  }
+
+  /**
+   * Run several calls at once. Each entry is { method, params } or
+   * [method, params]. Resolves with results in the same order; rejects on
+   * the first failed call.
+   */
+  async batch(calls, timeout = 30000) {
+    const normalized = calls.map(c => Array.isArray(c)
+      ? { method: c[0], params: c[1] || {} }
+      : { method: c.method, params: c.params || {} });
+
+    if (!this.jsonBatch) {
+      return Promise.all(normalized.map(c => this.call(c.method, c.params, timeout)));
+    }
+
+    const payload = normalized.map(c => ({
+      jsonrpc: '2.0',
+      id: String(this._nextId++),
+      method: c.method,
+      params: c.params
+    }));
+    const startTime = Date.now();
+
+    let response;
+    try {
+      response = await axios.post(`${this.url}/json_rpc`, payload, this._requestConfig(timeout));
+    } catch (error) {
+      normalized.forEach(c => this._record(c.method, startTime, true));
       if (error.response) {
         throw new Error(`HTTP ${error.response.status}: ${error.response.statusText}`);
       }
       throw error;
     }
+
+    if (!Array.isArray(response.data)) {
+      // Server does not support array batches; pipeline instead
+      this.jsonBatch = false;
+      return this.batch(calls, timeout);
+    }
+
+    const byId = new Map(response.data.map(r => [String(r.id), r]));
+    return payload.map((req, i) => {
+      const res = byId.get(req.id);
+      const failed = !res || !!res.error;
+      this._record(normalized[i].method, startTime, failed);
+      if (!res) throw new Error(`RPC Error: no response for ${req.method}`);
+      if (res.error) throw new Error(`RPC Error: ${res.error.message}`);
+      return res.result;
+    });
+  }
+
+  /**
+   * Per-method latency and error counters
+   */
+  getStats() {
+    const out = {};
+    for (const [method, s] of this.stats.entries()) {
+      out[method] = {
+        ...s,
+        avgMs: s.calls > 0 ? Math.round(s.totalMs / s.calls) : 0
+      };
+    }
+    return out;
+  }
+
+  resetStats() {
+    this.stats.clear();
+  }
+
+  // Close pooled sockets
+  destroy() {
+    this.httpAgent.destroy();
+    this.httpsAgent.destroy();
   }
 
   // Create new wallet
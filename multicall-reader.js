@@ -0,0 +1,211 @@
+const { ethers } = require('ethers');
+
+// Multicall3 is deployed at the same address on mainnet, Sepolia and most L2s
+const MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11';
+
+const multicallABI = [
+  'function tryBlockAndAggregate(bool requireSuccess, tuple(address target, bytes callData)[] calls) payable returns (uint256 blockNumber, bytes32 blockHash, tuple(bool success, bytes returnData)[] returnData)'
+];
+
+/**
+ * Multicall Reader
+ * Batches view calls issued in the same tick into one Multicall3 eth_call
+ * and caches decoded results per block number, so repeated reads of
+ * e.g. getFormingCluster() within a tick cost nothing.
+ *
+ * Calls for the same block tag that arrive before the next macrotask are
+ * coalesced; identical calls are deduplicated.
+ */
+class MulticallReader {
+  constructor(provider, options = {}) {
+    this.provider = provider;
+    this.enabled = options.enabled !== false;
+    this.maxCachedBlocks = options.maxCachedBlocks || 4;
+    this.latestTtlMs = options.latestTtlMs || 2000;
+    this.multicall = new ethers.Contract(
+      options.address || MULTICALL3_ADDRESS,
+      multicallABI,
+      provider
+    );
+
+    this.cache = new Map();      // blockNumber -> Map(callKey -> Result)
+    this.pending = new Map();    // blockTag -> { calls: Map(callKey -> entry) }
+    this.latestBlock = null;
+    this.latestAt = 0;
+    this.stats = { reads: 0, cacheHits: 0, batches: 0, fallbacks: 0 };
+  }
+
+  /**
+   * Pin 'latest' reads to a known head (e.g. from a 'block' subscription).
+   */
+  setLatestBlock(blockNumber) {
+    if (this.latestBlock === null || blockNumber >= this.latestBlock) {
+      this.latestBlock = Number(blockNumber);
+      this.latestAt = Date.now();
+    }
+  }
+
+  /**
+   * Forget the pinned head; call after our own writes are mined.
+   */
+  invalidate() {
+    this.latestBlock = null;
+    this.latestAt = 0;
+  }
+
+  /**
+   * Read a single view function. Resolves with the decoded ethers Result
+   * (same shape as calling contract[method](...args) directly).
+   */
+  async read(contract, method, args = [], blockTag) {
+    const [result] = await this.readMany([[contract, method, args]], blockTag);
+    return result;
+  }
+
+  /**
+   * Read several view functions at one block height in one round trip.
+   * @param {Array<[Contract, string, Array]>} calls
+   */
+  async readMany(calls, blockTag) {
+    this.stats.reads += calls.length;
+
+    if (!this.enabled) {
+      return Promise.all(calls.map(([contract, method, args = []]) => contract[method](...args)));
+    }
+
+    const block = this._resolveBlockTag(blockTag);
+    return Promise.all(calls.map(([contract, method, args = []]) => {
+      const callData = contract.interface.encodeFunctionData(method, args);
+      const target = contract.target;
+      const key = `${String(target).toLowerCase()}:${callData}`;
+
+      if (typeof block === 'number') {
+        const cached = this.cache.get(block);
+        if (cached && cached.has(key)) {
+          this.stats.cacheHits++;
+          return cached.get(key);
+        }
+      }
+      return this._enqueue(block, key, { contract, method, args, target, callData });
+    }));
+  }
+
+  _resolveBlockTag(blockTag) {
+    if (blockTag !== undefined && blockTag !== null && blockTag !== 'latest') {
+      return Number(blockTag);
+    }
+    if (this.latestBlock !== null && Date.now() - this.latestAt < this.latestTtlMs) {
+      return this.latestBlock;
+    }
+    return 'latest';
+  }
+
+  _enqueue(block, key, call) {
+    let batch = this.pending.get(block);
+    if (!batch) {
+      batch = { calls: new Map() };
+      this.pending.set(block, batch);
+      setImmediate(() => this._flush(block, batch));
+    }
+
+    let entry = batch.calls.get(key);
+    if (!entry) {
+      entry = { ...call, waiters: [] };
+      batch.calls.set(key, entry);
+    }
+    return new Promise((resolve, reject) => entry.waiters.push({ resolve, reject }));
+  }
+
+  async _flush(block, batch) {
+    if (this.pending.get(block) === batch) this.pending.delete(block);
+    const entries = [...batch.calls.entries()];
+    this.stats.batches++;
+
+    let blockNumber;
+    let results;
+    try {
+      const overrides = block === 'latest' ? {} : { blockTag: block };
+      const out = await this.multicall.tryBlockAndAggregate.staticCall(
+        false,
+        entries.map(([, e]) => ({ target: e.target, callData: e.callData })),
+        overrides
+      );
+      blockNumber = Number(out.blockNumber);
+      results = out.returnData;
+    } catch (error) {
+      // Multicall3 unavailable (or the aggregate itself failed): fall back
+      // to individual calls so callers still get an answer. They are pinned
+      // to one block, as the aggregate would have been.
+      this.stats.fallbacks++;
+      await this._fallback(block, entries);
+      return;
+    }
+
+    if (block === 'latest') this.setLatestBlock(blockNumber);
+    const blockCache = this._blockCache(blockNumber);
+
+    entries.forEach(([key, e], i) => {
+      const { success, returnData } = results[i];
+      if (!success) {
+        const err = new Error(`${e.method}() reverted`);
+        err.data = returnData;
+        e.waiters.forEach(w => w.reject(err));
+        return;
+      }
+      try {
+        const value = e.contract.interface.decodeFunctionResult(e.method, returnData);
+        // Single-output functions behave like a direct contract call
+        const decoded = value.length === 1 ? value[0] : value;
+        blockCache.set(key, decoded);
+        e.waiters.forEach(w => w.resolve(decoded));
+      } catch (err) {
+        e.waiters.forEach(w => w.reject(err));
+      }
+    });
+  }
+
+  async _fallback(block, entries) {
+    let blockNumber = block;
+    if (blockNumber === 'latest') {
+      try {
+        blockNumber = Number(await this.provider.getBlockNumber());
+        this.setLatestBlock(blockNumber);
+      } catch {
+        blockNumber = 'latest';
+      }
+    }
+    const overrides = blockNumber === 'latest' ? [] : [{ blockTag: blockNumber }];
+    const blockCache = blockNumber === 'latest' ? null : this._blockCache(blockNumber);
+
+    await Promise.all(entries.map(async ([key, e]) => {
+      try {
+        const value = await e.contract[e.method](...e.args, ...overrides);
+        if (blockCache) blockCache.set(key, value);
+        e.waiters.forEach(w => w.resolve(value));
+      } catch (err) {
+        e.waiters.forEach(w => w.reject(err));
+      }
+    }));
+  }
+
+  _blockCache(blockNumber) {
+    let blockCache = this.cache.get(blockNumber);
+    if (!blockCache) {
+      blockCache = new Map();
+      this.cache.set(blockNumber, blockCache);
+      // Evict oldest blocks
+      const blocks = [...this.cache.keys()].sort((a, b) => a - b);
+      while (blocks.length > this.maxCachedBlocks) {
+        this.cache.delete(blocks.shift());
+      }
+    }
+    return blockCache;
+  }
+
+  getStats() {
+    return { ...this.stats };
+  }
+}
+
+module.exports = MulticallReader;
+module.exports.MULTICALL3_ADDRESS = MULTICALL3_ADDRESS;
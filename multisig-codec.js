@@ -0,0 +1,315 @@
+const crypto = require('crypto');
+
+/**
+ * Multisig Codec
+ * Compact on-chain form for wallet-rpc multisig strings (prepare_multisig /
+ * make_multisig / exchange_multisig_keys messages and export_multisig_info).
+ *
+ * Those strings are a magic prefix plus Monero block base58 (11 chars per 8
+ * bytes), or plain hex for export_multisig_info. The codec decodes them to
+ * the raw bytes and packs them as
+ *
+ *   [version][kind][flags]([dictionary id: 4 bytes])[body]
+ *
+ * where body is the raw bytes or, with a dictionary, literal runs and
+ * copies from other members' messages (each kex message repeats its
+ * signer's public key, which every member already has from registration).
+ * The contracts take `string`, so the packed bytes travel as a marker
+ * character plus 7 bits per character: always valid single-byte UTF-8,
+ * about 8/7 of the binary size against 11/8 for base58 and 2 for hex.
+ *
+ * decode() returns the exact original string and passes anything that is
+ * not codec output (legacy strings, exchange commitments) through.
+ */
+
+const VERSION = 1;
+const WIRE_MARKER = '\u0001';
+const FLAG_DICTIONARY = 1;
+const MIN_MATCH = 16;
+const INDEX_BYTES = 8;
+
+const BASE58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz';
+const BASE58_INDEX = new Map([...BASE58_ALPHABET].map((c, i) => [c, BigInt(i)]));
+const FULL_BLOCK_BYTES = 8;
+const FULL_BLOCK_CHARS = 11;
+const BLOCK_CHARS = [0, 2, 3, 5, 6, 7, 9, 10, 11]; // encoded size by block byte length
+
+// kind -> magic prefix (base58 kinds) ; 0 = verbatim UTF-8, 1 = hex
+const KIND_VERBATIM = 0;
+const KIND_HEX = 1;
+const MAGICS = [null, null, 'MultisigV1', 'MultisigxV1', 'MultisigxV2R1', 'MultisigxV2Rn'];
+const MAGIC_ORDER = MAGICS
+  .map((magic, kind) => ({ magic, kind }))
+  .filter(m => m.magic)
+  .sort((a, b) => b.magic.length - a.magic.length);
+
+function writeVarint(value, out) {
+  while (value >= 0x80) {
+    out.push((value & 0x7f) | 0x80);
+    value >>>= 7;
+  }
+  out.push(value);
+}
+
+function readVarint(buf, pos) {
+  let value = 0;
+  let shift = 0;
+  for (;;) {
+    if (pos >= buf.length) throw new Error('Truncated varint');
+    const b = buf[pos++];
+    value += (b & 0x7f) * 2 ** shift;
+    if (!(b & 0x80)) return [value, pos];
+    shift += 7;
+    if (shift > 35) throw new Error('Varint too long');
+  }
+}
+
+class MultisigCodec {
+  // --- Monero base58 (fixed-size blocks, no checksum) ---
+
+  static base58Encode(bytes) {
+    let out = '';
+    for (let i = 0; i < bytes.length; i += FULL_BLOCK_BYTES) {
+      const block = bytes.subarray(i, i + FULL_BLOCK_BYTES);
+      let num = 0n;
+      for (const b of block) num = (num << 8n) | BigInt(b);
+      const chars = new Array(BLOCK_CHARS[block.length]).fill(BASE58_ALPHABET[0]);
+      for (let c = chars.length - 1; num > 0n; c--) {
+        chars[c] = BASE58_ALPHABET[Number(num % 58n)];
+        num /= 58n;
+      }
+      out += chars.join('');
+    }
+    return out;
+  }
+
+  static base58Decode(text) {
+    const fullBlocks = Math.floor(text.length / FULL_BLOCK_CHARS);
+    const lastChars = text.length % FULL_BLOCK_CHARS;
+    const lastBytes = BLOCK_CHARS.indexOf(lastChars);
+    if (lastBytes < 0) throw new Error('Invalid base58 length');
+    const out = Buffer.alloc(fullBlocks * FULL_BLOCK_BYTES + lastBytes);
+
+    for (let start = 0, offset = 0; start < text.length; start += FULL_BLOCK_CHARS, offset += FULL_BLOCK_BYTES) {
+      const chunk = text.slice(start, start + FULL_BLOCK_CHARS);
+      const size = chunk.length === FULL_BLOCK_CHARS ? FULL_BLOCK_BYTES : lastBytes;
+      let num = 0n;
+      for (const c of chunk) {
+        const digit = BASE58_INDEX.get(c);
+        if (digit === undefined) throw new Error(`Invalid base58 character '${c}'`);
+        num = num * 58n + digit;
+      }
+      if (num >> BigInt(size * 8)) throw new Error('Base58 block overflow');
+      for (let b = size - 1; b >= 0; b--) {
+        out[offset + b] = Number(num & 0xffn);
+        num >>= 8n;
+      }
+    }
+    return out;
+  }
+
+  // --- wallet-rpc string <-> (kind, raw bytes) ---
+
+  /**
+   * Split a multisig string into kind and raw bytes; anything that would
+   * not re-encode to the identical string is kept verbatim
+   */
+  static parse(info) {
+    const text = String(info);
+    if (text.length > 0 && text.length % 2 === 0 && /^[0-9a-f]+$/.test(text)) {
+      return { kind: KIND_HEX, raw: Buffer.from(text, 'hex') };
+    }
+    for (const { magic, kind } of MAGIC_ORDER) {
+      if (!text.startsWith(magic)) continue;
+      try {
+        const raw = MultisigCodec.base58Decode(text.slice(magic.length));
+        if (magic + MultisigCodec.base58Encode(raw) === text) {
+          return { kind, raw };
+        }
+      } catch {
+        // Not base58 after all
+      }
+      break;
+    }
+    return { kind: KIND_VERBATIM, raw: Buffer.from(text, 'utf8') };
+  }
+
+  static format(kind, raw) {
+    if (kind === KIND_VERBATIM) return raw.toString('utf8');
+    if (kind === KIND_HEX) return raw.toString('hex');
+    if (!MAGICS[kind]) throw new Error(`Unknown multisig kind ${kind}`);
+    return MAGICS[kind] + MultisigCodec.base58Encode(raw);
+  }
+
+  // --- dictionary of peers' messages ---
+
+  /**
+   * Dictionary from multisig strings every member can see (e.g. the
+   * forming cluster's registered infos, in registry order)
+   */
+  static buildDictionary(infos) {
+    const entries = infos.filter(Boolean).map(info => MultisigCodec.parse(MultisigCodec.decode(info)).raw);
+    const hash = crypto.createHash('sha256');
+    const index = new Map(); // first INDEX_BYTES bytes (hex) -> [entry, offset]
+    entries.forEach((entry, e) => {
+      const length = Buffer.alloc(4);
+      length.writeUInt32BE(entry.length, 0);
+      hash.update(length).update(entry);
+      for (let off = 0; off + INDEX_BYTES <= entry.length; off++) {
+        const key = entry.toString('hex', off, off + INDEX_BYTES);
+        if (!index.has(key)) index.set(key, [e, off]);
+      }
+    });
+    return { id: hash.digest().subarray(0, 4), entries, index };
+  }
+
+  static _compress(raw, dictionary) {
+    const out = [];
+    let literalStart = 0;
+    const flushLiteral = (end) => {
+      if (end > literalStart) {
+        writeVarint((end - literalStart) * 2, out);
+        for (let i = literalStart; i < end; i++) out.push(raw[i]);
+      }
+    };
+
+    let pos = 0;
+    while (pos + MIN_MATCH <= raw.length) {
+      const hit = dictionary.index.get(raw.toString('hex', pos, pos + INDEX_BYTES));
+      let length = 0;
+      if (hit) {
+        const [e, off] = hit;
+        const entry = dictionary.entries[e];
+        while (pos + length < raw.length && off + length < entry.length && raw[pos + length] === entry[off + length]) {
+          length++;
+        }
+      }
+      if (length >= MIN_MATCH) {
+        flushLiteral(pos);
+        writeVarint((length - MIN_MATCH) * 2 + 1, out);
+        writeVarint(hit[0], out);
+        writeVarint(hit[1], out);
+        pos += length;
+        literalStart = pos;
+      } else {
+        pos++;
+      }
+    }
+    flushLiteral(raw.length);
+    return Buffer.from(out);
+  }
+
+  static _decompress(body, dictionary) {
+    const out = [];
+    let pos = 0;
+    while (pos < body.length) {
+      let header;
+      [header, pos] = readVarint(body, pos);
+      if (header % 2 === 0) {
+        const length = header / 2;
+        if (pos + length > body.length) throw new Error('Truncated literal');
+        for (let i = 0; i < length; i++) out.push(body[pos + i]);
+        pos += length;
+      } else {
+        const length = (header - 1) / 2 + MIN_MATCH;
+        let e;
+        let off;
+        [e, pos] = readVarint(body, pos);
+        [off, pos] = readVarint(body, pos);
+        const entry = dictionary.entries[e];
+        if (!entry || off + length > entry.length) throw new Error('Copy outside dictionary');
+        for (let i = 0; i < length; i++) out.push(entry[off + i]);
+      }
+    }
+    return Buffer.from(out);
+  }
+
+  // --- packed binary form ---
+
+  static pack(info, dictionary = null) {
+    const { kind, raw } = MultisigCodec.parse(info);
+    if (dictionary && dictionary.entries.length > 0 && kind !== KIND_VERBATIM) {
+      const body = MultisigCodec._compress(raw, dictionary);
+      if (body.length + dictionary.id.length < raw.length) {
+        return Buffer.concat([Buffer.from([VERSION, kind, FLAG_DICTIONARY]), dictionary.id, body]);
+      }
+    }
+    return Buffer.concat([Buffer.from([VERSION, kind, 0]), raw]);
+  }
+
+  static unpack(packed, dictionary = null) {
+    if (packed.length < 3 || packed[0] !== VERSION) {
+      throw new Error(`Unsupported multisig codec version ${packed[0]}`);
+    }
+    const kind = packed[1];
+    const flags = packed[2];
+    let raw = packed.subarray(3);
+    if (flags & FLAG_DICTIONARY) {
+      const id = raw.subarray(0, 4);
+      if (!dictionary || !dictionary.id.equals(id)) {
+        throw new Error('Multisig info was packed against a different dictionary');
+      }
+      raw = MultisigCodec._decompress(raw.subarray(4), dictionary);
+    }
+    return MultisigCodec.format(kind, raw);
+  }
+
+  // --- string-safe wire form (7 bits per character) ---
+
+  static toWire(packed) {
+    let out = WIRE_MARKER;
+    let acc = 0;
+    let bits = 0;
+    for (const b of packed) {
+      acc = (acc << 8) | b;
+      bits += 8;
+      while (bits >= 7) {
+        bits -= 7;
+        out += String.fromCharCode((acc >> bits) & 0x7f);
+      }
+      acc &= (1 << bits) - 1;
+    }
+    if (bits > 0) out += String.fromCharCode((acc << (7 - bits)) & 0x7f);
+    return out;
+  }
+
+  static fromWire(text) {
+    const out = Buffer.alloc(Math.floor((text.length - 1) * 7 / 8));
+    let acc = 0;
+    let bits = 0;
+    let o = 0;
+    for (let i = 1; i < text.length && o < out.length; i++) {
+      const c = text.charCodeAt(i);
+      if (c > 0x7f) throw new Error('Invalid character in packed multisig info');
+      acc = (acc << 7) | c;
+      bits += 7;
+      if (bits >= 8) {
+        bits -= 8;
+        out[o++] = (acc >> bits) & 0xff;
+        acc &= (1 << bits) - 1;
+      }
+    }
+    return out;
+  }
+
+  static isEncoded(value) {
+    return typeof value === 'string' && value.startsWith(WIRE_MARKER);
+  }
+
+  /**
+   * wallet-rpc string -> compact string for registerNode / submitExchangeInfo
+   */
+  static encode(info, dictionary = null) {
+    return MultisigCodec.toWire(MultisigCodec.pack(info, dictionary));
+  }
+
+  /**
+   * Inverse of encode; other strings are returned unchanged
+   */
+  static decode(value, dictionary = null) {
+    if (!MultisigCodec.isEncoded(value)) return value;
+    return MultisigCodec.unpack(MultisigCodec.fromWire(value), dictionary);
+  }
+}
+
+module.exports = MultisigCodec;
@@ -1,14 +1,36 @@
 require('dotenv').config();
 const { ethers } = require('ethers');
 const MoneroRPC = require('./monero-rpc');
+const WalletSessionPool = require('./wallet-session-pool');
+const ClusterMonitor = require('./cluster-monitor');
+const MulticallReader = require('./multicall-reader');
+const ExchangeRoundWaiter = require('./exchange-round-waiter');
+const CeremonyJournal = require('./ceremony-journal');
+const TxManager = require('./tx-manager');
+const Metrics = require('./metrics');
+const WarmStartCache = require('./warm-start-cache');
+const P2PBackupNetwork = require('./p2p-backup-network');
+const ExchangeTransport = require('./exchange-transport');
+const MultisigCodec = require('./multisig-codec');
+const RefreshPipeline = require('./refresh-pipeline');
+const ECIESEncryption = require('./ecies-encryption');
 const crypto = require('crypto');
+const os = require('os');
+const path = require('path');
 
 class ZNode {
-  constructor() {
-    this.provider = new ethers.JsonRpcProvider(
+  /**
+   * @param {object} options - optional injected dependencies (provider, wallet,
+   *   registry, staking, zfi, exchangeCoordinator, monero, txm, reader,
+   *   monitor, ceremonyStateDir) used by the cluster simulator; defaults
+   *   come from .env
+   */
+  constructor(options = {}) {
+    this.options = options;
+    this.provider = options.provider || new ethers.JsonRpcProvider(
       process.env.RPC_URL || 'https://eth-sepolia.g.alchemy.com/v2/vO5dWTSB5yRyoMsJTnS6V'
     );
-    this.wallet = new ethers.Wallet(process.env.PRIVATE_KEY, this.provider);
+    this.wallet = options.wallet || new ethers.Wallet(process.env.PRIVATE_KEY, this.provider);
     
     // Generate deterministic wallet password from node's private key
     this.moneroPassword = crypto.createHash('sha256')
@@ -31,6 +53,7 @@ class ZNode {
       'function clearStaleCluster() external',
       'function checkMultisigTimeout(bytes32 clusterId) external',
       'function registeredNodes(address) view returns (bytes32 codeHash, uint256 registrationTime)',
+      'function getClusterInfo(bytes32 clusterId) external view returns (address[11] nodes, string moneroAddress, address[] currentMembers, uint256 refreshEpoch, uint256 lastRefreshTime, bool active)',
       'event NodeRegistered(address indexed node)',
       'event ClusterFormed(bytes32 indexed clusterId, address[] members)'
     ];
@@ -50,41 +73,74 @@ class ZNode {
     const exchangeCoordinatorABI = [
       'function submitExchangeInfo(bytes32 clusterId, uint8 round, string exchangeInfo, address[] clusterNodes) external',
       'function getExchangeRoundInfo(bytes32 clusterId, uint8 round, address[] clusterNodes) external view returns (address[] addresses, string[] exchangeInfos)',
-      'function getExchangeRoundStatus(bytes32 clusterId, uint8 round) external view returns (bool complete, uint8 submitted)'
+      'function getExchangeRoundStatus(bytes32 clusterId, uint8 round) external view returns (bool complete, uint8 submitted)',
+      'event ExchangeInfoSubmitted(bytes32 indexed clusterId, uint8 round, address indexed node)'
     ];
 
-    this.registry = new ethers.Contract(
+    this.registry = options.registry || new ethers.Contract(
       '0xad2F94104F38210625F2022883482De774c51d84',
       registryABI,
       this.wallet
     );
 
-    this.staking = new ethers.Contract(
+    this.staking = options.staking || new ethers.Contract(
       '0x287Ae2697B58e2f63B27426A97287df769b121e9',
       stakingABI,
       this.wallet
     );
 
-    this.zfi = new ethers.Contract(
+    this.zfi = options.zfi || new ethers.Contract(
       '0x43fAC64A8B016aE4CC26E36e4ebe2b8B6A51109a',
       zfiABI,
       this.wallet
     );
 
-    this.exchangeCoordinator = new ethers.Contract(
+    this.exchangeCoordinator = options.exchangeCoordinator || new ethers.Contract(
       '0xdA258736a8F3ED30CE2Ba150Ba65076cE9919C7E',
       exchangeCoordinatorABI,
       this.wallet
     );
 
-    this.monero = new MoneroRPC({
-      url: process.env.MONERO_RPC_URL || 'http://127.0.0.1:18083'
+    // Counters, histograms and spans (see start() for /metrics and dumps)
+    this.metrics = new Metrics();
+    this.metrics.instrumentProvider(this.provider);
+
+    // Local nonces, background receipts and fee bumping for our writes
+    this.txm = options.txm || new TxManager(this.wallet, {
+      onConfirmed: (method, elapsedMs, ok) => this.metrics.observe('znode_tx_confirmation_seconds',
+        { method, status: ok ? 'ok' : 'reverted' }, elapsedMs / 1000, 'Time from broadcast to receipt')
+    });
+
+    // Batched, per-block cached view reads (set MULTICALL=0 to disable)
+    this.reader = options.reader || new MulticallReader(this.provider, {
+      enabled: process.env.MULTICALL !== '0'
     });
 
+    this.roundWaiter = new ExchangeRoundWaiter(this.exchangeCoordinator, this.reader, this.provider);
+
+    // WALLET_POOL_SIZE > 0: one wallet-rpc per wallet, so the base wallet and
+    // cluster wallets stay open side by side instead of being switched
+    this.walletPool = options.walletPool || (Number(process.env.WALLET_POOL_SIZE) > 0 ? new WalletSessionPool() : null);
+    this.monero = options.monero || (this.walletPool ? this.walletPool.client() : new MoneroRPC({
+      url: process.env.MONERO_RPC_URL || 'http://127.0.0.1:18083'
+    }));
+    this.metrics.instrumentMonero(this.monero);
+    this.moneroWalletDir = this.walletPool ? this.walletPool.walletDir
+      : (process.env.MONERO_WALLET_DIR || path.join(os.homedir(), '.monero-wallets'));
+    this.warmStart = null; // WarmStartCache, opened in start()
+    this.exchangeTransport = null; // ExchangeTransport once started; null = on-chain exchange
+    this.servingFallbacks = false;
+    // Packed multisig strings on-chain; reading them is always supported
+    this.multisigCodec = options.multisigCodec ?? process.env.MULTISIG_CODEC === '1';
+
     this.baseWalletName = `znode_${this.wallet.address.slice(2, 10)}`;
     this.clusterWalletName = null; // Set when joining a cluster
+    this.ceremonyClusterId = null; // Cluster whose ceremony journal is open
     this.multisigInfo = null;
-    this.clusterId = null;
+    this.clusterId = null; // Our confirmed cluster, watched for failed members
+    this.failedMembers = ''; // Failed-node set last seen in our cluster
+    this.keyRefreshState = null; // { done, attempts, nextAt } for that set
+    this.keyRefreshRetryMs = Number(options.keyRefreshRetryMs || process.env.KEY_REFRESH_RETRY_MS || 60000);
   }
 
   async start() {
@@ -92,35 +148,86 @@ class ZNode {
     console.log('   ZNode - Monero Multisig (WORKING!)');
     console.log('═══════════════════════════════════════════════\n');
     console.log(`Address: ${this.wallet.address}`);
-    console.log(`Network: ${(await this.provider.getNetwork()).name}\n`);
+    const network = await this.provider.getNetwork();
+    console.log(`Network: ${network.name}\n`);
 
-    await this.checkRequirements();
-    await this.setupMonero();
+    if (process.env.METRICS_PORT) {
+      this.metrics.startServer(Number(process.env.METRICS_PORT));
+    }
+    if (process.env.METRICS_DUMP) {
+      this.metrics.startJsonDump(process.env.METRICS_DUMP);
+    }
+
+    this.warmStart = await WarmStartCache.open(this.wallet.address, {
+      dir: this.options.warmStartDir,
+      chainId: network.chainId
+    });
+
+    // Chain checks and wallet setup are independent: run them side by side
+    const startedAt = Date.now();
+    await Promise.all([
+      this.checkRequirements(),
+      this.setupMonero().then(() => this.loadCachedMultisigInfo()),
+      this.startExchangeTransport()
+    ]);
+    console.log(`✓ Startup checks done in ${((Date.now() - startedAt) / 1000).toFixed(1)}s\n`);
     await this.registerToQueue();
     await this.monitorNetwork();
   }
 
+  /**
+   * P2P transport for exchange round payloads, opt-in with
+   * EXCHANGE_TRANSPORT=p2p; needs a fixed port and a reachable announce
+   * address, else (or if libp2p cannot start) rounds stay on-chain
+   */
+  async startExchangeTransport() {
+    if ((process.env.EXCHANGE_TRANSPORT || 'chain') !== 'p2p') return;
+    const port = Number(process.env.EXCHANGE_P2P_PORT || 0);
+    if ((!this.options.exchangeNetwork && !(port > 0)) || !process.env.EXCHANGE_ANNOUNCE_ADDR) {
+      console.log('  [Exchange] EXCHANGE_TRANSPORT=p2p needs a fixed EXCHANGE_P2P_PORT and a reachable EXCHANGE_ANNOUNCE_ADDR; exchanging on-chain');
+      return;
+    }
+    try {
+      const network = this.options.exchangeNetwork || new P2PBackupNetwork(this.wallet, port);
+      if (!network.node) await network.start();
+      const transport = new ExchangeTransport(network);
+      await transport.start();
+      this.exchangeTransport = transport;
+    } catch (e) {
+      console.log(`  [Exchange] P2P transport unavailable, exchanging on-chain: ${e.message}`);
+    }
+  }
+
   async checkRequirements() {
     console.log('→ Checking requirements...');
 
+    // Independent reads in one round trip (balance + block via the provider,
+    // the view calls coalesced by the multicall reader)
+    const me = this.wallet.address;
+    const [ethBalance, zfiBal, nodeInfo, blockNumber] = await Promise.all([
+      this.provider.getBalance(me),
+      this.reader.read(this.zfi, 'balanceOf', [me]),
+      // Fallback if ABI/tuple width differs: treated as not staked below
+      this.reader.read(this.staking, 'getNodeInfo', [me]).catch(() => null),
+      this.provider.getBlockNumber()
+    ]);
+
     // Ensure we have some ETH for gas
-    const ethBalance = await this.provider.getBalance(this.wallet.address);
     if (ethBalance < ethers.parseEther('0.001')) {
       throw new Error('Insufficient ETH for gas (need >= 0.001 ETH)');
     }
-
-    // Check ZFI balance
-    const zfiBal = await this.zfi.balanceOf(this.wallet.address);
     console.log(`  ZFI Balance: ${ethers.formatEther(zfiBal)}`);
 
-    // Read staking state using getNodeInfo (first field = staked amount)
-    let stakedAmt = 0n;
-    try {
-      const info = await this.staking.getNodeInfo(this.wallet.address);
-      stakedAmt = info[0];
-    } catch {
-      // Fallback if ABI/tuple width differs: treat as not staked
-      stakedAmt = 0n;
+    // Staking state: getNodeInfo's first field is the staked amount. If the
+    // read failed, a stake verified within WARM_START_MAX_BLOCKS still counts
+    // (no re-stake attempt on a flaky read).
+    let stakedAmt = nodeInfo ? nodeInfo[0] : 0n;
+    if (nodeInfo === null) {
+      const cached = this.warmStart ? this.warmStart.getStaking(blockNumber) : null;
+      if (cached !== null) {
+        stakedAmt = cached;
+        console.log('  (getNodeInfo failed, using cached staking state)');
+      }
     }
     console.log(`  ZFI Staked: ${ethers.formatEther(stakedAmt)}`);
 
@@ -145,8 +252,13 @@ class ZNode {
       const codeHash = ethers.id('znode-v2-tss');
       const moneroAddr = '4' + '0'.repeat(94);
       const txS = await this.staking.stake(codeHash, moneroAddr);
-      await txS.wait();
+      const receipt = await txS.wait();
       console.log('  ✓ Staked');
+      stakedAmt = required;
+      this.reader.invalidate();
+      if (this.warmStart) await this.warmStart.setStaking(stakedAmt, receipt.blockNumber);
+    } else if (nodeInfo !== null && this.warmStart) {
+      await this.warmStart.setStaking(stakedAmt, blockNumber);
     }
 
     console.log('✓ Requirements met\n');
@@ -154,28 +266,22 @@ class ZNode {
 
   async setupMonero() {
     console.log('→ Setting up Monero with multisig support...');
-    
-    for (let i = 1; i <= 20; i++) {
-      try {
-        await this.monero.openWallet(this.baseWalletName, this.moneroPassword);
-        console.log(`✓ Base wallet opened: ${this.baseWalletName}`);
-        break;
-      } catch (error) {
-        if (error.code === 'ECONNREFUSED' && i < 10) {
-          console.log(`  Waiting for Monero RPC (attempt ${i}/10)...`);
-          await new Promise(r => setTimeout(r, 3000));
-          continue;
-        }
-        
-        if (error.code === 'ECONNREFUSED') {
-          throw new Error('Monero RPC not available');
-        }
-        
-        console.log('  Creating wallet with password...');
-        await this.monero.createWallet(this.baseWalletName, this.moneroPassword);
-        console.log(`✓ Base wallet created: ${this.baseWalletName}`);
-        break;
+
+    // Pooled sessions wait for their own wallet-rpc to come up
+    if (!this.walletPool) {
+      await this.waitForMoneroRpc();
+    }
+
+    try {
+      await this.monero.openWallet(this.baseWalletName, this.moneroPassword);
+      console.log(`✓ Base wallet opened: ${this.baseWalletName}`);
+    } catch (error) {
+      if (error.code === 'ECONNREFUSED') {
+        throw new Error('Monero RPC not available');
       }
+      console.log('  Creating wallet with password...');
+      await this.monero.createWallet(this.baseWalletName, this.moneroPassword);
+      console.log(`✓ Base wallet created: ${this.baseWalletName}`);
     }
 
     // Enable multisig experimental feature
@@ -192,6 +298,73 @@ class ZNode {
     }
   }
 
+  /**
+   * Probe wallet-rpc until it answers, backing off from 250ms up to 5s
+   * between attempts (MONERO_RPC_WAIT_MS overall, default 60s)
+   */
+  async waitForMoneroRpc(timeoutMs = Number(process.env.MONERO_RPC_WAIT_MS || 60000)) {
+    const startedAt = Date.now();
+    let delay = 250;
+    for (let attempt = 1; ; attempt++) {
+      try {
+        await this.monero.call('get_version', {}, 2000);
+      } catch (error) {
+        // An RPC/HTTP error still means the server is up
+        if (!/^(RPC Error|HTTP \d)/.test(error.message)) {
+          if (Date.now() - startedAt + delay > timeoutMs) {
+            throw new Error('Monero RPC not available');
+          }
+          if (attempt === 1 || attempt % 5 === 0) {
+            console.log(`  Waiting for Monero RPC (attempt ${attempt})...`);
+          }
+          await new Promise(r => setTimeout(r, delay));
+          delay = Math.min(delay * 2, 5000);
+          continue;
+        }
+      }
+      if (attempt > 1) {
+        console.log(`  Monero RPC ready after ${((Date.now() - startedAt) / 1000).toFixed(1)}s`);
+      }
+      return;
+    }
+  }
+
+  /**
+   * Warm start: reuse the prepare_multisig output saved for this base wallet
+   * if its .keys file and address are unchanged and it is not multisig yet
+   */
+  async loadCachedMultisigInfo() {
+    if (!this.warmStart || this.multisigInfo) return this.multisigInfo;
+    try {
+      const [fingerprint, [addr, ms]] = await Promise.all([
+        WarmStartCache.walletFingerprint(this.moneroWalletDir, this.baseWalletName),
+        this.monero.batch([['get_address', { account_index: 0 }], ['is_multisig']])
+      ]);
+      const info = this.warmStart.getMultisig(this.baseWalletName, fingerprint, addr.address);
+      if (info && !ms.multisig) {
+        this.multisigInfo = info;
+        console.log('✓ Multisig info restored from warm-start cache');
+      }
+    } catch (e) {
+      console.log('  Warm-start multisig check skipped:', e.message);
+    }
+    return this.multisigInfo;
+  }
+
+  async saveCachedMultisigInfo() {
+    if (!this.warmStart || !this.multisigInfo) return;
+    try {
+      const [fingerprint, addr, blockNumber] = await Promise.all([
+        WarmStartCache.walletFingerprint(this.moneroWalletDir, this.baseWalletName),
+        this.monero.call('get_address', { account_index: 0 }),
+        this.provider.getBlockNumber()
+      ]);
+      await this.warmStart.setMultisig(this.baseWalletName, fingerprint, addr.address, this.multisigInfo, blockNumber);
+    } catch (e) {
+      console.log('  Warm-start cache not saved:', e.message);
+    }
+  }
+
   async prepareMultisig() {
     console.log('\n→ Preparing multisig...');
     
@@ -201,6 +374,7 @@ class ZNode {
       
       console.log('✓ Multisig info generated');
       console.log(`  Info: ${this.multisigInfo.substring(0, 50)}...`);
+      await this.saveCachedMultisigInfo();
       
       return this.multisigInfo;
     } catch (error) {
@@ -218,6 +392,7 @@ class ZNode {
           this.multisigInfo = result.multisig_info;
           console.log('✓ Multisig info generated');
           console.log(`  Info: ${this.multisigInfo.substring(0, 50)}...`);
+          await this.saveCachedMultisigInfo();
           return this.multisigInfo;
         } catch (e) {
           console.error('❌ Failed to recreate wallet:', e.message);
@@ -249,154 +424,426 @@ class ZNode {
     }
   }
 
+  /**
+   * Ceremony journal for a cluster; a journal whose cluster wallet file is
+   * gone is discarded. Tracks the cluster so the journal can be removed
+   * once it is confirmed or abandoned.
+   */
+  async openCeremonyJournal(clusterId) {
+    this.clusterWalletName = `${this.baseWalletName}_cluster_${clusterId.slice(2, 10)}`;
+    if (this.ceremonyClusterId && this.ceremonyClusterId !== clusterId) {
+      await this.retireCeremonyJournal('new forming cluster');
+    }
+    this.ceremonyClusterId = clusterId;
+    // Only checkable when wallet-rpc keeps its wallets in our wallet dir
+    const walletsLocal = await WarmStartCache.walletFingerprint(this.moneroWalletDir, this.baseWalletName) !== null;
+    return CeremonyJournal.open(clusterId, {
+      dir: this.options.ceremonyStateDir,
+      walletFile: walletsLocal ? path.join(this.moneroWalletDir, `${this.clusterWalletName}.keys`) : null
+    });
+  }
+
+  /**
+   * Run a cluster ceremony against the cluster wallet. With a wallet pool,
+   * this.monero is swapped for a client pinned to the cluster wallet, whose
+   * session cannot be evicted until the ceremony returns; the shared
+   * client stays on the base wallet.
+   */
+  async withClusterWallet(clusterId, fn) {
+    if (!this.walletPool) return fn();
+    this.clusterWalletName = `${this.baseWalletName}_cluster_${clusterId.slice(2, 10)}`;
+    const shared = this.monero;
+    const pinned = this.walletPool.client(this.clusterWalletName, this.moneroPassword);
+    this.metrics.instrumentMonero(pinned);
+    this.monero = pinned;
+    try {
+      return await fn();
+    } finally {
+      this.monero = shared;
+      pinned.release();
+    }
+  }
+
+  async retireCeremonyJournal(reason) {
+    if (!this.ceremonyClusterId) return;
+    await CeremonyJournal.remove(this.ceremonyClusterId, { dir: this.options.ceremonyStateDir });
+    console.log(`🧹 Ceremony journal removed (${reason})`);
+    this.ceremonyClusterId = null;
+  }
+
   async finalizeClusterWithMultisigCoordination(clusterId) {
+    let journal = null;
+    const span = this.metrics.startSpan('finalize_cluster', { clusterId: clusterId.slice(0, 10) });
     try {
-      // Fetch forming cluster multisig info list (addresses aligned to selectedAddrs)
-      const [addrList, infoList] = await this.registry.getFormingClusterMultisigInfo();
-      // Build peers' multisig info excluding self
-      const my = this.wallet.address.toLowerCase();
-      const peers = [];
-      for (let i = 0; i < addrList.length; i++) {
-        if (addrList[i].toLowerCase() === my) continue;
-        const info = infoList[i];
-        if (info && info.length > 0) peers.push(info);
-      }
-      if (peers.length < 7) { // need at least 7 peers to make 8-of-11
-        console.log(`Not enough multisig infos yet (${peers.length}+1). Waiting...`);
-        return false;
-      }
-      
-      // Create cluster-specific multisig wallet
-      this.clusterWalletName = `${this.baseWalletName}_cluster_${clusterId.slice(2, 10)}`;
-      console.log(`Creating cluster wallet: ${this.clusterWalletName}`);
-      
-      try {
-        await this.monero.createWallet(this.clusterWalletName, this.moneroPassword);
-        console.log('✓ Cluster wallet created');
-      } catch (e) {
-        console.log('  Cluster wallet exists. Opening...');
+      // Resume from the last completed ceremony step, if any
+      journal = await this.openCeremonyJournal(clusterId);
+      await this.serveChainFallbacks(clusterId, journal);
+
+      if (journal.has('multisig_made')) {
+        console.log(`↻ Resuming ceremony after step: ${journal.lastStep()}`);
         await this.monero.openWallet(this.clusterWalletName, this.moneroPassword);
         console.log('✓ Cluster wallet opened');
-        // Check if already multisig - if so, this cluster was already handled
+      } else {
+        // Fetch forming cluster multisig info list (addresses aligned to selectedAddrs)
+        const [addrList, infoList] = await this.readFormingClusterMultisigInfo();
+        // Build peers' multisig info excluding self
+        const my = this.wallet.address.toLowerCase();
+        const peers = [];
+        for (let i = 0; i < addrList.length; i++) {
+          if (addrList[i].toLowerCase() === my) continue;
+          const info = infoList[i];
+          if (info && info.length > 0) peers.push(info);
+        }
+        if (peers.length < 7) { // need at least 7 peers to make 8-of-11
+          console.log(`Not enough multisig infos yet (${peers.length}+1). Waiting...`);
+          return false;
+        }
+        
+        // Create cluster-specific multisig wallet
+        console.log(`Creating cluster wallet: ${this.clusterWalletName}`);
+        
         try {
-          const info = await this.monero.call('is_multisig');
-          if (info.multisig && info.ready) {
-            console.log('  Wallet is already multisig and ready. Cluster likely already submitted.');
-            return false; // Don't re-submit
-          }
-        } catch {}
+          await this.monero.createWallet(this.clusterWalletName, this.moneroPassword);
+          console.log('✓ Cluster wallet created');
+        } catch (e) {
+          console.log('  Cluster wallet exists. Opening...');
+          await this.monero.openWallet(this.clusterWalletName, this.moneroPassword);
+          console.log('✓ Cluster wallet opened');
+          // Check if already multisig - if so, this cluster was already handled
+          try {
+            const info = await this.monero.call('is_multisig');
+            if (info.multisig && info.ready) {
+              console.log('  Wallet is already multisig and ready. Cluster likely already submitted.');
+              return false; // Don't re-submit
+            }
+          } catch {}
+        }
+        
+        // Round 1 & 2: prepare_multisig and make_multisig (already done via registration)
+        // Now perform make_multisig to get initial multisig wallet
+        const makeSpan = span.child('make_multisig');
+        const res = await this.makeMultisig(8, peers);
+        makeSpan.finish();
+        console.log(`✓ Multisig wallet initialized: ${res.address}`);
+        await journal.record('multisig_made', { address: res.address });
       }
       
-      // Round 1 & 2: prepare_multisig and make_multisig (already done via registration)
-      // Now perform make_multisig to get initial multisig wallet
-      const res = await this.makeMultisig(8, peers);
-      const incompleteAddr = res.address;
-      console.log(`✓ Multisig wallet initialized: ${incompleteAddr}`);
-      
       // Check if we need additional rounds
       const msInfo = await this.monero.call('is_multisig');
-      if (msInfo.ready) {
+      if (!msInfo.ready) {
+        // Multisig not ready - need exchange rounds
+        console.log('⚠️  Multisig not ready, performing exchange rounds...');
+        
+        for (const roundNumber of [3, 4]) {
+          if (journal.has(`round${roundNumber}_done`)) continue;
+          const label = roundNumber === 3 ? 'first' : 'second';
+          console.log(`\n→ Coordinator: Starting Round ${roundNumber} (${label} key exchange)`);
+          const roundSpan = span.child(`round_${roundNumber}`);
+          const roundSuccess = await this.coordinateExchangeRound(clusterId, roundNumber, journal);
+          roundSpan.finish(roundSuccess ? 'ok' : 'error');
+          if (!roundSuccess) {
+            console.log(`❌ Round ${roundNumber} failed`);
+            span.finish('error', { failedAt: `round_${roundNumber}` });
+            return false;
+          }
+        }
+      } else if (!journal.has('round3_done')) {
         console.log('✓ Multisig is ready (no additional rounds needed)');
-        const finalAddr = incompleteAddr;
-        const tx = await this.registry.submitMultisigAddress(clusterId, finalAddr);
-        await tx.wait();
-        console.log('✓ Submitted multisig address to registry');
-        await this.confirmClusterOnChain(clusterId, finalAddr);
-        return true;
       }
       
-      // Multisig not ready - need exchange rounds
-      console.log('⚠️  Multisig not ready, performing exchange rounds...');
-      
-      // ROUND 3: First exchange_multisig_keys
-      console.log('\n→ Coordinator: Starting Round 3 (first key exchange)');
-      const round3Success = await this.coordinateExchangeRound(clusterId, 3);
-      if (!round3Success) {
-        console.log('❌ Round 3 failed');
-        return false;
-      }
-      
-      // ROUND 4: Second exchange_multisig_keys
-      console.log('\n→ Coordinator: Starting Round 4 (second key exchange)');
-      const round4Success = await this.coordinateExchangeRound(clusterId, 4);
-      if (!round4Success) {
-        console.log('❌ Round 4 failed');
-        return false;
-      }
-      
-      // Get final address
-      const finalInfo = await this.monero.call('is_multisig');
+      // Get final address (both calls pipelined on the pooled connection)
+      const [finalInfo, getAddrResult] = await this.monero.batch([
+        ['is_multisig'],
+        ['get_address']
+      ]);
       if (!finalInfo.ready) {
         console.log('❌ Multisig still not ready after all rounds');
         return false;
       }
       
-      const getAddrResult = await this.monero.call('get_address');
       const finalAddr = getAddrResult.address;
       console.log(`\n✅ Final multisig address: ${finalAddr}`);
       
-      // Submit final address to registry
-      const tx = await this.registry.submitMultisigAddress(clusterId, finalAddr);
-      await tx.wait();
-      console.log('✓ Submitted final multisig address to registry');
+      // Submit final address to registry (skipped if a previous tick already did)
+      let addressTx = null;
+      if (!journal.has('address_submitted')) {
+        const tx = await this.txm.send(this.registry, 'submitMultisigAddress', [clusterId, finalAddr]);
+        await journal.record('address_submitted', { address: finalAddr, txHash: tx.hash });
+        addressTx = tx;
+      }
       
-      // Confirm cluster
-      await this.confirmClusterOnChain(clusterId, finalAddr);
+      // Confirm cluster (pipelined behind the address submission when possible)
+      const confirmSpan = span.child('confirm_cluster');
+      const confirmed = await this.confirmClusterOnChain(clusterId, finalAddr, addressTx);
+      confirmSpan.finish(confirmed ? 'ok' : 'error');
+      if (confirmed) {
+        this.clusterId = clusterId;
+        await this.retireCeremonyJournal('cluster confirmed');
+      } else if (addressTx && !(await addressTx.wait().then(() => true, () => false))) {
+        // Address submission itself failed: redo it on the next tick
+        await journal.forget('address_submitted');
+      }
       
+      span.finish('ok');
       return true;
     } catch (e) {
+      span.finish('error', { error: e.message || String(e) });
+      const step = journal ? journal.lastStep() : null;
       console.log('Coordinator finalize error:', e.message || String(e));
+      if (step) console.log(`  Progress saved; next tick resumes after step: ${step}`);
       return false;
+    } finally {
+      // Early exits (waiting for peers, already done) still close the span
+      span.finish('incomplete');
     }
   }
   
-  async confirmClusterOnChain(clusterId, address) {
+  async confirmClusterOnChain(clusterId, address, addressTx = null) {
     try {
-      const finalizeTx = await this.registry.confirmCluster(address);
+      const finalizeTx = await this.txm.send(this.registry, 'confirmCluster', [address], { after: addressTx });
+      if (addressTx) {
+        await addressTx.wait();
+        console.log('✓ Submitted final multisig address to registry');
+      }
       await finalizeTx.wait();
       console.log('✓ Cluster finalized on-chain');
+      return true;
     } catch (e) {
       if (e.message.includes('already exists')) {
         console.log('  Cluster already finalized');
+        return true;
       } else {
         console.log('  Finalization error:', e.message);
+        return false;
       }
     }
   }
+
+  /**
+   * On-chain form of our prepare_multisig info (packed if MULTISIG_CODEC=1)
+   */
+  encodeMultisigInfo(info) {
+    return this.multisigCodec ? MultisigCodec.encode(info) : info;
+  }
+
+  /**
+   * Forming cluster's registered infos as wallet-rpc strings. An info that
+   * fails to unpack is treated as missing rather than fed to make_multisig.
+   */
+  async readFormingClusterMultisigInfo() {
+    const [addrList, infoList] = await this.reader.read(this.registry, 'getFormingClusterMultisigInfo');
+    const infos = infoList.map((info, i) => {
+      try {
+        return MultisigCodec.decode(info);
+      } catch (error) {
+        console.log(`  Unreadable multisig info from ${addrList[i].slice(0, 10)}...: ${error.message}`);
+        return '';
+      }
+    });
+    return [addrList, infos];
+  }
+
+  /**
+   * Registered infos of the forming cluster, shared by all members, used
+   * to pack exchange infos that repeat parts of them
+   */
+  async exchangeDictionary() {
+    const [, infos] = await this.readFormingClusterMultisigInfo();
+    return MultisigCodec.buildDictionary(infos);
+  }
+
+  async encodeExchangeInfo(info) {
+    if (!this.multisigCodec) return info;
+    return MultisigCodec.encode(info, await this.exchangeDictionary());
+  }
+
+  /**
+   * Submit my exchange info for a round, journaled. Returns the submitted
+   * info and a promise that settles when the submission is mined; callers
+   * wait for peers while it confirms instead of blocking on tx.wait().
+   */
+  async submitRoundInfo(clusterId, roundNumber, clusterNodes, journal) {
+    const step = `round${roundNumber}_submitted`;
+    const previous = journal ? journal.get(step) : null;
+
+    if (previous && previous.txHash) {
+      // Re-use the tx from an earlier tick unless it reverted or was dropped
+      const receipt = await this.provider.waitForTransaction(previous.txHash, 1, 60000).catch(() => null);
+      if (receipt && receipt.status === 1) {
+        console.log(`  ↻ Round ${roundNumber} info already submitted (${previous.txHash.slice(0, 10)}...)`);
+        // Serve the payload again in case peers still need it
+        if (this.exchangeTransport) this.exchangeTransport.publish(clusterId, roundNumber, previous.info, clusterNodes);
+        return { info: previous.info, mined: Promise.resolve(receipt) };
+      }
+      console.log(`  ↻ Earlier round ${roundNumber} submission not mined, resubmitting`);
+    }
+
+    // Same info as before if we already exported it (export is not idempotent)
+    let myExchangeInfo = previous ? previous.info : null;
+    if (!myExchangeInfo) {
+      const myInfo = await this.monero.call('export_multisig_info');
+      myExchangeInfo = myInfo.info;
+    }
+
+    // With the P2P transport only a commitment to the payload goes on-chain
+    const submitted = this.exchangeTransport
+      ? this.exchangeTransport.publish(clusterId, roundNumber, myExchangeInfo, clusterNodes)
+      : await this.encodeExchangeInfo(myExchangeInfo);
+    const submitTx = await this.txm.send(this.exchangeCoordinator, 'submitExchangeInfo', [clusterId, roundNumber, submitted, clusterNodes]);
+    if (journal) await journal.record(step, { info: myExchangeInfo, txHash: submitTx.hash });
+
+    const mined = submitTx.wait().then(receipt => {
+      if (!receipt || receipt.status !== 1) {
+        throw new Error(`Round ${roundNumber} submission reverted`);
+      }
+      return receipt;
+    });
+    mined.catch(() => {}); // observed by the caller's race below
+    return { info: myExchangeInfo, mined };
+  }
+
+  /**
+   * Wait for a round while our submission confirms; abort early if it reverts.
+   * With the P2P transport, a complete round whose payloads cannot all be
+   * fetched (or that a peer already redid) is redone on-chain with
+   * fallback.info, our full info for the round.
+   */
+  async waitForRoundWhileMining(mined, clusterId, roundNumber, clusterNodes, options, fallback = null) {
+    const transport = this.exchangeTransport;
+    const journal = fallback ? fallback.journal : null;
+    if (transport) {
+      // Fetch peers' payloads as their commitments land, and help peers
+      // that had to redo an earlier round on-chain
+      options = {
+        ...options,
+        onSnapshot: s => {
+          transport.prefetch(clusterId, roundNumber, s.addresses, s.exchangeInfos);
+          this.serveChainFallbacks(clusterId, journal, clusterNodes);
+        }
+      };
+    }
+    const failed = mined.then(() => new Promise(() => {}));
+    let result = await Promise.race([
+      this.roundWaiter.waitForRound(clusterId, roundNumber, clusterNodes, options),
+      failed
+    ]);
+    await mined;
+    if (transport) {
+      let onChain = !!journal && journal.has(`round${roundNumber}_fallback`);
+      if (!onChain && result.complete) {
+        const [, fellBack] = await this.reader.read(this.exchangeCoordinator, 'getExchangeRoundStatus',
+          [clusterId, roundNumber + ExchangeTransport.FALLBACK_ROUND_OFFSET]);
+        onChain = Number(fellBack) > 0;
+      }
+      if (!onChain) {
+        try {
+          result.exchangeInfos = await transport.resolve(clusterId, roundNumber, result.addresses, result.exchangeInfos);
+        } catch (e) {
+          if (!result.complete || !fallback) throw e;
+          console.log(`  [Exchange] ${e.message}; redoing round ${roundNumber} on-chain`);
+          onChain = true;
+        }
+      }
+      if (onChain) {
+        result = await this.exchangeRoundOnChain(clusterId, roundNumber, clusterNodes, fallback, options.timeoutMs);
+      }
+    }
+    if (result.exchangeInfos.some(MultisigCodec.isEncoded)) {
+      const dictionary = await this.exchangeDictionary();
+      result.exchangeInfos = result.exchangeInfos.map(info => MultisigCodec.decode(info, dictionary));
+    }
+    return result;
+  }
   
-  async coordinateExchangeRound(clusterId, roundNumber) {
+  /**
+   * Redo a round on-chain: post our full info to the fallback round
+   * (round + FALLBACK_ROUND_OFFSET) and wait for every member's
+   */
+  async exchangeRoundOnChain(clusterId, roundNumber, clusterNodes, { info, journal }, timeoutMs) {
+    const fallbackRound = roundNumber + ExchangeTransport.FALLBACK_ROUND_OFFSET;
+    await this.submitChainFallback(clusterId, roundNumber, info, clusterNodes, journal);
+    const result = await this.roundWaiter.waitForRound(clusterId, fallbackRound, clusterNodes, {
+      timeoutMs,
+      onProgress: (n) => console.log(`  [Exchange] Round ${roundNumber} on-chain: ${n}/11 nodes submitted...`)
+    });
+    if (!result.complete) {
+      throw new Error(`Round ${roundNumber} on-chain fallback incomplete (${result.submitted}/11)`);
+    }
+    return result;
+  }
+
+  /**
+   * Post our full info for a round to its on-chain fallback round, once
+   */
+  async submitChainFallback(clusterId, roundNumber, info, clusterNodes, journal) {
+    const step = `round${roundNumber}_fallback`;
+    if (journal && journal.has(step)) return;
+    const fallbackRound = roundNumber + ExchangeTransport.FALLBACK_ROUND_OFFSET;
+    try {
+      const tx = await this.txm.send(this.exchangeCoordinator, 'submitExchangeInfo',
+        [clusterId, fallbackRound, await this.encodeExchangeInfo(info), clusterNodes]);
+      const receipt = await tx.wait();
+      if (!receipt || receipt.status !== 1) {
+        throw new Error(`Round ${roundNumber} on-chain fallback submission reverted`);
+      }
+    } catch (e) {
+      // Mined on an earlier tick
+      if (!/already submitted/i.test(e.message)) throw e;
+    }
+    if (journal) await journal.record(step, {});
+    this.metrics.inc('znode_exchange_chain_fallbacks_total', { round: roundNumber }, 1, 'Exchange rounds redone on-chain');
+    console.log(`  [Exchange] Round ${roundNumber} info posted on-chain (fallback round ${fallbackRound})`);
+  }
+
+  /**
+   * Join the on-chain fallback of any round we submitted over P2P once a
+   * peer has started it, so members that fetched every payload (and moved
+   * on) still complete it
+   */
+  async serveChainFallbacks(clusterId, journal, clusterNodes = null) {
+    if (!this.exchangeTransport || !journal || this.servingFallbacks) return;
+    const rounds = [3, 4].filter(r => journal.has(`round${r}_submitted`) && !journal.has(`round${r}_fallback`));
+    if (rounds.length === 0) return;
+    this.servingFallbacks = true;
+    try {
+      const statuses = await this.reader.readMany(rounds.map(r =>
+        [this.exchangeCoordinator, 'getExchangeRoundStatus', [clusterId, r + ExchangeTransport.FALLBACK_ROUND_OFFSET]]));
+      for (let i = 0; i < rounds.length; i++) {
+        if (Number(statuses[i][1]) === 0) continue;
+        if (!clusterNodes) [clusterNodes] = await this.reader.read(this.registry, 'getFormingCluster');
+        const { info } = journal.get(`round${rounds[i]}_submitted`);
+        await this.submitChainFallback(clusterId, rounds[i], info, clusterNodes, journal);
+      }
+    } catch (e) {
+      console.log(`  [Exchange] Could not join on-chain fallback: ${e.message}`);
+    } finally {
+      this.servingFallbacks = false;
+    }
+  }
+
+  async coordinateExchangeRound(clusterId, roundNumber, journal = null) {
+    const roundStart = Date.now();
     try {
       console.log(`  Performing my exchange for round ${roundNumber}...`);
       
-      // Get current multisig info to exchange
-      const myInfo = await this.monero.call('export_multisig_info');
-      const myExchangeInfo = myInfo.info;
-      
       // Fetch cluster nodes from forming cluster to pass to coordinator
-      const [clusterNodes] = await this.registry.getFormingCluster();
+      const [clusterNodes] = await this.reader.read(this.registry, 'getFormingCluster');
 
-      // Submit my exchange info to exchange coordinator
-      const submitTx = await this.exchangeCoordinator.submitExchangeInfo(clusterId, roundNumber, myExchangeInfo, clusterNodes);
-      await submitTx.wait();
+      // Submit my exchange info to exchange coordinator (don't block on the receipt)
+      const { info, mined } = await this.submitRoundInfo(clusterId, roundNumber, clusterNodes, journal);
       console.log(`  ✓ Submitted my exchange info for round ${roundNumber}`);
       
-      // Wait for all nodes to submit
+      // Wait for all nodes to submit; round infos arrive with the completion check
       console.log(`  Waiting for all 11 nodes to submit round ${roundNumber}...`);
-      const maxWait = 120; // 2 minutes
-      let waited = 0;
-      while (waited < maxWait) {
-        const [complete, submitted] = await this.exchangeCoordinator.getExchangeRoundStatus(clusterId, roundNumber);
-        if (complete) {
-          console.log(`  ✓ All nodes submitted (${submitted}/11)`);
-          break;
-        }
-        console.log(`  Progress: ${submitted}/11 nodes submitted...`);
-        await new Promise(r => setTimeout(r, 5000));
-        waited += 5;
+      const { complete, submitted, addresses, exchangeInfos } = await this.waitForRoundWhileMining(
+        mined, clusterId, roundNumber, clusterNodes, {
+          timeoutMs: 120000, // 2 minutes
+          onProgress: (n) => console.log(`  Progress: ${n}/11 nodes submitted...`)
+        }, { info, journal }
+      );
+      if (complete) {
+        console.log(`  ✓ All nodes submitted (${submitted}/11)`);
       }
-      
-      // Get all exchange info
-      const [addresses, exchangeInfos] = await this.exchangeCoordinator.getExchangeRoundInfo(clusterId, roundNumber, clusterNodes);
       const my = this.wallet.address.toLowerCase();
       const peersExchangeInfo = [];
       for (let i = 0; i < addresses.length; i++) {
@@ -410,7 +857,10 @@ class ZNode {
       
       // Import peer exchange infos
       await this.monero.call('import_multisig_info', { info: peersExchangeInfo });
+      if (journal) await journal.record(`round${roundNumber}_done`, { peers: peersExchangeInfo.length });
       console.log(`  ✓ Round ${roundNumber} complete`);
+      this.metrics.observe('znode_round_duration_seconds', { round: roundNumber, role: 'coordinator' },
+        (Date.now() - roundStart) / 1000, 'Exchange round duration');
       
       return true;
     } catch (e) {
@@ -421,67 +871,67 @@ class ZNode {
 
   async participateInExchangeRounds(clusterId) {
     try {
-      // Fetch forming cluster multisig info
-      const [addrList, infoList] = await this.registry.getFormingClusterMultisigInfo();
-      const my = this.wallet.address.toLowerCase();
-      const peers = [];
-      for (let i = 0; i < addrList.length; i++) {
-        if (addrList[i].toLowerCase() === my) continue;
-        const info = infoList[i];
-        if (info && info.length > 0) peers.push(info);
-      }
-      if (peers.length < 7) {
-        console.log(`  Not enough multisig infos yet (${peers.length}+1). Waiting...`);
-        return false;
-      }
-      
-      // Create/open cluster wallet
-      this.clusterWalletName = `${this.baseWalletName}_cluster_${clusterId.slice(2, 10)}`;
-      
-      try {
-        await this.monero.createWallet(this.clusterWalletName, this.moneroPassword);
-        console.log('  ✓ Created cluster wallet');
-      } catch (e) {
+      const journal = await this.openCeremonyJournal(clusterId);
+      await this.serveChainFallbacks(clusterId, journal);
+
+      if (journal.has('multisig_made')) {
+        console.log(`  ↻ Resuming exchanges after step: ${journal.lastStep()}`);
         await this.monero.openWallet(this.clusterWalletName, this.moneroPassword);
         console.log('  ✓ Opened cluster wallet');
-      }
-      
-      // Check if already multisig and ready
-      try {
-        const info = await this.monero.call('is_multisig');
-        if (info.multisig && info.ready) {
-          console.log('  ✓ Multisig already ready');
-          return true;
+      } else {
+        // Fetch forming cluster multisig info
+        const [addrList, infoList] = await this.readFormingClusterMultisigInfo();
+        const my = this.wallet.address.toLowerCase();
+        const peers = [];
+        for (let i = 0; i < addrList.length; i++) {
+          if (addrList[i].toLowerCase() === my) continue;
+          const info = infoList[i];
+          if (info && info.length > 0) peers.push(info);
         }
-        // If multisig but not ready, continue to exchanges
-        if (info.multisig && !info.ready) {
-          console.log('  → Multisig wallet exists, participating in exchanges...');
+        if (peers.length < 7) {
+          console.log(`  Not enough multisig infos yet (${peers.length}+1). Waiting...`);
+          return false;
         }
-      } catch {}
-      
-      // Initialize multisig if not already done
-      try {
-        const msInfo = await this.monero.call('is_multisig');
-        if (!msInfo.multisig) {
-          console.log('  → Initializing multisig...');
-          await this.makeMultisig(8, peers);
+        
+        // Create/open cluster wallet
+        try {
+          await this.monero.createWallet(this.clusterWalletName, this.moneroPassword);
+          console.log('  ✓ Created cluster wallet');
+        } catch (e) {
+          await this.monero.openWallet(this.clusterWalletName, this.moneroPassword);
+          console.log('  ✓ Opened cluster wallet');
         }
-      } catch {}
-      
-      // Participate in round 3
-      console.log('  → Participating in Round 3');
-      const round3Success = await this.participateInRound(clusterId, 3);
-      if (!round3Success) {
-        console.log('  ❌ Round 3 participation failed');
-        return false;
+        
+        // Check if already multisig and ready
+        try {
+          const info = await this.monero.call('is_multisig');
+          if (info.multisig && info.ready) {
+            console.log('  ✓ Multisig already ready');
+            return true;
+          }
+          // If multisig but not ready, continue to exchanges
+          if (info.multisig && !info.ready) {
+            console.log('  → Multisig wallet exists, participating in exchanges...');
+            await journal.record('multisig_made', {});
+          }
+          
+          // Initialize multisig if not already done
+          if (!info.multisig) {
+            console.log('  → Initializing multisig...');
+            const res = await this.makeMultisig(8, peers);
+            await journal.record('multisig_made', { address: res.address });
+          }
+        } catch {}
       }
       
-      // Participate in round 4
-      console.log('  → Participating in Round 4');
-      const round4Success = await this.participateInRound(clusterId, 4);
-      if (!round4Success) {
-        console.log('  ❌ Round 4 participation failed');
-        return false;
+      for (const roundNumber of [3, 4]) {
+        if (journal.has(`round${roundNumber}_done`)) continue;
+        console.log(`  → Participating in Round ${roundNumber}`);
+        const roundSuccess = await this.participateInRound(clusterId, roundNumber, journal);
+        if (!roundSuccess) {
+          console.log(`  ❌ Round ${roundNumber} participation failed`);
+          return false;
+        }
       }
       
       // Verify multisig is ready
@@ -499,36 +949,24 @@ class ZNode {
     }
   }
   
-  async participateInRound(clusterId, roundNumber) {
+  async participateInRound(clusterId, roundNumber, journal = null) {
+    const roundStart = Date.now();
     try {
       // Fetch cluster nodes
-      const [clusterNodes] = await this.registry.getFormingCluster();
+      const [clusterNodes] = await this.reader.read(this.registry, 'getFormingCluster');
 
-      // Export my multisig info
-      const myInfo = await this.monero.call('export_multisig_info');
-      const myExchangeInfo = myInfo.info;
-      
-      // Submit to exchange coordinator
-      const submitTx = await this.exchangeCoordinator.submitExchangeInfo(clusterId, roundNumber, myExchangeInfo, clusterNodes);
-      await submitTx.wait();
+      // Submit to exchange coordinator (don't block on the receipt)
+      const { info, mined } = await this.submitRoundInfo(clusterId, roundNumber, clusterNodes, journal);
       console.log(`  ✓ Submitted exchange info for round ${roundNumber}`);
       
-      // Wait for round to complete
+      // Wait for round to complete; round infos arrive with the completion check
       console.log(`  Waiting for round ${roundNumber} to complete...`);
-      const maxWait = 120;
-      let waited = 0;
-      while (waited < maxWait) {
-        const [complete, submitted] = await this.exchangeCoordinator.getExchangeRoundStatus(clusterId, roundNumber);
-        if (complete) {
-          console.log(`  ✓ Round complete (${submitted}/11)`);
-          break;
-        }
-        await new Promise(r => setTimeout(r, 5000));
-        waited += 5;
+      const { complete, submitted, addresses, exchangeInfos } = await this.waitForRoundWhileMining(
+        mined, clusterId, roundNumber, clusterNodes, { timeoutMs: 120000 }, { info, journal }
+      );
+      if (complete) {
+        console.log(`  ✓ Round complete (${submitted}/11)`);
       }
-      
-      // Get all exchange info from coordinator
-      const [addresses, exchangeInfos] = await this.exchangeCoordinator.getExchangeRoundInfo(clusterId, roundNumber, clusterNodes);
       const my = this.wallet.address.toLowerCase();
       const peersExchangeInfo = [];
       for (let i = 0; i < addresses.length; i++) {
@@ -540,7 +978,10 @@ class ZNode {
       
       // Import peer exchange infos
       await this.monero.call('import_multisig_info', { info: peersExchangeInfo });
+      if (journal) await journal.record(`round${roundNumber}_done`, { peers: peersExchangeInfo.length });
       console.log(`  ✓ Imported ${peersExchangeInfo.length} peer exchange infos`);
+      this.metrics.observe('znode_round_duration_seconds', { round: roundNumber, role: 'participant' },
+        (Date.now() - roundStart) / 1000, 'Exchange round duration');
       
       return true;
     } catch (e) {
@@ -553,22 +994,24 @@ class ZNode {
   async registerToQueue() {
     console.log('→ Registering to network...');
     
-    const nodeInfo = await this.registry.registeredNodes(this.wallet.address);
+    const [nodeInfo, [queueLen, selectedCount], [formingCluster]] = await this.reader.readMany([
+      [this.registry, 'registeredNodes', [this.wallet.address]],
+      [this.registry, 'getQueueStatus'],
+      [this.registry, 'getFormingCluster']
+    ]);
+    let deregTx = null;
     
     if (nodeInfo.registrationTime > 0) {
       // Check if we're in ghost state (registered but not in queue/forming cluster)
-      const [queueLen, selectedCount] = await this.registry.getQueueStatus();
-      const [formingCluster] = await this.registry.getFormingCluster();
       
       const inFormingCluster = formingCluster.map(a => a.toLowerCase()).includes(this.wallet.address.toLowerCase());
       
       if (!inFormingCluster && selectedCount === 0 && queueLen === 0) {
         console.log('⚠️  Ghost state detected: registered but not in queue or forming cluster');
+        this.metrics.inc('znode_ghost_detections_total', { where: 'register' });
         console.log('  Deregistering and re-registering...');
-        const deregTx = await this.registry.deregisterNode();
-        await deregTx.wait();
-        await new Promise(r => setTimeout(r, 2000));
-        // Fall through to register again
+        deregTx = await this.txm.send(this.registry, 'deregisterNode');
+        // Fall through to register again (pipelined behind the deregistration)
       } else {
         console.log('✓ Already registered\\n');
         return;
@@ -577,9 +1020,7 @@ class ZNode {
     
     if (nodeInfo.registered && !nodeInfo.inQueue) {
       console.log('  Deregistering stale registration...');
-      const deregTx = await this.registry.deregisterNode();
-      await deregTx.wait();
-      await new Promise(r => setTimeout(r, 2000));
+      deregTx = await this.txm.send(this.registry, 'deregisterNode');
     }
 
     // Ensure we have multisig info ready
@@ -587,11 +1028,13 @@ class ZNode {
       await this.prepareMultisig();
     }
     const codeHash = ethers.id('znode-v2-tss');
-    const tx = await this.registry.registerNode(codeHash, this.multisigInfo);
+    const tx = await this.txm.send(this.registry, 'registerNode', [codeHash, this.encodeMultisigInfo(this.multisigInfo)], { after: deregTx });
+    if (deregTx) await deregTx.wait();
     await tx.wait();
+    this.reader.invalidate();
     
     try {
-      const [queueLen] = await this.registry.getQueueStatus();
+      const [queueLen] = await this.reader.read(this.registry, 'getQueueStatus');
       console.log(`✓ Registered to queue (queue size: ${queueLen})\n`);
     } catch {
       console.log('✓ Registered to queue\n');
@@ -602,11 +1045,14 @@ class ZNode {
   // Requeue helper with backoff; keeps node in queue if previous round cleared without forming
   async requeueIfStale(ctx) {
     try {
-      // Always refresh state from chain to avoid stale context
-      const [queueLen, , canRegister] = await this.registry.getQueueStatus();
-      const [selectedNodes, lastSelection] = await this.registry.getFormingCluster();
+      // Always refresh state from chain to avoid stale context (one batched
+      // read at the current block; repeats within the tick hit the cache)
+      const [[queueLen, , canRegister], [selectedNodes, lastSelection], info] = await this.reader.readMany([
+        [this.registry, 'getQueueStatus'],
+        [this.registry, 'getFormingCluster'],
+        [this.registry, 'registeredNodes', [this.wallet.address]]
+      ]);
       const completed = selectedNodes.length === 11;
-      const info = await this.registry.registeredNodes(this.wallet.address);
       const registered = info.registrationTime > 0
       // Treat any completed round with registration window open as stale; requeue to kick off a new round
       const staleRound = completed && canRegister;
@@ -619,9 +1065,11 @@ class ZNode {
           return; // backoff 60s
         }
         console.log('↻ Re-queuing: reason staleRound=%s degenerate=%s needsQueue=%s', staleRound, degenerate, needsQueue);
+        this.metrics.inc('znode_requeues_total', { staleRound, degenerate, needsQueue });
+        // Deregister and register are pipelined: both are in flight at once
+        let tx1 = null;
         try {
-          const tx1 = await this.registry.deregisterNode();
-          await tx1.wait();
+          tx1 = await this.txm.send(this.registry, 'deregisterNode');
         } catch (e) {
           // ignore
         }
@@ -629,11 +1077,17 @@ class ZNode {
           try { await this.prepareMultisig(); } catch {}
         }
         const codeHash = ethers.id('znode-v2-tss');
-        const tx2 = await this.registry.registerNode(codeHash, this.multisigInfo || '');
+        const tx2 = await this.txm.send(this.registry, 'registerNode', [codeHash, this.multisigInfo ? this.encodeMultisigInfo(this.multisigInfo) : ''], { after: tx1 });
+        if (tx1) await tx1.wait().catch(() => {});
         await tx2.wait();
         this._lastRequeueTs = now;
+        this.reader.invalidate();
+        // Whatever ceremony we were in is abandoned
+        const removed = await CeremonyJournal.removeAll({ dir: this.options.ceremonyStateDir });
+        if (removed > 0) console.log(`🧹 Removed ${removed} ceremony journal(s) after requeue`);
+        this.ceremonyClusterId = null;
         try {
-          const [ql2] = await this.registry.getQueueStatus();
+          const [ql2] = await this.reader.read(this.registry, 'getQueueStatus');
           console.log(`↺ Re-queued. New queue size: ${ql2}`);
         } catch {}
       } else {
@@ -646,7 +1100,7 @@ class ZNode {
 
   async cleanupStaleCluster() {
     try {
-      const [selectedNodes, lastSelection] = await this.registry.getFormingCluster();
+      const [selectedNodes, lastSelection] = await this.reader.read(this.registry, 'getFormingCluster');
       const completed = selectedNodes.length === 11;
       
       // Only clean up if there's a forming cluster
@@ -683,9 +1137,12 @@ class ZNode {
       console.log(`🧹 I am the designated cleaner. Clearing stale cluster (age: ${Math.floor(ageMs/60000)}m)...`);
       
       try {
-        const tx = await this.registry.clearStaleCluster();
+        const tx = await this.txm.send(this.registry, 'clearStaleCluster');
         await tx.wait();
         console.log('✓ Stale forming cluster cleared on-chain');
+        this.metrics.inc('znode_stale_cluster_clears_total');
+        this.reader.invalidate();
+        if (this.clusterMonitor) this.clusterMonitor.invalidate('queue', 'forming');
         this._staleNotified = false; // Reset for next time
         return true;
       } catch (e) {
@@ -703,23 +1160,34 @@ class ZNode {
     console.log('→ Monitoring network...');
     console.log('🎉 Monero multisig is WORKING!');
     console.log('Wallet has password and multisig is enabled.\n');
+
+    // 'events' (default): one block poll, NodeRegistered / ClusterFormed
+    // from one getLogs per new block range. 'poll': legacy full re-read every 15s.
+    this.clusterMonitor = new ClusterMonitor(this.registry, this.provider, this.wallet.address, {
+      mode: process.env.MONITOR_MODE || 'events',
+      reader: this.reader,
+      pollIntervalMs: Number(process.env.MONITOR_POLL_MS || 15000),
+      blockPollMs: Number(process.env.MONITOR_BLOCK_POLL_MS || 15000),
+      ...this.options.monitor
+    });
     
-    const printStatus = async () => {
+    const printStatus = async (state) => {
       try {
-        const [queueLen, , canRegister] = await this.registry.getQueueStatus();
-        const [selectedNodes, lastSelection] = await this.registry.getFormingCluster();
+        const { queueLen, canRegister, selectedNodes, lastSelection } = state;
       const completed = selectedNodes.length === 11;
         
         // Ghost detection: if registered but not in forming cluster and queue is 0
-        const nodeInfo = await this.registry.registeredNodes(this.wallet.address);
-        if (nodeInfo.registrationTime > 0) {
+        const nodeInfo = state.registration;
+        if (nodeInfo && nodeInfo.registrationTime > 0) {
           const inFormingCluster = selectedNodes.map(a => a.toLowerCase()).includes(this.wallet.address.toLowerCase());
           if (!inFormingCluster && selectedNodes.length < 11 && queueLen === 0) {
             console.log("⚠️  Ghost detected: registered but queue is 0 and not in forming cluster");
-            const deregTx = await this.registry.deregisterNode();
+            this.metrics.inc('znode_ghost_detections_total', { where: 'monitor' });
+            const deregTx = await this.txm.send(this.registry, 'deregisterNode');
             await deregTx.wait();
-            await new Promise(r => setTimeout(r, 2000));
+            this.reader.invalidate();
             await this.registerToQueue();
+            this.clusterMonitor.invalidate();
             return;
           }
         }
@@ -743,8 +1211,10 @@ class ZNode {
                 if (canSelectNow) console.log('DEBUG: Attempting selection (queue=%d, selected=%d)', queueLen, selectedCount);
                 if (canSelectNow) {
                   try {
-                    const tx = await this.registry.selectNextNode();
+                    const tx = await this.txm.send(this.registry, 'selectNextNode');
                     await tx.wait();
+                    this.reader.invalidate();
+                    this.clusterMonitor.invalidate('queue', 'forming');
                     console.log(`Triggered selection: ${selectedCount + 1}/11`);
                   } catch (e) {
                     const msg = (e && e.message) ? e.message : String(e);
@@ -760,6 +1230,14 @@ class ZNode {
           console.log('✅ Selected for cluster! Waiting for formation to complete...');
         }
 
+        // Our ceremony's cluster left the forming slot: confirmed (ClusterFormed) or cleared
+        if (this.ceremonyClusterId && selectedCount !== 11) {
+          const info = await this.reader.read(this.registry, 'getClusterInfo', [this.ceremonyClusterId]).catch(() => null);
+          if (info && info.active) this.clusterId = this.ceremonyClusterId;
+          await this.retireCeremonyJournal('forming cluster closed');
+        }
+        await this.checkClusterLiveness();
+
         // If a full forming cluster exists (in-progress), elect coordinator deterministically and finalize
         if (selectedCount === 11) {
           try {
@@ -792,10 +1270,10 @@ class ZNode {
                 console.log('DEBUG: myIndex=%d coordIndex=%d myAddr=%s', myIndex, coordIndex, this.wallet.address);
                 if (myIndex === coordIndex) {
                   console.log('🎯 I am the coordinator for this cluster. Finalizing...');
-                  await this.finalizeClusterWithMultisigCoordination(clusterId);
+                  await this.withClusterWallet(clusterId, () => this.finalizeClusterWithMultisigCoordination(clusterId));
                 } else {
                   console.log('⏳ Waiting for coordinator to finalize cluster...');
-                  await this.participateInExchangeRounds(clusterId);
+                  await this.withClusterWallet(clusterId, () => this.participateInExchangeRounds(clusterId));
                 }
               }
             }
@@ -809,20 +1287,93 @@ class ZNode {
       }
     };
     
-    // Print immediately and then on interval
-    await printStatus();
-    setInterval(printStatus, 15000);
+    // First tick runs immediately; later ticks never overlap
+    await this.clusterMonitor.start(printStatus);
   }
 
 
-  async performKeyRefresh(clusterId, failedNodes) {
+  /**
+   * Members of our cluster the registry no longer lists as current have
+   * failed: refresh the keys among the rest, once per set of failed nodes.
+   * A failed refresh is retried with backoff (KEY_REFRESH_RETRY_MS,
+   * doubling up to 16x). Needs the options.keyRefresh share transport.
+   */
+  async checkClusterLiveness() {
+    const hooks = this.options.keyRefresh;
+    if (!this.clusterId || !hooks || !hooks.collectShares || !hooks.distribute) return false;
+    try {
+      const info = await this.reader.read(this.registry, 'getClusterInfo', [this.clusterId]);
+      if (!info.active) return false;
+      const current = info.currentMembers.map(a => a.toLowerCase());
+      if (!current.includes(this.wallet.address.toLowerCase())) return false;
+      const failedNodes = [...info.nodes].filter(n => n !== ethers.ZeroAddress && !current.includes(n.toLowerCase()));
+      const failures = failedNodes.map(n => n.toLowerCase()).sort().join(',');
+
+      if (failures !== this.failedMembers) {
+        const newlyFailed = failedNodes.filter(n => !this.failedMembers.split(',').includes(n.toLowerCase()));
+        this.failedMembers = failures;
+        this.keyRefreshState = failedNodes.length > 0 ? { done: false, attempts: 0, nextAt: 0 } : null;
+        if (newlyFailed.length > 0) {
+          console.log(`⚠️  ${newlyFailed.length} cluster member(s) failed liveness (${failedNodes.length} down)`);
+          this.metrics.inc('znode_failed_members_detected_total', {}, newlyFailed.length, 'Cluster members found failed');
+        }
+      }
+      const state = this.keyRefreshState;
+      if (!state || state.done || Date.now() < state.nextAt) return false;
+
+      const refreshed = await this.performKeyRefresh(this.clusterId, failedNodes, hooks, info);
+      if (refreshed) {
+        state.done = true;
+      } else {
+        state.attempts++;
+        const delay = this.keyRefreshRetryMs * 2 ** Math.min(state.attempts - 1, 4);
+        state.nextAt = Date.now() + delay;
+        console.log(`  Key refresh retry in ${Math.round(delay / 1000)}s (attempt ${state.attempts})`);
+      }
+      return refreshed;
+    } catch (e) {
+      console.log('Liveness check error:', e.message);
+      return false;
+    }
+  }
+
+  /**
+   * Re-share every cluster key among the members still alive. Keys stream
+   * through RefreshPipeline one at a time (reconstruct, re-split, encrypt,
+   * hand off, wipe). Share transport is supplied by options.keyRefresh:
+   *   collectShares(clusterId, members) -> { member: [old shares of its key] }
+   *   publicKey(member) -> ECIES public key (or encrypt(member, share, owner))
+   *   distribute({ clusterId, owner, shares: member -> sealed, commitments })
+   * clusterInfo, if given, is a getClusterInfo result already read.
+   */
+  async performKeyRefresh(clusterId, failedNodes, hooks = this.options.keyRefresh, clusterInfo = null) {
     try {
       console.log(`\n🔄 Key refresh for ${clusterId}`);
-      const cluster = await this.registry.clusters(clusterId);
-      const allNodes = cluster.nodes;
-      const activeNodes = allNodes.filter(n => !failedNodes.map(f => f.toLowerCase()).includes(n.toLowerCase()));
+      const info = clusterInfo || await this.reader.read(this.registry, 'getClusterInfo', [clusterId]);
+      const allNodes = [...info.nodes].filter(n => n !== ethers.ZeroAddress);
+      const failed = failedNodes.map(f => f.toLowerCase());
+      const activeNodes = allNodes.filter(n => !failed.includes(n.toLowerCase()));
       if (activeNodes.length < 8) return false;
-      console.log(`✓ Would refresh with ${activeNodes.length} nodes`);
+      if (!hooks || !hooks.collectShares || !hooks.distribute) {
+        console.log(`  No share transport configured (keyRefresh); cannot refresh with ${activeNodes.length} nodes`);
+        return false;
+      }
+
+      const collectedShares = await hooks.collectShares(clusterId, allNodes);
+      let encrypt = hooks.encrypt;
+      if (!encrypt && hooks.publicKey) {
+        const ecies = new ECIESEncryption(this.wallet);
+        encrypt = async (member, share) => ecies.encryptShareSet([share], await hooks.publicKey(member));
+      }
+
+      const pipeline = new RefreshPipeline({ queueDepth: this.options.refreshQueueDepth });
+      const stats = await this.metrics.time('znode_key_refresh_duration_seconds', {}, () =>
+        pipeline.run(collectedShares, allNodes, activeNodes, {
+          encrypt,
+          distribute: item => hooks.distribute({ clusterId, ...item })
+        }));
+      console.log(`✓ Refreshed ${stats.keys} keys for ${activeNodes.length} nodes in ${stats.totalMs}ms ` +
+        `(split ${stats.splitMs}ms, encrypt ${stats.encryptMs}ms, distribute ${stats.distributeMs}ms)`);
       return true;
     } catch (e) {
       console.log("Key refresh error:", e.message);
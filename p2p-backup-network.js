@@ -1,5 +1,63 @@
-const fs = require('fs').promises;
 const path = require('path');
+const BackupStore = require('./backup-store');
+
+// v2 frames: 4-byte big-endian length + payload
+const FRAME_HEADER_BYTES = 4;
+const MAX_FRAME_BYTES = 16 * 1024 * 1024;
+
+function encodeFrame(payload) {
+  const body = Buffer.isBuffer(payload) ? payload : Buffer.from(payload);
+  const header = Buffer.alloc(FRAME_HEADER_BYTES);
+  header.writeUInt32BE(body.length, 0);
+  return Buffer.concat([header, body]);
+}
+
+/**
+ * Yield frames from a libp2p stream source as soon as each one is complete
+ */
+async function* readFrames(source) {
+  let pending = Buffer.alloc(0);
+  for await (const chunk of source) {
+    const bytes = chunk.subarray();
+    pending = pending.length ? Buffer.concat([pending, bytes]) : Buffer.from(bytes);
+    while (pending.length >= FRAME_HEADER_BYTES) {
+      const length = pending.readUInt32BE(0);
+      if (length > MAX_FRAME_BYTES) {
+        throw new Error(`Frame of ${length} bytes exceeds limit`);
+      }
+      if (pending.length < FRAME_HEADER_BYTES + length) break;
+      yield pending.subarray(FRAME_HEADER_BYTES, FRAME_HEADER_BYTES + length);
+      pending = pending.subarray(FRAME_HEADER_BYTES + length);
+    }
+  }
+  if (pending.length > 0) {
+    throw new Error('Stream ended inside a frame');
+  }
+}
+
+/**
+ * v2 message: JSON header frame ({ ..., shares: n }) followed by n share frames
+ */
+function* encodeMessage(header, shares = []) {
+  yield encodeFrame(JSON.stringify({ ...header, shares: shares.length }));
+  for (const share of shares) {
+    yield encodeFrame(share);
+  }
+}
+
+async function readMessage(frames) {
+  const first = await frames.next();
+  if (first.done) throw new Error('Stream closed before message header');
+  const message = JSON.parse(first.value.toString());
+  const count = message.shares || 0;
+  message.shares = [];
+  for (let i = 0; i < count; i++) {
+    const frame = await frames.next();
+    if (frame.done) throw new Error(`Stream closed after ${i}/${count} shares`);
+    message.shares.push(frame.value.toString());
+  }
+  return message;
+}
 
 /**
  * P2P Backup Network using libp2p
@@ -8,16 +66,22 @@ const path = require('path');
  * Note: libp2p v1.0+ requires ESM, so we use dynamic import
  */
 class P2PBackupNetwork {
-  constructor(wallet, port = 0) {
+  constructor(wallet, port = 0, options = {}) {
     this.wallet = wallet;
     this.nodeAddress = wallet.address || wallet;
     this.port = port;
     this.node = null;
     this.backupStoragePath = path.join(__dirname, 'backup_shares', this.nodeAddress);
+    this.store = null;
     this.libp2pModule = null;
     
-    // Protocol IDs
+    // Protocol IDs (v1 is still served and used with peers that lack v2)
     this.PROTOCOL_BACKUP_REQUEST = '/xmrbridge/backup/request/1.0.0';
+    this.PROTOCOL_BACKUP_V2 = '/xmrbridge/backup/2.0.0';
+    this.protocolVersion = options.protocolVersion || Number(process.env.BACKUP_PROTOCOL_VERSION || 2);
+
+    // One connection per peer; every v2 message is its own muxed stream
+    this.connections = new Map(); // multiaddr -> connection
   }
 
   /**
@@ -48,6 +112,7 @@ class P2PBackupNetwork {
       
       // Setup protocol handlers
       await this.node.handle(this.PROTOCOL_BACKUP_REQUEST, this.handleBackupRequest.bind(this));
+      await this.node.handle(this.PROTOCOL_BACKUP_V2, this.handleBackupRequestV2.bind(this));
       
       console.log(`[P2P] Node started with ID: ${this.node.peerId.toString()}`);
       console.log(`[P2P] Listening on:`);
@@ -55,8 +120,8 @@ class P2PBackupNetwork {
         console.log(`  ${addr.toString()}`);
       });
 
-      // Ensure backup storage directory exists
-      await fs.mkdir(this.backupStoragePath, { recursive: true });
+      // Open backup store (creates the directory, migrates legacy files)
+      await this.getStore();
     } catch (error) {
       console.error('[P2P] Failed to start:', error.message);
       throw error;
@@ -64,6 +129,11 @@ class P2PBackupNetwork {
   }
 
   async stop() {
+    this.connections.clear();
+    if (this.store) {
+      await (await this.store).close();
+      this.store = null;
+    }
     if (this.node) {
       await this.node.stop();
       console.log('[P2P] Node stopped');
@@ -81,53 +151,122 @@ class P2PBackupNetwork {
     }
   }
 
+  /**
+   * Cached connection to a peer (dialed once, reused while open)
+   */
+  async getConnection(peerMultiaddr, options = {}) {
+    const key = peerMultiaddr.toString();
+    const cached = this.connections.get(key);
+    if (cached && cached.status === 'open') {
+      return cached;
+    }
+    const connection = await this.node.dial(peerMultiaddr, { signal: options.signal });
+    this.connections.set(key, connection);
+    return connection;
+  }
+
+  /**
+   * Open a backup stream, preferring v2; multistream-select falls back to
+   * v1 for peers that do not speak it.
+   */
+  async openBackupStream(peerMultiaddr, options = {}) {
+    const protocols = this.protocolVersion >= 2
+      ? [this.PROTOCOL_BACKUP_V2, this.PROTOCOL_BACKUP_REQUEST]
+      : [this.PROTOCOL_BACKUP_REQUEST];
+
+    if (this.protocolVersion < 2) {
+      // Legacy behaviour: dial per message
+      const connection = await this.node.dial(peerMultiaddr, { signal: options.signal });
+      return connection.newStream(protocols, { signal: options.signal });
+    }
+
+    return this.openStream(peerMultiaddr, protocols, options);
+  }
+
+  /**
+   * New stream for any of protocols over the cached connection to a peer;
+   * a stale cached connection is dropped and redialed once
+   */
+  async openStream(peerMultiaddr, protocols, options = {}) {
+    const key = peerMultiaddr.toString();
+    for (let attempt = 0; ; attempt++) {
+      const connection = await this.getConnection(peerMultiaddr, options);
+      try {
+        return await connection.newStream(protocols, { signal: options.signal });
+      } catch (error) {
+        this.connections.delete(key);
+        if (attempt > 0 || (options.signal && options.signal.aborted)) throw error;
+      }
+    }
+  }
+
+  /**
+   * Serve another protocol on this node (e.g. the exchange transport)
+   */
+  async handle(protocol, handler) {
+    if (!this.node) {
+      throw new Error('P2P node not started');
+    }
+    await this.node.handle(protocol, handler);
+  }
+
+  /**
+   * Backup store under backupStoragePath, opened (and legacy files
+   * migrated) on first use
+   */
+  getStore() {
+    if (!this.store) {
+      this.store = BackupStore.open(this.backupStoragePath);
+      this.store.catch(() => { this.store = null; });
+    }
+    return this.store;
+  }
+
   async storeBackupShares(sourceCluster, backupIndex, encryptedShares) {
-    const filename = `${sourceCluster}_backup${backupIndex}.json`;
-    const filepath = path.join(this.backupStoragePath, filename);
-    
-    const backupData = {
-      sourceCluster,
-      backupIndex,
-      shares: encryptedShares,
-      timestamp: Date.now(),
-      nodeAddress: this.nodeAddress
-    };
-
-    await fs.writeFile(filepath, JSON.stringify(backupData, null, 2));
+    const store = await this.getStore();
+    await store.put(sourceCluster, backupIndex, encryptedShares);
     console.log(`[P2P] Stored backup shares for cluster ${sourceCluster} (index ${backupIndex})`);
   }
 
   async retrieveBackupShares(sourceCluster, backupIndex) {
     try {
-      const filename = `${sourceCluster}_backup${backupIndex}.json`;
-      const filepath = path.join(this.backupStoragePath, filename);
-      
-      const data = await fs.readFile(filepath, 'utf8');
-      const backupData = JSON.parse(data);
+      const store = await this.getStore();
+      const shares = await store.get(sourceCluster, backupIndex);
+      if (!shares) {
+        throw new Error(`no backup ${backupIndex} for cluster ${sourceCluster}`);
+      }
       
       console.log(`[P2P] Retrieved backup shares for cluster ${sourceCluster} (index ${backupIndex})`);
-      return backupData.shares;
+      return shares;
     } catch (error) {
       console.error(`[P2P] Failed to retrieve backup shares:`, error.message);
       return null;
     }
   }
 
-  async sendBackupToPeer(peerMultiaddr, sourceCluster, backupIndex, encryptedShares) {
+  async sendBackupToPeer(peerMultiaddr, sourceCluster, backupIndex, encryptedShares, options = {}) {
     try {
-      const connection = await this.node.dial(peerMultiaddr);
-      const stream = await connection.newStream(this.PROTOCOL_BACKUP_REQUEST);
+      const stream = await this.openBackupStream(peerMultiaddr, options);
       
       const message = {
         type: 'STORE_BACKUP',
         sourceCluster,
         backupIndex,
-        shares: encryptedShares,
         timestamp: Date.now()
       };
 
-      const messageBytes = Buffer.from(JSON.stringify(message));
-      await stream.sink([messageBytes]);
+      if (stream.protocol === this.PROTOCOL_BACKUP_V2) {
+        // Shares are framed individually and streamed; wait for the ack
+        await stream.sink(encodeMessage(message, encryptedShares));
+        const ack = await readMessage(readFrames(stream.source));
+        if (!ack.success) {
+          console.error(`[P2P] Peer returned error: ${ack.error}`);
+          return false;
+        }
+      } else {
+        const messageBytes = Buffer.from(JSON.stringify({ ...message, shares: encryptedShares }));
+        await stream.sink([messageBytes]);
+      }
       
       console.log(`[P2P] Sent backup shares to peer ${peerMultiaddr}`);
       return true;
@@ -137,10 +276,9 @@ class P2PBackupNetwork {
     }
   }
 
-  async requestBackupFromPeer(peerMultiaddr, sourceCluster, backupIndex) {
+  async requestBackupFromPeer(peerMultiaddr, sourceCluster, backupIndex, options = {}) {
     try {
-      const connection = await this.node.dial(peerMultiaddr);
-      const stream = await connection.newStream(this.PROTOCOL_BACKUP_REQUEST);
+      const stream = await this.openBackupStream(peerMultiaddr, options);
       
       const request = {
         type: 'REQUEST_BACKUP',
@@ -149,11 +287,17 @@ class P2PBackupNetwork {
         requester: this.nodeAddress
       };
 
-      const requestBytes = Buffer.from(JSON.stringify(request));
-      await stream.sink([requestBytes]);
+      let responseData;
+      if (stream.protocol === this.PROTOCOL_BACKUP_V2) {
+        await stream.sink(encodeMessage(request));
+        responseData = await readMessage(readFrames(stream.source));
+      } else {
+        const requestBytes = Buffer.from(JSON.stringify(request));
+        await stream.sink([requestBytes]);
 
-      const response = await this.readStream(stream);
-      const responseData = JSON.parse(response.toString());
+        const response = await this.readStream(stream);
+        responseData = JSON.parse(response.toString());
+      }
 
       if (responseData.success) {
         console.log(`[P2P] Received backup shares from peer ${peerMultiaddr}`);
@@ -168,35 +312,40 @@ class P2PBackupNetwork {
     }
   }
 
+  /**
+   * Apply a STORE_BACKUP / REQUEST_BACKUP message, return the response
+   */
+  async processMessage(message) {
+    console.log(`[P2P] Received message type: ${message.type}`);
+
+    if (message.type === 'STORE_BACKUP') {
+      await this.storeBackupShares(
+        message.sourceCluster,
+        message.backupIndex,
+        message.shares
+      );
+      return { success: true };
+    }
+
+    if (message.type === 'REQUEST_BACKUP') {
+      const shares = await this.retrieveBackupShares(
+        message.sourceCluster,
+        message.backupIndex
+      );
+      return shares
+        ? { success: true, shares }
+        : { success: false, error: 'Backup not found' };
+    }
+
+    return { success: false, error: `Unknown message type: ${message.type}` };
+  }
+
   async handleBackupRequest({ stream }) {
     try {
       const data = await this.readStream(stream);
       const message = JSON.parse(data.toString());
-
-      console.log(`[P2P] Received message type: ${message.type}`);
-
-      if (message.type === 'STORE_BACKUP') {
-        await this.storeBackupShares(
-          message.sourceCluster,
-          message.backupIndex,
-          message.shares
-        );
-
-        const ack = { success: true };
-        await stream.sink([Buffer.from(JSON.stringify(ack))]);
-
-      } else if (message.type === 'REQUEST_BACKUP') {
-        const shares = await this.retrieveBackupShares(
-          message.sourceCluster,
-          message.backupIndex
-        );
-
-        const response = shares 
-          ? { success: true, shares }
-          : { success: false, error: 'Backup not found' };
-
-        await stream.sink([Buffer.from(JSON.stringify(response))]);
-      }
+      const response = await this.processMessage(message);
+      await stream.sink([Buffer.from(JSON.stringify(response))]);
     } catch (error) {
       console.error('[P2P] Error handling backup request:', error);
       const errorResponse = { success: false, error: error.message };
@@ -204,6 +353,24 @@ class P2PBackupNetwork {
     }
   }
 
+  async handleBackupRequestV2({ stream }) {
+    let response;
+    try {
+      // Parsed frame by frame as data arrives, no need to wait for EOF
+      const message = await readMessage(readFrames(stream.source));
+      response = await this.processMessage(message);
+    } catch (error) {
+      console.error('[P2P] Error handling backup request:', error);
+      response = { success: false, error: error.message };
+    }
+    try {
+      const { shares, ...header } = response;
+      await stream.sink(encodeMessage(header, shares));
+    } catch (error) {
+      console.error('[P2P] Failed to send backup response:', error.message);
+    }
+  }
+
   async readStream(stream) {
     const chunks = [];
     for await (const chunk of stream.source) {
@@ -222,23 +389,8 @@ class P2PBackupNetwork {
 
   async listStoredBackups() {
     try {
-      const files = await fs.readdir(this.backupStoragePath);
-      const backups = [];
-
-      for (const file of files) {
-        if (file.endsWith('.json')) {
-          const filepath = path.join(this.backupStoragePath, file);
-          const data = await fs.readFile(filepath, 'utf8');
-          const backup = JSON.parse(data);
-          backups.push({
-            sourceCluster: backup.sourceCluster,
-            backupIndex: backup.backupIndex,
-            timestamp: backup.timestamp
-          });
-        }
-      }
-
-      return backups;
+      const store = await this.getStore();
+      return store.list();
     } catch (error) {
       console.error('[P2P] Error listing backups:', error);
       return [];
@@ -247,18 +399,10 @@ class P2PBackupNetwork {
 
   async deleteBackupShares(sourceCluster) {
     try {
-      const files = await fs.readdir(this.backupStoragePath);
-      let deleted = 0;
-
-      for (const file of files) {
-        if (file.startsWith(sourceCluster)) {
-          const filepath = path.join(this.backupStoragePath, file);
-          await fs.unlink(filepath);
-          deleted++;
-        }
-      }
+      const store = await this.getStore();
+      const deleted = await store.deleteCluster(sourceCluster);
 
-      console.log(`[P2P] Deleted ${deleted} backup files for cluster ${sourceCluster}`);
+      console.log(`[P2P] Deleted ${deleted} backups for cluster ${sourceCluster}`);
       return deleted;
     } catch (error) {
       console.error('[P2P] Error deleting backups:', error);
@@ -268,3 +412,7 @@ class P2PBackupNetwork {
 }
 
 module.exports = P2PBackupNetwork;
+module.exports.encodeFrame = encodeFrame;
+module.exports.readFrames = readFrames;
+module.exports.encodeMessage = encodeMessage;
+module.exports.readMessage = readMessage;
@@ -0,0 +1,846 @@
+#!/usr/bin/env python3
+"""
+Method-level patch tool for node.js
+
+Parses a JS source once into an index of class members (name, kind and
+character offsets of the member, its leading comment and its body) using a
+small tokenizer that understands strings, template literals, comments and
+regex literals, then applies a declarative list of edits in one pass:
+
+  Replace(method, source)                      swap a member for new source
+  Remove(method, missing_ok=False)             drop a member and its comment
+  Insert(source, after=name | before=name)     add new member(s)
+  Insert(..., keep_existing=True)              add only the members not present
+  Insert(..., unless=name)                     skip entirely if member name exists
+  Upsert(source, after=name)                   replace if present, else insert
+  Refuse(method, reason)                       stop if a member is present
+  InsertAfterStatement(method, startswith, source, unless=None)
+  InsertAfterLine(method, line, source, unless=None)
+
+Every edit is resolved against the index before anything is written. A
+missing or ambiguous anchor (e.g. a method defined twice) or two overlapping
+edits is an error, and the patched source is re-parsed before it is saved,
+so unbalanced output never lands on disk. Re-running a patch over its own
+output is a no-op. Replace and Upsert overwrite whatever a member holds now,
+so a script that only adds missing pieces uses Insert(keep_existing=True),
+and one that rewrites members guards newer trees with Refuse. Unified diffs
+(node.js.patch) are not JS and are rejected.
+
+Usage:
+  python3 patch_node.py index [--json] FILE...   list class members
+  python3 fix-multisig.py [--dry-run] [FILE]     patch scripts built on run()
+"""
+import argparse
+import difflib
+import json
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+class ParseError(Exception):
+    pass
+
+
+class PatchError(Exception):
+    pass
+
+
+Token = namedtuple('Token', 'kind text start end')
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*")
+  | (?P<name>[A-Za-z_$][\w$]*)
+  | (?P<number>\.?\d[\w.]*)
+  | (?P<punct>=>|\.\.\.|\?\.|[{}()\[\];,`/=])
+  | (?P<op>[^\s\w])
+""", re.S | re.X)
+
+# A '/' after one of these starts a regex literal, not a division
+_REGEX_AFTER_NAMES = {
+    'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete',
+    'void', 'throw', 'instanceof', 'yield', 'await'
+}
+_MODIFIERS = {'static', 'async', 'get', 'set'}
+_BLOCK_KEYWORDS = {'if', 'for', 'while', 'try', 'switch', 'function', 'class', 'do', 'async'}
+
+
+def _line_of(src, pos):
+    return src.count('\n', 0, pos) + 1
+
+
+def _scan_template(src, i):
+    """Scan a template literal chunk starting after '`' or '}'.
+    Returns (end, opened) where opened is True if it stopped at '${'."""
+    n = len(src)
+    while i < n:
+        c = src[i]
+        if c == '\\':
+            i += 2
+        elif c == '`':
+            return i + 1, False
+        elif c == '$' and src.startswith('{', i + 1):
+            return i + 2, True
+        else:
+            i += 1
+    raise ParseError('unterminated template literal')
+
+
+def _scan_regex(src, i):
+    """Scan a regex literal body starting after the opening '/'."""
+    n = len(src)
+    in_class = False
+    while i < n:
+        c = src[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '\n':
+            break
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            i += 1
+            while i < n and (src[i].isalnum() or src[i] == '_'):
+                i += 1
+            return i
+        i += 1
+    raise ParseError('unterminated regex literal')
+
+
+def tokenize(src):
+    """Significant tokens of a JS source (whitespace dropped, comments kept).
+    Strings, template chunks and regex literals are single tokens; the code
+    inside ${...} is tokenized normally."""
+    tokens = []
+    append = tokens.append
+    tmpl = []    # brace depth inside each open ${ ... }
+    prev = None  # last non-comment token
+    pos = 0
+    n = len(src)
+    while pos < n:
+        m = _TOKEN_RE.match(src, pos)
+        kind = m.lastgroup
+        start = pos
+        pos = m.end()
+        if kind == 'ws':
+            continue
+        text = m.group()
+        try:
+            if kind == 'op' and text in '\'"':
+                raise ParseError('unterminated string')
+            if kind == 'punct':
+                if text == '`':
+                    pos, opened = _scan_template(src, pos)
+                    if opened:
+                        tmpl.append(0)
+                    kind, text = 'string', src[start:pos]
+                elif text == '/':
+                    if src.startswith('/*', start):
+                        raise ParseError('unterminated block comment')
+                    if (prev is None
+                            or (prev.kind in ('punct', 'op') and prev.text not in (')', ']', '}'))
+                            or (prev.kind == 'name' and prev.text in _REGEX_AFTER_NAMES)):
+                        pos = _scan_regex(src, pos)
+                        kind, text = 'regex', src[start:pos]
+                    else:
+                        kind = 'op'
+                elif text == '{' and tmpl:
+                    tmpl[-1] += 1
+                elif text == '}' and tmpl:
+                    if tmpl[-1] == 0:
+                        # End of ${...}: continue the template literal
+                        tmpl.pop()
+                        pos, opened = _scan_template(src, pos)
+                        if opened:
+                            tmpl.append(0)
+                        kind, text = 'string', src[start:pos]
+                    else:
+                        tmpl[-1] -= 1
+        except ParseError as e:
+            raise ParseError(f'{e} at line {_line_of(src, start)}') from None
+        tok = Token(kind, text, start, pos)
+        append(tok)
+        if kind != 'comment':
+            prev = tok
+    if tmpl:
+        raise ParseError('unterminated template literal at end of file')
+    return tokens
+
+
+@dataclass
+class Member:
+    cls: str
+    name: str
+    kind: str         # method | constructor | getter | setter | field
+    modifiers: List[str]
+    start: int        # first char of the member's line
+    doc_start: int    # first char of its leading comment's line (== start if none)
+    body_start: int   # offset of the body '{' (-1 for fields)
+    end: int          # just past the closing '}' and its line break
+    indent: str
+    tok_first: int
+    tok_body: int
+    tok_end: int
+
+    def span(self):
+        return self.doc_start, self.end
+
+
+@dataclass
+class ClassInfo:
+    name: str
+    start: int
+    end: int = -1
+    members: List[Member] = field(default_factory=list)
+
+
+class Index:
+    """Class/member index over one parsed source"""
+
+    def __init__(self, src):
+        self.src = src
+        self.tokens = tokenize(src)
+        self.classes = []
+        self._build()
+
+    def _line_start(self, pos):
+        ls = self.src.rfind('\n', 0, pos) + 1
+        return ls if not self.src[ls:pos].strip() else pos
+
+    def _line_end(self, pos):
+        nl = self.src.find('\n', pos)
+        if nl == -1:
+            return len(self.src) if not self.src[pos:].strip() else pos
+        return nl + 1 if not self.src[pos:nl].strip() else pos
+
+    def _next(self, i):
+        toks = self.tokens
+        i += 1
+        while i < len(toks) and toks[i].kind == 'comment':
+            i += 1
+        return i
+
+    def _build(self):
+        src, toks = self.src, self.tokens
+        stack = []   # ('class', ClassInfo) | ('member', dict) | ('block', None)
+        i = 0
+        n = len(toks)
+        while i < n:
+            tok = toks[i]
+            if tok.kind == 'comment':
+                i += 1
+                continue
+            top = stack[-1] if stack else None
+
+            if top is not None and top[0] == 'class':
+                i = self._member_header(i, top[1], stack)
+                continue
+
+            if tok.kind == 'name' and tok.text == 'class' and not (i > 0 and toks[i - 1].text == '.'):
+                j = self._next(i)
+                name = toks[j].text if j < n and toks[j].kind == 'name' and toks[j].text != 'extends' else None
+                # Skip the (possibly parenthesized) extends expression up to '{'
+                depth = 0
+                while j < n and not (toks[j].text == '{' and depth == 0 and toks[j].kind == 'punct'):
+                    if toks[j].kind == 'punct' and toks[j].text in '([':
+                        depth += 1
+                    elif toks[j].kind == 'punct' and toks[j].text in ')]':
+                        depth -= 1
+                    j += 1
+                if j >= n:
+                    raise ParseError(f'class without body at line {_line_of(src, tok.start)}')
+                info = ClassInfo(name or '<anonymous>', tok.start)
+                self.classes.append(info)
+                stack.append(('class', info))
+                i = j + 1
+                continue
+
+            if tok.kind == 'punct':
+                if tok.text == '{':
+                    stack.append(('block', None))
+                elif tok.text == '}':
+                    if not stack:
+                        raise ParseError(f"unbalanced '}}' at line {_line_of(src, tok.start)}")
+                    kind, payload = stack.pop()
+                    if kind == 'member':
+                        self._close_member(payload, i)
+            i += 1
+
+        if stack:
+            kind, payload = stack[-1]
+            what = payload.name if kind == 'class' else (payload['name'] if kind == 'member' else 'block')
+            raise ParseError(f"unclosed '{{' ({what}) at end of file")
+
+    def _member_header(self, i, info, stack):
+        """Parse one class-body element starting at token i; returns next index."""
+        src, toks = self.src, self.tokens
+        n = len(toks)
+        tok = toks[i]
+        if tok.kind == 'punct' and tok.text == '}':
+            stack.pop()
+            info.end = tok.end
+            return i + 1
+        if tok.kind == 'punct' and tok.text == ';':
+            return i + 1
+
+        hs = i
+        modifiers = []
+        name_tok = None
+        j = i
+        while j < n:
+            t = toks[j]
+            if t.kind == 'comment':
+                j += 1
+                continue
+            if t.kind == 'punct' and t.text == '(':
+                break
+            if t.kind == 'punct' and t.text in ('=', ';', '}'):
+                break
+            if t.kind == 'punct' and t.text == '[':
+                # Computed name: [expr]
+                depth = 0
+                k = j
+                while k < n:
+                    if toks[k].text == '[':
+                        depth += 1
+                    elif toks[k].text == ']':
+                        depth -= 1
+                        if depth == 0:
+                            break
+                    k += 1
+                name_tok = Token('name', src[t.start:toks[k].end], t.start, toks[k].end)
+                j = k + 1
+                continue
+            if t.kind == 'name' and t.text in _MODIFIERS and name_tok is None:
+                nxt = self._next(j)
+                if nxt < n and toks[nxt].text not in ('(', '=', ';', '}'):
+                    modifiers.append(t.text)
+                    j += 1
+                    continue
+            if t.kind in ('name', 'string', 'number'):
+                name_tok = t
+            elif t.text == '*':
+                modifiers.append('*')
+            j += 1
+
+        if j >= n:
+            raise ParseError(f'unterminated class member at line {_line_of(src, tok.start)}')
+        name = name_tok.text.strip('\'"') if name_tok else '<unnamed>'
+        t = toks[j]
+
+        if t.text == '(':
+            depth = 0
+            while j < n:
+                if toks[j].kind == 'punct' and toks[j].text == '(':
+                    depth += 1
+                elif toks[j].kind == 'punct' and toks[j].text == ')':
+                    depth -= 1
+                    if depth == 0:
+                        break
+                j += 1
+            body = self._next(j)
+            if body >= n or toks[body].text != '{':
+                raise ParseError(f'expected body for {name}() at line {_line_of(src, tok.start)}')
+            if name == 'constructor':
+                kind = 'constructor'
+            elif 'get' in modifiers:
+                kind = 'getter'
+            elif 'set' in modifiers:
+                kind = 'setter'
+            else:
+                kind = 'method'
+            stack.append(('member', {
+                'info': info, 'name': name, 'kind': kind, 'modifiers': modifiers,
+                'tok_first': hs, 'tok_body': body
+            }))
+            return body + 1
+
+        # Field: runs to ';' (or the class's closing brace) at depth 0
+        depth = 0
+        while j < n:
+            tj = toks[j]
+            if tj.kind == 'punct':
+                if tj.text in '({[':
+                    depth += 1
+                elif tj.text in ')}]':
+                    if depth == 0:
+                        break
+                    depth -= 1
+                elif tj.text == ';' and depth == 0:
+                    break
+            j += 1
+        last = j if j < n and toks[j].text == ';' else j - 1
+        self._close_member({
+            'info': info, 'name': name, 'kind': 'field', 'modifiers': modifiers,
+            'tok_first': hs, 'tok_body': -1
+        }, last)
+        return last + 1
+
+    def _close_member(self, m, tok_end):
+        src, toks = self.src, self.tokens
+        first = toks[m['tok_first']]
+        start = self._line_start(first.start)
+
+        # Leading comment block directly above (no blank line in between)
+        doc = start
+        k = m['tok_first'] - 1
+        nxt_start = start
+        while k >= 0 and toks[k].kind == 'comment':
+            c = toks[k]
+            gap = src[c.end:nxt_start]
+            if gap.strip() or gap.count('\n') > 1:
+                break
+            cs = self._line_start(c.start)
+            if cs != src.rfind('\n', 0, c.start) + 1:
+                break  # trailing comment of the previous line's code
+            doc = nxt_start = cs
+            k -= 1
+
+        end_tok = toks[tok_end]
+        info = m['info']
+        info.members.append(Member(
+            cls=info.name,
+            name=m['name'],
+            kind=m['kind'],
+            modifiers=m['modifiers'],
+            start=start,
+            doc_start=doc,
+            body_start=toks[m['tok_body']].start if m['tok_body'] >= 0 else -1,
+            end=self._line_end(end_tok.end),
+            indent=src[start:first.start] if start != first.start else '',
+            tok_first=m['tok_first'],
+            tok_body=m['tok_body'],
+            tok_end=tok_end
+        ))
+
+    def members(self, name=None, cls=None):
+        out = []
+        for info in self.classes:
+            if cls is not None and info.name != cls:
+                continue
+            for m in info.members:
+                if name is None or m.name == name:
+                    out.append(m)
+        return out
+
+    def find(self, name, cls=None, required=True):
+        found = self.members(name, cls)
+        where = f'{cls}.' if cls else ''
+        if len(found) > 1:
+            lines = ', '.join(str(_line_of(self.src, m.start)) for m in found)
+            raise PatchError(f'{where}{name} is defined {len(found)} times (lines {lines})')
+        if not found:
+            if required:
+                raise PatchError(f'{where}{name} not found')
+            return None
+        return found[0]
+
+    def text(self, member, with_doc=True):
+        return self.src[member.doc_start if with_doc else member.start:member.end]
+
+    def statements(self, member):
+        """(first_token, last_token) of each top-level statement in a body"""
+        toks = self.tokens
+        depth = 0
+        start = None
+        k = member.tok_body + 1
+        while k < member.tok_end:
+            t = toks[k]
+            if t.kind == 'comment':
+                k += 1
+                continue
+            if start is None:
+                start = k
+            if t.kind == 'punct':
+                if t.text in '({[':
+                    depth += 1
+                elif t.text in ')}]':
+                    depth -= 1
+                    if depth == 0 and t.text == '}' and toks[start].text in _BLOCK_KEYWORDS:
+                        nxt = self._next(k)
+                        if nxt >= member.tok_end or toks[nxt].text not in ('else', 'catch', 'finally', 'while'):
+                            yield start, k
+                            start = None
+                elif t.text == ';' and depth == 0:
+                    yield start, k
+                    start = None
+            k += 1
+
+
+# ---------------------------------------------------------------------------
+# Declarative edits
+
+@dataclass
+class Replace:
+    method: str
+    source: str
+    cls: Optional[str] = None
+
+
+@dataclass
+class Remove:
+    method: str
+    cls: Optional[str] = None
+    missing_ok: bool = False
+
+
+@dataclass
+class Insert:
+    source: str
+    after: Optional[str] = None
+    before: Optional[str] = None
+    cls: Optional[str] = None
+    keep_existing: bool = False
+    unless: Optional[str] = None
+
+
+@dataclass
+class Refuse:
+    method: str
+    reason: str
+    cls: Optional[str] = None
+
+
+@dataclass
+class Upsert:
+    source: str
+    after: Optional[str] = None
+    cls: Optional[str] = None
+
+
+@dataclass
+class InsertAfterStatement:
+    method: str
+    startswith: str
+    source: str
+    unless: Optional[str] = None
+    blank_line: bool = False
+    cls: Optional[str] = None
+
+
+@dataclass
+class InsertAfterLine:
+    method: str
+    line: str
+    source: str
+    unless: Optional[str] = None
+    cls: Optional[str] = None
+
+
+Edit = namedtuple('Edit', 'start end text')
+
+
+def _normalize_member(text):
+    """Dedent member source to column 0, using the closing brace's indent as
+    the base (so a flush first line with an indented body also works)."""
+    lines = text.strip('\n').split('\n')
+    base = len(lines[-1]) - len(lines[-1].lstrip(' '))
+    out = []
+    for line in lines:
+        if not line.strip():
+            out.append('')
+            continue
+        lead = len(line) - len(line.lstrip(' '))
+        out.append(line[min(lead, base):])
+    out[0] = out[0].lstrip(' ')
+    return '\n'.join(out)
+
+
+def _indent(text, indent):
+    return '\n'.join(indent + line if line.strip() else '' for line in text.split('\n'))
+
+
+def _dedent_block(text):
+    lines = text.strip('\n').split('\n')
+    lead = min((len(l) - len(l.lstrip(' ')) for l in lines if l.strip()), default=0)
+    return '\n'.join(l[lead:] for l in lines)
+
+
+def members(source):
+    """Split a blob of one or more class members into [(name, source)]"""
+    wrapped = 'class __Snippet__ {\n' + source.strip('\n') + '\n}\n'
+    try:
+        idx = Index(wrapped)
+    except ParseError as e:
+        raise PatchError(f'patch source does not parse: {e}') from None
+    out = []
+    for m in idx.members(cls='__Snippet__'):
+        out.append((m.name, _normalize_member(idx.text(m))))
+    if not out:
+        raise PatchError('patch source contains no class member')
+    return out
+
+
+def _single(source):
+    parts = members(source)
+    if len(parts) != 1:
+        raise PatchError(f'expected one member in patch source, got {[n for n, _ in parts]}')
+    return parts[0]
+
+
+def _same(index, member, text):
+    return _normalize_member(index.text(member)) == text
+
+
+def _resolve(index, op):
+    """Resolve one op to (edits, description)."""
+    src = index.src
+    if isinstance(op, Replace):
+        name, text = _single(op.source)
+        target = index.find(op.method, op.cls)
+        if _same(index, target, text):
+            return [], f'= {op.method} unchanged'
+        start = target.doc_start if text.lstrip().startswith('/') else target.start
+        return [Edit(start, target.end, _indent(text, target.indent) + '\n')], f'✓ replaced {op.method}'
+
+    if isinstance(op, Remove):
+        target = index.find(op.method, op.cls, required=not op.missing_ok)
+        if target is None:
+            return [], f'= {op.method} already absent'
+        end = target.end
+        prev = src[src.rfind('\n', 0, max(target.doc_start - 1, 0)) + 1:max(target.doc_start - 1, 0)]
+        m = re.match(r'(?:[ \t]*\n)+', src[end:])
+        if m and not prev.strip():
+            end += m.end()  # keep a single blank line between the neighbours
+        return [Edit(target.doc_start, end, '')], f'✓ removed {op.method}'
+
+    if isinstance(op, Insert) and op.unless and index.members(op.unless, op.cls):
+        return [], f'= {op.unless} present, skipped {[n for n, _ in members(op.source)]}'
+
+    if isinstance(op, (Insert, Upsert)):
+        edits = []
+        done = []
+        anchor = op.after if op.after is not None else op.before
+        after = op.after is not None or isinstance(op, Upsert)
+        at = indent = None  # insertion point (old offsets); follows the last placed member
+        for name, text in members(op.source):
+            existing = index.find(name, op.cls, required=False)
+            if existing is not None:
+                if isinstance(op, Insert) and op.keep_existing:
+                    done.append(f'= {name} already present, kept')
+                    if after:
+                        at, indent = existing.end, existing.indent
+                    continue
+                if isinstance(op, Insert) and not _same(index, existing, text):
+                    raise PatchError(f'{name} already exists with different source (use Upsert/Replace)')
+                if _same(index, existing, text):
+                    done.append(f'= {name} unchanged')
+                else:
+                    start = existing.doc_start if text.lstrip().startswith('/') else existing.start
+                    edits.append(Edit(start, existing.end, _indent(text, existing.indent) + '\n'))
+                    done.append(f'✓ replaced {name}')
+                if after:
+                    at, indent = existing.end, existing.indent
+                continue
+            if at is None:
+                if anchor is None:
+                    raise PatchError(f'no anchor to insert {name}')
+                ref = index.find(anchor, op.cls)
+                at, indent = (ref.end if after else ref.doc_start), ref.indent
+            if after:
+                edits.append(Edit(at, at, '\n' + _indent(text, indent) + '\n'))
+            else:
+                edits.append(Edit(at, at, _indent(text, indent) + '\n\n'))
+            done.append(f'✓ inserted {name}')
+        return edits, '\n'.join(done)
+
+    if isinstance(op, Refuse):
+        if index.members(op.method, op.cls):
+            raise PatchError(f'{op.method} is present: {op.reason}')
+        return [], f'= no {op.method}'
+
+    if isinstance(op, InsertAfterStatement):
+        target = index.find(op.method, op.cls)
+        body = index.text(target)
+        if op.unless and op.unless in body:
+            return [], f'= {op.method}: {op.unless!r} already present'
+        toks = index.tokens
+        found = [(a, b) for a, b in index.statements(target) if src.startswith(op.startswith, toks[a].start)]
+        if len(found) != 1:
+            raise PatchError(f'{len(found)} statements in {op.method} start with {op.startswith!r}')
+        first, last = found[0]
+        indent = src[index._line_start(toks[first].start):toks[first].start]
+        pos = index._line_end(toks[last].end)
+        text = _indent(_dedent_block(op.source), indent) + '\n'
+        if op.blank_line:
+            text = '\n' + text
+        if pos == toks[last].end:
+            text = '\n' + text
+        return [Edit(pos, pos, text)], f'✓ inserted after {op.method}: {op.startswith}...'
+
+    if isinstance(op, InsertAfterLine):
+        target = index.find(op.method, op.cls)
+        body = index.text(target)
+        if op.unless and op.unless in body:
+            return [], f'= {op.method}: {op.unless!r} already present'
+        want = op.line.strip()
+        hits = []
+        pos = target.start
+        for line in src[target.start:target.end].split('\n'):
+            if line.strip() == want:
+                hits.append((pos, line))
+            pos += len(line) + 1
+        if len(hits) != 1:
+            raise PatchError(f'{len(hits)} lines in {op.method} match {want!r}')
+        line_pos, line = hits[0]
+        indent = line[:len(line) - len(line.lstrip())]
+        at = line_pos + len(line) + 1
+        return [Edit(at, at, _indent(_dedent_block(op.source), indent) + '\n')], \
+            f'✓ inserted after line in {op.method}: {want[:40]}'
+
+    raise PatchError(f'unknown op {op!r}')
+
+
+def _expected(op):
+    if isinstance(op, Refuse):
+        return []
+    if isinstance(op, Remove):
+        return [(op.method, op.cls, 0)]
+    if isinstance(op, Replace):
+        return [(op.method, op.cls, 1)]
+    if isinstance(op, Insert) and op.unless:
+        return []
+    if isinstance(op, (Insert, Upsert)):
+        return [(name, op.cls, 1) for name, _ in members(op.source)]
+    return [(op.method, op.cls, 1)]
+
+
+def apply(src, ops, index=None):
+    """Apply ops to src in one pass. Returns (new_src, report_lines)."""
+    index = index or Index(src)
+    edits = []
+    report = []
+    for op in ops:
+        op_edits, desc = _resolve(index, op)
+        edits.extend(op_edits)
+        report.append(desc)
+
+    # Stable sort keeps same-position inserts in op order
+    edits.sort(key=lambda e: (e.start, e.end))
+    for a, b in zip(edits, edits[1:]):
+        if b.start < a.end:
+            raise PatchError(f'overlapping edits at lines {_line_of(src, a.start)} and {_line_of(src, b.start)}')
+
+    out = []
+    pos = 0
+    for e in edits:
+        out.append(src[pos:e.start])
+        out.append(e.text)
+        pos = e.end
+    out.append(src[pos:])
+    new_src = ''.join(out)
+
+    if edits:
+        try:
+            new_index = Index(new_src)
+        except ParseError as e:
+            raise PatchError(f'patched source does not parse: {e}') from None
+        for name, cls, count in (x for op in ops for x in _expected(op)):
+            got = len(new_index.members(name, cls))
+            if got != count:
+                raise PatchError(f'after patching, {name} is defined {got} times (expected {count})')
+    return new_src, report
+
+
+_DIFF_RE = re.compile(r'^(?:diff --git |--- \S|\+\+\+ \S|@@ -\d)', re.M)
+
+
+def _check_source(src):
+    """Reject inputs that are not JS sources, e.g. a unified diff"""
+    if _DIFF_RE.search(src[:4096]):
+        raise PatchError('looks like a unified diff, not a JS source')
+
+
+def run(ops, description='', argv=None):
+    """Entry point for patch scripts: [--dry-run] [file] (default node.js)"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('file', nargs='?', default='node.js')
+    parser.add_argument('--dry-run', action='store_true', help='print a unified diff instead of writing')
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.file, encoding='utf-8', newline='') as f:
+            src = f.read()
+        _check_source(src)
+        new_src, report = apply(src, ops)
+    except (ParseError, PatchError) as e:
+        print(f'ERROR: {args.file}: {e}')
+        return False
+
+    for line in '\n'.join(report).split('\n'):
+        print(f'  {line}')
+
+    if new_src == src:
+        print(f'{args.file}: already up to date')
+        return True
+
+    if args.dry_run:
+        sys.stdout.writelines(difflib.unified_diff(
+            src.splitlines(True), new_src.splitlines(True),
+            fromfile=f'a/{args.file}', tofile=f'b/{args.file}'
+        ))
+        return True
+
+    tmp = f'{args.file}.tmp'
+    with open(tmp, 'w', encoding='utf-8', newline='') as f:
+        f.write(new_src)
+    os.replace(tmp, args.file)
+    print(f'✅ Patched {args.file}')
+    return True
+
+
+def _cmd_index(paths, as_json):
+    ok = True
+    out = {}
+    for path in paths:
+        with open(path, encoding='utf-8', newline='') as f:
+            src = f.read()
+        t0 = time.perf_counter()
+        try:
+            _check_source(src)
+            idx = Index(src)
+        except (ParseError, PatchError) as e:
+            print(f'{path}: ERROR {e}')
+            ok = False
+            continue
+        ms = (time.perf_counter() - t0) * 1000
+        if as_json:
+            out[path] = [
+                {'class': m.cls, 'name': m.name, 'kind': m.kind, 'start': m.start,
+                 'doc_start': m.doc_start, 'body_start': m.body_start, 'end': m.end}
+                for m in idx.members()
+            ]
+            continue
+        print(f'{path}: {len(idx.tokens)} tokens, parsed in {ms:.1f}ms')
+        for info in idx.classes:
+            print(f'  class {info.name} ({len(info.members)} members)')
+            seen = {}
+            for m in info.members:
+                seen[m.name] = seen.get(m.name, 0) + 1
+                print(f'    {m.start:>7}-{m.end:<7} {m.kind:<11} {m.name}')
+            for name, count in seen.items():
+                if count > 1:
+                    print(f'    ⚠️  {name} defined {count} times')
+    if as_json:
+        print(json.dumps(out, indent=2))
+    return ok
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Method-level JS patch tool')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    p_index = sub.add_parser('index', help='list class members with offsets')
+    p_index.add_argument('files', nargs='+')
+    p_index.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+    if args.cmd == 'index':
+        sys.exit(0 if _cmd_index(args.files, args.json) else 1)
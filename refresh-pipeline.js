@@ -0,0 +1,234 @@
+const crypto = require('crypto');
+const ShamirBatch = require('./shamir-batch');
+const ShareVerifier = require('./share-verifier');
+
+/**
+ * Bounded FIFO between two pipeline stages: put() waits while it is full,
+ * take() waits while it is empty and returns null once closed and drained.
+ */
+class BoundedQueue {
+  constructor(capacity) {
+    this.capacity = Math.max(1, capacity);
+    this.items = [];
+    this.closed = false;
+    this.error = null;
+    this.takers = [];
+    this.putters = [];
+    this.peak = 0;
+  }
+
+  async put(item) {
+    while (this.items.length >= this.capacity && !this.error) {
+      await new Promise(resolve => this.putters.push(resolve));
+    }
+    if (this.error) throw this.error;
+    this.items.push(item);
+    this.peak = Math.max(this.peak, this.items.length);
+    const taker = this.takers.shift();
+    if (taker) taker();
+  }
+
+  async take() {
+    while (this.items.length === 0 && !this.closed && !this.error) {
+      await new Promise(resolve => this.takers.push(resolve));
+    }
+    if (this.error) throw this.error;
+    if (this.items.length === 0) return null;
+    const item = this.items.shift();
+    const putter = this.putters.shift();
+    if (putter) putter();
+    return item;
+  }
+
+  close() {
+    this.closed = true;
+    this.takers.splice(0).forEach(resolve => resolve());
+  }
+
+  /**
+   * Abort both sides; returns whatever was still queued so it can be wiped
+   */
+  fail(error) {
+    if (!this.error) this.error = error;
+    this.takers.splice(0).forEach(resolve => resolve());
+    this.putters.splice(0).forEach(resolve => resolve());
+    return this.items.splice(0);
+  }
+}
+
+/**
+ * Refresh Pipeline
+ * Key refresh one key at a time, in three overlapping stages:
+ *
+ *   split       reconstruct a key from its old shares, re-split it for the
+ *               new members, commit to the new shares, wipe the key
+ *   encrypt     seal each new share for its recipient
+ *   distribute  hand the sealed shares (and commitments) to delivery
+ *
+ * Stages are joined by bounded queues (queueDepth items), so while one key
+ * is being delivered the next is already sealed and the one after is
+ * being split. At most one reconstructed key exists at any time and at most
+ * queueDepth keys' plaintext shares wait for encryption.
+ *
+ * There is no timer that can fire mid-refresh: each key's exposure (combine
+ * to wipe) is measured and reported instead, and a refresh is cancelled
+ * only through options.signal.
+ */
+class RefreshPipeline {
+  constructor(options = {}) {
+    this.threshold = options.threshold || 6;
+    this.queueDepth = Number(options.queueDepth || process.env.REFRESH_QUEUE_DEPTH || 2);
+    this.signal = options.signal || null;
+    this.log = options.log !== undefined ? options.log : console.log;
+    this.stats = null;
+  }
+
+  static wipeKey(key) {
+    // Same best effort as RefreshCoordinator.clearAllKeys (JS strings are immutable)
+    Buffer.from(key, 'hex').fill(0);
+    return crypto.randomBytes(32).toString('hex');
+  }
+
+  static wipeShares(shareMap) {
+    for (const member of Object.keys(shareMap)) {
+      shareMap[member] = null;
+    }
+  }
+
+  /**
+   * Run a refresh.
+   *
+   * @param {Object} collectedShares  original member -> old shares of its key
+   * @param {string[]} originalMembers  owners of the keys to refresh, in order
+   * @param {string[]} newMembers  recipients of the new shares
+   * @param {Object} stages
+   *   encrypt(member, share, owner) -> sealed share (optional; default: as is)
+   *   distribute({ owner, shares: member -> sealed, commitments }) -> void
+   * @returns stats for the run
+   */
+  async run(collectedShares, originalMembers, newMembers, { encrypt, distribute }) {
+    if (typeof distribute !== 'function') {
+      throw new Error('RefreshPipeline needs a distribute stage');
+    }
+    for (const owner of originalMembers) {
+      const shares = collectedShares[owner];
+      if (!shares || shares.length < this.threshold) {
+        throw new Error(`Insufficient shares for ${owner}: ${shares?.length || 0}/${this.threshold}`);
+      }
+    }
+
+    const stats = {
+      keys: originalMembers.length,
+      members: newMembers.length,
+      done: 0,
+      splitMs: 0,
+      encryptMs: 0,
+      distributeMs: 0,
+      maxKeyExposureMs: 0,
+      keysInMemory: 0,
+      peakKeysInMemory: 0,
+      peakQueued: 0,
+      totalMs: 0
+    };
+    this.stats = stats;
+    const startTime = Date.now();
+    const toEncrypt = new BoundedQueue(this.queueDepth);
+    const toDistribute = new BoundedQueue(this.queueDepth);
+    const commitments = {};
+
+    const abort = (error) => {
+      for (const item of [...toEncrypt.fail(error), ...toDistribute.fail(error)]) {
+        RefreshPipeline.wipeShares(item.shares);
+      }
+    };
+    const onAbort = () => abort(new Error('Key refresh aborted'));
+    if (this.signal) {
+      if (this.signal.aborted) throw new Error('Key refresh aborted');
+      this.signal.addEventListener('abort', onAbort, { once: true });
+    }
+
+    const splitStage = async () => {
+      for (const owner of originalMembers) {
+        if (toEncrypt.error) return;
+        const t0 = Date.now();
+        stats.keysInMemory++;
+        stats.peakKeysInMemory = Math.max(stats.peakKeysInMemory, stats.keysInMemory);
+        let key = ShamirBatch.combine(collectedShares[owner].slice(0, this.threshold));
+        let newShares;
+        try {
+          newShares = ShamirBatch.split(key, newMembers.length, this.threshold);
+        } finally {
+          key = RefreshPipeline.wipeKey(key);
+          key = null;
+          stats.keysInMemory--;
+        }
+        const exposure = Date.now() - t0;
+        stats.maxKeyExposureMs = Math.max(stats.maxKeyExposureMs, exposure);
+
+        commitments[owner] = ShareVerifier.createShareCommitments(newShares, this.threshold);
+        const shares = {};
+        newMembers.forEach((member, i) => { shares[member] = newShares[i]; });
+        newShares.fill(null);
+        stats.splitMs += Date.now() - t0;
+
+        await toEncrypt.put({ owner, shares, commitments: commitments[owner] });
+        // Let the later stages run between keys
+        await new Promise(resolve => setImmediate(resolve));
+      }
+      toEncrypt.close();
+    };
+
+    const encryptStage = async () => {
+      for (let item; (item = await toEncrypt.take()) !== null;) {
+        const t0 = Date.now();
+        const sealed = {};
+        try {
+          await Promise.all(newMembers.map(async member => {
+            sealed[member] = encrypt ? await encrypt(member, item.shares[member], item.owner) : item.shares[member];
+          }));
+        } finally {
+          RefreshPipeline.wipeShares(item.shares);
+        }
+        stats.encryptMs += Date.now() - t0;
+        await toDistribute.put({ owner: item.owner, shares: sealed, commitments: item.commitments });
+      }
+      toDistribute.close();
+    };
+
+    const distributeStage = async () => {
+      for (let item; (item = await toDistribute.take()) !== null;) {
+        const t0 = Date.now();
+        try {
+          await distribute(item);
+        } finally {
+          RefreshPipeline.wipeShares(item.shares);
+        }
+        stats.distributeMs += Date.now() - t0;
+        stats.done++;
+        if (this.log) {
+          this.log(`  ✓ Refreshed key of ${item.owner.slice(0, 10)}... (${stats.done}/${stats.keys})`);
+        }
+      }
+    };
+
+    // First failure stops every stage and wipes anything still queued
+    const guard = stage => stage().catch(error => {
+      abort(error);
+      throw error;
+    });
+    try {
+      const results = await Promise.allSettled([guard(splitStage), guard(encryptStage), guard(distributeStage)]);
+      const failed = results.find(r => r.status === 'rejected');
+      if (failed) throw toEncrypt.error || failed.reason;
+    } finally {
+      if (this.signal) this.signal.removeEventListener('abort', onAbort);
+      stats.peakQueued = Math.max(toEncrypt.peak, toDistribute.peak);
+      stats.totalMs = Date.now() - startTime;
+    }
+    stats.commitments = commitments;
+    return stats;
+  }
+}
+
+module.exports = RefreshPipeline;
+module.exports.BoundedQueue = BoundedQueue;
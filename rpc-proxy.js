@@ -0,0 +1,392 @@
+#!/usr/bin/env node
+require('dotenv').config();
+const http = require('http');
+const https = require('https');
+const axios = require('axios');
+const Metrics = require('./metrics');
+
+// Block-scoped reads: method -> index of the block tag parameter
+const BLOCK_SCOPED = {
+  eth_call: 1,
+  eth_getBalance: 1,
+  eth_getCode: 1,
+  eth_getStorageAt: 2,
+  eth_getTransactionCount: 1
+};
+
+// Identical concurrent requests may share one upstream call (no side effects,
+// no per-caller state such as filter ids)
+const SHAREABLE = new Set([
+  ...Object.keys(BLOCK_SCOPED),
+  'eth_blockNumber', 'eth_chainId', 'net_version',
+  'eth_getBlockByNumber', 'eth_getBlockByHash',
+  'eth_getTransactionByHash', 'eth_getTransactionReceipt',
+  'eth_getLogs', 'eth_gasPrice', 'eth_maxPriorityFeePerGas', 'eth_feeHistory', 'eth_estimateGas'
+]);
+
+// Answers that never change for an upstream
+const CONSTANT = new Set(['eth_chainId', 'net_version']);
+
+const WRITES = new Set(['eth_sendRawTransaction', 'eth_sendTransaction']);
+
+/**
+ * RPC Proxy
+ * Local JSON-RPC sidecar shared by the znode processes on one host. Nodes
+ * set RPC_URL to it; it forwards to RPC_PROXY_UPSTREAM.
+ *
+ * - Identical in-flight reads are sent upstream once
+ * - Block-scoped reads (eth_call, eth_getBalance, ...) are cached per block
+ *   number, keeping the newest maxBlocks blocks. 'latest' is resolved to
+ *   the upstream head, itself shared for headTtlMs.
+ * - Writes, pending-state reads and filter methods pass straight through;
+ *   a sent transaction drops the shared head so reads catch up with it
+ * - Misses from one client batch go upstream as one batch
+ *
+ * Stats: GET /stats (JSON), GET /metrics (Prometheus).
+ */
+class RpcProxy {
+  constructor(options = {}) {
+    this.upstream = options.upstream || process.env.RPC_PROXY_UPSTREAM;
+    if (!this.upstream) throw new Error('RPC_PROXY_UPSTREAM not set');
+    this.host = options.host || process.env.RPC_PROXY_HOST || '127.0.0.1';
+    this.port = Number(options.port ?? process.env.RPC_PROXY_PORT ?? 8546);
+    this.headTtlMs = Number(options.headTtlMs ?? process.env.RPC_PROXY_HEAD_TTL_MS ?? 1000);
+    this.maxBlocks = Number(options.maxBlocks ?? process.env.RPC_PROXY_MAX_BLOCKS ?? 8);
+    this.timeoutMs = Number(options.timeoutMs ?? process.env.RPC_PROXY_TIMEOUT_MS ?? 30000);
+    this.maxBodyBytes = options.maxBodyBytes || 5 * 1024 * 1024;
+
+    const agentOptions = { keepAlive: true, maxSockets: options.maxSockets || 16 };
+    this.httpAgent = new http.Agent(agentOptions);
+    this.httpsAgent = new https.Agent(agentOptions);
+
+    this.cache = new Map();     // blockNumber -> Map(key -> result)
+    this.constants = new Map(); // key -> result
+    this.inflight = new Map();  // key -> Promise<response>
+    this.head = null;           // { number, at }
+    this.headInflight = null;
+    this._nextId = 1;
+
+    this.metrics = new Metrics({ prefix: 'rpcproxy_' });
+    this.stats = { requests: 0, cacheHits: 0, shared: 0, upstreamCalls: 0, upstreamBatches: 0, passthrough: 0, writes: 0, errors: 0 };
+    this.server = null;
+    this.logTimer = null;
+  }
+
+  // --- upstream ---
+
+  async _post(body) {
+    const response = await axios.post(this.upstream, body, {
+      httpAgent: this.httpAgent,
+      httpsAgent: this.httpsAgent,
+      timeout: this.timeoutMs,
+      headers: { 'Content-Type': 'application/json' }
+    });
+    return response.data;
+  }
+
+  /**
+   * Send calls upstream in one batch with our own ids; resolves with the
+   * response object for each call in order
+   */
+  async _forward(calls) {
+    this.stats.upstreamBatches++;
+    this.stats.upstreamCalls += calls.length;
+    const requests = calls.map(({ method, params }) => ({ jsonrpc: '2.0', id: this._nextId++, method, params }));
+    for (const { method } of calls) {
+      this.metrics.inc(`${this.metrics.prefix}upstream_calls_total`, { method }, 1, 'Calls forwarded upstream');
+    }
+
+    let data;
+    try {
+      data = await this._post(requests.length === 1 ? requests[0] : requests);
+    } catch (error) {
+      this.stats.errors += calls.length;
+      const message = error.response ? `Upstream HTTP ${error.response.status}` : `Upstream unavailable: ${error.message}`;
+      return requests.map(() => ({ error: { code: -32603, message } }));
+    }
+
+    const byId = new Map((Array.isArray(data) ? data : [data]).map(r => [r && r.id, r]));
+    return requests.map(({ id }) => {
+      const r = byId.get(id);
+      if (!r) return { error: { code: -32603, message: 'Missing upstream response' } };
+      return r.error ? { error: r.error } : { result: r.result };
+    });
+  }
+
+  /**
+   * Upstream head block number, shared by all callers for headTtlMs
+   */
+  async _headBlock() {
+    if (this.head && Date.now() - this.head.at < this.headTtlMs) return this.head.number;
+    if (!this.headInflight) {
+      this.headInflight = this._forward([{ method: 'eth_blockNumber', params: [] }])
+        .then(([response]) => {
+          if (response.error) throw new Error(response.error.message);
+          const number = Number(response.result);
+          if (!this.head || number >= this.head.number || Date.now() - this.head.at >= this.headTtlMs) {
+            this.head = { number, at: Date.now() };
+          }
+          return number;
+        })
+        .finally(() => { this.headInflight = null; });
+    }
+    return this.headInflight;
+  }
+
+  // --- request classification ---
+
+  /**
+   * { key, block } for cacheable/shareable calls; block is the number the
+   * result belongs to (null = not block-scoped)
+   */
+  async _classify(method, params) {
+    if (CONSTANT.has(method)) return { key: method, block: null, constant: true };
+    if (!SHAREABLE.has(method)) return null;
+
+    const tagIndex = BLOCK_SCOPED[method];
+    if (tagIndex === undefined) return { key: `${method}:${JSON.stringify(params)}`, block: null };
+
+    const tag = params.length > tagIndex ? params[tagIndex] : 'latest';
+    const rest = JSON.stringify(params.slice(0, tagIndex));
+    if (typeof tag === 'string' && /^0x[0-9a-fA-F]+$/.test(tag)) {
+      return { key: `${method}:${Number(tag)}:${rest}`, block: Number(tag) };
+    }
+    if (tag === 'latest') {
+      // Forwarded as 'latest' and keyed by the shared head; kept apart from
+      // explicit-number keys since upstream may already be one block ahead
+      const head = await this._headBlock();
+      return { key: `${method}:latest@${head}:${rest}`, block: head };
+    }
+    // pending / safe / finalized / block hash objects: share in-flight only
+    return { key: `${method}:${JSON.stringify(params)}`, block: null };
+  }
+
+  _cached(c) {
+    if (c.constant) return this.constants.get(c.key);
+    if (c.block === null) return undefined;
+    const blockCache = this.cache.get(c.block);
+    return blockCache ? blockCache.get(c.key) : undefined;
+  }
+
+  _store(c, result) {
+    if (c.constant) {
+      this.constants.set(c.key, result);
+      return;
+    }
+    if (c.block === null) return;
+    let blockCache = this.cache.get(c.block);
+    if (!blockCache) {
+      blockCache = new Map();
+      this.cache.set(c.block, blockCache);
+      // Evict oldest blocks
+      const blocks = [...this.cache.keys()].sort((a, b) => a - b);
+      while (blocks.length > this.maxBlocks) {
+        this.cache.delete(blocks.shift());
+      }
+    }
+    blockCache.set(c.key, result);
+  }
+
+  // --- request handling ---
+
+  /**
+   * Answer one client payload (single request or batch)
+   */
+  async handlePayload(payload) {
+    const batch = Array.isArray(payload);
+    const requests = batch ? payload : [payload];
+    if (requests.length === 0) {
+      return { jsonrpc: '2.0', id: null, error: { code: -32600, message: 'Empty batch' } };
+    }
+
+    const misses = { calls: [], scheduled: false };
+    const answers = await Promise.all(requests.map(async request => {
+      if (!request || typeof request.method !== 'string') {
+        return { error: { code: -32600, message: 'Invalid request' } };
+      }
+      const method = request.method;
+      const params = Array.isArray(request.params) ? request.params : [];
+      this.stats.requests++;
+
+      let c = null;
+      try {
+        if (method === 'eth_blockNumber') {
+          // Every node polls the head; answer from the shared one
+          const outcome = this.head && Date.now() - this.head.at < this.headTtlMs ? 'hit'
+            : this.headInflight ? 'shared' : 'miss';
+          const number = await this._headBlock();
+          if (outcome === 'hit') this.stats.cacheHits++;
+          if (outcome === 'shared') this.stats.shared++;
+          this._count(method, outcome);
+          return { result: '0x' + number.toString(16) };
+        }
+        c = await this._classify(method, params);
+      } catch (error) {
+        this.stats.errors++;
+        return { error: { code: -32603, message: `Upstream head unavailable: ${error.message}` } };
+      }
+
+      if (!c) {
+        this.stats[WRITES.has(method) ? 'writes' : 'passthrough']++;
+        this._count(method, 'passthrough');
+        const response = await this._queue(misses, method, params);
+        if (WRITES.has(method) && !response.error) this.head = null;
+        return response;
+      }
+
+      const hit = this._cached(c);
+      if (hit !== undefined) {
+        this.stats.cacheHits++;
+        this._count(method, 'hit');
+        return { result: hit };
+      }
+
+      let pending = this.inflight.get(c.key);
+      if (pending) {
+        this.stats.shared++;
+        this._count(method, 'shared');
+        return pending;
+      }
+      this._count(method, 'miss');
+      pending = this._queue(misses, method, params).then(response => {
+        if (!response.error) this._store(c, response.result);
+        return response;
+      }).finally(() => this.inflight.delete(c.key));
+      this.inflight.set(c.key, pending);
+      return pending;
+    }));
+
+    const responses = answers.map((answer, i) => ({ jsonrpc: '2.0', id: requests[i] ? requests[i].id ?? null : null, ...answer }));
+    return batch ? responses : responses[0];
+  }
+
+  /**
+   * Queue a call for upstream; a payload's calls queued in the same tick
+   * are forwarded as one batch
+   */
+  _queue(misses, method, params) {
+    return new Promise(settle => {
+      misses.calls.push({ method, params, settle });
+      if (misses.scheduled) return;
+      misses.scheduled = true;
+      setImmediate(async () => {
+        const calls = misses.calls.splice(0);
+        misses.scheduled = false;
+        const responses = await this._forward(calls);
+        calls.forEach((call, i) => call.settle(responses[i]));
+      });
+    });
+  }
+
+  _count(method, result) {
+    this.metrics.inc(`${this.metrics.prefix}requests_total`, { method, result }, 1, 'Client requests by outcome');
+  }
+
+  // --- HTTP ---
+
+  async handleHttp(req, res) {
+    if (req.method === 'GET') {
+      if (req.url === '/stats') {
+        res.setHeader('Content-Type', 'application/json');
+        res.end(JSON.stringify(this.getStats()));
+      } else if (req.url === '/metrics') {
+        res.setHeader('Content-Type', 'text/plain; version=0.0.4');
+        res.end(this.metrics.render());
+      } else {
+        res.statusCode = 404;
+        res.end();
+      }
+      return;
+    }
+    if (req.method !== 'POST') {
+      res.statusCode = 405;
+      res.end();
+      return;
+    }
+
+    const chunks = [];
+    let size = 0;
+    for await (const chunk of req) {
+      size += chunk.length;
+      if (size > this.maxBodyBytes) {
+        res.statusCode = 413;
+        res.end();
+        return;
+      }
+      chunks.push(chunk);
+    }
+
+    let payload;
+    try {
+      payload = JSON.parse(Buffer.concat(chunks).toString('utf8'));
+    } catch {
+      res.setHeader('Content-Type', 'application/json');
+      res.end(JSON.stringify({ jsonrpc: '2.0', id: null, error: { code: -32700, message: 'Parse error' } }));
+      return;
+    }
+
+    const response = await this.handlePayload(payload);
+    res.setHeader('Content-Type', 'application/json');
+    res.end(JSON.stringify(response));
+  }
+
+  async start() {
+    this.server = http.createServer((req, res) => {
+      this.handleHttp(req, res).catch(error => {
+        console.error('[RpcProxy] Request failed:', error.message);
+        if (!res.headersSent) res.statusCode = 500;
+        res.end();
+      });
+    });
+    this.server.keepAliveTimeout = 65000;
+    await new Promise((resolve, reject) => {
+      this.server.once('error', reject);
+      this.server.listen(this.port, this.host, resolve);
+    });
+    this.port = this.server.address().port;
+    console.log(`✓ RPC proxy on http://${this.host}:${this.port} → ${this.upstream.replace(/\/v2\/.*/, '/v2/…')}`);
+    return this;
+  }
+
+  startStatsLog(intervalMs = 60000) {
+    this.logTimer = setInterval(() => {
+      const s = this.getStats();
+      console.log(`[RpcProxy] ${s.requests} requests, hit rate ${(s.hitRate * 100).toFixed(1)}%, ` +
+        `${s.upstreamCalls} upstream calls in ${s.upstreamBatches} batches, ${s.errors} errors`);
+    }, intervalMs);
+    this.logTimer.unref();
+  }
+
+  async stop() {
+    if (this.logTimer) clearInterval(this.logTimer);
+    if (this.server) await new Promise(resolve => this.server.close(resolve));
+    this.httpAgent.destroy();
+    this.httpsAgent.destroy();
+  }
+
+  getStats() {
+    const served = this.stats.cacheHits + this.stats.shared;
+    return {
+      ...this.stats,
+      hitRate: this.stats.requests ? served / this.stats.requests : 0,
+      cachedBlocks: this.cache.size,
+      cachedEntries: [...this.cache.values()].reduce((n, m) => n + m.size, 0),
+      head: this.head ? this.head.number : null
+    };
+  }
+}
+
+if (require.main === module) {
+  const proxy = new RpcProxy();
+  proxy.start().then(() => {
+    proxy.startStatsLog(Number(process.env.RPC_PROXY_LOG_MS || 60000));
+  }).catch(error => {
+    console.error('RPC proxy failed to start:', error.message);
+    process.exit(1);
+  });
+  const shutdown = () => proxy.stop().then(() => process.exit(0));
+  process.on('SIGINT', shutdown);
+  process.on('SIGTERM', shutdown);
+}
+
+module.exports = RpcProxy;
@@ -1,5 +1,8 @@
 const secrets = require('secrets.js-grempe');
 const crypto = require('crypto');
+const ShamirBatch = require('./shamir-batch');
+const ShareVerifier = require('./share-verifier');
+const RefreshPipeline = require('./refresh-pipeline');
 
 /**
  * Secure Signing System
@@ -81,6 +84,34 @@ class SecureSigningSystem {
     }
   }
 
+  /**
+   * Sign several items with MY key, then clear. The first item is always
+   * signed; later ones only while the key is within MAX_KEY_LIFETIME_MS.
+   * Returns one { ok, value | error } per signed item, so a result shorter
+   * than items means the rest need a new reconstruction.
+   */
+  async signManyAndClear(items, signFunction) {
+    if (!this.myKey) {
+      throw new Error('No key available - must reconstruct first');
+    }
+
+    const results = [];
+    try {
+      for (const item of items) {
+        if (results.length > 0 && Date.now() - this.keyTimestamp > this.MAX_KEY_LIFETIME_MS) break;
+        try {
+          results.push({ ok: true, value: await signFunction(this.myKey, item) });
+        } catch (error) {
+          results.push({ ok: false, error });
+        }
+      }
+      return results;
+    } finally {
+      // ALWAYS clear, even on error
+      this.clearMyKey();
+    }
+  }
+
   /**
    * CRITICAL: Zero out MY key from memory
    */
@@ -121,6 +152,180 @@ class SecureSigningSystem {
   }
 }
 
+/**
+ * Signing Session
+ * Queues signing requests for a short window (windowMs) and serves them
+ * with one share collection and one reconstruction per batch instead of one
+ * per request. Batches run one at a time; whatever does not fit in the key
+ * lifetime budget goes back to the head of the queue for the next batch.
+ *
+ * Back-pressure: sign() rejects at once with code SIGNING_BACKPRESSURE when
+ * maxPending requests are already waiting.
+ *
+ * Default batch: collectShares(requests) -> my shares, then
+ * signer.reconstructMyKey + signer.signManyAndClear(payloads, signFunction).
+ * options.runBatch(requests) -> [{ ok, value | error }] replaces it.
+ */
+class SigningSession {
+  constructor(options = {}) {
+    this.signer = options.signer || null;
+    this.collectShares = options.collectShares || null;
+    this.signFunction = options.signFunction || null;
+    this.runBatch = options.runBatch || (requests => this._reconstructAndSign(requests));
+    if (!options.runBatch && !(this.signer && this.collectShares && this.signFunction)) {
+      throw new Error('SigningSession needs runBatch or signer, collectShares and signFunction');
+    }
+
+    this.windowMs = Number(options.windowMs ?? process.env.SIGNING_BATCH_WINDOW_MS ?? 20);
+    this.maxBatch = Number(options.maxBatch || process.env.SIGNING_BATCH_MAX || 32);
+    this.maxPending = Number(options.maxPending || process.env.SIGNING_MAX_PENDING || 256);
+    this.metrics = options.metrics || null;
+
+    this.queue = [];
+    this.timer = null;
+    this.running = false;
+    this.closed = false;
+    this.latencies = []; // recent request latencies (ms), for getStats()
+    this.maxLatencies = 1024;
+    this.stats = { requests: 0, signed: 0, failed: 0, rejected: 0, batches: 0, requeued: 0 };
+  }
+
+  /**
+   * Queue one payload for signing; resolves with its signature
+   */
+  sign(payload) {
+    if (this.closed) {
+      return Promise.reject(new Error('Signing session closed'));
+    }
+    if (this.queue.length >= this.maxPending) {
+      this.stats.rejected++;
+      if (this.metrics) this.metrics.inc('znode_signing_rejected_total', {}, 1, 'Signing requests refused by back-pressure');
+      const error = new Error(`Signing queue full (${this.queue.length} pending)`);
+      error.code = 'SIGNING_BACKPRESSURE';
+      return Promise.reject(error);
+    }
+
+    this.stats.requests++;
+    return new Promise((resolve, reject) => {
+      this.queue.push({ payload, resolve, reject, queuedAt: Date.now() });
+      this._schedule();
+    });
+  }
+
+  get pending() {
+    return this.queue.length;
+  }
+
+  _schedule() {
+    if (this.running || this.queue.length === 0) return;
+    if (this.queue.length >= this.maxBatch || this.windowMs <= 0) {
+      if (this.timer) clearTimeout(this.timer);
+      this.timer = null;
+      setImmediate(() => this._flush());
+    } else if (!this.timer) {
+      this.timer = setTimeout(() => {
+        this.timer = null;
+        this._flush();
+      }, this.windowMs);
+    }
+  }
+
+  async _flush() {
+    if (this.running || this.queue.length === 0) return;
+    this.running = true;
+    const batch = this.queue.splice(0, this.maxBatch);
+    const startedAt = Date.now();
+    this.stats.batches++;
+    if (this.metrics) {
+      this.metrics.observe('znode_signing_batch_size', {}, batch.length, 'Requests per reconstruction',
+        [1, 2, 4, 8, 16, 32, 64, 128]);
+    }
+
+    let results;
+    try {
+      results = await this.runBatch(batch.map(r => r.payload));
+    } catch (error) {
+      results = batch.map(() => ({ ok: false, error }));
+    }
+
+    const now = Date.now();
+    batch.forEach((request, i) => {
+      const result = results[i];
+      if (!result) return;
+      const status = result.ok ? 'ok' : 'error';
+      if (result.ok) {
+        this.stats.signed++;
+        request.resolve(result.value);
+      } else {
+        this.stats.failed++;
+        request.reject(result.error);
+      }
+      this._record(request, startedAt, now, status);
+    });
+
+    // Out of key lifetime: unsigned requests go first in the next batch
+    const unsigned = batch.slice(results.length);
+    if (unsigned.length > 0 && this.closed) {
+      const error = new Error('Signing session closed');
+      unsigned.forEach(request => request.reject(error));
+    } else if (unsigned.length > 0) {
+      this.stats.requeued += unsigned.length;
+      this.queue.unshift(...unsigned);
+    }
+
+    this.running = false;
+    if (this.queue.length > 0) {
+      // Requests that already waited a full window go out immediately
+      const oldest = now - this.queue[0].queuedAt;
+      if (oldest >= this.windowMs) {
+        setImmediate(() => this._flush());
+      } else {
+        this._schedule();
+      }
+    }
+  }
+
+  async _reconstructAndSign(payloads) {
+    const shares = await this.collectShares(payloads);
+    await this.signer.reconstructMyKey(shares);
+    return this.signer.signManyAndClear(payloads, this.signFunction);
+  }
+
+  _record(request, startedAt, finishedAt, status) {
+    const total = finishedAt - request.queuedAt;
+    this.latencies.push(total);
+    if (this.latencies.length > this.maxLatencies) this.latencies.shift();
+    if (this.metrics) {
+      this.metrics.observe('znode_signing_queue_seconds', {}, (startedAt - request.queuedAt) / 1000,
+        'Time a signing request waited for its batch');
+      this.metrics.observe('znode_signing_request_seconds', { status }, total / 1000,
+        'Signing request latency, queued to signed');
+    }
+  }
+
+  /**
+   * Reject everything still queued
+   */
+  close() {
+    this.closed = true;
+    if (this.timer) clearTimeout(this.timer);
+    this.timer = null;
+    const error = new Error('Signing session closed');
+    this.queue.splice(0).forEach(request => request.reject(error));
+  }
+
+  getStats() {
+    const sorted = [...this.latencies].sort((a, b) => a - b);
+    const pct = p => (sorted.length ? sorted[Math.min(sorted.length - 1, Math.floor(p * sorted.length))] : 0);
+    return {
+      ...this.stats,
+      pending: this.queue.length,
+      avgBatch: this.stats.batches ? (this.stats.signed + this.stats.failed) / this.stats.batches : 0,
+      latencyMs: { p50: pct(0.5), p90: pct(0.9), p99: pct(0.99), max: sorted.length ? sorted[sorted.length - 1] : 0 }
+    };
+  }
+}
+
 /**
  * Refresh Coordinator
  * ONLY used during membership changes
@@ -130,6 +335,8 @@ class RefreshCoordinator {
   constructor() {
     this.allKeys = new Map();
     this.reconstructionTimestamp = null;
+    // Per-key share commitments from the last re-split (safe to publish)
+    this.shareCommitments = {};
   }
 
   /**
@@ -157,13 +364,16 @@ class RefreshCoordinator {
         if (!shares || shares.length < 6) {
           throw new Error(`Insufficient shares for ${nodeAddr}: ${shares?.length || 0}/6`);
         }
+      }
 
-        const key = secrets.combine(shares.slice(0, 6));
-        this.allKeys.set(nodeAddr, key);
-        reconstructed[nodeAddr] = key;
+      // Every key in one batch (same share ids -> shared Lagrange coefficients)
+      const keys = ShamirBatch.combineMany(originalMembers.map(nodeAddr => collectedShares[nodeAddr].slice(0, 6)));
+      originalMembers.forEach((nodeAddr, i) => {
+        this.allKeys.set(nodeAddr, keys[i]);
+        reconstructed[nodeAddr] = keys[i];
         
         console.log(`  ✓ Reconstructed key for ${nodeAddr.slice(0, 10)}...`);
-      }
+      });
 
       clearTimeout(destructTimer);
       this.reconstructionTimestamp = Date.now();
@@ -193,17 +403,21 @@ class RefreshCoordinator {
     const startTime = Date.now();
     const newShareSets = {};
 
-    // For each original key
-    for (const [originalNode, key] of this.allKeys.entries()) {
-      // Split into new shares
-      const shares = secrets.share(key, newMembers.length, threshold);
-      
+    // Split every original key into new shares in one batch
+    const originalNodes = [...this.allKeys.keys()];
+    const shareSets = ShamirBatch.splitMany([...this.allKeys.values()], newMembers.length, threshold);
+
+    this.shareCommitments = {};
+    originalNodes.forEach((originalNode, i) => {
+      // Commitments let receivers check shares without combining them
+      this.shareCommitments[originalNode] = ShareVerifier.createShareCommitments(shareSets[i], threshold);
+
       // Distribute to new members
       newShareSets[originalNode] = {};
       newMembers.forEach((memberAddr, idx) => {
-        newShareSets[originalNode][memberAddr] = shares[idx];
+        newShareSets[originalNode][memberAddr] = shareSets[i][idx];
       });
-    }
+    });
 
     console.log(`✓ Re-split completed in ${Date.now() - startTime}ms\n`);
     
@@ -211,28 +425,26 @@ class RefreshCoordinator {
   }
 
   /**
-   * Complete refresh cycle
+   * Complete refresh cycle, streamed one key at a time (RefreshPipeline):
+   * each key is reconstructed, re-split and wiped before the next one, and
+   * encryptAndDistribute(newShareSets, shareCommitments) is called once per
+   * key with that key's entry only. options: queueDepth, signal, encrypt.
    */
-  async performRefresh(collectedShares, originalMembers, newMembers, encryptAndDistribute) {
-    try {
-      // Step 1: Reconstruct all original keys
-      await this.reconstructAllKeys(collectedShares, originalMembers);
-      
-      // Step 2: Re-split for new members
-      const newShareSets = await this.resplitAllKeys(newMembers);
-      
-      // Step 3: Encrypt and distribute (provided by caller)
-      await encryptAndDistribute(newShareSets);
-      
-      // Step 4: Clear ALL keys immediately
-      this.clearAllKeys();
-      
-      console.log('✅ Refresh complete - all keys cleared\n');
-      
-    } catch (error) {
-      this.clearAllKeys();
-      throw error;
-    }
+  async performRefresh(collectedShares, originalMembers, newMembers, encryptAndDistribute, options = {}) {
+    const pipeline = new RefreshPipeline({ threshold: options.threshold, queueDepth: options.queueDepth, signal: options.signal });
+    this.shareCommitments = {};
+
+    const stats = await pipeline.run(collectedShares, originalMembers, newMembers, {
+      encrypt: options.encrypt,
+      distribute: async ({ owner, shares, commitments }) => {
+        this.shareCommitments[owner] = commitments;
+        await encryptAndDistribute({ [owner]: shares }, { [owner]: commitments });
+      }
+    });
+
+    console.log(`✅ Refresh complete - ${stats.keys} keys in ${stats.totalMs}ms, ` +
+      `at most ${stats.peakKeysInMemory} in memory (longest ${stats.maxKeyExposureMs}ms)\n`);
+    return stats;
   }
 
   /**
@@ -287,4 +499,4 @@ class RefreshCoordinator {
   }
 }
 
-module.exports = { SecureSigningSystem, RefreshCoordinator };
+module.exports = { SecureSigningSystem, SigningSession, RefreshCoordinator };
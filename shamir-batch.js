@@ -0,0 +1,208 @@
+const crypto = require('crypto');
+
+const BITS = 8;
+const SIZE = 1 << BITS;
+const MAX = SIZE - 1;
+const PRIMITIVE = 29;
+const PAD_BITS = 128;
+
+const EXP = new Uint8Array(MAX * 2);
+const LOG = new Uint8Array(SIZE);
+(() => {
+  let x = 1;
+  for (let i = 0; i < MAX; i++) {
+    EXP[i] = x;
+    EXP[i + MAX] = x;
+    LOG[x] = i;
+    x <<= 1;
+    if (x >= SIZE) {
+      x = (x ^ PRIMITIVE) & MAX;
+    }
+  }
+})();
+
+// MUL[a * 256 + b] = a * b in GF(256)
+const MUL = new Uint8Array(SIZE * SIZE);
+for (let a = 1; a < SIZE; a++) {
+  for (let b = 1; b < SIZE; b++) {
+    MUL[a * SIZE + b] = EXP[LOG[a] + LOG[b]];
+  }
+}
+
+const SHARE_PATTERN = /^8([0-9a-fA-F]{2})([0-9a-fA-F]+)$/;
+const lagrangeCache = new Map();
+
+/**
+ * Batched Shamir Secret Sharing over GF(256)
+ * Splits / combines every key of a cluster in one call, working on Buffers.
+ *
+ * Shares are byte-for-byte what secrets.js-grempe produces and accepts with
+ * its defaults (8 bits, primitive polynomial 29, padLength 128): a '8' bits
+ * marker, a 2-hex-digit share id and the hex share data, where the secret is
+ * prefixed with a single 1 bit and left-padded to a multiple of 128 bits.
+ * Either implementation can combine the other's shares.
+ *
+ * Field multiplication uses a 64 KiB product table built from the log/exp
+ * tables, and the Lagrange coefficients for a given set of share ids are
+ * computed once and reused for every byte of every key.
+ */
+class ShamirBatch {
+  /**
+   * Secret hex string -> marker-prefixed, 128-bit padded bytes
+   */
+  static encodeSecret(secret) {
+    const hex = Buffer.isBuffer(secret) ? secret.toString('hex') : String(secret);
+    if (!/^[0-9a-fA-F]*$/.test(hex)) {
+      throw new Error('Invalid hex character in secret');
+    }
+    const bits = hex.length * 4 + 1;
+    const bytes = Buffer.alloc(Math.ceil(bits / PAD_BITS) * PAD_BITS / 8);
+    const body = Buffer.from(hex.length % 2 ? '0' + hex : hex, 'hex');
+    body.copy(bytes, bytes.length - body.length);
+    body.fill(0);
+    const markerBit = hex.length * 4;
+    bytes[bytes.length - 1 - (markerBit >> 3)] |= 1 << (markerBit & 7);
+    return bytes;
+  }
+
+  /**
+   * Inverse of encodeSecret: drop everything up to and including the marker bit
+   */
+  static decodeSecret(bytes) {
+    let first = 0;
+    while (first < bytes.length && bytes[first] === 0) first++;
+    if (first === bytes.length) {
+      return bytes.toString('hex');
+    }
+    const markerBit = 31 - Math.clz32(bytes[first]);
+    const remainingBits = (bytes.length - first - 1) * 8 + markerBit;
+    const tail = Buffer.from(bytes.subarray(first));
+    tail[0] &= (1 << markerBit) - 1;
+    const hex = tail.toString('hex');
+    tail.fill(0);
+    return hex.slice(hex.length - Math.ceil(remainingBits / 4));
+  }
+
+  static parseShare(share) {
+    const match = SHARE_PATTERN.exec(share);
+    if (!match) {
+      throw new Error(`Invalid share (only 8-bit secrets.js shares are supported): ${String(share).slice(0, 16)}...`);
+    }
+    const id = parseInt(match[1], 16);
+    if (id < 1) {
+      throw new Error('Invalid share id 0');
+    }
+    const data = match[2].length % 2 ? '0' + match[2] : match[2];
+    return { id, data: Buffer.from(data, 'hex') };
+  }
+
+  static formatShare(id, data) {
+    return '8' + id.toString(16).padStart(2, '0') + data.toString('hex');
+  }
+
+  /**
+   * Lagrange basis values at x = 0 for a set of share ids (cached)
+   */
+  static lagrangeAtZero(ids) {
+    const key = ids.join(',');
+    let coeffs = lagrangeCache.get(key);
+    if (!coeffs) {
+      coeffs = new Uint8Array(ids.length);
+      for (let i = 0; i < ids.length; i++) {
+        let log = 0;
+        for (let j = 0; j < ids.length; j++) {
+          if (i !== j) {
+            log = (log + LOG[ids[j]] - LOG[ids[i] ^ ids[j]] + MAX) % MAX;
+          }
+        }
+        coeffs[i] = EXP[log];
+      }
+      if (lagrangeCache.size > 1024) lagrangeCache.clear();
+      lagrangeCache.set(key, coeffs);
+    }
+    return coeffs;
+  }
+
+  /**
+   * Split each secret into numShares shares (any threshold of which recover it).
+   * Returns one array of share strings per secret, ids 1..numShares.
+   */
+  static splitMany(secretList, numShares, threshold) {
+    if (numShares < 2 || numShares > MAX || threshold < 2 || threshold > numShares) {
+      throw new Error(`Invalid split ${threshold}-of-${numShares}`);
+    }
+    return secretList.map(secret => {
+      const bytes = ShamirBatch.encodeSecret(secret);
+      const coeffs = crypto.randomBytes(bytes.length * (threshold - 1));
+      const y = Buffer.alloc(bytes.length);
+      const shares = [];
+
+      for (let x = 1; x <= numShares; x++) {
+        const row = x * SIZE;
+        // Horner: highest coefficient first, the secret is the constant term
+        coeffs.copy(y, 0, (threshold - 2) * bytes.length, (threshold - 1) * bytes.length);
+        for (let c = threshold - 3; c >= -1; c--) {
+          const term = c >= 0 ? coeffs.subarray(c * bytes.length, (c + 1) * bytes.length) : bytes;
+          for (let b = 0; b < y.length; b++) {
+            y[b] = MUL[row + y[b]] ^ term[b];
+          }
+        }
+        shares.push(ShamirBatch.formatShare(x, y));
+      }
+
+      bytes.fill(0);
+      coeffs.fill(0);
+      y.fill(0);
+      return shares;
+    });
+  }
+
+  static split(secret, numShares, threshold) {
+    return ShamirBatch.splitMany([secret], numShares, threshold)[0];
+  }
+
+  /**
+   * Combine one set of shares per secret; returns the secrets as hex strings.
+   * Like secrets.combine, every distinct share given is used.
+   */
+  static combineMany(shareSets) {
+    return shareSets.map(shareSet => {
+      const ids = [];
+      const data = [];
+      for (const share of shareSet) {
+        const parsed = ShamirBatch.parseShare(share);
+        if (!ids.includes(parsed.id)) {
+          ids.push(parsed.id);
+          data.push(parsed.data);
+        }
+      }
+      if (ids.length === 0) {
+        throw new Error('No shares to combine');
+      }
+
+      const coeffs = ShamirBatch.lagrangeAtZero(ids);
+      const length = Math.max(...data.map(d => d.length));
+      const out = Buffer.alloc(length);
+      for (let i = 0; i < ids.length; i++) {
+        const row = coeffs[i] * SIZE;
+        const share = data[i];
+        // Shorter shares are aligned to the least significant byte
+        const offset = length - share.length;
+        for (let b = 0; b < share.length; b++) {
+          out[offset + b] ^= MUL[row + share[b]];
+        }
+        share.fill(0);
+      }
+
+      const secret = ShamirBatch.decodeSecret(out);
+      out.fill(0);
+      return secret;
+    });
+  }
+
+  static combine(shares) {
+    return ShamirBatch.combineMany([shares])[0];
+  }
+}
+
+module.exports = ShamirBatch;
@@ -5,7 +5,9 @@
  * Maintains same interface/terminology for consistency
  */
 
+const crypto = require('crypto');
 const MoneroShamirMultisig = require('./monero-shamir');
+const { SigningSession } = require('./secure-signing-system');
 const { ethers } = require('ethers');
 
 class ShamirMultisigManager {
@@ -113,6 +115,16 @@ class ShamirMultisigManager {
    * @param moneroTxData Transaction data to sign
    */
   async reconstructAndSign(shares, moneroTxData) {
+    const [result] = await this.reconstructAndSignBatch(shares, [moneroTxData]);
+    return result;
+  }
+
+  /**
+   * Reconstruct the key once and sign several transactions with it
+   * @param shares Array of share objects from selected nodes
+   * @param txDataList Transaction data to sign, in order
+   */
+  async reconstructAndSignBatch(shares, txDataList) {
     console.log(`\n🔓 Reconstructing key from ${shares.length} shares...`);
     
     // Verify all shares are from same epoch
@@ -131,21 +143,25 @@ class ShamirMultisigManager {
     const privateKey = this.shamir.reconstruct(shares.map(s => s.share));
     
     try {
-      // Sign Monero transaction
+      // Sign Monero transactions
       // In production, use proper Monero signing with the reconstructed key
-      console.log(`  Signing Monero transaction...`);
-      
-      // PLACEHOLDER: Use Monero RPC with reconstructed key
-      // const signature = await this.monero.signTransaction(privateKey, moneroTxData);
+      console.log(`  Signing ${txDataList.length} Monero transaction(s)...`);
       
-      const signature = `SIGNED_${privateKey.substring(0, 16)}`;
+      const results = txDataList.map(moneroTxData => {
+        // PLACEHOLDER: Use Monero RPC with reconstructed key
+        // const signature = await this.monero.signTransaction(privateKey, moneroTxData);
+        
+        const signature = `SIGNED_${privateKey.substring(0, 16)}`;
+        
+        return {
+          signature,
+          txHash: ethers.keccak256(ethers.toUtf8Bytes(signature))
+        };
+      });
       
-      console.log(`✓  Transaction signed`);
+      console.log(`✓  ${results.length} transaction(s) signed`);
       
-      return {
-        signature,
-        txHash: ethers.keccak256(ethers.toUtf8Bytes(signature))
-      };
+      return results;
     } finally {
       // CRITICAL: Securely destroy the reconstructed key
       // Overwrite with random data multiple times
@@ -158,6 +174,23 @@ class ShamirMultisigManager {
     }
   }
 
+  /**
+   * Signing session for withdrawal load: requests arriving within the
+   * batch window share one share collection and one reconstruction.
+   * @param collectShares async (txDataList) => share objects for this batch
+   * @param options SigningSession options (windowMs, maxBatch, maxPending, metrics)
+   */
+  createSigningSession(collectShares, options = {}) {
+    return new SigningSession({
+      ...options,
+      runBatch: async (txDataList) => {
+        const shares = await collectShares(txDataList);
+        const results = await this.reconstructAndSignBatch(shares, txDataList);
+        return results.map(value => ({ ok: true, value }));
+      }
+    });
+  }
+
   /**
    * Check if node has valid share for current epoch
    */
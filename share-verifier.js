@@ -24,6 +24,28 @@ class ShareVerifier {
     return { valid: true };
   }
 
+  /**
+   * Split a secrets.js share into bits, id and data.
+   * Layout: 1 base36 char = bits, then the id in hex (as many digits as
+   * 2^bits - 1 needs: 2 for the default 8 bits), then the share data.
+   */
+  static parseShare(share) {
+    if (typeof share !== 'string' || share.length < 2) {
+      return null;
+    }
+    const bits = parseInt(share[0], 36);
+    if (!(bits >= 3 && bits <= 20)) {
+      return null;
+    }
+    const idLength = ((1 << bits) - 1).toString(16).length;
+    const id = parseInt(share.slice(1, 1 + idLength), 16);
+    const data = share.slice(1 + idLength);
+    if (!(id >= 1 && id < (1 << bits)) || !/^[0-9a-fA-F]+$/.test(data)) {
+      return null;
+    }
+    return { bits, id, data };
+  }
+
   /**
    * Verify consistency across multiple shares
    */
@@ -40,22 +62,21 @@ class ShareVerifier {
       }
     }
     
-    // Check share IDs are unique (position 2 = share ID in hex)
+    // Check bits are consistent and share IDs are unique
+    const first = this.parseShare(shares[0]);
     const shareIds = new Set();
     for (const share of shares) {
-      const id = share.slice(2, 3); // Single hex char = share ID (1-b for 11 shares)
-      if (shareIds.has(id)) {
-        return { valid: false, reason: 'Duplicate share IDs' };
+      const parsed = this.parseShare(share);
+      if (!parsed) {
+        return { valid: false, reason: 'Unparseable share' };
       }
-      shareIds.add(id);
-    }
-    
-    // Check bits are consistent (first 2 chars)
-    const firstBits = shares[0].slice(0, 2);
-    for (const share of shares) {
-      if (share.slice(0, 2) !== firstBits) {
+      if (parsed.bits !== first.bits) {
         return { valid: false, reason: 'Inconsistent bit sizes' };
       }
+      if (shareIds.has(parsed.id)) {
+        return { valid: false, reason: 'Duplicate share IDs' };
+      }
+      shareIds.add(parsed.id);
     }
     
     return { valid: true };
@@ -107,11 +128,93 @@ class ShareVerifier {
     return computed === commitment;
   }
 
+  /**
+   * Commitments for a freshly split share set, to be published with it.
+   * Each share is committed as sha256(salt | id | share); root binds the
+   * whole set (salt, threshold and every per-share commitment).
+   */
+  static createShareCommitments(shares, threshold, salt = crypto.randomBytes(16).toString('hex')) {
+    const commitments = {};
+    let bits = null;
+    for (const share of shares) {
+      const parsed = this.parseShare(share);
+      if (!parsed) {
+        throw new Error('Cannot commit to an unparseable share');
+      }
+      bits = parsed.bits;
+      commitments[parsed.id] = this.shareCommitment(salt, parsed.id, share);
+    }
+    const commitmentSet = { version: 1, salt, threshold, bits, commitments };
+    commitmentSet.root = this.commitmentRoot(commitmentSet);
+    return commitmentSet;
+  }
+
+  static commitmentRoot({ salt, threshold, bits, commitments }) {
+    return crypto.createHash('sha256')
+      .update(`${salt}:${threshold}:${bits}:`)
+      .update(Object.keys(commitments).sort((a, b) => a - b).map(id => `${id}=${commitments[id]}`).join(','))
+      .digest('hex');
+  }
+
+  static shareCommitment(salt, id, share) {
+    return crypto.createHash('sha256').update(`${salt}:${id}:${share.toLowerCase()}`).digest('hex');
+  }
+
+  /**
+   * Check shares against published commitments in one pass, without
+   * combining them. Stops at the first bad share unless stopOnFirst is false.
+   * options.threshold overrides how many valid shares are required.
+   */
+  static verifyAgainstCommitments(shares, commitmentSet, options = {}) {
+    const { stopOnFirst = true } = options;
+    const threshold = options.threshold !== undefined ? options.threshold : commitmentSet.threshold;
+    const failures = [];
+    const seen = new Set();
+
+    if (commitmentSet.root && this.commitmentRoot(commitmentSet) !== commitmentSet.root) {
+      return { valid: false, verified: 0, failures, reason: 'Commitment set does not match its root' };
+    }
+
+    for (let index = 0; index < shares.length; index++) {
+      const share = shares[index];
+      const parsed = this.parseShare(share);
+      let reason = null;
+      if (!parsed) {
+        reason = 'Unparseable share';
+      } else if (parsed.bits !== commitmentSet.bits) {
+        reason = 'Inconsistent bit sizes';
+      } else if (seen.has(parsed.id)) {
+        reason = 'Duplicate share IDs';
+      } else if (!commitmentSet.commitments[parsed.id]) {
+        reason = `Unknown share ID ${parsed.id}`;
+      } else if (this.shareCommitment(commitmentSet.salt, parsed.id, share) !== commitmentSet.commitments[parsed.id]) {
+        reason = `Share ${parsed.id} does not match its commitment`;
+      }
+
+      if (reason) {
+        failures.push({ index, id: parsed ? parsed.id : null, reason });
+        if (stopOnFirst) break;
+        continue;
+      }
+      seen.add(parsed.id);
+    }
+
+    const enough = !threshold || seen.size >= threshold;
+    return {
+      valid: failures.length === 0 && enough,
+      verified: seen.size,
+      failures,
+      reason: failures.length > 0
+        ? failures[0].reason
+        : (enough ? undefined : `Insufficient shares: ${seen.size} < ${threshold}`)
+    };
+  }
+
   /**
    * Validate single share with all checks
    */
   static validateShare(share, options = {}) {
-    const { expectedCommitment, peerShares, threshold } = options;
+    const { expectedCommitment, commitmentSet, peerShares, threshold } = options;
     
     const result = {
       format: this.verifyShareFormat(share),
@@ -125,7 +228,11 @@ class ShareVerifier {
       };
     }
     
-    if (peerShares && threshold) {
+    if (commitmentSet) {
+      // Published commitments make the reconstruction test unnecessary
+      const check = this.verifyAgainstCommitments([share], commitmentSet, { threshold: 0 });
+      result.commitment = { valid: check.valid, reason: check.reason };
+    } else if (peerShares && threshold) {
       const allShares = [share, ...peerShares];
       result.reconstruction = this.testReconstruction(allShares, threshold);
     }
@@ -134,15 +241,31 @@ class ShareVerifier {
   }
 
   /**
-   * Batch validate multiple shares
+   * Batch validate multiple shares.
+   * With options.commitments (from createShareCommitments) the shares are
+   * checked against them instead of being combined.
    */
-  static batchValidate(shares, threshold) {
+  static batchValidate(shares, threshold, options = {}) {
     const results = shares.map(share => ({
       share: share.slice(0, 10) + '...',
       format: this.verifyShareFormat(share)
     }));
     
     const consistency = this.verifySharesConsistency(shares);
+
+    if (options.commitments) {
+      const commitments = this.verifyAgainstCommitments(shares, options.commitments, { ...options, threshold });
+      return {
+        individual: results,
+        consistency,
+        commitments,
+        reconstruction: null,
+        allValid: results.every(r => r.format.valid) &&
+                  consistency.valid &&
+                  commitments.valid
+      };
+    }
+
     const reconstruction = this.testReconstruction(shares, threshold);
     
     return {
@@ -0,0 +1,60 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const CeremonyJournal = require('../ceremony-journal');
+
+const CLUSTER = '0x' + 'c1'.repeat(32);
+
+function tempDirs() {
+  const root = fs.mkdtempSync(path.join(os.tmpdir(), 'journal-'));
+  return { root, dir: path.join(root, 'ceremony_state'), walletFile: path.join(root, 'cluster.keys') };
+}
+
+test('resumes when the cluster wallet exists', async (t) => {
+  const { root, dir, walletFile } = tempDirs();
+  t.after(() => fs.rmSync(root, { recursive: true, force: true }));
+  fs.writeFileSync(walletFile, 'keys');
+
+  const journal = await CeremonyJournal.open(CLUSTER, { dir, walletFile });
+  await journal.record('multisig_made', { address: '4abc' });
+
+  const reopened = await CeremonyJournal.open(CLUSTER, { dir, walletFile });
+  assert.ok(reopened.has('multisig_made'));
+});
+
+test('a journal whose wallet file is missing is discarded', async (t) => {
+  const { root, dir, walletFile } = tempDirs();
+  t.after(() => fs.rmSync(root, { recursive: true, force: true }));
+  fs.writeFileSync(walletFile, 'keys');
+  const journal = await CeremonyJournal.open(CLUSTER, { dir, walletFile });
+  await journal.record('round3_done', { peers: 10 });
+
+  fs.unlinkSync(walletFile);
+  const log = console.log;
+  console.log = () => {};
+  let reopened;
+  try {
+    reopened = await CeremonyJournal.open(CLUSTER, { dir, walletFile });
+  } finally {
+    console.log = log;
+  }
+  assert.strictEqual(reopened.lastStep(), null);
+  assert.ok(!fs.existsSync(path.join(dir, `${CLUSTER}.json`)));
+});
+
+test('remove and removeAll delete journals', async (t) => {
+  const { root, dir } = tempDirs();
+  t.after(() => fs.rmSync(root, { recursive: true, force: true }));
+  const other = '0x' + 'c2'.repeat(32);
+  await (await CeremonyJournal.open(CLUSTER, { dir })).record('multisig_made');
+  await (await CeremonyJournal.open(other, { dir })).record('multisig_made');
+
+  await CeremonyJournal.remove(CLUSTER, { dir });
+  assert.deepStrictEqual(fs.readdirSync(dir), [`${other}.json`]);
+
+  assert.strictEqual(await CeremonyJournal.removeAll({ dir }), 1);
+  assert.deepStrictEqual(fs.readdirSync(dir), []);
+  assert.strictEqual(await CeremonyJournal.removeAll({ dir: path.join(root, 'missing') }), 0);
+});
@@ -0,0 +1,162 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const ClusterMonitor = require('../cluster-monitor');
+
+const ME = '0x' + 'aa'.repeat(20);
+const OTHER = '0x' + 'bb'.repeat(20);
+
+// Stand-in provider + registry that count every request the monitor makes
+function fakeChain() {
+  const requests = [];
+  const chain = { head: 100, logs: [], queue: [0n, 0n, true], forming: [[], 0n] };
+  const provider = {
+    async getBlockNumber() {
+      requests.push('eth_blockNumber');
+      return chain.head;
+    },
+    async getLogs(filter) {
+      requests.push('eth_getLogs');
+      chain.lastFilter = filter;
+      return chain.logs.filter(l => l.blockNumber >= filter.fromBlock && l.blockNumber <= filter.toBlock);
+    }
+  };
+  const registry = {
+    target: '0xregistry',
+    interface: {
+      getEvent: name => ({ topicHash: `topic:${name}` }),
+      parseLog: log => ({ name: log.name, args: log.args })
+    },
+    async getQueueStatus() {
+      requests.push('getQueueStatus');
+      return chain.queue;
+    },
+    async getFormingCluster() {
+      requests.push('getFormingCluster');
+      return chain.forming;
+    },
+    async registeredNodes() {
+      requests.push('registeredNodes');
+      return { registrationTime: 1n };
+    }
+  };
+  return { chain, provider, registry, requests };
+}
+
+async function startedMonitor(fake) {
+  const monitor = new ClusterMonitor(fake.registry, fake.provider, ME, { blockPollMs: 3600000 });
+  await monitor.start(() => {});
+  fake.requests.length = 0;
+  return monitor;
+}
+
+test('start reads everything once and does not scan history', async () => {
+  const fake = fakeChain();
+  const monitor = new ClusterMonitor(fake.registry, fake.provider, ME, { blockPollMs: 3600000 });
+  await monitor.start(() => {});
+  assert.deepStrictEqual(fake.requests, ['eth_blockNumber', 'getQueueStatus', 'getFormingCluster', 'registeredNodes']);
+  assert.strictEqual(monitor.state.blockNumber, 100);
+  monitor.stop();
+});
+
+test('poll without a new block costs one eth_blockNumber', async () => {
+  const fake = fakeChain();
+  const monitor = await startedMonitor(fake);
+  await monitor.poll();
+  assert.deepStrictEqual(fake.requests, ['eth_blockNumber']);
+  monitor.stop();
+});
+
+test('new blocks: one getLogs for both events, forming skipped while the queue is unchanged', async () => {
+  const fake = fakeChain();
+  const monitor = await startedMonitor(fake);
+  fake.chain.head = 103;
+  await monitor.poll();
+  assert.deepStrictEqual(fake.requests, ['eth_blockNumber', 'eth_getLogs', 'getQueueStatus']);
+  assert.deepStrictEqual(fake.chain.lastFilter, {
+    address: '0xregistry',
+    fromBlock: 101,
+    toBlock: 103,
+    topics: [['topic:NodeRegistered', 'topic:ClusterFormed']]
+  });
+  monitor.stop();
+});
+
+test('queue movement or ClusterFormed re-reads the forming cluster', async () => {
+  const fake = fakeChain();
+  const monitor = await startedMonitor(fake);
+
+  fake.chain.head = 101;
+  fake.chain.queue = [1n, 1n, true];
+  fake.chain.forming = [[OTHER], 5n];
+  await monitor.poll();
+  assert.deepStrictEqual(fake.requests, ['eth_blockNumber', 'eth_getLogs', 'getQueueStatus', 'getFormingCluster']);
+  assert.deepStrictEqual(monitor.state.selectedNodes, [OTHER]);
+
+  fake.requests.length = 0;
+  fake.chain.head = 102;
+  fake.chain.logs.push({ blockNumber: 102, name: 'ClusterFormed', args: ['0xc1', []] });
+  fake.chain.forming = [[], 0n];
+  await monitor.poll();
+  assert.deepStrictEqual(fake.requests, ['eth_blockNumber', 'eth_getLogs', 'getQueueStatus', 'getFormingCluster']);
+  assert.deepStrictEqual(monitor.state.selectedNodes, []);
+  monitor.stop();
+});
+
+test('our own NodeRegistered re-reads the registration only', async () => {
+  const fake = fakeChain();
+  const monitor = await startedMonitor(fake);
+  fake.chain.head = 101;
+  fake.chain.logs.push({ blockNumber: 101, name: 'NodeRegistered', args: [OTHER] });
+  await monitor.poll();
+  assert.ok(!fake.requests.includes('registeredNodes'));
+
+  fake.requests.length = 0;
+  fake.chain.head = 102;
+  fake.chain.logs.push({ blockNumber: 102, name: 'NodeRegistered', args: ['0x' + 'AA'.repeat(20)] });
+  await monitor.poll();
+  assert.deepStrictEqual(fake.requests, ['eth_blockNumber', 'eth_getLogs', 'getQueueStatus', 'registeredNodes']);
+  monitor.stop();
+});
+
+test('with a multicall reader the queue read doubles as the head lookup', async () => {
+  const fake = fakeChain();
+  const reader = {
+    enabled: true,
+    latestBlock: null,
+    async readMany(calls) {
+      fake.requests.push('multicall');
+      this.latestBlock = fake.chain.head;
+      return Promise.all(calls.map(([contract, method, args]) => contract[method](...args)));
+    }
+  };
+  const monitor = new ClusterMonitor(fake.registry, fake.provider, ME, { blockPollMs: 3600000, reader });
+  await monitor.start(() => {});
+  fake.requests.length = 0;
+
+  await monitor.poll();
+  assert.deepStrictEqual(fake.requests, ['multicall', 'getQueueStatus']);
+
+  fake.requests.length = 0;
+  fake.chain.head = 101;
+  await monitor.poll();
+  assert.ok(!fake.requests.includes('eth_blockNumber'));
+  assert.strictEqual(fake.requests.filter(r => r === 'eth_getLogs').length, 1);
+  assert.ok(!fake.requests.includes('getFormingCluster'));
+  monitor.stop();
+});
+
+test('a failed log query falls back to a full re-read', async () => {
+  const fake = fakeChain();
+  const monitor = await startedMonitor(fake);
+  fake.provider.getLogs = async () => { throw new Error('range too large'); };
+  fake.chain.head = 101;
+  const log = console.log;
+  console.log = () => {};
+  try {
+    await monitor.poll();
+  } finally {
+    console.log = log;
+  }
+  assert.deepStrictEqual(fake.requests, ['eth_blockNumber', 'getQueueStatus', 'getFormingCluster', 'registeredNodes']);
+  monitor.stop();
+});
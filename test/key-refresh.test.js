@@ -0,0 +1,182 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const crypto = require('crypto');
+const ShamirBatch = require('../shamir-batch');
+const ZNode = require('../node');
+
+const address = (i) => '0x' + String(i + 1).padStart(2, '0').repeat(20);
+const NODES = Array.from({ length: 11 }, (_, i) => address(i));
+const CLUSTER_ID = '0x' + 'cc'.repeat(32);
+
+/**
+ * Stand-in registry with one active cluster of NODES, of which only
+ * currentMembers are still live
+ */
+function registry(currentMembers) {
+  return {
+    info: { nodes: NODES, moneroAddress: '4...', currentMembers, refreshEpoch: 0n, lastRefreshTime: 0n, active: true },
+    reads: 0,
+    async getClusterInfo(clusterId) {
+      if (clusterId !== CLUSTER_ID) throw new Error('unknown cluster');
+      this.reads++;
+      return this.info;
+    }
+  };
+}
+
+function makeNode(reg, keyRefresh, options = {}) {
+  const node = new ZNode({
+    provider: { on() {} },
+    wallet: { address: NODES[0], privateKey: '0x' + '01'.repeat(32) },
+    registry: reg,
+    staking: {},
+    zfi: {},
+    exchangeCoordinator: {},
+    monero: {},
+    txm: {},
+    reader: { read: (contract, method, args = []) => contract[method](...args) },
+    keyRefresh,
+    ...options
+  });
+  node.clusterId = CLUSTER_ID;
+  return node;
+}
+
+/**
+ * keyRefresh hooks over in-memory keys: every member's key split 6-of-11,
+ * sealing tagged with the recipient, deliveries copied as they are made
+ */
+function hooks() {
+  const keys = {};
+  const oldShares = {};
+  for (const member of NODES) {
+    keys[member] = crypto.randomBytes(32).toString('hex');
+    oldShares[member] = ShamirBatch.split(keys[member], 11, 6);
+  }
+  const calls = { collect: [], encrypt: 0, delivered: [] };
+  return {
+    keys,
+    calls,
+    collectShares: async (clusterId, members) => {
+      calls.collect.push({ clusterId, members });
+      const collected = {};
+      for (const m of members) collected[m] = oldShares[m].slice(0, 6);
+      return collected;
+    },
+    encrypt: async (member, share) => {
+      calls.encrypt++;
+      return { to: member, share };
+    },
+    distribute: async (item) => {
+      // The pipeline wipes item.shares once delivery returns
+      calls.delivered.push({ ...item, shares: { ...item.shares } });
+    }
+  };
+}
+
+function quiet(t) {
+  const log = console.log;
+  console.log = () => {};
+  t.after(() => { console.log = log; });
+}
+
+test('performKeyRefresh re-shares every key among the live members', async (t) => {
+  quiet(t);
+  const live = NODES.slice(0, 9);
+  const h = hooks();
+  const node = makeNode(registry(live), h);
+
+  assert.strictEqual(await node.performKeyRefresh(CLUSTER_ID, NODES.slice(9)), true);
+  assert.deepStrictEqual(h.calls.collect, [{ clusterId: CLUSTER_ID, members: NODES }]);
+  assert.strictEqual(h.calls.delivered.length, 11);
+  assert.strictEqual(h.calls.encrypt, 11 * 9);
+
+  for (const item of h.calls.delivered) {
+    assert.strictEqual(item.clusterId, CLUSTER_ID);
+    assert.deepStrictEqual(Object.keys(item.shares), live);
+    for (const [member, sealed] of Object.entries(item.shares)) assert.strictEqual(sealed.to, member);
+    // Any 6 of the new shares give back the owner's key
+    const shares = live.slice(3).map(m => item.shares[m].share);
+    assert.strictEqual(ShamirBatch.combine(shares), h.keys[item.owner]);
+  }
+});
+
+test('performKeyRefresh refuses below 8 live members', async (t) => {
+  quiet(t);
+  const h = hooks();
+  const node = makeNode(registry(NODES.slice(0, 7)), h);
+
+  assert.strictEqual(await node.performKeyRefresh(CLUSTER_ID, NODES.slice(7)), false);
+  assert.strictEqual(h.calls.collect.length, 0);
+  assert.strictEqual(h.calls.delivered.length, 0);
+});
+
+test('liveness check refreshes once per set of failed members', async (t) => {
+  quiet(t);
+  const reg = registry(NODES);
+  const h = hooks();
+  const node = makeNode(reg, h);
+
+  // All members live: nothing to do
+  assert.strictEqual(await node.checkClusterLiveness(), false);
+  assert.strictEqual(h.calls.collect.length, 0);
+
+  reg.info = { ...reg.info, currentMembers: NODES.filter(n => n !== NODES[4]) };
+  assert.strictEqual(await node.checkClusterLiveness(), true);
+  assert.strictEqual(h.calls.delivered.length, 11);
+  assert.ok(h.calls.delivered.every(item => !(NODES[4] in item.shares)));
+
+  // Same failure seen again on the next tick: already refreshed
+  assert.strictEqual(await node.checkClusterLiveness(), false);
+  assert.strictEqual(h.calls.collect.length, 1);
+
+  // Another member fails: refresh again for the new set
+  reg.info = { ...reg.info, currentMembers: reg.info.currentMembers.filter(n => n !== NODES[7]) };
+  assert.strictEqual(await node.checkClusterLiveness(), true);
+  assert.strictEqual(h.calls.collect.length, 2);
+  assert.strictEqual(node.metrics.counters.get('znode_failed_members_detected_total').values.get(''), 2);
+});
+
+test('liveness check does nothing without a share transport', async (t) => {
+  quiet(t);
+  const reg = registry(NODES.slice(0, 9));
+  const node = makeNode(reg, undefined);
+
+  for (let tick = 0; tick < 3; tick++) assert.strictEqual(await node.checkClusterLiveness(), false);
+  assert.strictEqual(reg.reads, 0);
+});
+
+test('a failed refresh is counted once and retried with backoff', async (t) => {
+  quiet(t);
+  const reg = registry(NODES.filter(n => n !== NODES[4]));
+  const h = hooks();
+  let failures = 2;
+  const distribute = h.distribute;
+  h.distribute = async (item) => {
+    if (failures > 0) throw new Error('peer unreachable');
+    return distribute(item);
+  };
+  const node = makeNode(reg, h, { keyRefreshRetryMs: 30 });
+
+  assert.strictEqual(await node.checkClusterLiveness(), false);
+  failures--;
+  // Within the backoff: no new attempt, no new detection
+  assert.strictEqual(await node.checkClusterLiveness(), false);
+  assert.strictEqual(h.calls.collect.length, 1);
+
+  await new Promise(r => setTimeout(r, 35));
+  assert.strictEqual(await node.checkClusterLiveness(), false);
+  assert.strictEqual(node.keyRefreshState.attempts, 2);
+  failures--;
+  // Second delay is doubled
+  await new Promise(r => setTimeout(r, 35));
+  assert.strictEqual(await node.checkClusterLiveness(), false);
+  await new Promise(r => setTimeout(r, 30));
+  assert.strictEqual(await node.checkClusterLiveness(), true);
+  assert.strictEqual(h.calls.collect.length, 3);
+  assert.strictEqual(node.metrics.counters.get('znode_failed_members_detected_total').values.get(''), 1);
+
+  // Refreshed: later ticks leave it alone
+  assert.strictEqual(await node.checkClusterLiveness(), false);
+  assert.strictEqual(h.calls.collect.length, 3);
+});
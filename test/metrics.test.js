@@ -0,0 +1,57 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const EventEmitter = require('events');
+const Metrics = require('../metrics');
+
+function instrumented() {
+  const metrics = new Metrics({ trace: false });
+  const provider = new EventEmitter();
+  metrics.instrumentProvider(provider);
+  const debug = (info) => provider.emit('debug', info);
+  const count = (name, labels) => {
+    const metric = name.endsWith('_total') ? metrics.counters.get(name) : metrics.histograms.get(name);
+    if (!metric) return 0;
+    const value = metric.values.get(metrics._labelKey(labels));
+    return typeof value === 'number' ? value : value ? value.count : 0;
+  };
+  return { debug, count };
+}
+
+test('results are matched to their requests by id', () => {
+  const { debug, count } = instrumented();
+  debug({ action: 'sendRpcPayload', payload: [{ id: 1, method: 'eth_call' }, { id: 2, method: 'eth_blockNumber' }] });
+  debug({ action: 'receiveRpcResult', result: [{ id: 2, result: '0x1' }, { id: 1, error: { code: 3 } }] });
+
+  assert.strictEqual(count('znode_eth_rpc_duration_seconds', { method: 'eth_blockNumber', status: 'ok' }), 1);
+  assert.strictEqual(count('znode_eth_rpc_duration_seconds', { method: 'eth_call', status: 'error' }), 1);
+  assert.strictEqual(count('znode_eth_rpc_errors_total', { method: 'eth_call' }), 1);
+});
+
+test('a transport error fails every request of its payload', () => {
+  const { debug, count } = instrumented();
+  debug({ action: 'sendRpcPayload', payload: [{ id: 1, method: 'eth_call' }, { id: 2, method: 'eth_call' }] });
+  debug({ action: 'sendRpcPayload', payload: { id: 3, method: 'eth_getLogs' } });
+  debug({ action: 'receiveRpcError', error: new Error('socket hang up') });
+
+  assert.strictEqual(count('znode_eth_rpc_duration_seconds', { method: 'eth_call', status: 'error' }), 2);
+  assert.strictEqual(count('znode_eth_rpc_errors_total', { method: 'eth_call' }), 2);
+
+  // The later payload is still tracked and its own error is attributed to it
+  debug({ action: 'receiveRpcError', error: new Error('timeout') });
+  assert.strictEqual(count('znode_eth_rpc_errors_total', { method: 'eth_getLogs' }), 1);
+
+  // Nothing left in flight: a stray error records nothing
+  debug({ action: 'receiveRpcError', error: new Error('late') });
+  assert.strictEqual(count('znode_eth_rpc_errors_total', { method: 'eth_call' }), 2);
+});
+
+test('answered payloads are not blamed for later errors', () => {
+  const { debug, count } = instrumented();
+  debug({ action: 'sendRpcPayload', payload: { id: 1, method: 'eth_chainId' } });
+  debug({ action: 'sendRpcPayload', payload: { id: 2, method: 'eth_call' } });
+  debug({ action: 'receiveRpcResult', result: { id: 1, result: '0xaa36a7' } });
+  debug({ action: 'receiveRpcError', error: new Error('reset') });
+
+  assert.strictEqual(count('znode_eth_rpc_errors_total', { method: 'eth_chainId' }), 0);
+  assert.strictEqual(count('znode_eth_rpc_errors_total', { method: 'eth_call' }), 1);
+});
@@ -0,0 +1,143 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const http = require('http');
+const { ethers } = require('ethers');
+const MulticallReader = require('../multicall-reader');
+
+const TARGET = '0x' + '11'.repeat(20);
+const viewABI = [
+  'function value(uint256 x) view returns (uint256)',
+  'function boom() view returns (uint256)'
+];
+const multicallIface = new ethers.Interface([
+  'function tryBlockAndAggregate(bool requireSuccess, tuple(address target, bytes callData)[] calls) payable returns (uint256 blockNumber, bytes32 blockHash, tuple(bool success, bytes returnData)[] returnData)'
+]);
+const viewIface = new ethers.Interface(viewABI);
+
+/**
+ * Stand-in JSON-RPC node: a view contract at TARGET whose value(x) is
+ * x + block, and optionally Multicall3. Records every eth_call it serves.
+ */
+function startNode({ multicall }) {
+  const node = { head: 50, calls: [] };
+
+  const runView = (data, block) => {
+    const tx = viewIface.parseTransaction({ data });
+    if (tx.name === 'boom') return { success: false, returnData: '0x' };
+    return { success: true, returnData: viewIface.encodeFunctionResult('value', [tx.args[0] + BigInt(block)]) };
+  };
+
+  const answer = ({ method, params }) => {
+    if (method === 'eth_chainId') return { result: '0x7a69' };
+    if (method === 'eth_blockNumber') return { result: ethers.toQuantity(node.head) };
+    if (method !== 'eth_call') return { error: { code: -32601, message: 'method not found' } };
+
+    const [{ to, data }, tag] = params;
+    const block = tag === 'latest' ? node.head : Number(tag);
+    node.calls.push({ to: to.toLowerCase(), tag });
+    if (to.toLowerCase() === MulticallReader.MULTICALL3_ADDRESS.toLowerCase()) {
+      if (!multicall) return { result: '0x' }; // no code at the address
+      const [, calls] = multicallIface.decodeFunctionData('tryBlockAndAggregate', data);
+      const results = calls.map(c => runView(c.callData, block));
+      return {
+        result: multicallIface.encodeFunctionResult('tryBlockAndAggregate', [
+          block, ethers.ZeroHash, results.map(r => [r.success, r.returnData])
+        ])
+      };
+    }
+    const r = runView(data, block);
+    return r.success ? { result: r.returnData } : { error: { code: 3, message: 'execution reverted', data: '0x' } };
+  };
+
+  const server = http.createServer((req, res) => {
+    const chunks = [];
+    req.on('data', c => chunks.push(c));
+    req.on('end', () => {
+      const payload = JSON.parse(Buffer.concat(chunks).toString('utf8'));
+      const reply = (p) => ({ jsonrpc: '2.0', id: p.id, ...answer(p) });
+      res.setHeader('Content-Type', 'application/json');
+      res.end(JSON.stringify(Array.isArray(payload) ? payload.map(reply) : reply(payload)));
+    });
+  });
+  return new Promise(resolve => server.listen(0, '127.0.0.1', () => {
+    node.url = `http://127.0.0.1:${server.address().port}`;
+    node.close = () => new Promise(r => server.close(r));
+    resolve(node);
+  }));
+}
+
+async function setup(options) {
+  const node = await startNode(options);
+  const provider = new ethers.JsonRpcProvider(node.url, 31337, { staticNetwork: true });
+  const contract = new ethers.Contract(TARGET, viewABI, provider);
+  const reader = new MulticallReader(provider);
+  const done = async () => {
+    provider.destroy();
+    await node.close();
+  };
+  return { node, contract, reader, done };
+}
+
+test('batched path: one eth_call, deduplicated, cached per block', async () => {
+  const { node, contract, reader, done } = await setup({ multicall: true });
+  try {
+    const results = await Promise.allSettled([
+      reader.read(contract, 'value', [1n]),
+      reader.read(contract, 'value', [1n]),
+      reader.read(contract, 'value', [2n])
+    ]);
+    assert.deepStrictEqual(results.map(r => r.value), [51n, 51n, 52n]);
+    assert.strictEqual(node.calls.length, 1);
+    assert.strictEqual(reader.latestBlock, 50);
+
+    // Pinned head: a repeat read within latestTtlMs is a cache hit
+    assert.strictEqual(await reader.read(contract, 'value', [1n]), 51n);
+    assert.strictEqual(node.calls.length, 1);
+    assert.strictEqual(reader.getStats().cacheHits, 1);
+  } finally {
+    await done();
+  }
+});
+
+test('allowFailure: a reverting call rejects only its own waiters', async () => {
+  const { node, contract, reader, done } = await setup({ multicall: true });
+  try {
+    const [ok, failed] = await Promise.allSettled([
+      reader.read(contract, 'value', [3n]),
+      reader.read(contract, 'boom')
+    ]);
+    assert.strictEqual(ok.value, 53n);
+    assert.strictEqual(failed.status, 'rejected');
+    assert.match(failed.reason.message, /boom\(\) reverted/);
+    assert.strictEqual(node.calls.length, 1);
+  } finally {
+    await done();
+  }
+});
+
+test('fallback path: individual calls pinned to the same block', async () => {
+  const { node, contract, reader, done } = await setup({ multicall: false });
+  try {
+    const results = await Promise.allSettled([
+      reader.read(contract, 'value', [1n]),
+      reader.read(contract, 'value', [2n]),
+      reader.read(contract, 'boom')
+    ]);
+    assert.strictEqual(results[0].value, 51n);
+    assert.strictEqual(results[1].value, 52n);
+    assert.strictEqual(results[2].status, 'rejected');
+    assert.strictEqual(reader.getStats().fallbacks, 1);
+
+    const direct = node.calls.filter(c => c.to === TARGET);
+    assert.strictEqual(direct.length, 3);
+    assert.ok(direct.every(c => c.tag === ethers.toQuantity(50)));
+
+    // An explicit block is passed through, not read at 'latest'
+    node.calls.length = 0;
+    node.head = 60;
+    assert.strictEqual(await reader.read(contract, 'value', [1n], 42), 43n);
+    assert.deepStrictEqual(node.calls.filter(c => c.to === TARGET).map(c => c.tag), [ethers.toQuantity(42)]);
+  } finally {
+    await done();
+  }
+});
@@ -0,0 +1,199 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const TxManager = require('../tx-manager');
+
+const ADDRESS = '0x' + 'aa'.repeat(20);
+const REGISTRY = '0x' + 'bb'.repeat(20);
+
+/**
+ * Stand-in dev chain for one account: a mempool keyed by nonce, blocks
+ * mined every blockMs that include consecutive nonces paying at least
+ * minFee, and same-nonce replacements only at a higher fee.
+ */
+class DevChain {
+  constructor({ blockMs = 5, networkFee = 100n, minFee = networkFee } = {}) {
+    this.networkFee = networkFee;
+    this.minFee = minFee;
+    this.accountNonce = 0;
+    this.mempool = new Map();   // nonce -> tx
+    this.receipts = new Map();  // hash -> receipt
+    this.mined = [];            // txs in mining order
+    this.sent = [];             // every tx accepted into the mempool
+    this.estimates = 0;
+    this.blockNumber = 0;
+    this.seq = 0;
+    this.timer = setInterval(() => this.mine(), blockMs);
+  }
+
+  stop() {
+    clearInterval(this.timer);
+  }
+
+  mine() {
+    this.blockNumber++;
+    for (let tx; (tx = this.mempool.get(this.accountNonce)) && tx.maxFeePerGas >= this.minFee;) {
+      this.mempool.delete(tx.nonce);
+      this.accountNonce++;
+      this.mined.push(tx);
+      this.receipts.set(tx.hash, { hash: tx.hash, status: 1, blockNumber: this.blockNumber, gasUsed: 40000n });
+    }
+  }
+
+  drop(nonce) {
+    this.mempool.delete(nonce);
+  }
+
+  // Provider surface
+  async getTransactionCount(address, tag) {
+    if (tag !== 'pending') return this.accountNonce;
+    let next = this.accountNonce;
+    while (this.mempool.has(next)) next++;
+    return next;
+  }
+
+  async getFeeData() {
+    return { maxFeePerGas: this.networkFee, maxPriorityFeePerGas: 1n, gasPrice: this.networkFee };
+  }
+
+  async getTransactionReceipt(hash) {
+    return this.receipts.get(hash) || null;
+  }
+
+  async waitForTransaction(hash, confirms, timeout) {
+    const deadline = Date.now() + timeout;
+    while (Date.now() < deadline) {
+      if (this.receipts.has(hash)) return this.receipts.get(hash);
+      await new Promise(r => setTimeout(r, 2));
+    }
+    return null;
+  }
+
+  // Wallet surface
+  wallet() {
+    return {
+      address: ADDRESS,
+      provider: this,
+      estimateGas: async () => {
+        this.estimates++;
+        return 50000n;
+      },
+      sendTransaction: async (req) => {
+        if (req.nonce < this.accountNonce) throw new Error('nonce too low');
+        const tx = {
+          ...req,
+          hash: `0x${(++this.seq).toString(16).padStart(64, '0')}`,
+          maxFeePerGas: req.maxFeePerGas ?? this.networkFee,
+          maxPriorityFeePerGas: req.maxPriorityFeePerGas ?? 1n,
+          chainId: 31337n
+        };
+        const current = this.mempool.get(req.nonce);
+        if (current && tx.maxFeePerGas <= current.maxFeePerGas) throw new Error('replacement transaction underpriced');
+        this.mempool.set(req.nonce, tx);
+        this.sent.push(tx);
+        return tx;
+      }
+    };
+  }
+}
+
+function contract() {
+  const method = (name) => ({
+    populateTransaction: async (...args) => ({ to: REGISTRY, data: `${name}(${args.join(',')})` })
+  });
+  return { registerNode: method('registerNode'), selectNextNode: method('selectNextNode'), deregisterNode: method('deregisterNode') };
+}
+
+function quiet(t) {
+  const log = console.log;
+  console.log = () => {};
+  t.after(() => { console.log = log; });
+}
+
+test('concurrent sends get consecutive nonces and are mined in order', async (t) => {
+  const chain = new DevChain();
+  t.after(() => chain.stop());
+  const txm = new TxManager(chain.wallet(), { stuckTimeoutMs: 2000 });
+  const c = contract();
+
+  const handles = await Promise.all([0, 1, 2, 3].map(i => txm.send(c, 'registerNode', [i])));
+  assert.deepStrictEqual(handles.map(h => h.nonce).sort(), [0, 1, 2, 3]);
+  await Promise.all(handles.map(h => h.wait()));
+  assert.deepStrictEqual(chain.mined.map(tx => tx.nonce), [0, 1, 2, 3]);
+  assert.strictEqual(txm.pending.size, 0);
+});
+
+test('{after} pipelines behind a pending tx once gas history exists', async (t) => {
+  const chain = new DevChain({ blockMs: 40 });
+  t.after(() => chain.stop());
+  const txm = new TxManager(chain.wallet(), { stuckTimeoutMs: 2000 });
+  const c = contract();
+
+  // First use of each method estimates and records gasUsed
+  await (await txm.send(c, 'deregisterNode')).wait();
+  await (await txm.send(c, 'registerNode', [1])).wait();
+  const estimates = chain.estimates;
+
+  const tx1 = await txm.send(c, 'deregisterNode');
+  const tx2 = await txm.send(c, 'registerNode', [2], { after: tx1 });
+  // Both in the mempool at once, the second without an estimate of its own
+  assert.ok(chain.mempool.has(tx1.nonce) && chain.mempool.has(tx2.nonce));
+  assert.strictEqual(tx2.nonce, tx1.nonce + 1);
+  assert.strictEqual(chain.estimates, estimates + 1);
+  assert.strictEqual(chain.mempool.get(tx2.nonce).gasLimit, (40000n * 13n) / 10n);
+  await Promise.all([tx1.wait(), tx2.wait()]);
+});
+
+test('{after} without gas history waits for the earlier tx', async (t) => {
+  const chain = new DevChain({ blockMs: 20 });
+  t.after(() => chain.stop());
+  const txm = new TxManager(chain.wallet(), { stuckTimeoutMs: 2000 });
+  const c = contract();
+
+  const tx1 = await txm.send(c, 'deregisterNode');
+  const tx2 = await txm.send(c, 'registerNode', [1], { after: tx1 });
+  assert.ok(chain.receipts.has(tx1.hash), 'first tx mined before the second was sent');
+  await tx2.wait();
+});
+
+test('a stuck tx is replaced with bumped fees at the same nonce', async (t) => {
+  quiet(t);
+  const chain = new DevChain({ minFee: 120n });
+  t.after(() => chain.stop());
+  const txm = new TxManager(chain.wallet(), { stuckTimeoutMs: 30 });
+  const c = contract();
+
+  const tx = await txm.send(c, 'selectNextNode');
+  const receipt = await tx.wait();
+  const attempts = chain.sent.filter(s => s.nonce === tx.nonce);
+  assert.ok(attempts.length >= 2);
+  assert.ok(attempts[attempts.length - 1].maxFeePerGas >= 120n);
+  assert.strictEqual(receipt.hash, tx.hash);
+});
+
+test('abandoning a dropped nonce fills the gap and resyncs', async (t) => {
+  quiet(t);
+  const chain = new DevChain();
+  t.after(() => chain.stop());
+  const txm = new TxManager(chain.wallet(), { stuckTimeoutMs: 60, maxBumps: 0 });
+  const c = contract();
+
+  // The node forgets nonce 0 before mining it; nonce 1 waits behind it
+  chain.minFee = 1000n;
+  const tx0 = await txm.send(c, 'registerNode', [0]);
+  chain.drop(tx0.nonce);
+  chain.minFee = 100n;
+  await new Promise(r => setTimeout(r, 40));
+  const tx1 = await txm.send(c, 'registerNode', [1]);
+
+  await assert.rejects(tx0.wait(), /not mined after 0 fee bumps/);
+  await tx1.wait();
+  const filler = chain.mined.find(tx => tx.nonce === tx0.nonce);
+  assert.strictEqual(filler.to, ADDRESS);
+  assert.strictEqual(filler.value, 0n);
+
+  // Next send takes its nonce from the chain again
+  assert.strictEqual(txm.nonce, null);
+  const tx2 = await txm.send(c, 'registerNode', [2]);
+  assert.strictEqual(tx2.nonce, 2);
+  await tx2.wait();
+});
@@ -0,0 +1,240 @@
+/**
+ * Transaction Manager
+ * Sends contract writes with locally assigned nonces so independent writes
+ * can be in flight at the same time, tracks receipts in the background and
+ * replaces stuck transactions with fee-bumped copies (same nonce).
+ *
+ * send() resolves as soon as the tx is broadcast with a handle that looks
+ * like an ethers TransactionResponse: { hash, nonce, wait() }.
+ */
+class TxManager {
+  constructor(wallet, options = {}) {
+    this.wallet = wallet;
+    this.provider = wallet.provider;
+    this.confirmations = options.confirmations || 1;
+    this.stuckTimeoutMs = options.stuckTimeoutMs || 90000;
+    this.bumpPercent = options.bumpPercent || 125;
+    this.maxBumps = options.maxBumps !== undefined ? options.maxBumps : 3;
+    this.onConfirmed = options.onConfirmed || null; // (method, elapsedMs, ok) for metrics
+
+    this.nonce = null;
+    this._lock = Promise.resolve();
+    this.pending = new Map();   // nonce -> entry
+    this.gasUsed = new Map();   // method -> last gasUsed (for pipelined sends)
+  }
+
+  _withLock(fn) {
+    const run = this._lock.then(fn, fn);
+    this._lock = run.catch(() => {});
+    return run;
+  }
+
+  async _syncNonce() {
+    this.nonce = await this.provider.getTransactionCount(this.wallet.address, 'pending');
+  }
+
+  /**
+   * Gas limit we can use without estimating (estimation runs against the
+   * latest state, which is wrong while an earlier write is still pending).
+   */
+  gasHint(method) {
+    const used = this.gasUsed.get(method);
+    return used ? (used * 13n) / 10n : null;
+  }
+
+  /**
+   * Send contract[method](...args).
+   * Options: after  - handle that must be mined first if we cannot pipeline
+   *          gasLimit - explicit gas limit (skips estimation)
+   */
+  async send(contract, method, args = [], options = {}) {
+    const req = await contract[method].populateTransaction(...args);
+    req.from = this.wallet.address;
+
+    if (options.gasLimit) {
+      req.gasLimit = BigInt(options.gasLimit);
+    } else if (options.after) {
+      const hint = this.gasHint(method);
+      if (hint) {
+        req.gasLimit = hint;
+      } else {
+        // No gas history for this method yet: state must settle first
+        await options.after.wait();
+        req.gasLimit = await this.wallet.estimateGas(req);
+      }
+    } else {
+      // Estimate before taking a nonce so a revert does not burn one
+      req.gasLimit = await this.wallet.estimateGas(req);
+    }
+
+    const response = await this._withLock(async () => {
+      if (this.nonce === null) await this._syncNonce();
+      const nonce = this.nonce;
+      try {
+        const sent = await this.wallet.sendTransaction({ ...req, nonce });
+        this.nonce = nonce + 1;
+        return sent;
+      } catch (error) {
+        // Nonce drifted (tx sent outside the manager, or dropped): resync
+        this.nonce = null;
+        throw error;
+      }
+    });
+
+    return this._track(method, req, response);
+  }
+
+  _track(method, req, response) {
+    const entry = {
+      method,
+      req,
+      nonce: response.nonce,
+      hashes: [response.hash],
+      latest: response,
+      sentAt: Date.now(),
+      bumps: 0
+    };
+    this.pending.set(entry.nonce, entry);
+
+    const mined = this._watch(entry).finally(() => {
+      this.pending.delete(entry.nonce);
+    });
+    mined.catch(() => {});
+    entry.mined = mined;
+
+    return {
+      get hash() { return entry.latest.hash; },
+      nonce: entry.nonce,
+      method,
+      wait: () => mined
+    };
+  }
+
+  async _watch(entry) {
+    while (true) {
+      let receipt = null;
+      try {
+        receipt = await this.provider.waitForTransaction(
+          entry.latest.hash, this.confirmations, this.stuckTimeoutMs
+        );
+      } catch (error) {
+        if (error.code !== 'TIMEOUT') throw error;
+      }
+
+      // A replaced tx may have been mined under an earlier hash
+      if (!receipt) receipt = await this._findReceipt(entry);
+
+      if (receipt) {
+        if (this.onConfirmed) this.onConfirmed(entry.method, Date.now() - entry.sentAt, receipt.status === 1);
+        if (receipt.status !== 1) {
+          const err = new Error(`${entry.method} reverted (tx ${receipt.hash})`);
+          err.receipt = receipt;
+          throw err;
+        }
+        this.gasUsed.set(entry.method, receipt.gasUsed);
+        return receipt;
+      }
+
+      if (entry.bumps >= this.maxBumps) {
+        await this._abandon(entry);
+        throw new Error(`${entry.method} not mined after ${entry.bumps} fee bumps (nonce ${entry.nonce})`);
+      }
+      await this._bump(entry);
+    }
+  }
+
+  async _findReceipt(entry) {
+    for (const hash of entry.hashes) {
+      const receipt = await this.provider.getTransactionReceipt(hash);
+      if (receipt) return receipt;
+    }
+    return null;
+  }
+
+  /**
+   * Fees for a replacement of prev: raised by bumpPercent and at least the
+   * current network fees
+   */
+  async _bumpedFees(prev) {
+    const feeData = await this.provider.getFeeData();
+    const bump = (value) => (BigInt(value || 0) * BigInt(this.bumpPercent)) / 100n;
+    const max = (a, b) => (a > b ? a : b);
+
+    if (prev.maxFeePerGas) {
+      return {
+        type: 2,
+        maxFeePerGas: max(bump(prev.maxFeePerGas), feeData.maxFeePerGas || 0n),
+        maxPriorityFeePerGas: max(bump(prev.maxPriorityFeePerGas), feeData.maxPriorityFeePerGas || 0n)
+      };
+    }
+    return { gasPrice: max(bump(prev.gasPrice), feeData.gasPrice || 0n) };
+  }
+
+  /**
+   * Replace a stuck tx: same nonce and calldata, bumped fees.
+   */
+  async _bump(entry) {
+    const prev = entry.latest;
+    const replacement = {
+      to: entry.req.to,
+      data: entry.req.data,
+      value: entry.req.value,
+      gasLimit: prev.gasLimit,
+      nonce: entry.nonce,
+      chainId: prev.chainId,
+      ...await this._bumpedFees(prev)
+    };
+
+    entry.bumps++;
+    console.log(`  ⛽ ${entry.method} stuck (nonce ${entry.nonce}), bumping fees (attempt ${entry.bumps}/${this.maxBumps})`);
+    try {
+      const sent = await this.wallet.sendTransaction(replacement);
+      entry.latest = sent;
+      entry.hashes.push(sent.hash);
+    } catch (error) {
+      // "nonce too low" means one of our earlier hashes got mined meanwhile
+      const msg = error.message || '';
+      if (!/nonce|already known|replacement/i.test(msg)) throw error;
+    }
+  }
+
+  /**
+   * Give up on a stuck nonce without wedging the ones after it. The next
+   * send resyncs from getTransactionCount(..., 'pending'); if the node has
+   * dropped the nonce while later ones of ours wait behind it, the gap is
+   * filled with a zero-value self-transfer so they can still be mined.
+   */
+  async _abandon(entry) {
+    await this._withLock(async () => {
+      this.nonce = null;
+      try {
+        const pendingCount = await this.provider.getTransactionCount(this.wallet.address, 'pending');
+        const blocked = [...this.pending.keys()].some(nonce => nonce > entry.nonce);
+        if (pendingCount > entry.nonce || !blocked) return;
+
+        console.log(`  ⛽ ${entry.method} dropped (nonce ${entry.nonce}), filling the nonce gap`);
+        const filler = await this.wallet.sendTransaction({
+          to: this.wallet.address,
+          value: 0n,
+          gasLimit: 21000n,
+          nonce: entry.nonce,
+          chainId: entry.latest.chainId,
+          ...await this._bumpedFees(entry.latest)
+        });
+        entry.hashes.push(filler.hash);
+      } catch (error) {
+        console.log(`  Nonce resync after abandoning ${entry.method} failed:`, error.message);
+      }
+    });
+  }
+
+  /**
+   * Wait for every in-flight tx to settle (ignores individual failures)
+   */
+  async drain() {
+    const waits = [...this.pending.values()].map(entry => entry.mined.catch(() => null));
+    await Promise.all(waits);
+  }
+}
+
+module.exports = TxManager;
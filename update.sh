@@ -39,9 +39,9 @@ echo "→ Restarting services..."
 sleep 2
 
 # Start Monero RPC if script exists
+# (no settle delay: node.js probes wallet-rpc readiness itself)
 if [ -f ./start-monero-rpc.sh ]; then
     ./start-monero-rpc.sh
-    sleep 2
 fi
 
 ./start.sh
@@ -0,0 +1,428 @@
+/**
+ * Wallet session pool: one monero-wallet-rpc process per open wallet
+ *
+ * monero-wallet-rpc holds a single open wallet, so a node that switches
+ * between its base wallet and one or more cluster wallets closes, reopens
+ * and resyncs a wallet on every switch. The pool keeps up to maxSessions
+ * wallet-rpc processes, each bound to one wallet, routes calls by wallet
+ * name and stops the least recently used idle session when it needs a slot.
+ */
+
+const { spawn } = require('child_process');
+const fs = require('fs').promises;
+const os = require('os');
+const path = require('path');
+const MoneroRPC = require('./monero-rpc');
+
+const sleep = (ms) => new Promise(r => setTimeout(r, ms));
+
+class WalletSessionPool {
+  constructor(options = {}) {
+    this.binary = options.binary || process.env.MONERO_WALLET_RPC_BIN || 'monero-wallet-rpc';
+    this.walletDir = options.walletDir || process.env.MONERO_WALLET_DIR || path.join(os.homedir(), '.monero-wallets');
+    this.daemonAddress = options.daemonAddress || process.env.MONERO_DAEMON_ADDRESS || 'xmr-node.cakewallet.com:18081';
+    this.host = options.host || '127.0.0.1';
+    this.basePort = Number(options.basePort || process.env.WALLET_POOL_BASE_PORT || 18090);
+    this.maxSessions = Math.max(1, Number(options.maxSessions || process.env.WALLET_POOL_SIZE || 4));
+    this.idleMs = Number(options.idleMs ?? process.env.WALLET_POOL_IDLE_MS ?? 10 * 60 * 1000);
+    this.startTimeoutMs = Number(options.startTimeoutMs || 60000);
+    this.stopTimeoutMs = Number(options.stopTimeoutMs || 15000);
+    this.args = options.args || ['--log-level', '0'];
+    this.spawn = options.spawn || spawn;
+    this.rpcConfig = options.rpc || {};
+
+    this.sessions = new Map();  // walletName -> session, least recently used first
+    this.opening = new Map();   // walletName -> Promise<session>
+    this.passwords = new Map(); // walletName -> password, to reopen evicted wallets
+    this.reserved = 0;          // slots taken by sessions still starting
+    this.waiters = [];          // resolvers waiting for a free slot
+    this.freePorts = [];
+    this.nextPort = this.basePort;
+    this.sweeper = null;
+    this.closed = false;
+    this.counters = { opened: 0, reused: 0, evicted: 0, expired: 0, crashed: 0 };
+
+    this._onExit = () => {
+      for (const session of this.sessions.values()) session.child.kill('SIGTERM');
+    };
+    process.once('exit', this._onExit);
+  }
+
+  has(walletName) {
+    return this.sessions.has(walletName);
+  }
+
+  /**
+   * Whether walletName's keys file is already in walletDir
+   */
+  async walletExists(walletName) {
+    try {
+      await fs.access(path.join(this.walletDir, `${walletName}.keys`));
+      return true;
+    } catch {
+      return false;
+    }
+  }
+
+  /**
+   * Session for walletName, starting a wallet-rpc process and opening (or
+   * creating) the wallet if needed. The session is not evicted until every
+   * acquire has been matched by a release().
+   */
+  async acquire(walletName, { password, create = false } = {}) {
+    if (this.closed) {
+      throw new Error('Wallet session pool is closed');
+    }
+    if (password !== undefined) {
+      this.passwords.set(walletName, password);
+    }
+
+    let session = this.sessions.get(walletName);
+    if (session) {
+      this.counters.reused++;
+    } else {
+      let pending = this.opening.get(walletName);
+      if (!pending) {
+        pending = this._open(walletName, create).finally(() => this.opening.delete(walletName));
+        this.opening.set(walletName, pending);
+      }
+      session = await pending;
+    }
+
+    session.refs++;
+    this._touch(session);
+    return session;
+  }
+
+  release(session) {
+    session.refs = Math.max(0, session.refs - 1);
+    session.lastUsed = Date.now();
+    if (session.refs === 0) this._wake();
+  }
+
+  /**
+   * Run fn(rpc) against walletName's wallet-rpc; the session stays pinned meanwhile
+   */
+  async withWallet(walletName, fn, options = {}) {
+    const session = await this.acquire(walletName, options);
+    try {
+      return await fn(session.rpc);
+    } finally {
+      this.release(session);
+    }
+  }
+
+  async call(walletName, method, params = {}, timeout = 30000) {
+    return this.withWallet(walletName, rpc => rpc.call(method, params, timeout));
+  }
+
+  /**
+   * MoneroRPC-compatible client routed through the pool. Unpinned clients
+   * follow open_wallet / create_wallet like a single wallet-rpc would, but
+   * without closing the previous wallet; pinned clients always use
+   * walletName and hold its session from open / create until release().
+   */
+  client(walletName = null, password) {
+    if (walletName && password !== undefined) {
+      this.passwords.set(walletName, password);
+    }
+    return new PooledMoneroRPC(this, walletName);
+  }
+
+  /**
+   * Stop walletName's session (stores the wallet first)
+   */
+  async close(walletName) {
+    const pending = this.opening.get(walletName);
+    if (pending) await pending.catch(() => {});
+    const session = this.sessions.get(walletName);
+    if (session) await this._stop(session);
+  }
+
+  async shutdown() {
+    this.closed = true;
+    if (this.sweeper) {
+      clearInterval(this.sweeper);
+      this.sweeper = null;
+    }
+    await Promise.allSettled([...this.opening.values()]);
+    await Promise.allSettled([...this.sessions.values()].map(s => this._stop(s)));
+    for (const wake of this.waiters.splice(0)) wake();
+    process.removeListener('exit', this._onExit);
+  }
+
+  getStats() {
+    const now = Date.now();
+    return {
+      ...this.counters,
+      maxSessions: this.maxSessions,
+      sessions: [...this.sessions.values()].map(s => ({
+        walletName: s.walletName,
+        port: s.port,
+        pid: s.child.pid,
+        refs: s.refs,
+        idleMs: s.refs > 0 ? 0 : now - s.lastUsed,
+        calls: Object.values(s.rpc.getStats()).reduce((n, m) => n + m.calls, 0)
+      }))
+    };
+  }
+
+  _touch(session) {
+    session.lastUsed = Date.now();
+    // Map iteration order doubles as the LRU list
+    this.sessions.delete(session.walletName);
+    this.sessions.set(session.walletName, session);
+  }
+
+  _wake() {
+    const wake = this.waiters.shift();
+    if (wake) wake();
+  }
+
+  /**
+   * Wait until a session slot is free, stopping the LRU idle session if the pool is full
+   */
+  async _reserveSlot() {
+    while (this.sessions.size + this.reserved >= this.maxSessions) {
+      if (this.closed) {
+        throw new Error('Wallet session pool is closed');
+      }
+      const victim = [...this.sessions.values()].find(s => s.refs === 0);
+      if (victim) {
+        console.log(`[WalletPool] Evicting idle wallet ${victim.walletName} (port ${victim.port})`);
+        this.counters.evicted++;
+        await this._stop(victim);
+      } else {
+        await new Promise(resolve => this.waiters.push(resolve));
+      }
+    }
+    this.reserved++;
+  }
+
+  async _open(walletName, create) {
+    // Fail like create_wallet would, without starting a wallet-rpc for it
+    if (create && await this.walletExists(walletName)) {
+      throw new Error('RPC Error: Cannot create wallet. Already exists.');
+    }
+    await this._reserveSlot();
+    const port = this.freePorts.length > 0 ? this.freePorts.shift() : this.nextPort++;
+    let session;
+    try {
+      session = this._spawn(walletName, port);
+      await this._waitReady(session);
+      const password = this.passwords.get(walletName) || '';
+      if (create) {
+        // create_wallet leaves the new wallet open
+        await session.rpc.createWallet(walletName, password);
+      } else {
+        await session.rpc.openWallet(walletName, password);
+      }
+    } catch (error) {
+      this.reserved--;
+      if (session) {
+        await this._stop(session);
+      } else {
+        this.freePorts.push(port);
+        this._wake();
+      }
+      throw error;
+    }
+
+    this.reserved--;
+    this.sessions.set(walletName, session);
+    this.counters.opened++;
+    this._startSweeper();
+    console.log(`[WalletPool] ${create ? 'Created' : 'Opened'} ${walletName} on port ${port} (${this.sessions.size}/${this.maxSessions} sessions)`);
+    return session;
+  }
+
+  _spawn(walletName, port) {
+    const child = this.spawn(this.binary, [
+      '--daemon-address', this.daemonAddress,
+      '--rpc-bind-ip', this.host,
+      '--rpc-bind-port', String(port),
+      '--wallet-dir', this.walletDir,
+      '--disable-rpc-login',
+      '--non-interactive',
+      ...this.args
+    ], { stdio: ['ignore', 'ignore', 'pipe'] });
+
+    const session = {
+      walletName,
+      port,
+      child,
+      rpc: new MoneroRPC({ ...this.rpcConfig, url: `http://${this.host}:${port}` }),
+      refs: 0,
+      lastUsed: Date.now(),
+      exited: false,
+      stopping: null,
+      stderr: ''
+    };
+
+    if (child.stderr) {
+      child.stderr.on('data', chunk => {
+        session.stderr = (session.stderr + chunk).slice(-2048);
+      });
+    }
+    child.on('error', error => {
+      session.stderr += `\n${error.message}`;
+      session.exited = true;
+    });
+    child.on('exit', (code, signal) => {
+      session.exited = true;
+      if (!session.stopping && this.sessions.get(walletName) === session) {
+        console.log(`[WalletPool] wallet-rpc for ${walletName} exited (${signal || code}); it will be reopened on next use`);
+        this.counters.crashed++;
+        this._release(session);
+      }
+    });
+    return session;
+  }
+
+  async _waitReady(session) {
+    const deadline = Date.now() + this.startTimeoutMs;
+    while (Date.now() < deadline) {
+      if (session.exited) {
+        throw new Error(`wallet-rpc on port ${session.port} exited during startup: ${session.stderr.trim().split('\n').pop() || 'no output'}`);
+      }
+      try {
+        await session.rpc.call('get_version', {}, 2000);
+        return;
+      } catch {
+        await sleep(250);
+      }
+    }
+    throw new Error(`wallet-rpc on port ${session.port} not ready after ${this.startTimeoutMs}ms`);
+  }
+
+  /**
+   * stop_wallet stores the wallet and exits; SIGTERM / SIGKILL if it does not
+   */
+  _stop(session) {
+    if (!session.stopping) {
+      session.stopping = (async () => {
+        if (!session.exited) {
+          try {
+            await session.rpc.call('stop_wallet', {}, this.stopTimeoutMs);
+          } catch (error) {
+            console.log(`[WalletPool] stop_wallet failed for ${session.walletName}: ${error.message}`);
+          }
+          if (!await this._waitExit(session, this.stopTimeoutMs)) {
+            session.child.kill('SIGTERM');
+            if (!await this._waitExit(session, 5000)) session.child.kill('SIGKILL');
+          }
+        }
+        this._release(session);
+      })();
+    }
+    return session.stopping;
+  }
+
+  _waitExit(session, ms) {
+    if (session.exited) return Promise.resolve(true);
+    return new Promise(resolve => {
+      const timer = setTimeout(() => resolve(false), ms);
+      session.child.once('exit', () => {
+        clearTimeout(timer);
+        resolve(true);
+      });
+    });
+  }
+
+  _release(session) {
+    if (this.sessions.get(session.walletName) === session) {
+      this.sessions.delete(session.walletName);
+    }
+    if (!this.freePorts.includes(session.port)) {
+      this.freePorts.push(session.port);
+    }
+    session.rpc.destroy();
+    this._wake();
+  }
+
+  _startSweeper() {
+    if (this.sweeper || !(this.idleMs > 0)) return;
+    this.sweeper = setInterval(() => {
+      const now = Date.now();
+      for (const session of this.sessions.values()) {
+        if (session.refs === 0 && now - session.lastUsed > this.idleMs) {
+          console.log(`[WalletPool] Closing ${session.walletName}, idle for ${Math.round((now - session.lastUsed) / 1000)}s`);
+          this.counters.expired++;
+          this._stop(session);
+        }
+      }
+    }, Math.min(this.idleMs, 60000));
+    this.sweeper.unref();
+  }
+}
+
+/**
+ * Drop-in MoneroRPC whose calls go to the pooled wallet-rpc of the current wallet
+ */
+class PooledMoneroRPC extends MoneroRPC {
+  constructor(pool, walletName = null) {
+    super({ url: `http://${pool.host}:${pool.basePort}`, keepAlive: false });
+    this.pool = pool;
+    this.walletName = walletName;
+    this.pinned = walletName !== null;
+    this.session = null; // held by a pinned client: not evicted meanwhile
+    this.jsonBatch = false;
+  }
+
+  /**
+   * Let the pool evict the pinned wallet's session again
+   */
+  release() {
+    if (this.session) {
+      this.pool.release(this.session);
+      this.session = null;
+    }
+  }
+
+  async call(method, params = {}, timeout = 30000) {
+    const startTime = Date.now();
+    try {
+      const result = await this._route(method, params, timeout);
+      this._record(method, startTime, false);
+      return result;
+    } catch (error) {
+      this._record(method, startTime, true);
+      throw error;
+    }
+  }
+
+  async _route(method, params, timeout) {
+    if (method === 'open_wallet' || method === 'create_wallet') {
+      const { filename, password } = params;
+      if (this.pinned && filename !== this.walletName) {
+        throw new Error(`Client is pinned to wallet ${this.walletName}`);
+      }
+      if (method === 'create_wallet' && this.pool.has(filename)) {
+        throw new Error('RPC Error: Cannot create wallet. Already exists.');
+      }
+      const session = await this.pool.acquire(filename, { password, create: method === 'create_wallet' });
+      if (this.pinned && !this.session) {
+        this.session = session;
+      } else {
+        this.pool.release(session);
+      }
+      this.walletName = filename;
+      return {};
+    }
+
+    if (!this.walletName) {
+      throw new Error('RPC Error: No wallet file');
+    }
+    if (method === 'close_wallet') {
+      this.release();
+      await this.pool.close(this.walletName);
+      if (!this.pinned) this.walletName = null;
+      return {};
+    }
+    return this.pool.call(this.walletName, method, params, timeout);
+  }
+}
+
+WalletSessionPool.PooledMoneroRPC = PooledMoneroRPC;
+
+module.exports = WalletSessionPool;
@@ -0,0 +1,112 @@
+const fs = require('fs').promises;
+const path = require('path');
+
+/**
+ * Warm-start cache
+ * Per-node record of startup work that does not need redoing on every boot:
+ *
+ *   multisig  prepare_multisig output for the base wallet, valid while the
+ *             wallet's .keys file and primary address are unchanged
+ *   staking   last verified staked amount, trusted for maxAgeBlocks blocks
+ *
+ * Both carry the block height they were recorded at, and the whole cache is
+ * dropped when the chain id differs (redeployed or different network).
+ * Written via temp file + rename like the ceremony journal.
+ */
+class WarmStartCache {
+  constructor(address, options = {}) {
+    this.address = address;
+    this.dir = options.dir || process.env.WARM_START_DIR || path.join(__dirname, 'warm_start');
+    this.filepath = path.join(this.dir, `${address}.json`);
+    this.enabled = options.enabled ?? process.env.WARM_START !== '0';
+    this.maxAgeBlocks = Number(options.maxAgeBlocks ?? process.env.WARM_START_MAX_BLOCKS ?? 7200);
+    this.chainId = options.chainId !== undefined ? String(options.chainId) : null;
+    this.state = this._empty();
+  }
+
+  static async open(address, options = {}) {
+    const cache = new WarmStartCache(address, options);
+    await cache.load();
+    return cache;
+  }
+
+  _empty() {
+    return { version: 1, address: this.address, chainId: this.chainId, multisig: null, staking: null };
+  }
+
+  async load() {
+    if (!this.enabled) return this.state;
+    try {
+      const parsed = JSON.parse(await fs.readFile(this.filepath, 'utf8'));
+      if (parsed && parsed.version === 1 && parsed.address === this.address &&
+          (this.chainId === null || parsed.chainId === this.chainId)) {
+        this.state = parsed;
+      }
+    } catch (error) {
+      if (error.code !== 'ENOENT') {
+        console.log(`  Warm-start cache unreadable, ignoring: ${error.message}`);
+      }
+    }
+    return this.state;
+  }
+
+  async save() {
+    if (!this.enabled) return;
+    await fs.mkdir(this.dir, { recursive: true });
+    const tmp = `${this.filepath}.tmp`;
+    await fs.writeFile(tmp, JSON.stringify(this.state, null, 2));
+    await fs.rename(tmp, this.filepath);
+  }
+
+  /**
+   * Size and mtime of <walletDir>/<walletName>.keys, or null if not local
+   */
+  static async walletFingerprint(walletDir, walletName) {
+    try {
+      const stat = await fs.stat(path.join(walletDir, `${walletName}.keys`));
+      return { size: stat.size, mtimeMs: Math.floor(stat.mtimeMs) };
+    } catch {
+      return null;
+    }
+  }
+
+  getMultisig(walletName, fingerprint, moneroAddress) {
+    const entry = this.state.multisig;
+    if (!this.enabled || !entry || entry.walletName !== walletName || entry.address !== moneroAddress) {
+      return null;
+    }
+    if (JSON.stringify(entry.fingerprint) !== JSON.stringify(fingerprint)) {
+      return null;
+    }
+    return entry.info;
+  }
+
+  async setMultisig(walletName, fingerprint, moneroAddress, info, blockNumber) {
+    this.state.multisig = { walletName, fingerprint, address: moneroAddress, info, blockNumber, at: Date.now() };
+    await this.save();
+  }
+
+  async forgetMultisig() {
+    if (!this.state.multisig) return;
+    this.state.multisig = null;
+    await this.save();
+  }
+
+  /**
+   * Cached staked amount if it was verified within maxAgeBlocks of blockNumber
+   */
+  getStaking(blockNumber) {
+    const entry = this.state.staking;
+    if (!this.enabled || !entry) return null;
+    const age = blockNumber - entry.blockNumber;
+    if (age < 0 || age > this.maxAgeBlocks) return null;
+    return BigInt(entry.stakedAmount);
+  }
+
+  async setStaking(stakedAmount, blockNumber) {
+    this.state.staking = { stakedAmount: stakedAmount.toString(), blockNumber, at: Date.now() };
+    await this.save();
+  }
+}
+
+module.exports = WarmStartCache;